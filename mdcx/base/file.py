@@ -1,9 +1,9 @@
 import asyncio
 import os
-import re
 import shutil
 import time
 import traceback
+from collections.abc import Iterable
 from pathlib import Path
 
 import aiofiles
@@ -15,7 +15,7 @@ from ..config.manager import manager
 from ..config.models import CleanAction
 from ..config.resources import resources
 from ..models.enums import FileMode
-from ..models.flags import Flags
+from ..models.flags import Flags, ScrapeState
 from ..models.log_buffer import LogBuffer
 from ..signals import signal
 from ..utils import executor, get_current_time, get_used_time
@@ -106,7 +106,7 @@ async def copy_trailer_to_theme_videos(folder_new_path: Path, naming_rule: str)
         LogBuffer.log().write("\n 🍀 Trailer delete done!")
 
 
-async def pic_some_deal(number: str, thumb_final_path: Path, fanart_final_path: Path) -> None:
+async def pic_some_deal(number: str, thumb_final_path: Path, fanart_final_path: Path, state: ScrapeState) -> None:
     """
     thumb、poster、fanart 删除冗余的图片
     """
@@ -116,9 +116,9 @@ async def pic_some_deal(number: str, thumb_final_path: Path, fanart_final_path:
         and DownloadableFile.THUMB not in manager.config.keep_files
     ):
         if await aiofiles.os.path.exists(fanart_final_path):
-            Flags.file_done_dic[number].update(thumb=fanart_final_path)
+            state.file_done_dic[number].update(thumb=fanart_final_path)
         else:
-            Flags.file_done_dic[number].update(thumb=None)
+            state.file_done_dic[number].update(thumb=None)
         if await aiofiles.os.path.exists(thumb_final_path):
             await delete_file_async(thumb_final_path)
             LogBuffer.log().write("\n 🍀 Thumb delete done!")
@@ -148,9 +148,14 @@ def save_remain_list() -> None:
     """This function is intended to be sync."""
     if Flags.can_save_remain and Switch.REMAIN_TASK in manager.config.switch_on:
         try:
-            with open(resources.u("remain.txt"), "w", encoding="utf-8", errors="ignore") as f:
-                f.writelines(sorted(str(p) + "\n" for p in Flags.remain_list))
-                Flags.can_save_remain = False
+            # 刮削线程会同时修改 remain_list, 先复制再写入临时文件, 避免出错时清空已有记录
+            lines = sorted(str(p) + "\n" for p in list(Flags.remain_list))
+            path = resources.u("remain.txt")
+            tmp = path.with_name(path.name + ".tmp")
+            with open(tmp, "w", encoding="utf-8", errors="ignore") as f:
+                f.writelines(lines)
+            os.replace(tmp, path)
+            Flags.can_save_remain = False
         except Exception as e:
             signal.show_log_text(f"save remain list error: {str(e)}\n {traceback.format_exc()}")
 
@@ -163,7 +168,7 @@ async def _clean_empty_fodlers(path: Path, file_mode: FileMode) -> None:
     signal.show_log_text(" ⏳ Cleaning empty folders...")
 
     if NoEscape.FOLDER in manager.config.no_escape:
-        ignore_dirs = []
+        ignore_dirs = frozenset()
     else:
         ignore_dirs = get_movie_path_setting().ignore_dirs
 
@@ -251,11 +256,16 @@ def get_success_list() -> None:
     signal.view_success_file_settext.emit(f"查看 ({len(Flags.success_list)})")
 
 
-async def movie_lists(ignore_dirs: list[Path], media_type: list[str], movie_path: Path) -> list[Path]:
+async def movie_lists(ignore_dirs: Iterable[Path], media_type: Iterable[str], movie_path: Path) -> list[Path]:
     start_time = time.time()
     total = []
-    skip_list = ["skip", ".skip", ".ignore"]
+    skip_list = frozenset(("skip", ".skip", ".ignore"))
+    # 自顶向下遍历时排除目录的子目录不会被访问, 因此只需判断目录本身
+    ignore_dirs = frozenset(ignore_dirs)
+    media_type = frozenset(media_type)
     not_skip_success = NoEscape.SKIP_SUCCESS_FILE not in manager.config.no_escape
+    auto_clean = CleanAction.AUTO_CLEAN in manager.config.clean_enable
+    check_symlink = NoEscape.CHECK_SYMLINK in manager.config.no_escape
 
     signal.show_traceback_log("🔎 遍历待刮削目录....")
 
@@ -263,68 +273,74 @@ async def movie_lists(ignore_dirs: list[Path], media_type: list[str], movie_path
         i = 100
         skip = 0
         skip_repeat_softlink = 0
+        # 已添加的文件及软链接指向的文件, 用于跳过指向同一文件的软链接. 使用字符串, 避免为每个文件构造 Path
+        seen: set[str] = set()
+        links: list[tuple[str, str]] = []
+
+        def add(path_str: str) -> None:
+            nonlocal skip
+            path = Path(path_str)
+            if not_skip_success or path not in Flags.success_list:
+                total.append(path)
+            else:
+                skip += 1
+
         for root, dirs, files in movie_path.walk(top_down=True):
-            for d in dirs.copy():
-                if root / d in ignore_dirs or "behind the scenes" in d:
-                    dirs.remove(d)
+            dirs[:] = [d for d in dirs if root / d not in ignore_dirs and "behind the scenes" not in d]
 
             # 文件夹是否存在跳过文件
-            for skip_key in skip_list:
-                if skip_key in files:
-                    dirs.clear()
-                    break
-            else:
-                # 处理文件列表
-                for f in files:
-                    file_name, file_ext = os.path.splitext(f)
+            if not skip_list.isdisjoint(files):
+                dirs.clear()
+                continue
+            root_str = str(root)
+            # 处理文件列表
+            for f in files:
+                file_name, file_ext = os.path.splitext(f)
 
-                    # 跳过隐藏文件、预告片、主题视频
-                    if re.search(r"^\..+", file_name):
-                        continue
-                    if "trailer." in f or "trailers." in f:
-                        continue
-                    if "theme_video." in f:
-                        continue
+                # 跳过隐藏文件、预告片、主题视频
+                if len(file_name) > 1 and file_name[0] == ".":
+                    continue
+                if "trailer." in f or "trailers." in f:
+                    continue
+                if "theme_video." in f:
+                    continue
 
-                    # 判断清理文件
-                    path = root / f
-                    if CleanAction.AUTO_CLEAN in manager.config.clean_enable and need_clean(path, f, file_ext):
-                        result, error_info = delete_file_sync(path)
+                # 判断清理文件
+                if auto_clean and need_clean(path := root / f, f, file_ext):
+                    result, error_info = delete_file_sync(path)
+                    if result:
+                        signal.show_log_text(f" 🗑 Clean: {path} ")
+                    else:
+                        signal.show_log_text(f" 🗑 Clean error: {error_info} ")
+                    continue
+
+                # 添加文件
+                if file_ext.lower() not in media_type:
+                    continue
+                path_str = os.path.join(root_str, f)
+                if os.path.islink(path_str):
+                    # 相对路径的软链接相对于其所在目录
+                    real_path = os.path.normpath(os.path.join(root_str, os.readlink(path_str)))
+                    # 清理失效的软链接文件
+                    if check_symlink and not os.path.exists(real_path):
+                        result, error_info = delete_file_sync(path_str)
                         if result:
-                            signal.show_log_text(f" 🗑 Clean: {path} ")
+                            signal.show_log_text(f" 🗑 Clean dead link: {path_str} ")
                         else:
-                            signal.show_log_text(f" 🗑 Clean error: {error_info} ")
+                            signal.show_log_text(f" 🗑 Clean dead link error: {error_info} ")
                         continue
+                    links.append((path_str, real_path))
+                    continue
+                seen.add(path_str)
+                add(path_str)
 
-                    # 添加文件
-                    temp_total = []
-                    if file_ext.lower() in media_type:
-                        if os.path.islink(path):
-                            real_path = path.readlink()
-                            # 清理失效的软链接文件
-                            if NoEscape.CHECK_SYMLINK in manager.config.no_escape and not os.path.exists(real_path):
-                                result, error_info = delete_file_sync(path)
-                                if result:
-                                    signal.show_log_text(f" 🗑 Clean dead link: {path} ")
-                                else:
-                                    signal.show_log_text(f" 🗑 Clean dead link error: {error_info} ")
-                                continue
-                            if real_path in temp_total:
-                                skip_repeat_softlink += 1
-                                delete_file_sync(path)
-                                continue
-                            else:
-                                temp_total.append(real_path)
-
-                        if path in temp_total:
-                            skip_repeat_softlink += 1
-                            continue
-                        else:
-                            temp_total.append(path)
-                        if not_skip_success or path not in Flags.success_list:
-                            total.append(path)
-                        else:
-                            skip += 1
+        # 遍历结束后再处理软链接, 无论遍历顺序如何都保留真实文件. 重复的软链接只跳过, 不删除
+        for path_str, real_path in links:
+            if real_path in seen:
+                skip_repeat_softlink += 1
+                continue
+            seen.add(real_path)
+            add(path_str)
 
         found_count = len(total)
         if found_count >= i:
@@ -357,7 +373,7 @@ async def movie_lists(ignore_dirs: list[Path], media_type: list[str], movie_path
     return total
 
 
-async def get_movie_list(file_mode: FileMode, movie_path: Path, ignore_dirs: list[Path]) -> list[Path]:
+async def get_movie_list(file_mode: FileMode, movie_path: Path, ignore_dirs: frozenset[Path]) -> list[Path]:
     movie_list = []
     if file_mode == FileMode.Default:  # 刮削默认视频目录的文件
         if not await aiofiles.os.path.exists(movie_path):
@@ -371,7 +387,7 @@ async def get_movie_list(file_mode: FileMode, movie_path: Path, ignore_dirs: lis
                 or manager.config.main_mode == 3
                 or manager.config.main_mode == 4
             ):
-                ignore_dirs = []
+                ignore_dirs = frozenset()
             try:
                 # 获取所有需要刮削的影片列表
                 movie_list = await movie_lists(ignore_dirs, manager.config.media_type, movie_path)
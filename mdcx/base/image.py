@@ -1,3 +1,4 @@
+import asyncio
 import shutil
 import time
 import traceback
@@ -13,10 +14,16 @@ from ..config.resources import resources
 from ..models.log_buffer import LogBuffer
 from ..signals import signal
 from ..utils import get_used_time
-from ..utils.file import check_pic_async, move_file_async
+from ..utils.file import check_pic_async, link_or_copy_sync, move_file_async
 from .file import movie_lists
 
 
+def _copy_function():
+    """复制剧照目录时使用的文件复制函数. 图片缓存为 link 时以硬链接等方式代替复制."""
+    link = manager.config.image_cache == "link"
+    return lambda src, dst: link_or_copy_sync(src, dst, link)
+
+
 async def extrafanart_copy2(folder_path: Path):
     start_time = time.time()
     download_files = manager.config.download_files
@@ -45,7 +52,7 @@ async def extrafanart_copy2(folder_path: Path):
 
     if await aiofiles.os.path.exists(extrafanart_copy_path):
         shutil.rmtree(extrafanart_copy_path, ignore_errors=True)
-    shutil.copytree(extrafanart_path, extrafanart_copy_path)
+    await asyncio.to_thread(shutil.copytree, extrafanart_path, extrafanart_copy_path, copy_function=_copy_function())
 
     filelist = await aiofiles.os.listdir(extrafanart_copy_path)
     for each in filelist:
@@ -72,7 +79,7 @@ async def extrafanart_extras_copy(folder_path: Path):
 
     if await aiofiles.os.path.exists(extrafanart_extra_path):
         shutil.rmtree(extrafanart_extra_path)
-    shutil.copytree(extrafanart_path, extrafanart_extra_path)
+    await asyncio.to_thread(shutil.copytree, extrafanart_path, extrafanart_extra_path, copy_function=_copy_function())
     filelist = await aiofiles.os.listdir(extrafanart_extra_path)
     for each in filelist:
         file_new_name = each.replace("jpg", "mp4")
@@ -0,0 +1,190 @@
+"""
+图片内容寻址存储. 下载的图片按内容哈希保存在用户数据目录下, 并以 SQLite 记录 URL 到哈希的映射.
+
+重新刮削或多个影片引用同一图片时, 直接从存储物化 (写时复制、硬链接或复制) 到影片目录, 无需再次下载.
+"""
+
+import asyncio
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from PIL import Image
+
+from ..config.manager import manager
+from ..config.resources import resources
+from ..signals import signal
+from ..utils.file import link_or_copy_sync
+
+# URL 映射的有效期. 过期后重新下载, 以获取网站更新后的图片
+URL_TTL = 30 * 24 * 3600
+_CHUNK_SIZE = 1024 * 1024
+
+
+def _file_hash(p: Path) -> str:
+    h = hashlib.sha256()
+    with open(p, "rb") as f:
+        while chunk := f.read(_CHUNK_SIZE):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class ImageStore:
+    """
+    图片存储. blobs 表记录存储中的文件及最近使用时间, urls 表记录 URL 对应的内容哈希.
+
+    此类线程安全, 所有方法均为阻塞调用, 在异步代码中应通过 asyncio.to_thread 调用.
+    """
+
+    def __init__(self, root: str | Path):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.root / "index.db", check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "create table if not exists blobs ("
+                "hash text primary key, suffix text not null, size integer not null, last_used real not null)"
+            )
+            self._conn.execute(
+                "create table if not exists urls (url text primary key, hash text not null, updated real not null)"
+            )
+            self._conn.execute("create index if not exists urls_hash on urls(hash)")
+            self._conn.execute("create index if not exists blobs_last_used on blobs(last_used)")
+
+    def blob_path(self, h: str, suffix: str) -> Path:
+        return self.root / h[:2] / f"{h}{suffix}"
+
+    def lookup(self, url: str) -> Path | None:
+        """查询 URL 对应的存储文件. 映射已过期或文件缺失、大小不符时返回 None."""
+        with self._lock:
+            row = self._conn.execute(
+                "select b.hash, b.suffix, b.size, u.updated from urls u join blobs b on u.hash = b.hash where u.url = ?",
+                (url,),
+            ).fetchone()
+        if row is None:
+            return None
+        h, suffix, size, updated = row
+        if time.time() - updated > URL_TTL:
+            return None
+        p = self.blob_path(h, suffix)
+        try:
+            if p.stat().st_size == size:
+                with self._lock, self._conn:
+                    self._conn.execute("update blobs set last_used = ? where hash = ?", (time.time(), h))
+                return p
+        except OSError:
+            pass
+        self._forget(h)
+        return None
+
+    def fetch(self, url: str, dest: Path, link: bool = True) -> str:
+        """将 URL 对应的图片物化到 dest. 未命中时返回空字符串, 否则返回物化方式."""
+        if (blob := self.lookup(url)) is None:
+            return ""
+        return link_or_copy_sync(blob, dest, link)
+
+    def add(self, src: Path, url: str = "", link: bool = True) -> str:
+        """将文件加入存储并记录 URL, 返回内容哈希. 内容已存在时只更新映射."""
+        h = _file_hash(src)
+        suffix = src.suffix.lower()
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("select suffix from blobs where hash = ?", (h,)).fetchone()
+        if row is not None and self.blob_path(h, row[0]).exists():
+            suffix = row[0]
+        else:
+            p = self.blob_path(h, suffix)
+            p.parent.mkdir(exist_ok=True)
+            link_or_copy_sync(src, p, link)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "insert or replace into blobs (hash, suffix, size, last_used) values (?, ?, ?, ?)",
+                (h, suffix, os.path.getsize(src), now),
+            )
+            if url:
+                self._conn.execute("insert or replace into urls (url, hash, updated) values (?, ?, ?)", (url, h, now))
+        return h
+
+    def total_size(self) -> int:
+        with self._lock:
+            return self._conn.execute("select coalesce(sum(size), 0) from blobs").fetchone()[0]
+
+    def prune(self, max_bytes: int) -> int:
+        """按最近使用时间删除文件, 直到总大小不超过 max_bytes. 返回删除的文件数."""
+        with self._lock:
+            rows = self._conn.execute("select hash, suffix, size from blobs order by last_used desc").fetchall()
+        total = 0
+        removed = 0
+        for h, suffix, size in rows:
+            total += size
+            if total <= max_bytes:
+                continue
+            self.blob_path(h, suffix).unlink(missing_ok=True)
+            self._forget(h)
+            removed += 1
+        return removed
+
+    def _forget(self, h: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("delete from urls where hash = ?", (h,))
+            self._conn.execute("delete from blobs where hash = ?", (h,))
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_image_store: ImageStore | None = None
+
+
+def get_image_store() -> ImageStore:
+    """获取图片存储, 首次调用时在用户数据目录下创建."""
+    global _image_store
+    if _image_store is None:
+        _image_store = ImageStore(resources.u("image_store"))
+    return _image_store
+
+
+def _add_checked(src: Path, url: str, link: bool) -> None:
+    with Image.open(src) as img:  # 只缓存完整的图片
+        img.load()
+    get_image_store().add(src, url, link)
+
+
+async def fetch_cached_image(url: str, dest: Path) -> bool:
+    """从图片存储物化 URL 对应的图片, 未开启存储或未命中时返回 False."""
+    mode = manager.config.image_cache
+    if mode == "off" or not url:
+        return False
+    try:
+        return bool(await asyncio.to_thread(get_image_store().fetch, url, dest, mode == "link"))
+    except Exception as e:
+        signal.add_log(f"读取图片缓存失败: {url} {e}")
+        return False
+
+
+async def cache_image(url: str, src: Path) -> None:
+    """将下载完成的图片加入存储."""
+    mode = manager.config.image_cache
+    if mode == "off" or not url:
+        return
+    try:
+        await asyncio.to_thread(_add_checked, src, url, mode == "link")
+    except Exception as e:
+        signal.add_log(f"写入图片缓存失败: {src} {e}")
+
+
+async def prune_image_store() -> None:
+    """按设置的大小上限清理图片存储."""
+    if manager.config.image_cache == "off":
+        return
+    try:
+        removed = await asyncio.to_thread(get_image_store().prune, manager.config.image_cache_size * 1024 * 1024)
+        if removed:
+            signal.add_log(f"图片缓存已清理 {removed} 个文件")
+    except Exception as e:
+        signal.add_log(f"清理图片缓存失败: {e}")
@@ -0,0 +1,301 @@
+"""
+媒体库索引. 以 SQLite 持久化记录本地视频文件的内容哈希及刮削结果, 用于跨目录、跨批次识别内容相同的文件.
+"""
+
+import asyncio
+import hashlib
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+import oshash
+
+from ..config.manager import manager
+from ..config.resources import resources
+from ..signals import signal
+from ..utils import get_used_time
+
+# 硬链接前比较内容时的抽样块数和块大小
+_SAMPLE_COUNT = 16
+_SAMPLE_SIZE = 64 * 1024
+# 为重复文件复制的 NFO 及图片, 图片命名不加文件名时使用括号中的文件
+_REUSED_FILES = (
+    (".nfo", ""),
+    ("-poster.jpg", "poster.jpg"),
+    ("-thumb.jpg", "thumb.jpg"),
+    ("-fanart.jpg", "fanart.jpg"),
+)
+
+
+def _file_hash(p: str) -> str:
+    """计算文件的 oshash. oshash 要求文件不小于 128 KB, 更小的文件改为计算完整内容的哈希."""
+    try:
+        return oshash.oshash(p)
+    except ValueError:
+        with open(p, "rb") as f:
+            return "sha1:" + hashlib.sha1(f.read()).hexdigest()
+
+
+def _same_content(a: Path, b: Path) -> bool:
+    """抽样比较两个大小相同的文件. oshash 仅覆盖首尾, 硬链接会删除文件, 需要更严格的校验."""
+    size = os.path.getsize(a)
+    if size != os.path.getsize(b):
+        return False
+    step = max(size // _SAMPLE_COUNT, 1)
+    with open(a, "rb") as fa, open(b, "rb") as fb:
+        for offset in range(0, size, step):
+            fa.seek(offset)
+            fb.seek(offset)
+            if fa.read(_SAMPLE_SIZE) != fb.read(_SAMPLE_SIZE):
+                return False
+    return True
+
+
+class LibraryIndex:
+    """
+    媒体库文件索引, 以路径为主键, 记录文件大小、修改时间和 oshash.
+
+    此类线程安全, 所有方法均为阻塞调用, 在异步代码中应通过 asyncio.to_thread 调用.
+    """
+
+    def __init__(self, db_path: str | Path):
+        self.db_path = Path(db_path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "create table if not exists files ("
+                "path text primary key, size integer not null, mtime_ns integer not null, oshash text not null, "
+                "number text not null default '', scraped integer not null default 0, updated real not null)"
+            )
+            self._conn.execute("create index if not exists files_oshash on files(oshash, size)")
+            # 检查缺失番号时使用的本地番号
+            self._conn.execute(
+                "create table if not exists local_numbers ("
+                "path text primary key, size integer not null, mtime_ns integer not null, "
+                "number text not null, has_sub integer not null)"
+            )
+            self._conn.execute("create index if not exists local_numbers_number on local_numbers(has_sub, number)")
+
+    def get_hash(self, p: Path) -> str:
+        """获取文件的内容哈希. 文件大小和修改时间未变时使用索引中的值, 不读取文件."""
+        st = os.stat(p)
+        key = str(p)
+        with self._lock:
+            row = self._conn.execute("select size, mtime_ns, oshash from files where path = ?", (key,)).fetchone()
+        if row and row[0] == st.st_size and row[1] == st.st_mtime_ns:
+            return row[2]
+        h = _file_hash(key)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "insert into files (path, size, mtime_ns, oshash, updated) values (?, ?, ?, ?, ?) "
+                "on conflict(path) do update set size = excluded.size, mtime_ns = excluded.mtime_ns, "
+                "oshash = excluded.oshash, number = '', scraped = 0, updated = excluded.updated",
+                (key, st.st_size, st.st_mtime_ns, h, time.time()),
+            )
+        return h
+
+    def find_scraped(self, h: str, size: int) -> list[tuple[Path, str]]:
+        """查找已刮削的相同内容文件, 返回 (路径, 番号) 列表."""
+        with self._lock:
+            rows = self._conn.execute(
+                "select path, number from files where oshash = ? and size = ? and scraped = 1", (h, size)
+            ).fetchall()
+        return [(Path(p), n) for p, n in rows]
+
+    def record_scraped(self, old_path: Path, new_path: Path, number: str) -> None:
+        """记录刮削成功的文件. 文件被移动时, 沿用原路径的哈希."""
+        with self._lock:
+            row = self._conn.execute("select oshash from files where path = ?", (str(old_path),)).fetchone()
+        h = row[0] if row else _file_hash(str(new_path))
+        st = os.stat(new_path)
+        with self._lock, self._conn:
+            if old_path != new_path:
+                self._conn.execute("delete from files where path = ?", (str(old_path),))
+            self._conn.execute(
+                "insert or replace into files (path, size, mtime_ns, oshash, number, scraped, updated) "
+                "values (?, ?, ?, ?, ?, 1, ?)",
+                (str(new_path), st.st_size, st.st_mtime_ns, h, number, time.time()),
+            )
+
+    def sync_local_numbers(self, files: dict[str, tuple[int, int]]) -> list[str]:
+        """
+        按当前文件列表同步本地番号. 删除已不存在的文件, 新文件与某个已删除文件的文件名、大小和修改时间相同且唯一时,
+        视为该文件被移动, 沿用其番号. 重命名的文件需要重新解析, 番号可能来自文件名.
+
+        Args:
+            files: 路径 -> (大小, 修改时间 ns)
+
+        Returns:
+            需要重新解析番号的路径
+        """
+        with self._lock, self._conn:
+            known = {
+                path: (size, mtime_ns)
+                for path, size, mtime_ns in self._conn.execute("select path, size, mtime_ns from local_numbers")
+            }
+            pending = [p for p, st in files.items() if known.get(p) != st]
+            removed: dict[tuple[str, tuple[int, int]], list[str]] = {}
+            for p, st in known.items():
+                if p not in files:
+                    removed.setdefault((os.path.basename(p), st), []).append(p)
+            rest = []
+            for p in pending:
+                old = removed.get((os.path.basename(p), files[p]))
+                if old is not None and len(old) == 1 and p not in known:
+                    self._conn.execute("update local_numbers set path = ? where path = ?", (p, old.pop()))
+                else:
+                    rest.append(p)
+            self._conn.executemany(
+                "delete from local_numbers where path = ?", ((p,) for paths in removed.values() for p in paths)
+            )
+        return rest
+
+    def set_local_numbers(self, rows: list[tuple[str, int, int, str, bool]]) -> None:
+        """写入本地番号, rows 为 (路径, 大小, 修改时间 ns, 番号, 是否有字幕)."""
+        with self._lock, self._conn:
+            self._conn.executemany("insert or replace into local_numbers values (?, ?, ?, ?, ?)", rows)
+
+    def local_number_sets(self) -> tuple[set[str], set[str]]:
+        """返回 (本地所有番号, 本地有字幕的番号)."""
+        with self._lock:
+            numbers = {r[0] for r in self._conn.execute("select distinct number from local_numbers")}
+            cnword = {r[0] for r in self._conn.execute("select distinct number from local_numbers where has_sub = 1")}
+        return numbers, cnword
+
+    def remove(self, p: Path) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("delete from files where path = ?", (str(p),))
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_library_index: LibraryIndex | None = None
+
+
+def get_library_index() -> LibraryIndex:
+    """获取媒体库索引, 首次调用时打开用户数据目录下的数据库."""
+    global _library_index
+    if _library_index is None:
+        _library_index = LibraryIndex(resources.u("library.db"))
+    return _library_index
+
+
+def _replace_with_hardlink(duplicate: Path, origin: Path) -> str:
+    """将 duplicate 替换为指向 origin 的硬链接. 成功返回空字符串, 否则返回原因."""
+    if duplicate.is_symlink() or origin.is_symlink():
+        return "符号链接"
+    st_dup, st_origin = os.stat(duplicate), os.stat(origin)
+    if st_dup.st_ino and st_dup.st_ino == st_origin.st_ino and st_dup.st_dev == st_origin.st_dev:
+        return ""  # 已是硬链接
+    if st_dup.st_dev != st_origin.st_dev:
+        return "不在同一文件系统"
+    if not _same_content(duplicate, origin):
+        return "抽样校验不一致"
+    tmp = duplicate.with_name(duplicate.name + ".[LINK]")
+    os.link(origin, tmp)
+    os.replace(tmp, duplicate)
+    return ""
+
+
+def _reuse_files(duplicate: Path, origin: Path) -> int:
+    """将 origin 刮削生成的 NFO 及图片复制给 duplicate, 不覆盖已有文件. 返回复制的文件数."""
+    count = 0
+    for suffix, simple_name in _REUSED_FILES:
+        dest = duplicate.with_name(duplicate.stem + suffix)
+        if dest.exists():
+            continue
+        src = origin.with_name(origin.stem + suffix)
+        if not src.is_file() and simple_name:
+            src = origin.with_name(simple_name)
+        if src.is_file():
+            shutil.copyfile(src, dest)
+            count += 1
+    return count
+
+
+def _find_duplicates(movie_list: list[Path]) -> tuple[list[Path], dict[Path, Path]]:
+    """
+    按内容哈希查找重复文件.
+
+    Returns:
+        (需要刮削的文件列表, {重复文件: 首个相同内容的文件})
+    """
+    index = get_library_index()
+    unique: list[Path] = []
+    duplicates: dict[Path, Path] = {}
+    seen: dict[tuple[str, int], Path] = {}
+    for p in movie_list:
+        try:
+            h = index.get_hash(p)
+            size = os.path.getsize(p)
+        except OSError:
+            unique.append(p)
+            continue
+        key = (h, size)
+        if origin := seen.get(key):  # 本批次中已存在
+            duplicates[p] = origin
+            continue
+        # 媒体库中已刮削过, 且已刮削文件仍存在
+        origin = next((s for s, _ in index.find_scraped(h, size) if s != p and s.exists()), None)
+        if origin is not None:
+            duplicates[p] = origin
+            continue
+        seen[key] = p
+        unique.append(p)
+    return unique, duplicates
+
+
+async def dedup_movie_list(movie_list: list[Path]) -> tuple[list[Path], list[Path]]:
+    """
+    根据设置检测内容重复的文件. 与已刮削文件重复的文件不会被刮削, 复制已刮削文件的 NFO 及图片.
+
+    与本批次中其他文件重复的文件需等待首个文件刮削完成后再次检测, 首个文件刮削失败时仍需刮削.
+
+    Returns:
+        (待刮削列表, 本批次刮削完成后需再次检测的文件列表)
+    """
+    mode = manager.config.dedup_mode
+    if mode == "off" or not movie_list:
+        return movie_list, []
+    start_time = time.time()
+    signal.show_log_text(" 🔎 正在检测内容重复的文件...")
+    unique, duplicates = await asyncio.to_thread(_find_duplicates, movie_list)
+    pending = set(unique)
+    later = [dup for dup, origin in duplicates.items() if origin in pending]
+    for dup, origin in duplicates.items():
+        if origin in pending:
+            continue
+        msg = f" ♻️ 重复文件: {dup}\n    与已刮削文件内容相同: {origin}"
+        try:
+            if count := await asyncio.to_thread(_reuse_files, dup, origin):
+                msg += f"\n    已复制 {count} 个 NFO 及图片文件"
+        except Exception as e:
+            msg += f"\n    复制 NFO 及图片失败: {e}"
+        if mode == "hardlink":
+            try:
+                reason = await asyncio.to_thread(_replace_with_hardlink, dup, origin)
+                msg += f"\n    未创建硬链接: {reason}" if reason else "\n    已替换为硬链接"
+            except Exception as e:
+                msg += f"\n    创建硬链接失败: {e}"
+        signal.show_log_text(msg)
+    signal.show_log_text(
+        f" ♻️ 重复检测完成! 共 {len(movie_list)} 个文件, 跳过重复文件 {len(duplicates) - len(later)} 个, "
+        f"{len(later)} 个重复文件在本批次刮削后处理 ({get_used_time(start_time)}s)"
+    )
+    return unique, later
+
+
+async def record_scraped(old_path: Path, new_path: Path, number: str) -> None:
+    """记录刮削成功的文件, 供后续重复检测使用."""
+    if manager.config.dedup_mode == "off":
+        return
+    try:
+        await asyncio.to_thread(get_library_index().record_scraped, old_path, new_path, number)
+    except Exception as e:
+        signal.add_log(f"记录媒体库索引失败: {new_path} {e}")
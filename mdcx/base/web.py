@@ -17,6 +17,8 @@ from ..models.log_buffer import LogBuffer
 from ..signals import signal
 from ..utils import executor
 from ..utils.file import check_pic_async
+from ..web_async import DownloadPriority, discard_partial
+from .image_store import cache_image, fetch_cached_image
 from .web_sync import get_json_sync
 
 
@@ -41,20 +43,16 @@ async def check_url(url: str, length: bool = False, real_url: bool = False):
         return
 
     try:
-        # 使用 request 方法发送 HEAD 请求
-        response, error = await manager.computed.async_client.request("HEAD", url)
+        # 发送 HEAD 请求, 结果会被缓存, 随后下载同一链接时不再重复探测
+        probe, error = await manager.computed.async_client.probe(url)
 
         # 处理请求失败的情况
-        if response is None:
+        if probe is None:
             signal.add_log(f"🔴 检测链接失败: {error}")
             return
 
-        # 不输出获取 dmm预览视频(trailer) 最高分辨率的测试结果到日志中
-        if response.status_code == 404 and "_w.mp4" in url:
-            return
-
         # 返回重定向的url
-        true_url = str(response.url)
+        true_url = probe.url
         if real_url:
             return true_url
 
@@ -71,7 +69,7 @@ async def check_url(url: str, length: bool = False, real_url: bool = False):
                 return
 
         # 获取文件大小
-        content_length = response.headers.get("Content-Length")
+        content_length = probe.size
         if not content_length:
             # 如果没有获取到文件大小，尝试下载数据
             content, error = await manager.computed.async_client.get_content(true_url)
@@ -83,12 +81,12 @@ async def check_url(url: str, length: bool = False, real_url: bool = False):
                 signal.add_log(f"🔴 检测链接失败: 未返回大小且预下载失败 {true_url}")
                 return
         # 如果返回内容的文件大小 < 8k，视为不可用
-        elif int(content_length) < 8192:
+        elif content_length < 8192:
             signal.add_log(f"🔴 检测链接失败: 返回大小({content_length}) < 8k {true_url}")
             return
 
         signal.add_log(f"✅ 检测链接通过: 返回大小({content_length}) {true_url}")
-        return int(content_length) if length else true_url
+        return content_length if length else true_url
 
     except Exception as e:
         signal.add_log(f"🔴 检测链接失败: 未知异常 {e} {url}")
@@ -390,24 +388,45 @@ async def get_yesjav_title(movie_number: str) -> str:
     return movie_title
 
 
-async def download_file_with_filepath(url: str, file_path: Path, folder_new_path: Path) -> bool:
+async def download_file_with_filepath(
+    url: str,
+    file_path: Path,
+    folder_new_path: Path,
+    priority: DownloadPriority = DownloadPriority.IMAGE,
+    cache: bool = False,
+) -> bool:
+    """
+    下载文件到 file_path.
+
+    Args:
+        cache: 是否使用图片存储. 命中时直接物化已下载的图片, 下载成功后加入存储. 物化的文件可能是硬链接, 不能原地修改
+    """
     if not url:
         return False
 
     if not await aiofiles.os.path.exists(folder_new_path):
         await aiofiles.os.makedirs(folder_new_path)
+    if cache and await fetch_cached_image(url, file_path):
+        LogBuffer.log().write(f"\n 🍀 命中图片缓存: {url}")
+        return True
     try:
-        if await manager.computed.async_client.download(url, file_path):
+        if await manager.computed.async_client.download(url, file_path, priority=priority):
+            if cache:
+                await cache_image(url, file_path)
             return True
     except Exception:
         pass
+    # 调用方会换用其他地址或放弃, 不再续传. 停止刮削或程序退出时不会执行到这里, 临时文件保留, 下次继续
+    await asyncio.to_thread(discard_partial, file_path)
     LogBuffer.log().write(f"\n 🥺 Download failed! {url}")
     return False
 
 
 async def download_extrafanart_task(task: tuple[str, Path, Path, str]) -> bool:
     extrafanart_url, extrafanart_file_path, extrafanart_folder_path, extrafanart_name = task
-    if await download_file_with_filepath(extrafanart_url, extrafanart_file_path, extrafanart_folder_path):
+    if await download_file_with_filepath(
+        extrafanart_url, extrafanart_file_path, extrafanart_folder_path, DownloadPriority.EXTRAFANART, cache=True
+    ):
         if await check_pic_async(extrafanart_file_path):
             return True
     else:
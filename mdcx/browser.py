@@ -1,14 +1,132 @@
 import asyncio
 import os
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager, suppress
+from dataclasses import dataclass
 from typing import TYPE_CHECKING
-
-from patchright.async_api import async_playwright
+from urllib.parse import urlsplit
 
 if TYPE_CHECKING:
-    from patchright.async_api import Browser
+    from patchright.async_api import Browser, BrowserContext, Page, Route
 
     from .config.models import Config
 
+LOAD_STATES = ("commit", "domcontentloaded", "load", "networkidle")
+# 刮削只需要 HTML, 拦截这些资源可显著降低浏览器的内存和 CPU 占用
+BLOCKED_RESOURCE_TYPES = frozenset({"image", "media", "font"})
+BLOCKED_HOSTS = (
+    "google-analytics.com",
+    "googletagmanager.com",
+    "googlesyndication.com",
+    "doubleclick.net",
+    "facebook.net",
+    "clarity.ms",
+    "hotjar.com",
+    "twitter.com",
+    "yandex.ru",
+)
+
+
+@dataclass
+class BrowserOptions:
+    pages: int = 4
+    """每个浏览器上下文同时打开的页面数上限"""
+    max_uses: int = 50
+    """页面复用次数, 达到后关闭并新建页面, 避免长时间运行的页面占用内存"""
+    block_resources: bool = True
+    """拦截图片、媒体、字体和统计脚本"""
+    wait: str = ""
+    """页面加载等待条件, 可为 LOAD_STATES 之一或 CSS 选择器. 为空时使用爬虫的默认值"""
+
+    @classmethod
+    def from_config(cls, config: "Config", site) -> "BrowserOptions":
+        return cls(
+            pages=max(config.browser_pages, 1),
+            max_uses=max(config.browser_page_max_uses, 1),
+            block_resources=config.browser_block_resources,
+            wait=config.get_site_config(site).browser_wait,
+        )
+
+
+def should_block(resource_type: str, url: str) -> bool:
+    if resource_type in BLOCKED_RESOURCE_TYPES:
+        return True
+    host = urlsplit(url).hostname or ""
+    return any(host == h or host.endswith("." + h) for h in BLOCKED_HOSTS)
+
+
+async def _block_route(route: "Route") -> None:
+    request = route.request
+    if should_block(request.resource_type, request.url):
+        await route.abort()
+    else:
+        await route.fallback()
+
+
+async def block_resources(context: "BrowserContext") -> None:
+    """为浏览器上下文的所有页面启用资源拦截."""
+    await context.route("**/*", _block_route)
+
+
+class PagePool:
+    """
+    浏览器上下文的页面池. 限制同时打开的页面数, 并复用页面以避免每次请求都新建页面.
+
+    页面使用 max_uses 次或请求出错后关闭, 之后按需新建.
+    """
+
+    def __init__(self, context: "BrowserContext", size: int = 4, max_uses: int = 50):
+        self.context = context
+        self.max_uses = max_uses
+        self._semaphore = asyncio.Semaphore(size)
+        self._idle: list[tuple[Page, int]] = []
+        self._closed = False
+        self.user_agent: str | None = None
+        """浏览器的 User-Agent, 首次请求后获取. 保存验证 cookie 时需一并保存"""
+
+    @asynccontextmanager
+    async def page(self) -> AsyncIterator["Page"]:
+        async with self._semaphore:
+            if self._closed:
+                raise RuntimeError("页面池已关闭")
+            page, uses = self._idle.pop() if self._idle else (await self.context.new_page(), 0)
+            reusable = False
+            try:
+                yield page
+                reusable = True
+            finally:
+                uses += 1
+                if reusable and uses < self.max_uses and not self._closed and not page.is_closed():
+                    self._idle.append((page, uses))
+                else:
+                    with suppress(Exception):
+                        await page.close()
+
+    async def fetch(self, url: str, wait: str = "domcontentloaded", timeout: float | None = None) -> str:
+        """
+        打开页面并返回 HTML.
+
+        Args:
+            wait: LOAD_STATES 之一, 或等待出现的 CSS 选择器
+            timeout: 超时 (毫秒), 为 None 时使用浏览器默认值
+        """
+        async with self.page() as page:
+            if wait in LOAD_STATES:
+                await page.goto(url, wait_until=wait, timeout=timeout)  # type: ignore[arg-type]
+            else:
+                await page.goto(url, wait_until="domcontentloaded", timeout=timeout)
+                await page.wait_for_selector(wait, timeout=timeout)
+            if self.user_agent is None:
+                self.user_agent = await page.evaluate("() => navigator.userAgent")
+            return await page.content()
+
+    async def close(self) -> None:
+        self._closed = True
+        idle, self._idle = self._idle, []
+        for page, _ in idle:
+            with suppress(Exception):
+                await page.close()
+
 
 class BrowserProvider:
     def __init__(self, config: "Config"):
@@ -22,6 +140,8 @@ class BrowserProvider:
             return self.default_browser
         async with self.lock:
             if self.playwright is None:
+                from patchright.async_api import async_playwright  # 导入耗时较长, 仅在需要浏览器时导入
+
                 self.playwright = await async_playwright().start()
             if self.default_browser is None:
                 self.default_browser = await self.playwright.chromium.launch(
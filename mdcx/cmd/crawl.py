@@ -14,7 +14,7 @@ from ..browser import BrowserProvider
 from ..config.manager import manager
 from ..config.models import Language, Website
 from ..crawler import Never
-from ..crawlers import get_crawler_compat
+from ..crawlers import get_crawler_compat, load_crawler
 from ..crawlers.base import GenericBaseCrawler, get_crawler
 from ..crawlers.base.compat import LegacyCrawler
 from ..manual import ManualConfig
@@ -237,6 +237,7 @@ async def _fetch_async(
         ) as progress:
             task = progress.add_task("正在获取详情页...", total=None)
             if website:
+                load_crawler(website)
                 crawler_class = get_crawler(website)
                 if crawler_class is None:
                     console.print(f"[red]错误: 未找到 {website.value} Crawler[/red]")
@@ -0,0 +1,26 @@
+"""
+根据 resources/c_number/c_number.json 生成色花标题数据库
+"""
+
+from pathlib import Path
+from typing import Annotated
+
+import typer
+
+from ..sehua_store import build_sehua_db
+
+app = typer.Typer(help="生成色花标题数据库", context_settings={"help_option_names": ["-h", "--help"]})
+
+
+@app.command()
+def main(
+    json_path: Annotated[Path, typer.Argument(help="色花数据 JSON 文件")] = Path("resources/c_number/c_number.json"),
+    db_path: Annotated[Path | None, typer.Argument(help="输出的数据库文件, 默认与 JSON 文件同目录")] = None,
+):
+    db_path = db_path or json_path.with_suffix(".db")
+    count = build_sehua_db(json_path, db_path)
+    print(f"已生成 {count} 条数据到文件: {db_path}")
+
+
+if __name__ == "__main__":
+    app()
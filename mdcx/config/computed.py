@@ -1,38 +1,119 @@
+import asyncio
 import re
+from collections.abc import Callable, Coroutine
+from typing import Any
 
 import httpx
 
 from ..llm import LLMClient
 from ..manual import ManualConfig
+from ..session_store import get_session_store
 from ..signals import signal
 from ..utils import executor, get_random_headers
-from ..web_async import AsyncWebClient
+from ..web_async import AsyncWebClient, DownloadScheduler
 from .enums import CleanAction
 from .models import Config
 
+# 被替换的客户端延迟关闭, 等待进行中的请求完成
+CLOSE_DELAY = 120
+
+_closing: set[asyncio.Task] = set()
+
+
+def close_later(closers: list[Callable[[], Coroutine[Any, Any, None]]], delay: float = CLOSE_DELAY) -> None:
+    """在后台事件循环中延迟调用 closers. 此函数线程安全."""
+    if not closers:
+        return
+    loop = executor._loop
+
+    def _close(close: Callable[[], Coroutine[Any, Any, None]]):
+        task = loop.create_task(close())
+        _closing.add(task)
+        task.add_done_callback(_closing.discard)
+
+    def _schedule():
+        for close in closers:
+            loop.call_later(delay, _close, close)
+
+    loop.call_soon_threadsafe(_schedule)
+
 
 class Computed:
-    def __init__(self, config: Config):
+    def __init__(self, config: Config, previous: "Computed | None" = None):
+        """
+        Args:
+            config: 配置
+            previous: 重新加载配置前的 Computed. 相关设置未变化的客户端会被沿用, 以保留连接池、TLS 会话和限速状态;
+                被替换的客户端记录在 replaced 中, 由调用方关闭
+        """
+        self.replaced: list[Callable[[], Coroutine[Any, Any, None]]] = []
+
         self.can_clean = CleanAction.I_KNOW in config.clean_enable and CleanAction.I_AGREE in config.clean_enable
 
         self.random_headers = get_random_headers()
 
         proxy = config.proxy if config.use_proxy else None
-        self.llm_client = LLMClient(
-            api_key=config.translate_config.llm_key,
-            base_url=config.translate_config.llm_url.unicode_string(),
-            proxy=proxy,
-            timeout=httpx.Timeout(config.timeout, read=config.translate_config.llm_read_timeout),
-            rate=(max(config.translate_config.llm_max_req_sec, 1), max(1, 1 / config.translate_config.llm_max_req_sec)),
+        t = config.translate_config
+        self._llm_key = (
+            t.llm_key,
+            t.llm_url.unicode_string(),
+            proxy,
+            config.timeout,
+            t.llm_read_timeout,
+            t.llm_max_req_sec,
         )
+        if previous is not None and previous._llm_key == self._llm_key:
+            self.llm_client = previous.llm_client
+        else:
+            self.llm_client = LLMClient(
+                api_key=t.llm_key,
+                base_url=t.llm_url.unicode_string(),
+                proxy=proxy,
+                timeout=httpx.Timeout(config.timeout, read=t.llm_read_timeout),
+                rate=(max(t.llm_max_req_sec, 1), max(1, 1 / t.llm_max_req_sec)),
+            )
+            if previous is not None:
+                self.replaced.append(previous.llm_client.close)
 
-        self.async_client = AsyncWebClient(
-            loop=executor._loop,
-            proxy=proxy,
-            retry=config.retry,
-            timeout=config.timeout,
-            log_fn=signal.add_log,
+        self._scheduler_key = (
+            config.download_concurrency,
+            config.download_host_concurrency,
+            config.download_bandwidth,
+            config.download_host_bandwidth,
+            config.defer_bulk_download,
         )
+        if previous is not None and previous._scheduler_key == self._scheduler_key:
+            scheduler = previous.async_client.scheduler
+        else:
+            # 已开始的下载继续使用原调度器
+            scheduler = DownloadScheduler(
+                max_concurrent=config.download_concurrency,
+                per_host=config.download_host_concurrency,
+                bandwidth=config.download_bandwidth * 1024,
+                per_host_bandwidth=config.download_host_bandwidth * 1024,
+                # 延后下载剧照和预告片时, 它们与刮削同时进行, 需要让出连接
+                yield_bulk=config.defer_bulk_download,
+            )
+
+        self._client_key = (proxy, config.timeout)
+        if previous is not None and previous._client_key == self._client_key:
+            self.async_client = previous.async_client
+            self.async_client.retry = config.retry
+            self.async_client.scheduler = scheduler
+        else:
+            self.async_client = AsyncWebClient(
+                loop=executor._loop,
+                proxy=proxy,
+                retry=config.retry,
+                timeout=config.timeout,
+                log_fn=signal.add_log,
+                # 沿用限速器, 重建客户端后不会超出各域名的请求速率
+                limiters=previous.async_client.limiters if previous is not None else None,
+                scheduler=scheduler,
+                session_store=get_session_store(),
+            )
+            if previous is not None:
+                self.replaced.append(previous.async_client.close)
 
         official_websites_dic = {}
         for key, value in ManualConfig.OFFICIAL.items():
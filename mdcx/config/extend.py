@@ -14,7 +14,7 @@ class MoviePathSetting:
     movie_path: Path  # 电影路径
     success_folder: Path  # 成功目录
     failed_folder: Path  # 失败目录
-    ignore_dirs: list[Path]  # 排除目录列表
+    ignore_dirs: frozenset[Path]  # 排除目录
     extrafanart_folder: Path  # 剧照副本目录
     softlink_path: Path  # 软链接路径
 
@@ -33,12 +33,12 @@ def get_movie_path_setting(file_path: Path | None = None) -> MoviePathSetting:
     # 用户设置的失败输出目录
     failed_folder = Path(manager.config.failed_output_folder.replace("end_folder_name", end_folder_name))
     # 用户设置的排除目录, 转换相对路径
-    ignore_dirs = []
+    ignore_dirs = set()
     for f in manager.config.folders:
         p = Path(f.replace("end_folder_name", end_folder_name))
         if not p.is_absolute():
             p = movie_path / p
-        ignore_dirs.append(p)
+        ignore_dirs.add(p)
     # 用户设置的剧照副本目录
     extrafanart_folder = Path(manager.config.extrafanart_folder)
 
@@ -65,7 +65,7 @@ def get_movie_path_setting(file_path: Path | None = None) -> MoviePathSetting:
         movie_path=movie_path,
         success_folder=success_folder,
         failed_folder=failed_folder,
-        ignore_dirs=ignore_dirs,
+        ignore_dirs=frozenset(ignore_dirs),
         extrafanart_folder=extrafanart_folder,
         softlink_path=softlink_path,
     )
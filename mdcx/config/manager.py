@@ -4,7 +4,7 @@ import os.path
 from pathlib import Path
 
 from ..consts import MAIN_PATH, MARK_FILE
-from .computed import Computed
+from .computed import Computed, close_later
 from .models import Config
 from .v1 import ConfigV1, load_v1
 
@@ -40,14 +40,19 @@ class ConfigManager:
             d = json.loads(self._path.read_text(encoding="UTF-8"))
             errors = Config.update(d)
             self.config = Config.model_validate(d)
-            self.computed = Computed(self.config)
+            self._update_computed()
             return errors
         except Exception as e:
             self.config = Config()
-            self.computed = Computed(self.config)
+            self._update_computed()
             msg = f" 配置文件 {self._path} 验证失败. 错误信息: \n{str(e)}"
             return msg.splitlines()
 
+    def _update_computed(self):
+        """根据新配置更新 computed, 沿用设置未变化的客户端, 并延迟关闭被替换的客户端."""
+        self.computed = Computed(self.config, getattr(self, "computed", None))
+        close_later(self.computed.replaced)
+
     def handle_v1(self):
         v2path = self.path.with_suffix(".v2.json")
         v1path = self.path
@@ -64,7 +69,7 @@ class ConfigManager:
         config_v1 = ConfigV1(**d)
         config_v1.init()
         self.config = config_v1.to_pydantic_model()
-        self.computed = Computed(self.config)
+        self._update_computed()
         self.save()
         return errors
 
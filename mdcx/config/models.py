@@ -79,6 +79,11 @@ class TranslateConfig(BaseModel):
 
 class SiteConfig(BaseModel):
     use_browser: bool = Field(default=False, title="使用无头浏览器")
+    browser_wait: str = Field(
+        default="",
+        title="浏览器等待条件",
+        description="commit/domcontentloaded/load/networkidle 或 CSS 选择器, 留空使用默认值",
+    )
     custom_url: HttpUrl | None = Field(default=None, title="自定义网址")
 
 
@@ -246,6 +251,17 @@ class Config(BaseModel):
         ],
         title="下载文件类型",
     )
+    defer_bulk_download: bool = Field(
+        default=False,
+        title="延后下载剧照和预告片",
+        description="在所有文件刮削完成后再下载剧照和预告片, 带宽有限时可提高刮削速度",
+    )
+    image_cache: Literal["off", "copy", "link"] = Field(
+        default="copy",
+        title="图片缓存",
+        description="按内容哈希保存下载的图片, 重新刮削时无需再次下载. off: 关闭; copy: 复制到影片目录; link: 优先使用写时复制或硬链接, 分集和剧照副本也使用链接",
+    )
+    image_cache_size: int = Field(default=1024, title="图片缓存大小上限 (MB)", description="超出时删除最久未使用的图片")
     keep_files: list[KeepableFile] = Field(
         default_factory=lambda: [
             KeepableFile.POSTER,
@@ -282,6 +298,11 @@ class Config(BaseModel):
         title="Google搜图排除的网址",
     )
     scrape_like: Literal["info", "speed", "single"] = Field(default="info", title="刮削模式")  # speed, info, single
+    dedup_mode: Literal["off", "skip", "hardlink"] = Field(
+        default="off",
+        title="重复内容检测",
+        description="根据文件内容哈希识别不同文件名/目录下的同一影片. off: 关闭; skip: 跳过重复文件, 复制首个文件的 NFO 及图片并在日志中报告; hardlink: 同 skip, 并将重复文件替换为指向首个文件的硬链接 (需位于同一文件系统)",
+    )
     # endregion
 
     # region: Website Settings
@@ -535,6 +556,12 @@ class Config(BaseModel):
     trailer_simple_name: bool = Field(default=True, title="预告片简化命名")
     hd_name: Literal["height", "hd"] = Field(default="height", title="高清名称")
     hd_get: Literal["video", "path", "none"] = Field(default="video", title="获取高清")
+    probe_concurrency: int = Field(
+        default=4,
+        title="视频探测并发数",
+        description="同时读取视频文件获取分辨率的最大数量, 与网络并发数无关. 机械硬盘或网络存储建议设置较小值",
+    )
+    probe_timeout: int = Field(default=30, title="视频探测超时 (秒)", description="单个文件超时后根据文件名推断分辨率")
     cnword_char: list[str] = Field(default_factory=lambda: ["-C.", "-C-", "ch.", "字幕"], title="中文字符")
     cnword_style: str = Field(default="-C", title="中文样式")
     folder_cnword: bool = Field(default=True, title="目录中文")
@@ -571,6 +598,16 @@ class Config(BaseModel):
     gfriends_github: HttpUrl = Field(default=HttpUrl("https://github.com/gfriends/gfriends"), title="Gfriends Github")
     actor_photo_folder: str = Field(default="", title="演员照片目录")
     actor_photo_kodi_auto: bool = Field(default=False, title="演员照片Kodi自动")
+    emby_concurrency: int = Field(default=4, title="Emby 并发请求数")
+    emby_update_rate: float = Field(
+        default=5, title="Emby 演员信息更新速率", description="每秒最多更新的演员数, 0 表示不限制"
+    )
+    actor_photo_concurrency: int = Field(
+        default=4, title="演员头像并发下载数", description="graphis, Gfriends 等头像来源的并发请求数"
+    )
+    actor_photo_workers: int = Field(
+        default=0, title="演员头像处理进程数", description="0 表示根据 CPU 核心数自动设置, 最多 4 个"
+    )
     # endregion
 
     # region: Watermark Settings
@@ -606,6 +643,19 @@ class Config(BaseModel):
     proxy: str = Field(default="http://127.0.0.1:7890", title="代理地址")
     timeout: int = Field(default=10, title="超时")
     retry: int = Field(default=3, title="重试")
+    download_concurrency: int = Field(
+        default=16, title="下载并发数", description="同时进行的图片、剧照和预告片下载连接数上限, 刮削请求不受此限制"
+    )
+    download_host_concurrency: int = Field(default=6, title="单域名下载并发数")
+    download_bandwidth: int = Field(
+        default=0, title="下载带宽限制 (KB/s)", description="图片、剧照和预告片的总下载速度上限, 0 表示不限制"
+    )
+    download_host_bandwidth: int = Field(default=0, title="单域名下载带宽限制 (KB/s)", description="0 表示不限制")
+    browser_pages: int = Field(default=4, title="浏览器页面数", description="每个网站同时打开的浏览器页面数上限")
+    browser_page_max_uses: int = Field(
+        default=50, title="浏览器页面复用次数", description="页面使用指定次数后关闭并重新创建"
+    )
+    browser_block_resources: bool = Field(default=True, title="浏览器拦截图片和统计脚本")
     theporndb_api_token: str = Field(default="", title="Theporndb API令牌")
     javdb: str = Field(default="", title="Javdb")
     javbus: str = Field(default="", title="Javbus")
@@ -647,6 +697,26 @@ class Config(BaseModel):
     timed_interval: timedelta = Field(default=timedelta(minutes=30), title="定时器间隔")
     rest_count: int = Field(default=20, title="休息计数")
     rest_time: timedelta = Field(default=timedelta(), title="休息时间")
+    watch_media_path: bool = Field(
+        default=False, title="监视媒体目录", description="仅服务器模式. 新文件写入完成后自动提交刮削任务"
+    )
+    watch_polling: bool = Field(
+        default=False,
+        title="轮询监视",
+        description="定时扫描目录而不使用 inotify. 非 Linux 系统及网络挂载目录 (nfs, smb 等) 总是使用轮询",
+    )
+    watch_poll_interval: int = Field(default=60, title="轮询间隔 (秒)")
+    watch_stable_seconds: int = Field(
+        default=10, title="文件稳定时间 (秒)", description="文件大小在此时间内不变才视为写入完成"
+    )
+    watch_batch_window: int = Field(
+        default=60, title="批量窗口 (秒)", description="收集此时间内写入完成的文件后一起提交刮削"
+    )
+    watch_quiet_hours: str = Field(
+        default="",
+        title="静默时段",
+        description="如 01:00-07:00, 多个时段用逗号分隔. 该时段内不提交刮削, 结束后一起提交. 留空表示不限制",
+    )
     # statement: int = Field(default=3, title="声明")
     # endregion
 
@@ -0,0 +1,101 @@
+"""
+刮削计划. 每次刮削开始时根据 Config 生成一次, 刮削每个文件时直接查询, 无需重复构造默认值、遍历列表或筛选网站.
+
+ScrapePlan 不可变, 刮削过程中修改设置不会影响正在进行的刮削.
+"""
+
+from dataclasses import dataclass
+from enum import Enum
+from types import MappingProxyType
+from typing import TYPE_CHECKING
+
+from ..gen.field_enums import CrawlerResultFields
+from ..manual import ManualConfig
+from .enums import DownloadableFile, Language, Switch, Website
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping
+
+    from .models import Config
+
+
+MULTI_LANGUAGE_WEBSITES = frozenset(  # 支持多语言, language 参数有意义
+    {
+        Website.AIRAV_CC,
+        Website.AIRAV,
+        Website.IQQTV,
+        Website.JAVLIBRARY,
+    }
+)
+
+
+class SiteCategory(Enum):
+    """影片类型, 决定从哪组网站刮削"""
+
+    YOUMA = "youma"
+    WUMA = "wuma"
+    SUREN = "suren"
+    FC2 = "fc2"
+    OUMEI = "oumei"
+    GUOCHAN = "guochan"
+    DMM = "dmm"  # ssni00321 这类 DMM 格式的番号, 只从 DMM 刮削
+
+
+@dataclass(frozen=True, slots=True)
+class FieldSource:
+    """某个字段的一个来源网站"""
+
+    site: Website
+    key: tuple[Website, Language]  # 区分请求结果的键, 不支持多语言的网站语言为 UNDEFINED
+    language: Language  # 请求时使用的语言
+
+
+@dataclass(frozen=True, slots=True)
+class ScrapePlan:
+    switches: frozenset[Switch]
+    download_files: frozenset[DownloadableFile]
+    keep_files: frozenset[DownloadableFile]
+    category_sites: "Mapping[SiteCategory, frozenset[Website]]"
+    # (类型, 字段) -> 按优先级排列的来源
+    field_sources: "Mapping[tuple[SiteCategory, CrawlerResultFields], tuple[FieldSource, ...]]"
+    field_languages: "Mapping[CrawlerResultFields, Language]"
+
+    @classmethod
+    def from_config(cls, config: "Config") -> "ScrapePlan":
+        category_sites = {
+            SiteCategory.YOUMA: frozenset(config.website_youma),
+            SiteCategory.WUMA: frozenset(config.website_wuma),
+            SiteCategory.SUREN: frozenset(config.website_suren),
+            SiteCategory.FC2: frozenset(config.website_fc2),
+            SiteCategory.OUMEI: frozenset(config.website_oumei),
+            SiteCategory.GUOCHAN: frozenset(config.website_guochan),
+            SiteCategory.DMM: frozenset({Website.DMM}),
+        }
+        field_languages = {}
+        field_sources = {}
+        for field in CrawlerResultFields:
+            f_config = config.get_field_config(field)
+            field_languages[field] = f_config.language
+            if field not in ManualConfig.REDUCED_FIELDS:
+                continue
+            sources = [_field_source(site, f_config.language) for site in f_config.site_prority]
+            for category, sites in category_sites.items():
+                field_sources[(category, field)] = tuple(s for s in sources if s.site in sites)
+        return cls(
+            switches=frozenset(config.switch_on),
+            download_files=frozenset(config.download_files),
+            keep_files=frozenset(config.keep_files),
+            category_sites=MappingProxyType(category_sites),
+            field_sources=MappingProxyType(field_sources),
+            field_languages=MappingProxyType(field_languages),
+        )
+
+    def sources(self, category: SiteCategory, field: CrawlerResultFields) -> tuple[FieldSource, ...]:
+        return self.field_sources[(category, field)]
+
+
+def _field_source(site: Website, language: Language) -> FieldSource:
+    if site not in MULTI_LANGUAGE_WEBSITES:
+        return FieldSource(site, (site, Language.UNDEFINED), language)
+    # 多语言网站, 未指定语言时使用日语请求
+    return FieldSource(site, (site, language), Language.JP if language == Language.UNDEFINED else language)
@@ -1,6 +1,6 @@
-import json
 import os
 import sys
+import threading
 import traceback
 from pathlib import Path
 
@@ -10,6 +10,7 @@ from PyQt5.QtGui import QFontDatabase
 
 from ..consts import IS_PYINSTALLER, MAIN_PATH
 from ..manual import ManualConfig
+from ..sehua_store import SehuaTitleStore, open_sehua_store
 from ..signals import signal
 from ..utils import singleton
 from ..utils.file import copy_file_sync
@@ -33,6 +34,7 @@ class Resources:
 
         # 获取资源路径
         self.sehua_title_path = self.r("c_number/c_number.json")  # 内置色花数据的文件路径
+        self.sehua_title_db_path = self.r("c_number/c_number.db")  # 构建时根据色花数据生成的数据库
         self.actor_map_backup_path = self.r("mapping_table/mapping_actor.xml")  # 内置演员映射表的文件路径
         self.info_map_backup_path = self.r("mapping_table/mapping_info.xml")  # 内置信息映射表的文件路径
 
@@ -74,13 +76,46 @@ class Resources:
         self.icon_leak_path = self.u("watermark/leak.png")
         self.icon_wuma_path = self.u("watermark/wuma.png")
 
-        self.actor_mapping_data = None  # 演员映射表数据
-        self.info_mapping_data = None  # 信息映射表数据
-        self.sehua_title_data = {}  # 色花数据
+        self._actor_mapping_data = None
+        self._info_mapping_data = None
+        self._sehua_title_data: SehuaTitleStore | None = None
+        self._local_data_loaded = False
+        self._local_data_lock = threading.Lock()
 
-        self._get_or_generate_local_data()
         self._get_mark_icon()
-        zhconv.loaddict(str(self.r("zhconv/zhcdict.json")))  # 加载繁简转换字典
+        # 繁简转换字典在首次转换时加载
+        zhconv.zhconv.DICTIONARY = str(self.r("zhconv/zhcdict.json"))
+        # 映射表等数据在后台加载, 首次访问时若未加载完成则等待
+        threading.Thread(target=self._load_local_data, name="resources", daemon=True).start()
+
+    @property
+    def actor_mapping_data(self):
+        """演员映射表数据"""
+        self._load_local_data()
+        return self._actor_mapping_data
+
+    @property
+    def info_mapping_data(self):
+        """信息映射表数据"""
+        self._load_local_data()
+        return self._info_mapping_data
+
+    @property
+    def sehua_title_data(self) -> SehuaTitleStore:
+        """色花数据, 按番号查询标题"""
+        self._load_local_data()
+        assert self._sehua_title_data is not None
+        return self._sehua_title_data
+
+    def _load_local_data(self):
+        if self._local_data_loaded:
+            return
+        with self._local_data_lock:
+            if self._local_data_loaded:
+                return
+            self._get_or_generate_local_data()
+            zhconv.loaddict(zhconv.zhconv.DICTIONARY)
+            self._local_data_loaded = True
 
     def r(self, relative_path: str | Path):
         return self._resources_base / relative_path
@@ -162,9 +197,10 @@ class Resources:
 
     def _get_or_generate_local_data(self):
         """如果用户数据目录下已有数据则直接读取, 否则根据内置数据生成"""
-        # 载入 c_numuber.json 数据
-        with open(self.sehua_title_path, encoding="UTF-8") as data:
-            self.sehua_title_data = json.load(data)
+        # 打开色花数据库, 内置数据库与 c_number.json 不一致时在用户数据目录下生成
+        self._sehua_title_data = open_sehua_store(
+            self.sehua_title_path, self.sehua_title_db_path, self.u("c_number.db")
+        )
 
         # 载入 mapping_actor.xml mapping_info.xml 数据
         actor_map_local_path = self.u("mapping_actor.xml")
@@ -179,17 +215,17 @@ class Resources:
             parser = etree.HTMLParser(encoding="utf-8")
             with open(actor_map_local_path, encoding="utf-8") as f:
                 content = f.read()
-            self.actor_mapping_data = etree.HTML(content.encode("utf-8"), parser=parser)
+            self._actor_mapping_data = etree.HTML(content.encode("utf-8"), parser=parser)
             with open(info_map_local_path, encoding="utf-8") as f:
                 content = f.read()
-            self.info_mapping_data = etree.HTML(content.encode("utf-8"), parser=parser)
+            self._info_mapping_data = etree.HTML(content.encode("utf-8"), parser=parser)
         except Exception as e:
             signal.show_log_text(
                 f" {actor_map_local_path} 读取失败！请检查该文件是否存在问题！如需重置请删除该文件！错误信息：\n{str(e)}"
             )
             signal.show_traceback_log(traceback.format_exc())
             signal.show_log_text(traceback.format_exc())
-            self.actor_mapping_data = None
+            self._actor_mapping_data = None
 
     def _get_mark_icon(self):
         mark_folder = self.u("watermark")
@@ -49,8 +49,6 @@ from mdcx.models.log_buffer import LogBuffer
 from mdcx.models.types import CrawlersResult, FileInfo, OtherInfo, ShowData
 from mdcx.signals import signal_qt
 from mdcx.tools.actress_db import ActressDB
-from mdcx.tools.emby_actor_image import update_emby_actor_photo
-from mdcx.tools.emby_actor_info import creat_kodi_actors, show_emby_actor_list, update_emby_actor_info
 from mdcx.tools.missing import check_missing_number
 from mdcx.tools.subtitle import add_sub_for_all_video
 from mdcx.utils import _async_raise, add_html, executor, get_current_time, get_used_time, kill_a_thread, split_path
@@ -569,7 +567,7 @@ class MyMAinWindow(QMainWindow):
         self.pushButton_check_javdb_cookie_clicked()  # 检测javdb cookie
         self.pushButton_check_javbus_cookie_clicked()  # 检测javbus cookie
         if manager.config.use_database:
-            ActressDB.init_db()
+            ActressDB.init_db_in_background()
         try:
             t = threading.Thread(target=check_theporndb_api_token)
             t.start()  # 启动线程,即让线程开始执行
@@ -1487,8 +1485,7 @@ class MyMAinWindow(QMainWindow):
         signal_qt.change_buttons_status.emit()
         c = get_movie_path_setting()
         movie_path = c.movie_path
-        ignore_dirs = c.ignore_dirs
-        ignore_dirs.append(movie_path / "Movie_moved")
+        ignore_dirs = c.ignore_dirs | {movie_path / "Movie_moved"}
         movie_list = executor.run(
             movie_lists(ignore_dirs, manager.config.media_type + manager.config.sub_type, movie_path)
         )
@@ -1503,12 +1500,13 @@ class MyMAinWindow(QMainWindow):
             os.makedirs(des_path)
         signal_qt.show_log_text("Start move movies...")
         skip_list = []
+        media_type = frozenset(manager.config.media_type)
         for file_path in movie_list:
             file_name = file_path.name
             file_ext = file_path.suffix.lower()
             try:
                 shutil.move(file_path, des_path)
-                if file_ext in manager.config.media_type:
+                if file_ext in media_type:
                     signal_qt.show_log_text("   Move movie: " + file_name + " to Movie_moved Success!")
                 else:
                     signal_qt.show_log_text("   Move sub: " + file_name + " to Movie_moved Success!")
@@ -1792,11 +1790,14 @@ class MyMAinWindow(QMainWindow):
     # endregion
 
     # region 设置-演员
+    # 演员工具依赖 bs4/parsel, 导入耗时较长, 点击按钮时再导入
     # 设置-演员 补全演员信息
     def pushButton_add_actor_info_clicked(self):
         self.pushButton_save_config_clicked()
         self.pushButton_show_log_clicked()  # 点按钮后跳转到日志页面
         try:
+            from mdcx.tools.emby_actor_info import update_emby_actor_info
+
             executor.submit(update_emby_actor_info())
         except Exception:
             signal_qt.show_log_text(traceback.format_exc())
@@ -1806,6 +1807,8 @@ class MyMAinWindow(QMainWindow):
         self.pushButton_save_config_clicked()
         self.pushButton_show_log_clicked()  # 点按钮后跳转到日志页面
         try:
+            from mdcx.tools.emby_actor_image import update_emby_actor_photo
+
             executor.submit(update_emby_actor_photo())
         except Exception:
             signal_qt.show_log_text(traceback.format_exc())
@@ -1815,6 +1818,8 @@ class MyMAinWindow(QMainWindow):
         self.pushButton_save_config_clicked()
         self.pushButton_show_log_clicked()  # 点按钮后跳转到日志页面
         try:
+            from mdcx.tools.emby_actor_info import creat_kodi_actors
+
             executor.submit(creat_kodi_actors(True))
         except Exception:
             signal_qt.show_log_text(traceback.format_exc())
@@ -1823,6 +1828,8 @@ class MyMAinWindow(QMainWindow):
     def pushButton_del_actor_folder_clicked(self):
         self.pushButton_show_log_clicked()  # 点按钮后跳转到日志页面
         try:
+            from mdcx.tools.emby_actor_info import creat_kodi_actors
+
             executor.submit(creat_kodi_actors(False))
         except Exception:
             signal_qt.show_log_text(traceback.format_exc())
@@ -1831,6 +1838,8 @@ class MyMAinWindow(QMainWindow):
     def pushButton_show_pic_actor_clicked(self):
         self.pushButton_show_log_clicked()  # 点按钮后跳转到日志页面
         try:
+            from mdcx.tools.emby_actor_info import show_emby_actor_list
+
             executor.submit(show_emby_actor_list(self.Ui.comboBox_pic_actor.currentIndex()))
         except Exception:
             signal_qt.show_log_text(traceback.format_exc())
@@ -527,7 +527,7 @@ def save_config(self: "MyMAinWindow"):
     manager.config.info_database_path = self.Ui.lineEdit_actor_db_path.text()  # 信息数据库
     manager.config.use_database = self.Ui.checkBox_actor_db.isChecked()
     if manager.config.use_database:
-        ActressDB.init_db()
+        ActressDB.init_db_in_background()
 
     # 构建 emby_on 配置
     actor_info_lang = get_radio_buttons(
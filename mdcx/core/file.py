@@ -12,10 +12,10 @@ from ..config.enums import CDChar, MarkType, Switch
 from ..config.manager import manager
 from ..consts import IS_MAC, IS_WINDOWS
 from ..models.enums import FileMode
-from ..models.flags import Flags
+from ..models.flags import Flags, ScrapeState
 from ..models.log_buffer import LogBuffer
 from ..models.types import BaseCrawlerResult, CrawlersResult, FileInfo, OtherInfo
-from ..number import get_file_number, get_number_letters, is_uncensored
+from ..number import get_file_number, get_number_info
 from ..signals import signal
 from ..utils import nfd2c, split_path
 from ..utils.file import copy_file_async, delete_file_async, move_file_async
@@ -397,7 +397,13 @@ def get_output_name(
     )
 
 
-async def get_file_info_v2(file_path: Path, copy_sub: bool = True) -> FileInfo:
+async def get_file_info_v2(
+    file_path: Path, copy_sub: bool = True, appoint: tuple[str, str, str] | None = None
+) -> FileInfo:
+    """
+    Args:
+        appoint: (指定番号, 指定网址, 网站名), 含义与重新刮削相同. 指定时不再读取 Flags 中的重新刮削和单文件刮削设置
+    """
     optional_data = {}
     movie_number = ""
     has_sub = False
@@ -410,8 +416,10 @@ async def get_file_info_v2(file_path: Path, copy_sub: bool = True) -> FileInfo:
     mosaic = ""
     sub_list = []
     cnword_style = manager.config.cnword_style
-    if Flags.file_mode == FileMode.Again and file_path in Flags.new_again_dic:
-        temp_number, temp_url, temp_website = Flags.new_again_dic[file_path]
+    if appoint is None and Flags.file_mode == FileMode.Again:
+        appoint = Flags.new_again_dic.get(file_path)
+    if appoint is not None:
+        temp_number, temp_url, temp_website = appoint
         if temp_number:  # 如果指定了番号，则使用指定番号
             movie_number = temp_number
             optional_data["appoint_number"] = temp_number
@@ -449,8 +457,7 @@ async def get_file_info_v2(file_path: Path, copy_sub: bool = True) -> FileInfo:
             movie_number = get_file_number(file_path_str, manager.computed.escape_string_list)
 
         # 259LUXU-1111, 非mgstage、avsex去除前面的数字前缀
-        temp_n = re.findall(r"\d{3,}([a-zA-Z]+-\d+)", movie_number)
-        optional_data["short_number"] = temp_n[0] if temp_n else ""
+        optional_data["short_number"] = get_number_info(movie_number).short_number
 
         # 去掉各种乱七八糟的字符
         file_name_cd = remove_escape_string(file_name, "-").replace(movie_number, "-").replace("--", "-").strip()
@@ -593,7 +600,7 @@ async def get_file_info_v2(file_path: Path, copy_sub: bool = True) -> FileInfo:
             or "無碼" in file_path_str
             or "無修正" in file_path_str
             or "uncensored" in file_path_str.lower()
-            or is_uncensored(movie_number)
+            or get_number_info(movie_number).uncensored
         ):
             wuma = wuma_style
             mosaic = "无码"
@@ -724,7 +731,7 @@ async def get_file_info_v2(file_path: Path, copy_sub: bool = True) -> FileInfo:
 
     return FileInfo(
         number=movie_number,
-        letters=get_number_letters(movie_number),
+        letters=get_number_info(movie_number).letters,
         has_sub=has_sub,
         c_word=c_word,
         cd_part=cd_part,
@@ -764,6 +771,7 @@ async def deal_old_files(
     poster_final_path: Path,
     thumb_final_path: Path,
     fanart_final_path: Path,
+    state: ScrapeState,
 ) -> tuple[bool, bool]:
     """
     处理本地已存在的thumb、poster、fanart、nfo
@@ -840,16 +848,16 @@ async def deal_old_files(
     # 抢占图片的处理权
     single_folder_catched = False  # 剧照、剧照副本、主题视频 这些单文件夹的处理权，他们只需要处理一次
     pic_final_catched = False  # 最终图片（poster、thumb、fanart）的处理权
-    if thumb_new_path_with_filename not in Flags.pic_catch_set:
+    if thumb_new_path_with_filename not in state.pic_catch_set:
         if thumb_final_path != thumb_new_path_with_filename:
-            if thumb_final_path not in Flags.pic_catch_set:  # 不带文件名的图片的下载权利（下载权利只给它一个）
-                Flags.pic_catch_set.add(thumb_final_path)
+            if thumb_final_path not in state.pic_catch_set:  # 不带文件名的图片的下载权利（下载权利只给它一个）
+                state.pic_catch_set.add(thumb_final_path)
                 pic_final_catched = True
         else:
             pic_final_catched = True  # 带文件名的图片，下载权利给每一个。（如果有一个下载好了，未下载的可以直接复制）
     # 处理 extrafanart、extrafanart副本、主题视频、附加视频
-    if pic_final_catched and extrafanart_new_path not in Flags.extrafanart_deal_set:
-        Flags.extrafanart_deal_set.add(extrafanart_new_path)
+    if pic_final_catched and extrafanart_new_path not in state.extrafanart_deal_set:
+        state.extrafanart_deal_set.add(extrafanart_new_path)
         single_folder_catched = True
     """
     需要考虑旧文件分集情况（带文件名、不带文件名）、旧文件不同扩展名情况，他们如何清理或保留
@@ -882,7 +890,7 @@ async def deal_old_files(
     """
 
     # poster 处理：寻找对应文件放到最终路径上。这样避免刮削失败时，旧的图片被删除
-    done_poster_path = Flags.file_done_dic.get(number, {}).get("poster")
+    done_poster_path = state.file_done_dic.get(number, {}).get("poster")
     done_poster_path_copy = True
     try:
         # 图片最终路径等于已下载路径时，图片是已下载的，不需要处理
@@ -910,7 +918,7 @@ async def deal_old_files(
             poster_exists = False
 
         if poster_exists:
-            Flags.file_done_dic[number].update({"local_poster": poster_final_path})
+            state.file_done_dic[number].update({"local_poster": poster_final_path})
             # 清理旧图片
             if poster_old_path_with_filename != poster_final_path and await aiofiles.os.path.exists(
                 poster_old_path_with_filename
@@ -924,14 +932,14 @@ async def deal_old_files(
                 poster_final_path
             ).lower() and await aiofiles.os.path.exists(poster_new_path_with_filename):
                 await delete_file_async(poster_new_path_with_filename)
-        elif p := Flags.file_done_dic[number]["local_poster"]:
+        elif p := state.file_done_dic[number]["local_poster"]:
             await copy_file_async(p, poster_final_path)
 
     except Exception:
         signal.show_log_text(traceback.format_exc())
 
     # thumb 处理：寻找对应文件放到最终路径上。这样避免刮削失败时，旧的图片被删除
-    done_thumb_path = Flags.file_done_dic.get(number, {}).get("thumb")
+    done_thumb_path = state.file_done_dic.get(number, {}).get("thumb")
     done_thumb_path_copy = True
     try:
         # 图片最终路径等于已下载路径时，图片是已下载的，不需要处理
@@ -959,7 +967,7 @@ async def deal_old_files(
             thumb_exists = False
 
         if thumb_exists:
-            Flags.file_done_dic[number].update({"local_thumb": thumb_final_path})
+            state.file_done_dic[number].update({"local_thumb": thumb_final_path})
             # 清理旧图片
             if str(thumb_old_path_with_filename).lower() != str(
                 thumb_final_path
@@ -973,14 +981,14 @@ async def deal_old_files(
                 thumb_final_path
             ).lower() and await aiofiles.os.path.exists(thumb_new_path_with_filename):
                 await delete_file_async(thumb_new_path_with_filename)
-        elif p := Flags.file_done_dic[number]["local_thumb"]:
+        elif p := state.file_done_dic[number]["local_thumb"]:
             await copy_file_async(p, thumb_final_path)
 
     except Exception:
         signal.show_log_text(traceback.format_exc())
 
     # fanart 处理：寻找对应文件放到最终路径上。这样避免刮削失败时，旧的图片被删除
-    done_fanart_path = Flags.file_done_dic.get(number, {}).get("fanart")
+    done_fanart_path = state.file_done_dic.get(number, {}).get("fanart")
     done_fanart_path_copy = True
     try:
         # 图片最终路径等于已下载路径时，图片是已下载的，不需要处理
@@ -1008,7 +1016,7 @@ async def deal_old_files(
             fanart_exists = False
 
         if fanart_exists:
-            Flags.file_done_dic[number].update({"local_fanart": fanart_final_path})
+            state.file_done_dic[number].update({"local_fanart": fanart_final_path})
             # 清理旧图片
             if fanart_old_path_with_filename != fanart_final_path and await aiofiles.os.path.exists(
                 fanart_old_path_with_filename
@@ -1022,7 +1030,7 @@ async def deal_old_files(
                 fanart_new_path_with_filename
             ):
                 await delete_file_async(fanart_new_path_with_filename)
-        elif p := Flags.file_done_dic[number]["local_fanart"]:
+        elif p := state.file_done_dic[number]["local_fanart"]:
             await copy_file_async(p, fanart_final_path)
 
     except Exception:
@@ -1099,7 +1107,7 @@ async def deal_old_files(
             trailer_exists = False
 
         if trailer_exists:
-            Flags.file_done_dic[number].update({"local_trailer": trailer_new_file_path_with_filename})
+            state.file_done_dic[number].update({"local_trailer": trailer_new_file_path_with_filename})
             # 删除旧、新文件夹，用不到了(分集使用local trailer复制即可)
             if await aiofiles.os.path.exists(trailer_old_folder_path):
                 shutil.rmtree(trailer_old_folder_path, ignore_errors=True)
@@ -1114,7 +1122,7 @@ async def deal_old_files(
             ):
                 await delete_file_async(trailer_old_file_path_with_filename)
         else:
-            local_trailer = Flags.file_done_dic.get(number, {}).get("local_trailer")
+            local_trailer = state.file_done_dic.get(number, {}).get("local_trailer")
             if local_trailer and await aiofiles.os.path.exists(local_trailer):
                 await copy_file_async(local_trailer, trailer_new_file_path_with_filename)
 
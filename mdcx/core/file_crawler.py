@@ -4,15 +4,14 @@ import re
 from itertools import chain
 from typing import TYPE_CHECKING
 
-from patchright.async_api import Error as PatchrightError
-
 from ..config.models import Language, Website
+from ..config.plan import MULTI_LANGUAGE_WEBSITES, ScrapePlan, SiteCategory
 from ..gen.field_enums import CrawlerResultFields
 from ..manual import ManualConfig
 from ..models.enums import FileMode
 from ..models.flags import Flags
 from ..models.types import CrawlerInput, CrawlerResponse, CrawlerResult, CrawlersResult, CrawlTask
-from ..number import is_uncensored
+from ..number import get_number_info
 from ..utils.dataclass import update
 
 if TYPE_CHECKING:
@@ -20,14 +19,6 @@ if TYPE_CHECKING:
     from ..crawler import CrawlerProviderProtocol
 
 
-MULTI_LANGUAGE_WEBSITES = [  # 支持多语言, language 参数有意义
-    Website.AIRAV_CC,
-    Website.AIRAV,
-    Website.IQQTV,
-    Website.JAVLIBRARY,
-]
-
-
 def sprint_source(website: Website, language: Language) -> str:
     if language == Language.UNDEFINED:
         return f"{website.value}"
@@ -103,9 +94,10 @@ def _deal_res(res: CrawlersResult) -> CrawlersResult:
 
 
 class FileScraper:
-    def __init__(self, config: "Config", crawler_provider: "CrawlerProviderProtocol"):
+    def __init__(self, config: "Config", crawler_provider: "CrawlerProviderProtocol", plan: ScrapePlan | None = None):
         self.config = config
         self.crawler_provider = crawler_provider
+        self.plan = plan if plan is not None else ScrapePlan.from_config(config)
 
     async def _call_crawler(
         self, task_input: CrawlerInput, website: Website, timeout: float | None = 30
@@ -136,7 +128,7 @@ class FileScraper:
         r = await asyncio.wait_for(c.run(task_input), timeout=timeout)
         return r
 
-    async def _call_crawlers(self, task_input: CrawlerInput, type_sites: set[Website]) -> CrawlersResult | None:
+    async def _call_crawlers(self, task_input: CrawlerInput, category: SiteCategory) -> CrawlersResult | None:
         """
         获取一组网站的数据：按照设置的网站组，请求各字段数据，并返回最终的数据
         采用按需请求策略：仅请求必要的网站，失败时才请求下一优先级网站
@@ -149,23 +141,17 @@ class FileScraper:
         # 按字段分别处理，每个字段按优先级尝试获取
         for field in ManualConfig.REDUCED_FIELDS:
             # 获取该字段的优先级列表
-            f_config = self.config.get_field_config(field)
-            f_sites = [s for s in f_config.site_prority if s in type_sites]
-            f_lang = f_config.language
+            f_sources = self.plan.sources(category, field)
 
             reduced.field_log += (
                 f"\n\n    📌 {field} \n    ====================================\n"
-                f"    🌐 优先级设置: {' -> '.join(s.value for s in f_sites)}"
+                f"    🌐 优先级设置: {' -> '.join(s.site.value for s in f_sources)}"
             )
 
             # 按优先级依次尝试获取字段值
-            for site in f_sites:
-                # 检查是否已经请求过该网站
-                key = (site, f_lang)
-
-                # 如果网站不支持多语言, 则使用 UNDEFINED
-                if site not in MULTI_LANGUAGE_WEBSITES:
-                    key = (site, Language.UNDEFINED)
+            for source in f_sources:
+                site = source.site
+                key = source.key
 
                 # 如果已有该网站数据，直接使用
                 if key in all_res:
@@ -177,12 +163,8 @@ class FileScraper:
                 else:
                     # 如果网站数据尚未请求，则进行请求
                     try:
-                        task_input.language = f_lang
-                        task_input.org_language = f_lang
-                        # 多语言网站, 指定一个默认语言
-                        if site in MULTI_LANGUAGE_WEBSITES and key[1] == Language.UNDEFINED:
-                            task_input.language = Language.JP
-                            task_input.org_language = Language.JP
+                        task_input.language = source.language
+                        task_input.org_language = source.language
                         web_data = await self._call_crawler(task_input, site)
                         req_info.append(f"{sprint_source(*key)} ({web_data.debug_info.execution_time:.2f}s)")
                         if web_data.data is None:
@@ -195,17 +177,14 @@ class FileScraper:
                         # 多语言网站, 如果 undefined 尚不存在, 也使用当前语言数据
                         if site in MULTI_LANGUAGE_WEBSITES and (site, Language.UNDEFINED) not in all_res:
                             all_res[(site, Language.UNDEFINED)] = web_data.data
-                    except PatchrightError as e:
-                        if "BrowserType.launch: Executable doesn't exist" in e.message:
-                            e = "找不到 Chrome 浏览器, 请安装或关闭对应网站的 use_browser 选项"
-                        reduced.field_log += f"\n    🔴 {site:<15} (失败: {str(e)})"
-                        failed.add(key)
-                        continue
                     except TimeoutError:
                         reduced.field_log += f"\n    🔴 {site:<15} (请求超时)"
                         failed.add(key)
                         continue
                     except Exception as e:
+                        # patchright 的异常, 为避免启动时导入 patchright, 根据错误信息判断
+                        if "BrowserType.launch: Executable doesn't exist" in str(e):
+                            e = "找不到 Chrome 浏览器, 请安装或关闭对应网站的 use_browser 选项"
                         reduced.field_log += f"\n    🔴 {site:<15} (失败: {str(e)})"
                         failed.add(key)
                         continue
@@ -266,7 +245,7 @@ class FileScraper:
         file_number = task_input.number
         short_number = task_input.short_number
 
-        title_language = self.config.get_field_config(CrawlerResultFields.TITLE).language
+        title_language = self.plan.field_languages[CrawlerResultFields.TITLE]
         org_language = title_language
 
         if website not in ["airav_cc", "iqqtv", "airav", "avsex", "javlibrary", "mdtv", "madouqu", "lulubar"]:
@@ -329,7 +308,7 @@ class FileScraper:
                 or re.search(r"MKY-[A-Z]+-\d{3,}", file_number)
             ):
                 task_input.mosaic = "国产"
-                res = await self._call_crawlers(task_input, self.config.website_guochan)
+                res = await self._call_crawlers(task_input, SiteCategory.GUOCHAN)
 
             # =======================================================================kin8
             elif file_number.startswith("KIN8"):
@@ -356,7 +335,7 @@ class FileScraper:
                 file_number_1 = re.search(r"\d{5,}", file_number)
                 if file_number_1:
                     file_number_1.group()
-                    res = await self._call_crawlers(task_input, self.config.website_fc2)
+                    res = await self._call_crawlers(task_input, SiteCategory.FC2)
                 else:
                     raise Exception(f"未识别的 FC2 番号: {file_number}")
 
@@ -364,23 +343,23 @@ class FileScraper:
             elif re.search(r"[^.]+\.\d{2}\.\d{2}\.\d{2}", file_number) or (
                 "欧美" in file_path_str and "东欧美" not in file_path_str
             ):
-                res = await self._call_crawlers(task_input, self.config.website_oumei)
+                res = await self._call_crawlers(task_input, SiteCategory.OUMEI)
 
             # =======================================================================无码抓取:111111-111,n1111,HEYZO-1111,SMD-115
             elif mosaic == "无码" or mosaic == "無碼":
-                res = await self._call_crawlers(task_input, self.config.website_wuma)
+                res = await self._call_crawlers(task_input, SiteCategory.WUMA)
 
             # =======================================================================259LUXU-1111
             elif short_number or "SIRO" in file_number.upper():
-                res = await self._call_crawlers(task_input, self.config.website_suren)
+                res = await self._call_crawlers(task_input, SiteCategory.SUREN)
 
             # =======================================================================ssni00321
             elif re.match(r"\D{2,}00\d{3,}", file_number) and "-" not in file_number and "_" not in file_number:
-                res = await self._call_crawlers(task_input, {Website.DMM})
+                res = await self._call_crawlers(task_input, SiteCategory.DMM)
 
             # =======================================================================剩下的（含匹配不了）的按有码来刮削
             else:
-                res = await self._call_crawlers(task_input, self.config.website_youma)
+                res = await self._call_crawlers(task_input, SiteCategory.YOUMA)
         else:
             res = await self._call_specific_crawler(task_input, website)
 
@@ -407,7 +386,7 @@ class FileScraper:
         elif mosaic:
             res.mosaic = mosaic
         if not res.mosaic:
-            if is_uncensored(number):
+            if get_number_info(number).uncensored:
                 res.mosaic = "无码"
             else:
                 res.mosaic = "有码"
@@ -0,0 +1,202 @@
+"""
+刮削任务队列, 供服务器提交和管理刮削任务.
+
+批量刮削 (整个媒体目录) 仍使用全局 Flags, 因此同一时间只运行一个, 且开始时需等待正在运行的单文件任务结束, 以免 Flags.reset 影响它们.
+单文件任务使用各自的 Scraper 和进度, 不读取也不修改 Flags 中的刮削模式和进度, 最多同时运行 SMALL_JOB_CONCURRENCY 个, 可与批量刮削同时进行.
+所有任务共用 manager.computed.async_client, 因此也共用其中的按网站限速器.
+"""
+
+import asyncio
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from enum import Enum
+from pathlib import Path
+
+from ..config.manager import manager
+from ..crawler import CrawlerProvider
+from ..models.enums import FileMode
+from ..models.types import ScrapeProgress
+from ..signals import signal
+from ..utils import executor
+from .scraper import Scraper
+
+SMALL_JOB_CONCURRENCY = 4
+MAX_HISTORY = 200  # 保留的已结束任务数量
+
+
+class JobKind(Enum):
+    SCRAPE = "scrape"  # 批量刮削媒体目录或指定文件
+    SCRAPE_FILE = "scrape_file"  # 单文件刮削, 可指定网址
+
+
+class JobStatus(Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"  # 任务正常结束, 部分文件刮削失败时见 progress.failed 和 error
+    FAILED = "failed"  # 任务本身出错
+    CANCELLED = "cancelled"
+
+    @property
+    def finished(self) -> bool:
+        return self in (JobStatus.SUCCEEDED, JobStatus.FAILED, JobStatus.CANCELLED)
+
+
+@dataclass
+class Job:
+    id: str
+    kind: JobKind
+    paths: list[Path]
+    appoint_url: str = ""
+    website: str = ""
+    status: JobStatus = JobStatus.QUEUED
+    progress: ScrapeProgress = field(default_factory=ScrapeProgress)
+    created_at: float = field(default_factory=time.time)
+    started_at: float | None = None
+    finished_at: float | None = None
+    error: str = ""
+    future: Future | None = field(default=None, repr=False)
+
+    def eta(self) -> float | None:
+        """按已完成文件的平均用时估算剩余秒数, 无法估算时返回 None"""
+        p = self.progress
+        if self.status != JobStatus.RUNNING or self.started_at is None or not p.done or not p.total:
+            return None
+        elapsed = time.time() - self.started_at
+        return max(elapsed / p.done * (p.total - p.done), 0.0)
+
+
+class JobQueue:
+    def __init__(self, small_concurrency: int = SMALL_JOB_CONCURRENCY, max_history: int = MAX_HISTORY):
+        self.max_history = max_history
+        self._jobs: dict[str, Job] = {}
+        self._lock = threading.Lock()
+        # 以下对象仅在后台事件循环中使用, 首次使用时创建
+        self._small_concurrency = small_concurrency
+        self._small_semaphore: asyncio.Semaphore | None = None
+        self._bulk_lock: asyncio.Lock | None = None
+        self._small_idle: asyncio.Event | None = None
+        self._small_allowed: asyncio.Event | None = None
+        self._small_running = 0
+
+    def submit(self, kind: JobKind, paths: list[Path], appoint_url: str = "", website: str = "") -> Job:
+        """提交任务并立即返回, 此方法线程安全."""
+        job = Job(uuid.uuid4().hex, kind, paths, appoint_url, website)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune()
+        job.future = executor.submit(self._run(job))
+        return job
+
+    def get(self, job_id: str) -> Job | None:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list(self) -> list[Job]:
+        with self._lock:
+            return list(self._jobs.values())
+
+    def cancel(self, job_id: str) -> Job | None:
+        """取消排队中或运行中的任务, 任务不存在时返回 None. 此方法线程安全."""
+        job = self.get(job_id)
+        if job is None or job.status.finished:
+            return job
+        if job.future is not None:
+            job.future.cancel()
+        # 尚未开始运行的协程不会收到 CancelledError, 直接标记
+        if job.status == JobStatus.QUEUED:
+            self._finish(job, JobStatus.CANCELLED)
+        return job
+
+    def _prune(self):
+        finished = [j for j in self._jobs.values() if j.status.finished]
+        for job in finished[: max(len(finished) - self.max_history, 0)]:
+            del self._jobs[job.id]
+
+    def _finish(self, job: Job, status: JobStatus, error: str = ""):
+        if job.status.finished:
+            return
+        job.status = status
+        job.error = error
+        job.finished_at = time.time()
+
+    def _init_primitives(self):
+        if self._bulk_lock is None:
+            self._small_semaphore = asyncio.Semaphore(self._small_concurrency)
+            self._bulk_lock = asyncio.Lock()
+            self._small_idle = asyncio.Event()
+            self._small_idle.set()
+            self._small_allowed = asyncio.Event()
+            self._small_allowed.set()
+
+    async def _run(self, job: Job) -> None:
+        self._init_primitives()
+        try:
+            if job.kind == JobKind.SCRAPE:
+                await self._run_bulk(job)
+            else:
+                await self._run_small(job)
+        except asyncio.CancelledError:
+            self._finish(job, JobStatus.CANCELLED)
+            raise
+        except Exception as e:
+            signal.show_traceback_log(traceback.format_exc())
+            self._finish(job, JobStatus.FAILED, str(e))
+
+    async def _run_bulk(self, job: Job) -> None:
+        assert self._bulk_lock is not None and self._small_idle is not None and self._small_allowed is not None
+        async with self._bulk_lock:
+            scraper = Scraper(CrawlerProvider(manager.config, manager.computed.async_client), job.progress)
+            run = None
+            try:
+                # 等待期间不再开始新的单文件任务, 避免批量刮削一直无法开始
+                self._small_allowed.clear()
+                try:
+                    await self._small_idle.wait()
+                    job.status = JobStatus.RUNNING
+                    job.started_at = time.time()
+                    run = asyncio.ensure_future(scraper.run(FileMode.Default, job.paths or None))
+                    # Flags.reset 在刮削开始时同步执行, 之后即可继续开始单文件任务
+                    await asyncio.sleep(0)
+                finally:
+                    self._small_allowed.set()
+                await run
+            except asyncio.CancelledError:
+                if run is not None:
+                    run.cancel()
+                raise
+            self._finish(job, JobStatus.SUCCEEDED)
+
+    async def _run_small(self, job: Job) -> None:
+        assert self._small_semaphore is not None and self._small_idle is not None and self._small_allowed is not None
+        async with self._small_semaphore:
+            await self._small_allowed.wait()
+            self._small_running += 1
+            self._small_idle.clear()
+            try:
+                job.status = JobStatus.RUNNING
+                job.started_at = time.time()
+                job.progress.total = len(job.paths)
+                scraper = Scraper(CrawlerProvider(manager.config, manager.computed.async_client), job.progress)
+                try:
+                    errors = [await scraper.scrape_file(p, ("", job.appoint_url, job.website)) for p in job.paths]
+                finally:
+                    await scraper.crawler_provider.close()
+                self._finish(job, JobStatus.SUCCEEDED, "\n".join(e for e in errors if e))
+            finally:
+                self._small_running -= 1
+                if self._small_running == 0:
+                    self._small_idle.set()
+
+
+_job_queue: JobQueue | None = None
+
+
+def get_job_queue() -> JobQueue:
+    global _job_queue
+    if _job_queue is None:
+        _job_queue = JobQueue()
+    return _job_queue
@@ -14,7 +14,7 @@ from ..gen.field_enums import CrawlerResultFields
 from ..manual import ManualConfig
 from ..models.log_buffer import LogBuffer
 from ..models.types import CrawlersResult, FileInfo, OtherInfo
-from ..number import get_number_letters
+from ..number import get_number_info
 from ..signals import signal
 from ..utils import get_used_time
 from ..utils.file import delete_file_async
@@ -357,7 +357,7 @@ async def get_nfo_data(file_path: Path, movie_number: str) -> tuple[CrawlersResu
     number = "".join(xml_nfo.xpath("//num/text()"))
     if not number:
         number = movie_number
-    letters = get_number_letters(number)
+    letters = get_number_info(number).letters
     title = title.replace(number + " ", "").strip()
     originaltitle = originaltitle.replace(number + " ", "").strip()
     originaltitle_amazon = originaltitle
@@ -1,6 +1,8 @@
 import asyncio
 import time
 import traceback
+from collections.abc import Coroutine
+from functools import partial
 from pathlib import Path
 from typing import TYPE_CHECKING
 
@@ -21,18 +23,20 @@ from ..base.file import (
     save_success_list,
 )
 from ..base.image import extrafanart_copy2, extrafanart_extras_copy
+from ..base.image_store import prune_image_store
+from ..base.library import dedup_movie_list, record_scraped
+from ..base.web import get_dmm_trailer
 from ..config.enums import DownloadableFile, EmbyAction, ReadMode, Switch
 from ..config.extend import get_movie_path_setting
 from ..config.manager import manager
+from ..config.plan import ScrapePlan
 from ..config.resources import resources
 from ..crawler import CrawlerProvider
 from ..models.enums import FileMode
-from ..models.flags import FileDoneDict, Flags
+from ..models.flags import FileDoneDict, Flags, ScrapeState
 from ..models.log_buffer import LogBuffer
-from ..models.types import CrawlersResult, FileInfo, OtherInfo, ScrapeResult, ShowData
+from ..models.types import CrawlersResult, FileInfo, OtherInfo, ScrapeProgress, ScrapeResult, ShowData
 from ..signals import signal
-from ..tools.emby_actor_image import update_emby_actor_photo
-from ..tools.emby_actor_info import creat_kodi_actors
 from ..utils import executor, get_current_time, get_real_time, get_used_time, split_path
 from ..utils.dataclass import update
 from ..utils.file import copy_file_async, move_file_async
@@ -67,8 +71,12 @@ class StopScrape(Exception): ...
 
 
 class Scraper:
-    def __init__(self, crawler_provider: "CrawlerProviderProtocol"):
+    def __init__(self, crawler_provider: "CrawlerProviderProtocol", progress: ScrapeProgress | None = None):
         self.crawler_provider = crawler_provider
+        self.progress = progress if progress is not None else ScrapeProgress()
+        self.plan = ScrapePlan.from_config(manager.config)
+        # 延后到所有文件刮削完成后执行的剧照和预告片下载, (番号, 协程)
+        self._deferred_downloads: list[tuple[str, Coroutine]] = []
 
     async def run(self, file_mode: FileMode, movie_list: list[Path] | None) -> None:
         try:
@@ -78,6 +86,9 @@ class Scraper:
 
     async def _run(self, file_mode: FileMode, movie_list: list[Path] | None) -> None:
         Flags.reset()
+        self._deferred_downloads = []
+        # 每次刮削开始时根据当前设置生成
+        self.plan = ScrapePlan.from_config(manager.config)
         if movie_list is None:
             movie_list = []
         Flags.scrape_start_time = time.time()  # 开始刮削时间
@@ -114,19 +125,21 @@ class Scraper:
         # 获取待刮削文件列表的相关信息
         if not movie_list:
             if manager.config.scrape_softlink_path:
-                await newtdisk_creat_symlink(
-                    Switch.COPY_NETDISK_NFO in manager.config.switch_on, movie_path, softlink_path
-                )
+                await newtdisk_creat_symlink(Switch.COPY_NETDISK_NFO in self.plan.switches, movie_path, softlink_path)
                 movie_path = softlink_path
             signal.show_log_text("\n ⏰ Start time: " + time.strftime("%Y-%m-%d %H:%M:%S", time.localtime()))
             movie_list = await get_movie_list(file_mode, movie_path, ignore_dirs)
         else:
             signal.show_log_text("\n ⏰ Start time: " + time.strftime("%Y-%m-%d %H:%M:%S", time.localtime()))
-        Flags.remain_list = movie_list
+        later: list[Path] = []  # 与本批次其他文件内容相同, 等待首个文件刮削完成后再处理
+        if file_mode == FileMode.Default and manager.config.main_mode != 4:
+            movie_list, later = await dedup_movie_list(movie_list)
+        Flags.remain_list = dict.fromkeys(movie_list + later)
         Flags.can_save_remain = True
 
         task_count = len(movie_list)
         Flags.total_count = task_count
+        self.progress.total = task_count
 
         task_list = []
         for i, each in enumerate(movie_list, 1):
@@ -156,8 +169,24 @@ class Scraper:
 
             # 异步并发
             await asyncio.gather(*[limited_scrape_exec_thread(task) for task in task_list])
+            # 首个文件刮削成功时重复文件复用其结果, 否则刮削下一个重复文件
+            while later and not signal.stop:
+                waiting = later
+                movie_list, later = await dedup_movie_list(waiting)
+                for p in set(waiting) - set(movie_list) - set(later):
+                    Flags.remain_list.pop(p, None)
+                Flags.can_save_remain = True
+                task_list = [
+                    (each, i, task_count + len(movie_list)) for i, each in enumerate(movie_list, task_count + 1)
+                ]
+                task_count += len(movie_list)
+                Flags.total_count = task_count
+                self.progress.total = task_count
+                await asyncio.gather(*[limited_scrape_exec_thread(task) for task in task_list])
+            await self._run_deferred_downloads()
             signal.label_result.emit(f" 刮削中：0 成功：{Flags.succ_count} 失败：{Flags.fail_count}")
             await save_success_list()  # 保存成功列表
+            await prune_image_store()
             if signal.stop:
                 return
 
@@ -195,8 +224,12 @@ class Scraper:
 
         # auto run after scrape
         if EmbyAction.ACTOR_PHOTO_AUTO in manager.config.emby_on:
+            from ..tools.emby_actor_image import update_emby_actor_photo  # 依赖 parsel, 使用时再导入
+
             await update_emby_actor_photo()
         if manager.config.actor_photo_kodi_auto:
+            from ..tools.emby_actor_info import creat_kodi_actors  # 依赖 bs4, 使用时再导入
+
             await creat_kodi_actors(True)
 
         signal.reset_buttons_status.emit()
@@ -205,7 +238,7 @@ class Scraper:
             new_movie_list = list(Flags.new_again_dic.keys())
             Flags.again_dic.clear()
             start_new_scrape(FileMode.Again, new_movie_list)
-        if Switch.AUTO_EXIT in manager.config.switch_on:
+        if Switch.AUTO_EXIT in self.plan.switches:
             signal.show_log_text("\n\n 🍔 已启用「刮削后自动退出软件」！")
             count = 5
             for i in range(count):
@@ -225,7 +258,7 @@ class Scraper:
         if len(show_name) > 40:
             show_name = show_name[:40] + "..."
 
-        # 处理间歇任务
+        # 处理间歇任务. 间歇刮削可在刮削过程中开关, 读取当前设置而不是 self.plan
         while (
             manager.config.main_mode != 4
             and Switch.REST_SCRAPE in manager.config.switch_on
@@ -256,6 +289,7 @@ class Scraper:
                 await asyncio.sleep(1)
 
         Flags.scrape_started += 1
+        self.progress.current = file_path.name
         if count > 1 and thread_time != 0:
             signal.show_log_text(f" 🕷 {get_current_time()} 开始刮削：{Flags.scrape_started}/{count_all} {show_name}")
 
@@ -314,6 +348,7 @@ class Scraper:
                 show_data.data = json_data
                 show_data.other = other
                 Flags.succ_count += 1
+                self.progress.succeeded += 1
                 show_data.show_name = (
                     str(Flags.count_claw)
                     + "-"
@@ -326,6 +361,7 @@ class Scraper:
                 signal.show_list_name("succ", show_data, number)
             else:
                 Flags.fail_count += 1
+                self.progress.failed += 1
                 show_data.show_name = (
                     str(Flags.count_claw)
                     + "-"
@@ -356,6 +392,7 @@ class Scraper:
         # 显示刮削结果
         try:
             Flags.scrape_done += 1
+            self.progress.done += 1
             count = Flags.scrape_done
             progress_value = count / count_all * 100
             progress_percentage = f"{progress_value:.2f}%"
@@ -376,17 +413,8 @@ class Scraper:
             signal.show_log_text(str(e))
 
         # 更新剩余任务
-        try:
-            try:
-                Flags.remain_list.remove(file_path)
-                Flags.can_save_remain = True
-            except Exception as e1:
-                signal.show_log_text(f"remove:  {file_path}\n {str(e1)}\n {traceback.format_exc()}")
-        except Exception as e:
-            self._check_stop(show_name)
-            signal.show_traceback_log(traceback.format_exc())
-            signal.show_log_text(traceback.format_exc())
-            signal.show_log_text(str(e))
+        Flags.remain_list.pop(file_path, None)
+        Flags.can_save_remain = True
 
         # 处理间歇刮削
         try:
@@ -423,9 +451,108 @@ class Scraper:
 
         LogBuffer.clear_thread()
 
+    async def _download_bulk(
+        self,
+        res: CrawlersResult,
+        folder_new_path: Path,
+        folder_old_path: Path,
+        naming_rule: str,
+        single_folder_catched: bool,
+        state: ScrapeState,
+    ) -> None:
+        # 下载剧照和剧照副本
+        if single_folder_catched:
+            await extrafanart_download(res.extrafanart, res.extrafanart_from, folder_new_path, self.plan)
+            await extrafanart_copy2(folder_new_path)
+            await extrafanart_extras_copy(folder_new_path)
+
+        # 下载trailer、复制主题视频
+        # 因为 trailer也有带文件名，不带文件名两种情况，不能使用pic_final_catched。比如图片不带文件名，trailer带文件名这种场景需要支持每个分集去下载trailer
+        await trailer_download(res, folder_new_path, folder_old_path, naming_rule, self.plan, state)
+        await copy_trailer_to_theme_videos(folder_new_path, naming_rule)
+
+    async def _run_deferred_downloads(self) -> None:
+        """执行延后的剧照和预告片下载, 并发数由下载调度器控制"""
+        deferred, self._deferred_downloads = self._deferred_downloads, []
+        if signal.stop:
+            for _, coro in deferred:
+                coro.close()
+            return
+        if not deferred:
+            return
+        start_time = time.time()
+        signal.show_log_text(f" ⏳ 开始下载延后的剧照和预告片, 共 {len(deferred)} 个...")
+
+        async def run(number: str, coro: Coroutine) -> None:
+            try:
+                await coro
+                signal.show_log_text(f" 🍀 {number}{LogBuffer.log().get()}")
+            except Exception as e:
+                signal.show_traceback_log(traceback.format_exc())
+                signal.show_log_text(f" 🔴 {number} 剧照和预告片下载失败: {e}")
+            finally:
+                LogBuffer.clear_task()
+
+        await asyncio.gather(*(run(number, coro) for number, coro in deferred))
+        signal.show_log_text(f" ⏳ 延后下载完成 ({get_used_time(start_time)}s)")
+
+    async def scrape_file(self, file_path: Path, appoint: tuple[str, str, str] | None = None) -> str:
+        """
+        刮削单个文件, 供刮削任务中的单文件任务使用. 不读取也不修改 Flags 中的刮削模式和进度, 可与批量刮削同时进行.
+
+        Args:
+            appoint: (指定番号, 指定网址, 网站名), 含义与重新刮削相同
+
+        Returns:
+            失败原因, 成功时为空字符串
+        """
+        self.plan = ScrapePlan.from_config(manager.config)
+        self.progress.current = file_path.name
+        start_time = time.time()
+        appoint = appoint or ("", "", "")
+        file_info = await get_file_info_v2(file_path, appoint=appoint)
+        LogBuffer.log().write("\n" + "👆" * 50)
+        LogBuffer.log().write("\n 🙈 [file] " + str(file_info.file_path))
+        LogBuffer.log().write("\n 🚘 [number] " + file_info.number)
+
+        json_data = other = None
+        try:
+            file_mode = FileMode.Again if appoint[1] else FileMode.Default
+            # 使用独立的处理标识, 重复刮削同一文件或同一目录时不受之前任务的影响
+            json_data, other = await self._process_one_file(file_info, file_mode, reuse=False, state=ScrapeState())
+        except Exception as e:
+            signal.show_traceback_log(traceback.format_exc())
+            LogBuffer.error().write("scrape file error: " + str(e))
+            LogBuffer.log().write("\n" + traceback.format_exc())
+
+        error = ""
+        if json_data and other:
+            self.progress.succeeded += 1
+            await self._run_deferred_downloads()
+        else:
+            self.progress.failed += 1
+            error = LogBuffer.error().get() or "刮削失败"
+            LogBuffer.log().write(f"\n 🔴 [Failed] Reason: {error}")
+            failed_folder = get_movie_path_setting(file_path).failed_folder
+            await move_file_to_failed_folder(failed_folder, file_path, file_info.folder_path)
+        self.progress.done += 1
+        signal.show_log_text(
+            "\n\n\n"
+            + "👇" * 50
+            + f"\n {file_path.name}    单文件任务"
+            + LogBuffer.log().get()
+            + f"\n 🕷 {get_current_time()} {file_path.name} 刮削完成！用时 {get_used_time(start_time)} 秒！"
+        )
+        return error
+
     async def _process_one_file(
-        self, file_info: FileInfo, file_mode: FileMode
+        self, file_info: FileInfo, file_mode: FileMode, reuse: bool = True, state: ScrapeState = Flags
     ) -> tuple[CrawlersResult | None, OtherInfo | None]:
+        """
+        Args:
+            reuse: 是否使用本次批量刮削中同一番号 (如其他分集) 的刮削结果
+            state: 图片、剧照、预告片等的处理标识, 默认使用批量刮削的全局状态
+        """
         # 处理单个文件刮削
         # 初始化所需变量
         start_time = time.time()
@@ -479,7 +606,7 @@ class Scraper:
         # 判断是否write_nfo
         update_nfo = True
         # 不写nfo的情况：
-        if manager.config.main_mode == 2 and Switch.SORT_DEL in manager.config.switch_on:
+        if manager.config.main_mode == 2 and Switch.SORT_DEL in self.plan.switches:
             # 2模式勾选“删除本地已下载的nfo文件”（暂无效，会直接return）
             update_nfo = False
         elif manager.config.main_mode in [1, 2, 3] or (
@@ -487,10 +614,10 @@ class Scraper:
         ):
             # 1、2、3模式，或4模式启用了“本地之前刮削失败和没有nfo的文件重新刮削”（变量命名有点问题，存在"no_nfo_scrape"意思其实是要刮削）
             # 且
-            if DownloadableFile.NFO not in manager.config.download_files:
+            if DownloadableFile.NFO not in self.plan.download_files:
                 # [下载]处不勾选下载nfo时
                 update_nfo = False
-            if DownloadableFile.NFO in manager.config.keep_files and is_nfo_existed:
+            if DownloadableFile.NFO in self.plan.keep_files and is_nfo_existed:
                 # [下载]处勾选保留nfo且nfo存在时
                 update_nfo = False
         elif manager.config.main_mode == 4:
@@ -503,7 +630,7 @@ class Scraper:
 
         # 刮削json_data
         # 获取已刮削的json_data
-        if "." in movie_number or file_info.mosaic in ["国产"]:
+        if not reuse or "." in movie_number or file_info.mosaic in ["国产"]:
             pass
         elif movie_number not in Flags.json_get_set:
             # 第一次遇到该番号，刮削
@@ -514,7 +641,7 @@ class Scraper:
             while not Flags.json_data_dic.get(movie_number):
                 await asyncio.sleep(1)
 
-        pre_data = Flags.json_data_dic.get(movie_number)
+        pre_data = Flags.json_data_dic.get(movie_number) if reuse else None
         # 已存在该番号数据时直接使用该数据
         if pre_data and "." not in movie_number and file_info.mosaic not in ["国产"]:
             pre_res = pre_data.data
@@ -558,7 +685,7 @@ class Scraper:
             # ========================= call crawlers =========================
             # res = await crawl(file_info.crawl_task(), file_mode)
 
-            scraper = FileScraper(manager.config, self.crawler_provider)
+            scraper = FileScraper(manager.config, self.crawler_provider, self.plan)
             res = await scraper.run(file_info.crawl_task(), file_mode)
             if res is None:
                 return None, None
@@ -609,9 +736,9 @@ class Scraper:
 
         # 判断输出文件的路径是否重复
         if manager.config.soft_link == 0:
-            done_file_new_path_list = Flags.file_new_path_dic.get(file_new_path)
+            done_file_new_path_list = state.file_new_path_dic.get(file_new_path)
             if not done_file_new_path_list:  # 如果字典中不存在同名的情况，存入列表，继续刮削
-                Flags.file_new_path_dic[file_new_path] = [file_path]
+                state.file_new_path_dic[file_new_path] = [file_path]
             else:
                 done_file_new_path_list.append(file_path)  # 已存在时，添加到列表，停止刮削
                 done_file_new_path_list.sort(reverse=True)
@@ -637,8 +764,8 @@ class Scraper:
             return None, None
 
         # 初始化图片已下载地址的字典
-        if not Flags.file_done_dic.get(res.number):
-            Flags.file_done_dic[res.number] = FileDoneDict(
+        if not state.file_done_dic.get(res.number):
+            state.file_done_dic[res.number] = FileDoneDict(
                 poster=None,
                 thumb=None,
                 fanart=None,
@@ -654,7 +781,7 @@ class Scraper:
         if manager.config.main_mode == 2:
             # 移动文件
             if await move_movie(other, file_info, file_path, file_new_path):
-                if Switch.SORT_DEL in manager.config.switch_on:
+                if Switch.SORT_DEL in self.plan.switches:
                     await deal_old_files(
                         res.number,
                         other,
@@ -670,8 +797,10 @@ class Scraper:
                         poster_final_path,
                         thumb_final_path,
                         fanart_final_path,
+                        state,
                     )  # 清理旧的thumb、poster、fanart、nfo
                 await save_success_list(file_path, file_new_path)  # 保存成功列表
+                await record_scraped(file_path, file_new_path, res.number)
                 return res, other
             else:
                 # 返回MDCx1_1main, 继续处理下一个文件
@@ -693,37 +822,43 @@ class Scraper:
             poster_final_path,
             thumb_final_path,
             fanart_final_path,
+            state,
         )
 
         # 如果 final_pic_path 没处理过，这时才需要下载和加水印
+        deferred_bulk = None
         if pic_final_catched and file_can_download:
             # 下载thumb
-            if not await thumb_download(res, other, file_info.cd_part, folder_new_path, thumb_final_path):
+            if not await thumb_download(
+                res, other, file_info.cd_part, folder_new_path, thumb_final_path, self.plan, state
+            ):
                 return None, None
 
             # 下载艺术图
-            await fanart_download(res.number, other, file_info.cd_part, fanart_final_path)
+            await fanart_download(res.number, other, file_info.cd_part, fanart_final_path, self.plan, state)
 
             # 下载poster
-            if not await poster_download(res, other, file_info.cd_part, folder_new_path, poster_final_path):
+            if not await poster_download(
+                res, other, file_info.cd_part, folder_new_path, poster_final_path, self.plan, state
+            ):
                 return None, None
 
             # 清理冗余图片
-            await pic_some_deal(res.number, thumb_final_path, fanart_final_path)
+            await pic_some_deal(res.number, thumb_final_path, fanart_final_path, state)
 
             # 加水印
             await add_mark(other, file_info, res.mosaic)
 
-            # 下载剧照和剧照副本
-            if single_folder_catched:
-                await extrafanart_download(res.extrafanart, res.extrafanart_from, folder_new_path)
-                await extrafanart_copy2(folder_new_path)
-                await extrafanart_extras_copy(folder_new_path)
-
-            # 下载trailer、复制主题视频
-            # 因为 trailer也有带文件名，不带文件名两种情况，不能使用pic_final_catched。比如图片不带文件名，trailer带文件名这种场景需要支持每个分集去下载trailer
-            await trailer_download(res, folder_new_path, folder_old_path, naming_rule)
-            await copy_trailer_to_theme_videos(folder_new_path, naming_rule)
+            # 下载剧照、trailer. 启用延后下载时, 在所有文件刮削完成后执行
+            # 延后下载在写入 nfo 之后, 因此先获取最终的预告片地址
+            res.trailer = await get_dmm_trailer(res.trailer)
+            bulk = partial(
+                self._download_bulk, res, folder_new_path, folder_old_path, naming_rule, single_folder_catched, state
+            )
+            if manager.config.defer_bulk_download:
+                deferred_bulk = bulk
+            else:
+                await bulk()
 
         # 生成nfo文件
         await write_nfo(file_info, res, nfo_new_path, folder_new_path, update_nfo)
@@ -740,6 +875,7 @@ class Scraper:
         if not await move_movie(other, file_info, file_path, file_new_path):
             return None, None
         await save_success_list(file_path, file_new_path)  # 保存成功列表
+        await record_scraped(file_path, file_new_path, res.number)
 
         # 创建软链接及复制文件
         if manager.config.auto_link:
@@ -751,7 +887,7 @@ class Scraper:
             else:
                 # 此时 folder_new_path == folder_old_path 且在 movie_path 目录下
                 target_dir = Path(manager.config.localdisk_path) / folder_old_path.relative_to(movie_path, walk_up=True)
-            copy = Switch.COPY_NETDISK_NFO in manager.config.switch_on
+            copy = Switch.COPY_NETDISK_NFO in self.plan.switches
             await newtdisk_creat_symlink(copy, folder_new_path, target_dir)
 
         # json添加封面缩略图路径
@@ -761,6 +897,9 @@ class Scraper:
         if not await aiofiles.os.path.exists(thumb_final_path) and await aiofiles.os.path.exists(fanart_final_path):
             other.thumb_path = fanart_final_path
 
+        # 刮削成功后才加入延后下载
+        if deferred_bulk is not None:
+            self._deferred_downloads.append((res.number, deferred_bulk()))
         return res, other
 
     def _check_stop(self, show_name: str) -> None:
@@ -801,7 +940,7 @@ def get_remain_list() -> bool:
         return False
     remains = remain_list_path.read_text(encoding="utf-8").strip()
     remains = [p for path in remains.split("\n") if path.strip() and (p := Path(path.strip())).suffix]
-    Flags.remain_list = remains
+    Flags.remain_list = dict.fromkeys(remains)
     if not len(Flags.remain_list) or Switch.REMAIN_TASK not in manager.config.switch_on:
         return False
     box = QMessageBox(QMessageBox.Information, "继续刮削", "上次刮削未完成，是否继续刮削剩余任务？")
@@ -821,7 +960,7 @@ def get_remain_list() -> bool:
         movie_path = manager.data_folder
     movie_path = Path(movie_path)
 
-    p = Flags.remain_list[0]
+    p = next(iter(Flags.remain_list))
     if not is_descendant(p, movie_path):
         box = QMessageBox(
             QMessageBox.Warning,
@@ -838,7 +977,7 @@ def get_remain_list() -> bool:
         if reply == QMessageBox.No:
             return True
     signal.show_log_text(f"🍯 🍯 🍯 NOTE: 继续刮削未完成任务！！！ 剩余未刮削文件数量（{len(Flags.remain_list)})")
-    start_new_scrape(FileMode.Default, Flags.remain_list)
+    start_new_scrape(FileMode.Default, list(Flags.remain_list))
     return True
 
 
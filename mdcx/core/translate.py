@@ -15,7 +15,7 @@ from ..config.resources import resources
 from ..gen.field_enums import CrawlerResultFields
 from ..models.log_buffer import LogBuffer
 from ..models.types import CrawlersResult
-from ..number import get_number_letters
+from ..number import get_number_info
 from ..signals import signal
 from ..utils import clean_list, get_used_time
 from ..utils.language import is_japanese
@@ -91,11 +91,10 @@ def translate_info(json_data: CrawlersResult, has_sub: bool):
     if TagInclude.LETTERS in tag_include and letters and letters != "未知车牌":
         # 去除素人番号前缀数字
         if FieldRule.DEL_NUM in fields_rule:
-            temp_n = re.findall(r"\d{3,}([a-zA-Z]+-\d+)", json_data.number)
-            if temp_n:
-                letters = get_number_letters(temp_n[0])
+            if short_number := get_number_info(json_data.number).short_number:
+                letters = get_number_info(short_number).letters
                 json_data.letters = letters
-                json_data.number = temp_n[0]
+                json_data.number = short_number
         tag = letters + "," + tag
         tag = tag.strip(",")
 
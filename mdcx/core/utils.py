@@ -1,6 +1,7 @@
 import asyncio
 import os
 import re
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import aiofiles.os
@@ -13,10 +14,10 @@ from ..gen.field_enums import CrawlerResultFields
 from ..manual import ManualConfig
 from ..models.log_buffer import LogBuffer
 from ..models.types import BaseCrawlerResult, CrawlersResult, FileInfo
-from ..number import get_number_first_letter, get_number_letters
+from ..number import get_number_first_letter, get_number_info
 from ..signals import signal
 from ..utils import get_new_release, get_used_time, split_path
-from ..utils.video import get_video_metadata
+from ..utils.video import PROBE_BACKENDS, VideoMetadata, VideoProbeCache, guess_height_from_path
 
 
 def replace_word(json_data: BaseCrawlerResult):
@@ -122,10 +123,9 @@ def deal_some_field(json_data: CrawlersResult):
 
     # 去除素人番号前缀数字
     if FieldRule.DEL_NUM in fields_rule:
-        temp_n = re.findall(r"\d{3,}([a-zA-Z]+-\d+)", number)
-        if temp_n:
-            json_data.number = temp_n[0]
-            json_data.letters = get_number_letters(json_data.number)
+        if short_number := get_number_info(number).short_number:
+            json_data.number = short_number
+            json_data.letters = get_number_info(short_number).letters
 
     if number.endswith("Z"):
         json_data.number = json_data.number[:-1] + "z"
@@ -148,6 +148,81 @@ def show_movie_info(file_info: FileInfo, result: CrawlersResult):
         LogBuffer.log().write(f"\n     {key:<13}: {value}")
 
 
+class VideoProber:
+    """
+    视频探测执行器. 使用独立的有界线程池, 与网络并发数互不影响, 避免同时打开过多视频造成磁盘寻道抖动.
+
+    按 pyav -> ffprobe 的顺序尝试, 每个后端均有超时, 全部失败时根据文件名推断分辨率.
+    """
+
+    # 后端超时后额外等待的时间 (秒)
+    TIMEOUT_GRACE = 5
+
+    def __init__(self, max_workers: int, timeout: float):
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="VideoProbe")
+
+    async def probe(self, p: Path) -> VideoMetadata:
+        loop = asyncio.get_running_loop()
+        errors = []
+        for name, func in PROBE_BACKENDS:
+            try:
+                # 后端自身的超时用于释放工作线程, wait_for 确保调用方不会被卡住
+                meta = await asyncio.wait_for(
+                    loop.run_in_executor(self._executor, func, p, self.timeout),
+                    self.timeout + self.TIMEOUT_GRACE,
+                )
+                if meta.height:
+                    return meta
+                errors.append(f"{name}: 未找到视频流")
+            except Exception as e:
+                errors.append(f"{name}: {e or type(e).__name__}")
+        signal.show_log_text(
+            f" 🔴 无法获取视频分辨率, 将根据文件名推断! 文件地址: {p}  错误信息: {'; '.join(errors) or '无可用后端'}"
+        )
+        return VideoMetadata(height=guess_height_from_path(p), source="path")
+
+    def shutdown(self) -> None:
+        """不再接受新的探测. 已提交的探测继续执行完毕, 不会取消正在等待的刮削任务."""
+        self._executor.shutdown(wait=False)
+
+
+_probe_cache: VideoProbeCache | None = None
+_prober: VideoProber | None = None
+
+
+def get_probe_cache() -> VideoProbeCache:
+    """获取视频元数据缓存, 首次调用时打开用户数据目录下的数据库."""
+    global _probe_cache
+    if _probe_cache is None:
+        _probe_cache = VideoProbeCache(resources.u("video_probe.db"))
+    return _probe_cache
+
+
+def get_video_prober() -> VideoProber:
+    """获取视频探测执行器, 相关配置变更时重建."""
+    global _prober
+    max_workers = max(1, manager.config.probe_concurrency)
+    timeout = max(1, manager.config.probe_timeout)
+    if _prober is None or _prober.max_workers != max_workers or _prober.timeout != timeout:
+        if _prober is not None:
+            _prober.shutdown()
+        _prober = VideoProber(max_workers, timeout)
+    return _prober
+
+
+async def probe_video_cached(p: Path) -> VideoMetadata:
+    """获取视频元数据, 优先使用缓存. 根据文件名推断的结果不写入缓存."""
+    cache = get_probe_cache()
+    if (meta := await asyncio.to_thread(cache.get, p)) is not None:
+        return meta
+    meta = await get_video_prober().probe(p)
+    if meta.source != "path":
+        await asyncio.to_thread(cache.put, p, meta)
+    return meta
+
+
 async def get_video_size(file_path: Path):
     """
     获取视频分辨率和编码格式
@@ -170,23 +245,12 @@ async def get_video_size(file_path: Path):
     codec = ""
     if hd_get == "video":
         try:
-            height, codec = await asyncio.to_thread(get_video_metadata, file_path)
+            meta = await probe_video_cached(file_path)
+            height, codec = meta.height, meta.codec
         except Exception as e:
             signal.show_log_text(f" 🔴 无法获取视频分辨率! 文件地址: {file_path}  错误信息: {e}")
     elif hd_get == "path":
-        file_path_temp = file_path.as_posix().upper()
-        if "8K" in file_path_temp:
-            height = 4000
-        elif "4K" in file_path_temp or "UHD" in file_path_temp:
-            height = 2000
-        elif "1440P" in file_path_temp or "QHD" in file_path_temp:
-            height = 1440
-        elif "1080P" in file_path_temp or "FHD" in file_path_temp:
-            height = 1080
-        elif "960P" in file_path_temp:
-            height = 960
-        elif "720P" in file_path_temp or "HD" in file_path_temp:
-            height = 720
+        height = guess_height_from_path(file_path)
 
     hd_name = manager.config.hd_name
     if not height:
@@ -0,0 +1,426 @@
+"""
+监视媒体目录, 新文件写入完成后自动提交刮削任务. 供服务器模式使用.
+
+Linux 上使用 inotify, 其他系统及网络挂载目录 (inotify 无法收到其他主机的修改) 定时扫描目录.
+文件大小在 watch_stable_seconds 内不变才视为写入完成, 写入完成的文件在 watch_batch_window 内一起提交, 静默时段内暂不提交.
+"""
+
+import asyncio
+import ctypes
+import ctypes.util
+import os
+import re
+import struct
+import sys
+import time
+import traceback
+from collections.abc import Callable
+from concurrent.futures import Future
+from datetime import datetime
+from datetime import time as dtime
+from pathlib import Path
+
+from ..config.extend import get_movie_path_setting
+from ..config.manager import manager
+from ..models.flags import Flags
+from ..signals import signal
+from ..utils import executor
+from .jobs import JobKind, get_job_queue
+
+TICK = 1.0  # 检查文件大小及提交的间隔秒数
+SKIP_MARKERS = ("skip", ".skip", ".ignore")  # 目录中存在这些文件时跳过该目录, 与 movie_lists 一致
+NETWORK_FS = frozenset(
+    {"nfs", "nfs4", "cifs", "smb3", "smbfs", "9p", "davfs", "fuse.sshfs", "fuse.rclone", "fuse.s3fs", "fuse.juicefs"}
+)
+
+# inotify 常量, 见 inotify(7)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+_WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_ONLYDIR
+_EVENT = struct.Struct("iIII")
+
+
+def in_quiet_hours(spec: str, now: dtime) -> bool:
+    """
+    判断是否处于静默时段.
+
+    Args:
+        spec: 如 "01:00-07:00", 多个时段用逗号分隔, 结束时间早于开始时间时表示跨越午夜. 无效的时段被忽略
+    """
+    for part in spec.split(","):
+        try:
+            start, end = (dtime.fromisoformat(s.strip()) for s in part.split("-"))
+        except ValueError:
+            continue
+        if start <= end:
+            if start <= now < end:
+                return True
+        elif now >= start or now < end:
+            return True
+    return False
+
+
+def is_network_fs(path: Path) -> bool:
+    """根据 /proc/self/mounts 判断路径是否位于网络文件系统, 无法判断时返回 False"""
+    try:
+        mounts = Path("/proc/self/mounts").read_text().splitlines()
+        target = path.resolve().as_posix()
+    except OSError:
+        return False
+    best, fs_type = "", ""
+    for line in mounts:
+        fields = line.split()
+        if len(fields) < 3:
+            continue
+        # 挂载点中的空格等字符以八进制转义
+        mount_point = re.sub(r"\\([0-7]{3})", lambda m: chr(int(m.group(1), 8)), fields[1])
+        if (target == mount_point or target.startswith(mount_point.rstrip("/") + "/")) and len(mount_point) >= len(
+            best
+        ):
+            best, fs_type = mount_point, fields[2]
+    return fs_type in NETWORK_FS
+
+
+class WatchFilter:
+    """判断监视到的目录和文件是否需要处理, 规则与 movie_lists 一致, 另外排除成功/失败输出目录以免重复刮削"""
+
+    def __init__(self, root: Path, excluded: frozenset[Path], media_type: frozenset[str]):
+        self.root = root
+        self.excluded = excluded
+        self.media_type = media_type
+
+    @classmethod
+    def from_config(cls) -> "WatchFilter":
+        settings = get_movie_path_setting()
+        excluded = {settings.success_folder, settings.failed_folder, settings.softlink_path}
+        excluded.update(settings.ignore_dirs)
+        return cls(settings.movie_path, frozenset(excluded), frozenset(t.lower() for t in manager.config.media_type))
+
+    def dir_ok(self, path: Path) -> bool:
+        return path not in self.excluded and "behind the scenes" not in path.name
+
+    def name_ok(self, name: str) -> bool:
+        file_name, file_ext = os.path.splitext(name)
+        if file_name.startswith(".") or "trailer." in name or "trailers." in name or "theme_video." in name:
+            return False
+        return file_ext.lower() in self.media_type
+
+    def accept(self, path: Path) -> bool:
+        """文件写入完成后的最终检查"""
+        if not self.name_ok(path.name) or path in Flags.success_list:
+            return False
+        for p in path.parents:
+            if p == self.root:
+                break
+            if not self.dir_ok(p):
+                return False
+        return not any((path.parent / m).exists() for m in SKIP_MARKERS)
+
+    def walk(self, top: Path):
+        """遍历 top 下需要处理的目录, 返回 (目录, 文件名列表)"""
+        for root, dirs, files in top.walk(top_down=True):
+            if any(m in files for m in SKIP_MARKERS):
+                dirs.clear()
+                continue
+            dirs[:] = [d for d in dirs if self.dir_ok(root / d)]
+            yield root, [f for f in files if self.name_ok(f)]
+
+
+def _snapshot(flt: WatchFilter) -> dict[Path, tuple[int, int]]:
+    result = {}
+    for root, files in flt.walk(flt.root):
+        for f in files:
+            path = root / f
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            result[path] = (st.st_size, st.st_mtime_ns)
+    return result
+
+
+def _sizes(paths: list[Path]) -> dict[Path, int | None]:
+    result = {}
+    for p in paths:
+        try:
+            result[p] = p.stat().st_size
+        except OSError:
+            result[p] = None
+    return result
+
+
+class PollingBackend:
+    """定时扫描目录, 与上次扫描相比新增或修改的文件视为候选"""
+
+    def __init__(self, flt: WatchFilter, add: Callable[[Path], None], interval: float):
+        self.flt = flt
+        self.add = add
+        self.interval = interval
+        self._snapshot: dict[Path, tuple[int, int]] = {}
+        self._task: asyncio.Task | None = None
+
+    async def start(self):
+        # 首次扫描仅作为基准, 已有文件由手动刮削处理
+        self._snapshot = await asyncio.to_thread(_snapshot, self.flt)
+        self._task = asyncio.create_task(self._loop())
+
+    async def poll(self):
+        snapshot = await asyncio.to_thread(_snapshot, self.flt)
+        for path, st in snapshot.items():
+            if self._snapshot.get(path) != st:
+                self.add(path)
+        self._snapshot = snapshot
+
+    async def _loop(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.poll()
+            except Exception:
+                signal.show_traceback_log(traceback.format_exc())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+
+
+class InotifyBackend:
+    """使用 inotify 监视目录树, 新建的子目录自动加入监视"""
+
+    def __init__(self, flt: WatchFilter, add: Callable[[Path], None]):
+        self.flt = flt
+        self.add = add
+        self._fd = -1
+        self._wds: dict[int, Path] = {}
+        self._last_event = time.time()
+        self._tasks: set[asyncio.Task] = set()
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+
+    async def start(self):
+        fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._fd = fd
+        try:
+            await asyncio.to_thread(self._watch_tree, self.flt.root, None)
+        except OSError:
+            os.close(fd)
+            self._fd = -1
+            raise
+        asyncio.get_running_loop().add_reader(fd, self._on_readable)
+
+    def _add_watch(self, path: Path):
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), _WATCH_MASK)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, f"inotify_add_watch failed: {os.strerror(errno)}", str(path))
+        self._wds[wd] = path
+
+    def _watch_tree(self, top: Path, newer_than: float | None) -> list[Path]:
+        """
+        监视 top 下所有目录. 在工作线程中执行.
+
+        Args:
+            newer_than: 不为 None 时返回修改时间晚于此时间的文件, 用于处理监视开始前已写入的文件
+        """
+        found = []
+        for root, files in self.flt.walk(top):
+            self._add_watch(root)
+            if newer_than is None:
+                continue
+            for f in files:
+                try:
+                    if (root / f).stat().st_mtime >= newer_than:
+                        found.append(root / f)
+                except OSError:
+                    pass
+        return found
+
+    def _spawn(self, top: Path, newer_than: float):
+        async def task():
+            try:
+                for path in await asyncio.to_thread(self._watch_tree, top, newer_than):
+                    self.add(path)
+            except OSError as e:
+                signal.show_log_text(f" 🔴 监视目录失败: {e}")
+
+        t = asyncio.create_task(task())
+        self._tasks.add(t)
+        t.add_done_callback(self._tasks.discard)
+
+    def _on_readable(self):
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return
+        now = time.time()
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = _EVENT.unpack_from(data, offset)
+            offset += _EVENT.size
+            name = os.fsdecode(data[offset : offset + length].rstrip(b"\0"))
+            offset += length
+            if mask & IN_Q_OVERFLOW:
+                # 事件队列溢出, 重新扫描上次收到事件之后修改的文件
+                signal.show_log_text(" ⚠️ inotify 事件过多, 重新扫描媒体目录")
+                self._spawn(self.flt.root, self._last_event - TICK)
+                continue
+            if mask & IN_IGNORED:
+                self._wds.pop(wd, None)
+                continue
+            parent = self._wds.get(wd)
+            if parent is None or not name:
+                continue
+            path = parent / name
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO) and self.flt.dir_ok(path):
+                    # 新目录中的文件可能在开始监视前已写入
+                    self._spawn(path, 0)
+            elif self.flt.name_ok(name):
+                self.add(path)
+        self._last_event = now
+
+    async def close(self):
+        for t in self._tasks:
+            t.cancel()
+        if self._fd >= 0:
+            asyncio.get_running_loop().remove_reader(self._fd)
+            os.close(self._fd)
+            self._fd = -1
+
+
+class LibraryWatcher:
+    """
+    长期运行的监视服务. 根据设置随时启用、停用或切换监视方式, 无需重启.
+    """
+
+    def __init__(self, submit: Callable[[list[Path]], object] | None = None):
+        self._submit = submit or self._submit_job
+        self._pending: dict[Path, tuple[int | None, float]] = {}  # 路径 -> (上次大小, 大小开始不变的时间)
+        self._batch: dict[Path, None] = {}  # 有序集合, 等待提交的文件
+        self._batch_start = 0.0
+        self._backend: PollingBackend | InotifyBackend | None = None
+        self._filter: WatchFilter | None = None
+        self._key: tuple | None = None
+        self._future: Future | None = None
+
+    def start(self):
+        """在后台事件循环中启动服务, 此方法线程安全."""
+        if self._future is None or self._future.done():
+            self._future = executor.submit(self.run())
+
+    def stop(self):
+        if self._future is not None:
+            self._future.cancel()
+
+    def add(self, path: Path):
+        """记录可能正在写入的文件, 由监视后端调用"""
+        if path not in self._pending and path not in self._batch:
+            self._pending[path] = (None, 0.0)
+
+    async def run(self):
+        try:
+            while True:
+                try:
+                    await self._reconfigure()
+                    await self.tick(time.monotonic(), datetime.now().time())
+                except Exception:
+                    signal.show_traceback_log(traceback.format_exc())
+                await asyncio.sleep(TICK)
+        finally:
+            await self._close_backend()
+
+    async def _close_backend(self):
+        if self._backend is not None:
+            await self._backend.close()
+            self._backend = None
+
+    async def _reconfigure(self):
+        config = manager.config
+        flt = WatchFilter.from_config() if config.watch_media_path else None
+        key = (
+            config.watch_media_path,
+            config.watch_polling,
+            config.watch_poll_interval,
+            flt and flt.root,
+            flt and flt.excluded,
+            flt and flt.media_type,
+        )
+        if key == self._key:
+            return
+        self._key = key
+        await self._close_backend()
+        self._filter = flt
+        self._pending.clear()
+        if flt is None:
+            return
+        if not flt.root.is_dir():
+            signal.show_log_text(f" 🔴 监视媒体目录失败, 目录不存在: {flt.root}")
+            return
+        if not config.watch_polling and sys.platform.startswith("linux") and not is_network_fs(flt.root):
+            backend = InotifyBackend(flt, self.add)
+            try:
+                await backend.start()
+                self._backend = backend
+                signal.show_log_text(f" 👀 开始监视媒体目录 (inotify): {flt.root}")
+                return
+            except OSError as e:
+                # 如 fs.inotify.max_user_watches 不足
+                signal.show_log_text(f" ⚠️ inotify 不可用, 改为轮询: {e}")
+        backend = PollingBackend(flt, self.add, max(config.watch_poll_interval, 1))
+        await backend.start()
+        self._backend = backend
+        signal.show_log_text(f" 👀 开始监视媒体目录 (轮询, {config.watch_poll_interval} 秒): {flt.root}")
+
+    async def tick(self, now: float, wall: dtime):
+        """
+        Args:
+            now: 单调时钟, 用于计算稳定时间和批量窗口
+            wall: 当前时间, 用于判断静默时段
+        """
+        config = manager.config
+        if self._pending:
+            sizes = await asyncio.to_thread(_sizes, list(self._pending))
+            for path, size in sizes.items():
+                if size is None:
+                    del self._pending[path]
+                    continue
+                last, since = self._pending[path]
+                if size != last:
+                    self._pending[path] = (size, now)
+                elif now - since >= config.watch_stable_seconds:
+                    del self._pending[path]
+                    if self._filter is not None and await asyncio.to_thread(self._filter.accept, path):
+                        if not self._batch:
+                            self._batch_start = now
+                        self._batch[path] = None
+
+        if not self._batch or now - self._batch_start < config.watch_batch_window:
+            return
+        if in_quiet_hours(config.watch_quiet_hours, wall):
+            return
+        paths = list(self._batch)
+        self._batch.clear()
+        signal.show_log_text(f" 👀 监视到 {len(paths)} 个新文件, 提交刮削任务")
+        self._submit(paths)
+
+    @staticmethod
+    def _submit_job(paths: list[Path]):
+        # 刮削软链接目录时需要先为新文件创建软链接, 因此刮削整个目录
+        get_job_queue().submit(JobKind.SCRAPE, [] if manager.config.scrape_softlink_path else paths)
+
+
+_watcher: LibraryWatcher | None = None
+
+
+def get_library_watcher() -> LibraryWatcher:
+    global _watcher
+    if _watcher is None:
+        _watcher = LibraryWatcher()
+    return _watcher
@@ -20,17 +20,18 @@ from ..base.web import (
     download_file_with_filepath,
     get_amazon_data,
     get_big_pic_by_google,
-    get_dmm_trailer,
     get_imgsize,
 )
 from ..config.enums import DownloadableFile, HDPicSource
 from ..config.manager import manager
-from ..models.flags import Flags
+from ..config.plan import ScrapePlan
+from ..models.flags import ScrapeState
 from ..models.log_buffer import LogBuffer
 from ..models.types import CrawlersResult, OtherInfo
 from ..signals import signal
 from ..utils import convert_half, get_used_time, split_path
-from ..utils.file import check_pic_async, copy_file_async, delete_file_async, move_file_async
+from ..utils.file import check_pic_async, copy_file_async, delete_file_async, link_or_copy_async, move_file_async
+from ..web_async import DownloadPriority
 from .image import cut_thumb_to_poster
 
 
@@ -211,12 +212,13 @@ async def trailer_download(
     folder_new: Path,
     folder_old: Path,
     naming_rule: str,
+    plan: ScrapePlan,
+    state: ScrapeState,
 ) -> bool | None:
     start_time = time.time()
-    download_files = manager.config.download_files
-    keep_files = manager.config.keep_files
+    download_files = plan.download_files
+    keep_files = plan.keep_files
     trailer_name = manager.config.trailer_simple_name
-    result.trailer = await get_dmm_trailer(result.trailer)  # todo 或许找一个更合适的地方进行统一后处理
     trailer_url = result.trailer
     trailer_old_folder_path = folder_old / "trailers"
     trailer_new_folder_path = folder_new / "trailers"
@@ -228,9 +230,9 @@ async def trailer_download(
         trailer_file_path = trailer_folder_path / trailer_file_name
 
         # 预告片文件夹已在已处理列表时，返回（这时只需要下载一个，其他分集不需要下载）
-        if trailer_folder_path in Flags.trailer_deal_set:
+        if trailer_folder_path in state.trailer_deal_set:
             return
-        Flags.trailer_deal_set.add(trailer_folder_path)
+        state.trailer_deal_set.add(trailer_folder_path)
 
         # 不下载不保留时删除返回
         if DownloadableFile.TRAILER not in download_files and DownloadableFile.TRAILER not in keep_files:
@@ -260,8 +262,8 @@ async def trailer_download(
 
     # 选择保留文件，当存在文件时，不下载。（done trailer path 未设置时，把当前文件设置为 done trailer path，以便其他分集复制）
     if DownloadableFile.TRAILER in keep_files and await aiofiles.os.path.exists(trailer_file_path):
-        if not Flags.file_done_dic.get(result.number, {}).get("trailer"):
-            Flags.file_done_dic[result.number].update({"trailer": trailer_file_path})
+        if not state.file_done_dic.get(result.number, {}).get("trailer"):
+            state.file_done_dic[result.number].update({"trailer": trailer_file_path})
             # 带文件名时，删除掉新、旧文件夹，用不到了。（其他分集如果没有，可以复制第一个文件的预告片。此时不删，没机会删除了）
             if not trailer_name:
                 if await aiofiles.os.path.exists(trailer_old_folder_path):
@@ -275,7 +277,7 @@ async def trailer_download(
 
     # 带文件名时，选择下载不保留，或者选择保留但没有预告片，检查是否有其他分集已下载或本地预告片
     # 选择下载不保留，当没有下载成功时，不会删除不保留的文件
-    done_trailer_path = Flags.file_done_dic.get(result.number, {}).get("trailer")
+    done_trailer_path = state.file_done_dic.get(result.number, {}).get("trailer")
     if not trailer_name and done_trailer_path and await aiofiles.os.path.exists(done_trailer_path):
         if await aiofiles.os.path.exists(trailer_file_path):
             await delete_file_async(trailer_file_path)
@@ -295,12 +297,13 @@ async def trailer_download(
             await aiofiles.os.makedirs(trailer_folder_path)
 
         # 开始下载
-        download_files = manager.config.download_files
         signal.show_traceback_log(f"🍔 {result.number} download trailer... {trailer_url}")
         trailer_file_path_temp = trailer_file_path
         if await aiofiles.os.path.exists(trailer_file_path):
             trailer_file_path_temp = trailer_file_path.with_suffix(".[DOWNLOAD].mp4")
-        if await download_file_with_filepath(trailer_url, trailer_file_path_temp, trailer_folder_path):
+        if await download_file_with_filepath(
+            trailer_url, trailer_file_path_temp, trailer_folder_path, DownloadPriority.TRAILER
+        ):
             file_size = await aiofiles.os.path.getsize(trailer_file_path_temp)
             if file_size >= content_length or DownloadableFile.IGNORE_SIZE in download_files:
                 LogBuffer.log().write(
@@ -310,9 +313,9 @@ async def trailer_download(
                 if trailer_file_path_temp != trailer_file_path:
                     await move_file_async(trailer_file_path_temp, trailer_file_path)
                     await delete_file_async(trailer_file_path_temp)
-                done_trailer_path = Flags.file_done_dic.get(result.number, {}).get("trailer")
+                done_trailer_path = state.file_done_dic.get(result.number, {}).get("trailer")
                 if not done_trailer_path:
-                    Flags.file_done_dic[result.number].update({"trailer": trailer_file_path})
+                    state.file_done_dic[result.number].update({"trailer": trailer_file_path})
                     if trailer_name == 0:  # 带文件名，已下载成功，删除掉那些不用的文件夹即可
                         if await aiofiles.os.path.exists(trailer_old_folder_path):
                             await to_thread(shutil.rmtree, trailer_old_folder_path, ignore_errors=True)
@@ -331,9 +334,9 @@ async def trailer_download(
         LogBuffer.log().write(f"\n 🟠 Trailer download failed! ({trailer_url}) ")
 
     if await aiofiles.os.path.exists(trailer_file_path):  # 使用旧文件
-        done_trailer_path = Flags.file_done_dic.get(result.number, {}).get("trailer")
+        done_trailer_path = state.file_done_dic.get(result.number, {}).get("trailer")
         if not done_trailer_path:
-            Flags.file_done_dic[result.number].update({"trailer": trailer_file_path})
+            state.file_done_dic[result.number].update({"trailer": trailer_file_path})
             if trailer_name == 0:  # 带文件名，已下载成功，删除掉那些不用的文件夹即可
                 if await aiofiles.os.path.exists(trailer_old_folder_path):
                     await to_thread(shutil.rmtree, trailer_old_folder_path, ignore_errors=True)
@@ -530,6 +533,8 @@ async def thumb_download(
     cd_part: str,
     folder_new_path: Path,
     thumb_final_path: Path,
+    plan: ScrapePlan,
+    state: ScrapeState,
 ) -> bool:
     start_time = time.time()
     poster_path = other.poster_path
@@ -537,17 +542,17 @@ async def thumb_download(
     fanart_path = other.fanart_path
 
     # 本地存在 thumb.jpg，且勾选保留旧文件时，不下载
-    if thumb_path and DownloadableFile.THUMB in manager.config.keep_files:
+    if thumb_path and DownloadableFile.THUMB in plan.keep_files:
         LogBuffer.log().write(f"\n 🍀 Thumb done! (old)({get_used_time(start_time)}s) ")
         return True
 
     # 如果thumb不下载，看fanart、poster要不要下载，都不下载则返回
-    if DownloadableFile.THUMB not in manager.config.download_files:
+    if DownloadableFile.THUMB not in plan.download_files:
         if (
-            DownloadableFile.POSTER in manager.config.download_files
-            and (DownloadableFile.POSTER not in manager.config.keep_files or not poster_path)
-            or DownloadableFile.FANART in manager.config.download_files
-            and (DownloadableFile.FANART not in manager.config.keep_files or not fanart_path)
+            DownloadableFile.POSTER in plan.download_files
+            and (DownloadableFile.POSTER not in plan.keep_files or not poster_path)
+            or DownloadableFile.FANART in plan.download_files
+            and (DownloadableFile.FANART not in plan.keep_files or not fanart_path)
         ):
             pass
         else:
@@ -555,13 +560,13 @@ async def thumb_download(
 
     # 尝试复制其他分集。看分集有没有下载，如果下载完成则可以复制，否则就自行下载
     if cd_part:
-        done_thumb_path = Flags.file_done_dic.get(result.number, {}).get("thumb")
+        done_thumb_path = state.file_done_dic.get(result.number, {}).get("thumb")
         if (
             done_thumb_path
             and await aiofiles.os.path.exists(done_thumb_path)
             and split_path(done_thumb_path)[0] == split_path(thumb_final_path)[0]
         ):
-            await copy_file_async(done_thumb_path, thumb_final_path)
+            await link_or_copy_async(done_thumb_path, thumb_final_path, manager.config.image_cache == "link")
             LogBuffer.log().write(f"\n 🍀 Thumb done! (copy cd-thumb)({get_used_time(start_time)}s) ")
             result.thumb_from = "copy cd-thumb"
             other.thumb_path = thumb_final_path
@@ -592,7 +597,7 @@ async def thumb_download(
                 )
                 continue
             result.thumb_from = cover_from
-            if await download_file_with_filepath(cover_url, thumb_final_path_temp, folder_new_path):
+            if await download_file_with_filepath(cover_url, thumb_final_path_temp, folder_new_path, cache=True):
                 cover_size = await check_pic_async(thumb_final_path_temp)
                 if cover_size:
                     if (
@@ -608,7 +613,7 @@ async def thumb_download(
                             await move_file_async(thumb_final_path_temp, thumb_final_path)
                             await delete_file_async(thumb_final_path_temp)
                         if cd_part:
-                            Flags.file_done_dic[result.number].update({"thumb": thumb_final_path})
+                            state.file_done_dic[result.number].update({"thumb": thumb_final_path})
                         other.thumb_marked = False  # 表示还没有走加水印流程
                         LogBuffer.log().write(f"\n 🍀 Thumb done! ({result.thumb_from})({get_used_time(start_time)}s) ")
                         other.thumb_path = thumb_final_path
@@ -629,7 +634,7 @@ async def thumb_download(
         LogBuffer.log().write(f"\n 🍀 Thumb done! (old)({get_used_time(start_time)}s) ")
         return True
     else:
-        if DownloadableFile.IGNORE_PIC_FAIL in manager.config.download_files:
+        if DownloadableFile.IGNORE_PIC_FAIL in plan.download_files:
             LogBuffer.log().write("\n 🟠 Thumb download failed! (你已勾选「图片下载失败时，不视为失败！」) ")
             LogBuffer.log().write(f"\n 🍀 Thumb done! (none)({get_used_time(start_time)}s)")
             return True
@@ -649,10 +654,12 @@ async def poster_download(
     cd_part: str,
     folder_new_path: Path,
     poster_final_path: Path,
+    plan: ScrapePlan,
+    state: ScrapeState,
 ) -> bool:
     start_time = time.time()
-    download_files = manager.config.download_files
-    keep_files = manager.config.keep_files
+    download_files = plan.download_files
+    keep_files = plan.keep_files
     poster_path = other.poster_path
     thumb_path = other.thumb_path
     fanart_path = other.fanart_path
@@ -675,13 +682,13 @@ async def poster_download(
 
     # 尝试复制其他分集。看分集有没有下载，如果下载完成则可以复制，否则就自行下载
     if cd_part:
-        done_poster_path = Flags.file_done_dic.get(result.number, {}).get("poster")
+        done_poster_path = state.file_done_dic.get(result.number, {}).get("poster")
         if (
             done_poster_path
             and await aiofiles.os.path.exists(done_poster_path)
             and split_path(done_poster_path)[0] == split_path(poster_final_path)[0]
         ):
-            await copy_file_async(done_poster_path, poster_final_path)
+            await link_or_copy_async(done_poster_path, poster_final_path, manager.config.image_cache == "link")
             result.poster_from = "copy cd-poster"
             other.poster_path = poster_final_path
             LogBuffer.log().write(f"\n 🍀 Poster done! (copy cd-poster)({get_used_time(start_time)}s)")
@@ -708,7 +715,7 @@ async def poster_download(
             if DownloadableFile.IGNORE_YOUMA in download_files:
                 copy_flag = True
         if copy_flag:
-            await copy_file_async(thumb_path, poster_final_path)
+            await link_or_copy_async(thumb_path, poster_final_path, manager.config.image_cache == "link")
             other.poster_marked = other.thumb_marked
             result.poster_from = "copy thumb"
             other.poster_path = poster_final_path
@@ -726,7 +733,7 @@ async def poster_download(
         poster_final_path_temp = poster_final_path.with_suffix(".[DOWNLOAD].jpg")
     if result.image_download:
         start_time = time.time()
-        if await download_file_with_filepath(poster_url, poster_final_path_temp, folder_new_path):
+        if await download_file_with_filepath(poster_url, poster_final_path_temp, folder_new_path, cache=True):
             poster_size = await check_pic_async(poster_final_path_temp)
             if poster_size:
                 if (
@@ -738,7 +745,7 @@ async def poster_download(
                         await move_file_async(poster_final_path_temp, poster_final_path)
                         await delete_file_async(poster_final_path_temp)
                     if cd_part:
-                        Flags.file_done_dic[result.number].update({"poster": poster_final_path})
+                        state.file_done_dic[result.number].update({"poster": poster_final_path})
                     other.poster_marked = False  # 下载的图，还没加水印
                     other.poster_path = poster_final_path
                     LogBuffer.log().write(f"\n 🍀 Poster done! ({poster_from})({get_used_time(start_time)}s)")
@@ -773,7 +780,7 @@ async def poster_download(
         # 裁剪成功，替换旧图
         await move_file_async(poster_final_path_temp, poster_final_path)
         if cd_part:
-            Flags.file_done_dic[result.number].update({"poster": poster_final_path})
+            state.file_done_dic[result.number].update({"poster": poster_final_path})
         other.poster_path = poster_final_path
         other.poster_marked = False
         return True
@@ -801,6 +808,8 @@ async def fanart_download(
     other: OtherInfo,
     cd_part: str,
     fanart_final_path: Path,
+    plan: ScrapePlan,
+    state: ScrapeState,
 ) -> bool:
     """
     复制thumb为fanart
@@ -808,8 +817,8 @@ async def fanart_download(
     start_time = time.time()
     thumb_path = other.thumb_path
     fanart_path = other.fanart_path
-    download_files = manager.config.download_files
-    keep_files = manager.config.keep_files
+    download_files = plan.download_files
+    keep_files = plan.keep_files
 
     # 不保留不下载时删除返回
     if DownloadableFile.FANART not in keep_files and DownloadableFile.FANART not in download_files:
@@ -828,7 +837,7 @@ async def fanart_download(
 
     # 尝试复制其他分集。看分集有没有下载，如果下载完成则可以复制，否则就自行下载
     if cd_part:
-        done_fanart_path = Flags.file_done_dic.get(number, {}).get("fanart")
+        done_fanart_path = state.file_done_dic.get(number, {}).get("fanart")
         if (
             done_fanart_path
             and await aiofiles.os.path.exists(done_fanart_path)
@@ -836,7 +845,7 @@ async def fanart_download(
         ):
             if fanart_path:
                 await delete_file_async(fanart_path)
-            await copy_file_async(done_fanart_path, fanart_final_path)
+            await link_or_copy_async(done_fanart_path, fanart_final_path, manager.config.image_cache == "link")
             other.fanart_path = fanart_final_path
             LogBuffer.log().write(f"\n 🍀 Fanart done! (copy cd-fanart)({get_used_time(start_time)}s)")
             return True
@@ -845,12 +854,12 @@ async def fanart_download(
     if thumb_path:
         if fanart_path:
             await delete_file_async(fanart_path)
-        await copy_file_async(thumb_path, fanart_final_path)
+        await link_or_copy_async(thumb_path, fanart_final_path, manager.config.image_cache == "link")
         other.fanart_path = fanart_final_path
         other.fanart_marked = other.thumb_marked
         LogBuffer.log().write(f"\n 🍀 Fanart done! (copy thumb)({get_used_time(start_time)}s)")
         if cd_part:
-            Flags.file_done_dic[number].update({"fanart": fanart_final_path})
+            state.file_done_dic[number].update({"fanart": fanart_final_path})
         return True
     else:
         # 本地有 fanart 时，不下载
@@ -874,10 +883,12 @@ async def fanart_download(
                 return False
 
 
-async def extrafanart_download(extrafanart: list[str], extrafanart_from: str, folder_new_path: Path) -> bool | None:
+async def extrafanart_download(
+    extrafanart: list[str], extrafanart_from: str, folder_new_path: Path, plan: ScrapePlan
+) -> bool | None:
     start_time = time.time()
-    download_files = manager.config.download_files
-    keep_files = manager.config.keep_files
+    download_files = plan.download_files
+    keep_files = plan.keep_files
     extrafanart_list = extrafanart
     extrafanart_folder_path = folder_new_path / "extrafanart"
 
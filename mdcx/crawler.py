@@ -1,7 +1,7 @@
 import asyncio
 from typing import TYPE_CHECKING, Never, Protocol
 
-from .browser import BrowserProvider
+from .browser import BrowserOptions, BrowserProvider
 from .config.enums import Website
 from .crawlers import get_crawler_compat
 
@@ -39,6 +39,7 @@ class CrawlerProvider:
                     client=self.client,
                     base_url=self.config.get_site_url(site),
                     browser=self.browser,
+                    browser_options=BrowserOptions.from_config(self.config, site),
                 )
         return self.instances[site]
 
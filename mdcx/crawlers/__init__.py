@@ -1,96 +1,81 @@
-from collections.abc import Callable
+import importlib
+import threading
 
 from ..config.models import Website
-from . import (
-    airav,
-    airav_cc,
-    avsex,
-    avsox,
-    cableav,
-    cnmdb,
-    dahlia,
-    faleno,
-    fantastica,
-    fc2,
-    fc2club,
-    fc2hub,
-    fc2ppvdb,
-    freejavbt,
-    getchu,
-    getchu_dmm,
-    giga,
-    hdouban,
-    hscangku,
-    iqqtv_new,
-    jav321,
-    javbus,
-    javday,
-    javlibrary_new,
-    kin8,
-    love6,
-    lulubar,
-    madouqu,
-    mdtv,
-    mgstage,
-    mmtv,
-    mywife,
-    official,
-    prestige,
-    theporndb,
-    xcity,
-)
-from .base import get_crawler, register_crawler
-from .base.compat import get_v1_crawler, register_v1_crawler
-from .dmm_new import DmmCrawler
-from .javdb_new import JavdbCrawler
 
-CRAWLER_FUNCS: list[tuple[Website, Callable]] = [
-    (Website.MMTV, mmtv.main),
-    (Website.AIRAV_CC, airav_cc.main),  # lang
-    (Website.AIRAV, airav.main),  # lang
-    (Website.AVSEX, avsex.main),
-    (Website.AVSOX, avsox.main),
-    (Website.CABLEAV, cableav.main),
-    (Website.CNMDB, cnmdb.main),
-    (Website.DAHLIA, dahlia.main),
-    (Website.FALENO, faleno.main),
-    (Website.FANTASTICA, fantastica.main),
-    (Website.FC2, fc2.main),
-    (Website.FC2CLUB, fc2club.main),
-    (Website.FC2HUB, fc2hub.main),
-    (Website.FC2PPVDB, fc2ppvdb.main),
-    (Website.FREEJAVBT, freejavbt.main),
-    (Website.GETCHU_DMM, getchu_dmm.main),
-    (Website.GETCHU, getchu.main),
-    (Website.GIGA, giga.main),
-    (Website.HDOUBAN, hdouban.main),
-    (Website.HSCANGKU, hscangku.main),
-    (Website.IQQTV, iqqtv_new.main),  # lang
-    (Website.JAV321, jav321.main),
-    (Website.JAVBUS, javbus.main),
-    (Website.JAVDAY, javday.main),
-    (Website.JAVLIBRARY, javlibrary_new.main),  # lang
-    (Website.KIN8, kin8.main),
-    (Website.LOVE6, love6.main),
-    (Website.LULUBAR, lulubar.main),
-    (Website.MADOUQU, madouqu.main),
-    (Website.MDTV, mdtv.main),
-    (Website.MGSTAGE, mgstage.main),
-    (Website.MYWIFE, mywife.main),
-    (Website.OFFICIAL, official.main),
-    (Website.PRESTIGE, prestige.main),
-    (Website.THEPORNDB, theporndb.main),
-    (Website.XCITY, xcity.main),
-]
+# 爬虫模块在首次使用时导入, 以加快启动速度
+CRAWLER_MODULES: dict[Website, tuple[str, str]] = {
+    Website.DMM: ("dmm_new", "DmmCrawler"),
+    Website.JAVDB: ("javdb_new", "JavdbCrawler"),
+}
+"""新版爬虫所在模块及爬虫类名"""
+V1_CRAWLER_MODULES: dict[Website, str] = {
+    Website.MMTV: "mmtv",
+    Website.AIRAV_CC: "airav_cc",  # lang
+    Website.AIRAV: "airav",  # lang
+    Website.AVSEX: "avsex",
+    Website.AVSOX: "avsox",
+    Website.CABLEAV: "cableav",
+    Website.CNMDB: "cnmdb",
+    Website.DAHLIA: "dahlia",
+    Website.FALENO: "faleno",
+    Website.FANTASTICA: "fantastica",
+    Website.FC2: "fc2",
+    Website.FC2CLUB: "fc2club",
+    Website.FC2HUB: "fc2hub",
+    Website.FC2PPVDB: "fc2ppvdb",
+    Website.FREEJAVBT: "freejavbt",
+    Website.GETCHU_DMM: "getchu_dmm",
+    Website.GETCHU: "getchu",
+    Website.GIGA: "giga",
+    Website.HDOUBAN: "hdouban",
+    Website.HSCANGKU: "hscangku",
+    Website.IQQTV: "iqqtv_new",  # lang
+    Website.JAV321: "jav321",
+    Website.JAVBUS: "javbus",
+    Website.JAVDAY: "javday",
+    Website.JAVLIBRARY: "javlibrary_new",  # lang
+    Website.KIN8: "kin8",
+    Website.LOVE6: "love6",
+    Website.LULUBAR: "lulubar",
+    Website.MADOUQU: "madouqu",
+    Website.MDTV: "mdtv",
+    Website.MGSTAGE: "mgstage",
+    Website.MYWIFE: "mywife",
+    Website.OFFICIAL: "official",
+    Website.PRESTIGE: "prestige",
+    Website.THEPORNDB: "theporndb",
+    Website.XCITY: "xcity",
+}
+"""旧版爬虫所在模块, 入口为模块中的 `main` 函数"""
 
+_loaded: set[Website] = set()
+_load_lock = threading.Lock()
 
-register_crawler(DmmCrawler)
-register_crawler(JavdbCrawler)
-for site, func in CRAWLER_FUNCS:
-    register_v1_crawler(site, func)
+
+def load_crawler(site: Website) -> None:
+    """导入并注册指定网站的爬虫模块. 重复调用不会重复导入."""
+    if site in _loaded:
+        return
+    with _load_lock:
+        if site in _loaded:
+            return
+        from .base import register_crawler
+        from .base.compat import register_v1_crawler
+
+        if site in CRAWLER_MODULES:
+            module, cls = CRAWLER_MODULES[site]
+            register_crawler(getattr(importlib.import_module(f".{module}", __name__), cls))
+        elif module := V1_CRAWLER_MODULES.get(site):
+            register_v1_crawler(site, importlib.import_module(f".{module}", __name__).main)
+        _loaded.add(site)
 
 
 def get_crawler_compat(site: Website):
+    from .base import get_crawler
+    from .base.compat import get_v1_crawler
+
+    load_crawler(site)
     c = get_crawler(site)
     if c is not None:
         return c
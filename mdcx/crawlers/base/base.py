@@ -1,20 +1,25 @@
+import asyncio
 import time
 import traceback
 from abc import ABC, abstractmethod
 from asyncio import Lock
 from collections.abc import Sequence
-from typing import TYPE_CHECKING, Any, Literal, Never
+from typing import TYPE_CHECKING, Any, Never
 
+import httpx
 from parsel import Selector
-from patchright._impl._api_structures import SetCookieParam
-from patchright.async_api import Browser, BrowserContext
 
+from mdcx.browser import BrowserOptions, PagePool, block_resources
 from mdcx.config.models import Website
 from mdcx.models.types import CrawlerInput, CrawlerResponse, CrawlerResult
+from mdcx.web_async import CHALLENGE_ERROR
 
 from .types import Context, CralwerException, CrawlerData
 
 if TYPE_CHECKING:
+    from patchright._impl._api_structures import SetCookieParam
+    from patchright.async_api import Browser, BrowserContext
+
     from mdcx.web_async import AsyncWebClient
 
 
@@ -30,7 +35,16 @@ class GenericBaseCrawler[T: Context = Context](ABC):
     由于爬取逻辑因网站而异, 在最极端情况下可以重写 `_run` 方法以完全自定义爬取流程.
     """
 
-    def __init__(self, client: "AsyncWebClient", base_url: str = "", browser: Browser | None = None):
+    browser_wait: str = "domcontentloaded"
+    """浏览器请求的默认等待条件, 可被网站设置覆盖. 参见 `BrowserOptions.wait`."""
+
+    def __init__(
+        self,
+        client: "AsyncWebClient",
+        base_url: str = "",
+        browser: "Browser | None" = None,
+        browser_options: BrowserOptions | None = None,
+    ):
         """
         初始化爬虫实例.
 
@@ -38,6 +52,7 @@ class GenericBaseCrawler[T: Context = Context](ABC):
             client (AsyncWebClient): 异步 HTTP 客户端, 用于发送请求.
             base_url (str, optional): 基础 URL, 用于支持自定义 URL. 不提供则使用默认值.
             browser (_type_, optional): 浏览器实例, 如果提供则某些请求可以改用浏览器进行处理.
+            browser_options (BrowserOptions, optional): 页面池大小、资源拦截及等待条件等浏览器请求设置.
         """
         self.async_client = client
         self.base_url: str = base_url or self.base_url_()
@@ -45,11 +60,17 @@ class GenericBaseCrawler[T: Context = Context](ABC):
         self.browser = browser
         """此实例会被多个 Crawler 复用, 其生命周期由调用方负责管理. 但创建的 Context 由每个 Crawler 独立管理."""
         self._browser_context: BrowserContext | None = None
+        self.browser_options = browser_options or BrowserOptions()
+        self._page_pool: PagePool | None = None
 
     async def close(self):
         """释放资源, 如关闭浏览器上下文等."""
+        if self._page_pool is not None:
+            await self._page_pool.close()
+            self._page_pool = None
         if self._browser_context is not None:
             await self._browser_context.close()
+            self._browser_context = None
 
     @classmethod
     @abstractmethod
@@ -203,26 +224,47 @@ class GenericBaseCrawler[T: Context = Context](ABC):
                 return content, error
             if use_browser is True:
                 return None, f"强制使用浏览器请求但失败: {error=}"
-        return await self.async_client.get_text(url, headers=self._get_headers(ctx), cookies=self._get_cookies(ctx))
+        html, error = await self.async_client.get_text(
+            url, headers=self._get_headers(ctx), cookies=self._get_cookies(ctx)
+        )
+        # 仅在 HTTP 请求遇到人机验证时使用浏览器, 通过验证后的 cookies 会保存供后续 HTTP 请求使用
+        if html is None and CHALLENGE_ERROR in error and self.browser is not None:
+            ctx.debug(f"HTTP 请求遇到人机验证, 改用浏览器: {url}")
+            content, browser_error = await self._browser_fetch(ctx, url)
+            if content is not None:
+                return content, ""
+            error = f"{error}; {browser_error}"
+        return html, error
 
-    async def _browser_fetch(
-        self,
-        ctx: T,
-        url: str,
-        wait_until: Literal["commit", "domcontentloaded", "load", "networkidle"] | None = "load",
-    ) -> tuple[str | None, str]:
+    async def _browser_fetch(self, ctx: T, url: str, wait: str = "") -> tuple[str | None, str]:
+        """
+        通过页面池请求 URL.
+
+        Args:
+            wait: 等待条件, 为空时依次使用网站设置和 `browser_wait`.
+        """
         if not await self._init_browser_context(ctx, self._get_cookies_browser(ctx)):
             return None, "浏览器初始化失败"
-        assert self._browser_context is not None
+        assert self._page_pool is not None
         try:
-            async with await self._browser_context.new_page() as page:
-                await page.goto(url, wait_until=wait_until)
-                content = await page.content()
-                return content, ""
+            content = await self._page_pool.fetch(url, wait or self.browser_options.wait or self.browser_wait)
         except Exception as e:
             return None, f"浏览器请求失败: {e}"
+        await self._save_browser_session(ctx)
+        return content, ""
+
+    async def _save_browser_session(self, ctx: T) -> None:
+        """将浏览器上下文的 cookies 保存到会话存储, 供 HTTP 请求和之后的刮削任务使用."""
+        store = self.async_client.session_store
+        if store is None or self._browser_context is None or self._page_pool is None:
+            return
+        try:
+            cookies = await self._browser_context.cookies()
+            await asyncio.to_thread(store.save_browser_cookies, cookies, self._page_pool.user_agent)  # type: ignore[arg-type]
+        except Exception as e:
+            ctx.debug(f"保存浏览器会话失败: {e}")
 
-    async def _init_browser_context(self, ctx: T, cookies: Sequence[SetCookieParam] | None = None) -> bool:
+    async def _init_browser_context(self, ctx: T, cookies: "Sequence[SetCookieParam] | None" = None) -> bool:
         if self.browser is None:
             return False
         if self._browser_context is not None:
@@ -232,8 +274,14 @@ class GenericBaseCrawler[T: Context = Context](ABC):
                 return True
             try:
                 context = await self.browser.new_context(ignore_https_errors=True)
+                # 恢复之前保存的会话, 避免重复验证
+                if (store := self.async_client.session_store) is not None and (host := httpx.URL(self.base_url).host):
+                    cookies = [*(cookies or []), *store.browser_cookies(host)]  # type: ignore[list-item]
                 if cookies:
                     await context.add_cookies(cookies)
+                if self.browser_options.block_resources:
+                    await block_resources(context)
+                self._page_pool = PagePool(context, self.browser_options.pages, self.browser_options.max_uses)
                 self._browser_context = context
             except Exception as e:
                 ctx.debug(f"创建浏览器上下文失败: {e}")
@@ -243,7 +291,7 @@ class GenericBaseCrawler[T: Context = Context](ABC):
     def _get_cookies(self, ctx: T) -> dict[str, str] | None:
         return None
 
-    def _get_cookies_browser(self, ctx: T) -> Sequence[SetCookieParam] | None:
+    def _get_cookies_browser(self, ctx: T) -> "Sequence[SetCookieParam] | None":
         return None
 
     def _get_headers(self, ctx: T) -> dict[str, str] | None:
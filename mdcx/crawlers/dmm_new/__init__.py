@@ -8,6 +8,7 @@ from patchright._impl._api_structures import SetCookieParam
 from patchright.async_api import Browser
 
 from mdcx.base.web import check_url
+from mdcx.browser import BrowserOptions
 from mdcx.config.models import Website
 from mdcx.models.types import CrawlerInput
 from mdcx.utils.dataclass import update_valid
@@ -28,9 +29,16 @@ class DmmCrawler(GenericBaseCrawler[DMMContext]):
     mono = MonoParser()
     digital = DigitalParser()
     rental = RentalParser()
-
-    def __init__(self, client: AsyncWebClient, base_url: str = "", browser: Browser | None = None):
-        super().__init__(client, base_url, browser)
+    browser_wait = "load"  # digital 详情页由脚本渲染
+
+    def __init__(
+        self,
+        client: AsyncWebClient,
+        base_url: str = "",
+        browser: Browser | None = None,
+        browser_options: BrowserOptions | None = None,
+    ):
+        super().__init__(client, base_url, browser, browser_options)
 
     @classmethod
     @override
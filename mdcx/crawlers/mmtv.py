@@ -7,7 +7,7 @@ from lxml import etree
 from ..config.enums import Website
 from ..config.manager import manager
 from ..models.log_buffer import LogBuffer
-from ..number import is_uncensored
+from ..number import get_number_info
 from .guochan import get_extra_info
 
 
@@ -153,7 +153,8 @@ def get_mosaic(html, number):
     except Exception:
         pass
     if not mosaic:
-        mosaic = "无码" if number.upper().startswith("FC2") or is_uncensored(number) else "有码"
+        number_info = get_number_info(number)
+        mosaic = "无码" if number_info.family == "fc2" or number_info.uncensored else "有码"
     return mosaic
 
 
@@ -7,7 +7,7 @@ from lxml import etree
 from ..config.manager import manager
 from ..crawlers import prestige
 from ..models.log_buffer import LogBuffer
-from ..number import get_number_letters
+from ..number import get_number_info
 
 
 def get_title(html):
@@ -115,7 +115,7 @@ async def main(
     website_name = "offical_failed"
 
     try:  # 捕获主动抛出的异常
-        official_url = manager.computed.official_websites.get(get_number_letters(number))
+        official_url = manager.computed.official_websites.get(get_number_info(number).letters)
         if not official_url:
             raise Exception("不在官网番号前缀列表中")
         elif official_url == "https://www.prestige-av.com":
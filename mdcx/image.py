@@ -3,7 +3,7 @@ import traceback
 from pathlib import Path
 
 import aiofiles.os
-from PIL import Image, ImageFilter
+from PIL import Image, ImageFile, ImageFilter
 from PyQt5.QtGui import QImageReader, QPixmap
 
 from .signals import signal
@@ -48,13 +48,17 @@ async def get_pixmap(pic_path: Path, poster=True, pic_from=""):
 
 
 def cut_pic(pic_path: Path):
-    # 打开图片, 获取图片尺寸
-    img = None
-    img_new = None
-    img_new_png = None
     try:
-        img = Image.open(pic_path)  # 返回一个Image对象
+        _cut_pic(pic_path)
+    except Exception:
+        signal.show_traceback_log(traceback.format_exc())
+        signal.show_log_text(traceback.format_exc())
+
 
+def _cut_pic(pic_path: Path):
+    """将图片裁剪为 2:3, 出错时抛出异常"""
+    # 打开图片, 获取图片尺寸
+    with Image.open(pic_path) as img:  # 返回一个Image对象
         w, h = img.size
         prop = h / w
 
@@ -70,23 +74,11 @@ def cut_pic(pic_path: Path):
             bx = int(w)
             by = int(h - ay)
         else:
-            img.close()
             return
 
         # 裁剪并保存
-        img_new = img.convert("RGB")
-        img_new_png = img_new.crop((ax, ay, bx, by))
-        img_new_png.save(pic_path, quality=95, subsampling=0)
-    except Exception:
-        signal.show_traceback_log(traceback.format_exc())
-        signal.show_log_text(traceback.format_exc())
-    finally:
-        if img_new_png:
-            img_new_png.close()
-        if img_new:
-            img_new.close()
-        if img:
-            img.close()
+        with img.convert("RGB") as img_new, img_new.crop((ax, ay, bx, by)) as img_new_png:
+            img_new_png.save(pic_path, quality=95, subsampling=0)
 
 
 async def fix_pic_async(pic_path: Path, new_path: Path):
@@ -94,6 +86,15 @@ async def fix_pic_async(pic_path: Path, new_path: Path):
 
 
 def fix_pic(pic_path: Path, new_path: Path):
+    try:
+        _fix_pic(pic_path, new_path)
+    except Exception:
+        signal.show_log_text(f"{traceback.format_exc()}\n Pic: {pic_path}")
+        signal.show_traceback_log(traceback.format_exc())
+
+
+def _fix_pic(pic_path: Path, new_path: Path):
+    """生成演员背景图, 出错时抛出异常"""
     pic = None
     fixed_pic = None
     try:
@@ -118,11 +119,26 @@ def fix_pic(pic_path: Path, new_path: Path):
         fixed_pic.paste(pic, (foreground_x, foreground_y))  # 粘贴原图
         fixed_pic = fixed_pic.convert("RGB")
         fixed_pic.save(new_path, quality=95, subsampling=0)
-    except Exception:
-        signal.show_log_text(f"{traceback.format_exc()}\n Pic: {pic_path}")
-        signal.show_traceback_log(traceback.format_exc())
     finally:
         if pic is not None:
             pic.close()
         if fixed_pic is not None:
             fixed_pic.close()
+
+
+def prepare_actor_photo(pic_path: Path, backdrop_path: Path | None = None, crop: bool = True) -> str:
+    """
+    根据头像生成演员背景图 (若指定 backdrop_path), 并将头像裁剪为 2:3 (若 crop). 不依赖界面, 可在子进程中执行.
+
+    Returns:
+        出错时返回错误信息, 否则返回空字符串
+    """
+    ImageFile.LOAD_TRUNCATED_IMAGES = True
+    try:
+        if backdrop_path is not None:
+            _fix_pic(pic_path, backdrop_path)
+        if crop:
+            _cut_pic(pic_path)
+    except Exception:
+        return f"{traceback.format_exc()}\n Pic: {pic_path}"
+    return ""
@@ -1,11 +1,14 @@
 import asyncio
 import re
 from collections.abc import Callable
+from typing import TYPE_CHECKING
 
 from aiolimiter import AsyncLimiter
 from httpx import AsyncClient, Timeout
-from openai import AsyncOpenAI
-from openai.types.chat import ChatCompletionMessageParam
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+    from openai.types.chat import ChatCompletionMessageParam
 
 
 class LLMClient:
@@ -18,14 +21,32 @@ class LLMClient:
         timeout: Timeout,
         rate: tuple[float, float],
     ):
-        self.client = AsyncOpenAI(
-            api_key=api_key,
-            base_url=base_url,
-            http_client=AsyncClient(proxy=proxy, verify=False, timeout=timeout, follow_redirects=True),
-            timeout=timeout,
-        )
+        self._api_key = api_key
+        self._base_url = base_url
+        self._proxy = proxy
+        self._timeout = timeout
+        self._client: AsyncOpenAI | None = None
         self.limiter = AsyncLimiter(*rate)
 
+    @property
+    def client(self) -> "AsyncOpenAI":
+        # openai 导入耗时较长, 首次使用时再导入
+        if self._client is None:
+            from openai import AsyncOpenAI
+
+            self._client = AsyncOpenAI(
+                api_key=self._api_key,
+                base_url=self._base_url,
+                http_client=AsyncClient(proxy=self._proxy, verify=False, timeout=self._timeout, follow_redirects=True),
+                timeout=self._timeout,
+            )
+        return self._client
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+
     async def ask(
         self,
         *,
@@ -19,7 +19,23 @@ class FileDoneDict(TypedDict):
 
 
 @dataclass
-class _Flags:
+class ScrapeState:
+    """一次刮削中各文件共享的处理标识. 批量刮削使用全局的 Flags, 单文件任务每个文件使用独立的实例."""
+
+    # 所有文件最终输出路径的字典（如已存在，则视为重复文件，直接跳过）
+    file_new_path_dic: dict[Path, list[Path]] = field(default_factory=dict)
+    # 当前文件的图片最终输出路径的字典（如已存在，则最终图片文件视为已处理过）
+    pic_catch_set: set[Path] = field(default_factory=set)
+    # 当前番号的图片已下载完成的标识（如已存在，视为图片已下载完成）
+    file_done_dic: dict[str, FileDoneDict] = field(default_factory=dict)
+    # 当前文件夹剧照已处理的标识（如已存在，视为剧照已处理过）
+    extrafanart_deal_set: set[Path] = field(default_factory=set)
+    # 当前文件trailer已处理的标识（如已存在，视为剧照已处理过）
+    trailer_deal_set: set[Path] = field(default_factory=set)
+
+
+@dataclass
+class _Flags(ScrapeState):
     # 指定刮削 #todo 改为传参
     appoint_url: str = ""
     website_name: str = ""
@@ -33,7 +49,7 @@ class _Flags:
     next_start_time: float = 0.0
     count_claw: int = 0  # 批量刮削次数
     can_save_remain: bool = False  # 保存剩余任务
-    remain_list: list[Path] = field(default_factory=list)
+    remain_list: dict[Path, None] = field(default_factory=dict)  # 有序集合, 刮削完成的文件随时移除
     new_again_dic: dict[Path, tuple[str, str, str]] = field(default_factory=dict)
     again_dic: dict[Path, tuple[str, str, str]] = field(default_factory=dict)  # 待重新刮削的字典
     start_time: float = 0.0
@@ -48,16 +64,6 @@ class _Flags:
     scrape_done: int = 0  # 已完成刮削数量
     succ_count: int = 0  # 成功数量
     fail_count: int = 0  # 失败数量
-    # 所有文件最终输出路径的字典（如已存在，则视为重复文件，直接跳过）
-    file_new_path_dic: dict[Path, list[Path]] = field(default_factory=dict)
-    # 当前文件的图片最终输出路径的字典（如已存在，则最终图片文件视为已处理过）
-    pic_catch_set: set[Path] = field(default_factory=set)
-    # 当前番号的图片已下载完成的标识（如已存在，视为图片已下载完成）
-    file_done_dic: dict[str, FileDoneDict] = field(default_factory=dict)
-    # 当前文件夹剧照已处理的标识（如已存在，视为剧照已处理过）
-    extrafanart_deal_set: set[Path] = field(default_factory=set)
-    # 当前文件trailer已处理的标识（如已存在，视为剧照已处理过）
-    trailer_deal_set: set[Path] = field(default_factory=set)
     # 当前文件夹剧照已下载的标识（如已存在，视为剧照已处理过）
     theme_videos_deal_set: set[Path] = field(default_factory=set)
     # 当前文件nfo已处理的标识（如已存在，视为剧照已处理过）
@@ -80,11 +86,6 @@ class _Flags:
 
     single_file_path: Path = field(default_factory=Path)  # 工具-单文件刮削的文件路径
 
-    # for missing
-    actor_numbers_dic: dict[str, list[str]] = field(default_factory=dict)  # 每个演员所有番号的字典
-    local_number_set: set[str] = field(default_factory=set)  # 本地所有番号的集合
-    local_number_cnword_set: set[str] = field(default_factory=set)  # 本地所有有字幕的番号的集合
-
     def reset(self) -> None:
         self.failed_list = []
         self.counting_order = 0
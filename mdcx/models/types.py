@@ -454,6 +454,17 @@ class OtherInfo:
         )
 
 
+@dataclass
+class ScrapeProgress:
+    """单次刮削的进度, 刮削任务据此显示进度和预计剩余时间"""
+
+    total: int = 0
+    done: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    current: str = ""  # 最近开始刮削的文件名
+
+
 @dataclass
 class ScrapeResult:
     file_info: FileInfo
@@ -1,17 +1,28 @@
 import contextlib
+import functools
 import os
 import re
 import unicodedata
+from collections.abc import Iterable
+from dataclasses import dataclass
 
 from .manual import ManualConfig
 
 
-def is_uncensored(number: str) -> bool:
-    if re.match(r"n\d{4}", number) or re.search(r"[^.]+\.\d{2}\.\d{2}\.\d{2}", number):
-        return True
+class _PrefixSet:
+    """前缀集合. 按集合中出现的前缀长度截取后查询 frozenset, 不区分大小写."""
+
+    def __init__(self, prefixes: Iterable[str]):
+        self.prefixes = frozenset(p.upper() for p in prefixes)
+        self.lengths = tuple(sorted({len(p) for p in self.prefixes}))
+
+    def match(self, s_upper: str) -> bool:
+        return any(s_upper[:n] in self.prefixes for n in self.lengths)
 
-    # 无码车牌BT,CT,EMP,CCDV,CWP,CWPBD,DSAM,DRC,DRG,GACHI,heydouga,JAV,LAF,LAFBD,HEYZO,KTG,KP,KG,LLDV,MCDV,MKD,MKBD,MMDV,NIP,PB,PT,QE,RED,RHJ,S2M,SKY,SKYHD,SMD,SSDV,SSKP,TRG,TS,xxx-av,YKB
-    key_start_word = [
+
+# 无码车牌BT,CT,EMP,CCDV,CWP,CWPBD,DSAM,DRC,DRG,GACHI,heydouga,JAV,LAF,LAFBD,HEYZO,KTG,KP,KG,LLDV,MCDV,MKD,MKBD,MMDV,NIP,PB,PT,QE,RED,RHJ,S2M,SKY,SKYHD,SMD,SSDV,SSKP,TRG,TS,xxx-av,YKB
+_UNCENSORED_PREFIXES = _PrefixSet(
+    [
         "BT-",
         "CT-",
         "EMP-",
@@ -54,43 +65,96 @@ def is_uncensored(number: str) -> bool:
         "bird",
         "bouga",
     ]
-    return any(number.upper().startswith(each.upper()) for each in key_start_word)
+)
+_SUREN_PREFIXES = _PrefixSet(ManualConfig.SUREN_DIC)
+
+_RE_TOKYO_HOT_NUMBER = re.compile(r"n\d{4}")
+_RE_OUMEI_NUMBER = re.compile(r"[^.]+\.\d{2}\.\d{2}\.\d{2}")
+_RE_SUREN_NUMBER = re.compile(r"\d{3,}[A-Z]+-\d{2}")
+_RE_SHORT_NUMBER = re.compile(r"\d{3,}([a-zA-Z]+-\d+)")
+_RE_OUMEI_LETTERS = re.compile(r"([A-Za-z0-9-.]{3,})[-_. ]\d{2}\.\d{2}\.\d{2}")
+_RE_MKY_LETTERS = re.compile(r"(MKY-[A-Z]+)-\d{3,}")
+_RE_CW3D2DBD_LETTERS = re.compile(r"(CW3D2D?BD)")
+_RE_MCB3D_LETTERS = re.compile(r"MCB3D[BD]*-\d{2,}")
+_RE_H4610_LETTERS = re.compile(r"(H4610|C0930|H0930)-[A-Z]+\d{4,}")
+_RE_LETTERS = re.compile(r"(\d*[A-Za-z]+)\d*")
+# 以固定前缀开头时直接作为车牌
+_FIXED_LETTERS = ("FC2", "MYWIFE", "KIN8", "S2M", "T28", "TH101", "XXX-AV")
+
+
+@dataclass(frozen=True, slots=True)
+class NumberInfo:
+    """番号分类信息, 由 get_number_info 生成."""
+
+    number: str
+    letters: str  # 车牌, 如 SSIS, 259LUXU, FC2; 无法识别时为 "未知车牌"
+    family: str  # oumei, fc2, uncensored, suren, censored
+    uncensored: bool
+    suren: bool
+    short_number: str  # 去除素人番号前缀数字后的番号, 如 259LUXU-1111 -> LUXU-1111; 非此格式时为空
+
+
+def _get_number_letters(number: str, number_upper: str) -> str:
+    if r := _RE_OUMEI_LETTERS.search(number):
+        return r[1]
+    for letters in _FIXED_LETTERS:
+        if number_upper.startswith(letters):
+            return letters
+    if r := _RE_MKY_LETTERS.search(number_upper):
+        return r[1]
+    if _RE_CW3D2DBD_LETTERS.search(number_upper):
+        return "CW3D2D"
+    if _RE_MCB3D_LETTERS.search(number_upper):
+        return "MCB3D"
+    if r := _RE_H4610_LETTERS.search(number_upper):
+        return r[1]
+    result = _RE_LETTERS.search(number)
+    return result[1] if result else "未知车牌"
+
+
+@functools.lru_cache(maxsize=4096)
+def get_number_info(number: str) -> NumberInfo:
+    """
+    获取番号的分类信息. 结果按番号缓存, 同一番号在刮削、翻译、写入 NFO 等环节多次查询时只计算一次.
+    """
+    number_upper = number.upper()
+    oumei = _RE_OUMEI_NUMBER.search(number) is not None
+    uncensored = oumei or _RE_TOKYO_HOT_NUMBER.match(number) is not None or _UNCENSORED_PREFIXES.match(number_upper)
+    suren = (
+        _RE_SUREN_NUMBER.search(number_upper) is not None
+        or "SIRO" in number_upper
+        or _SUREN_PREFIXES.match(number_upper)
+    )
+    if oumei:
+        family = "oumei"
+    elif number_upper.startswith("FC2"):
+        family = "fc2"
+    elif uncensored:
+        family = "uncensored"
+    elif suren:
+        family = "suren"
+    else:
+        family = "censored"
+    return NumberInfo(
+        number=number,
+        letters=_get_number_letters(number, number_upper),
+        family=family,
+        uncensored=uncensored,
+        suren=suren,
+        short_number=r[1] if (r := _RE_SHORT_NUMBER.search(number)) else "",
+    )
+
+
+def is_uncensored(number: str) -> bool:
+    return get_number_info(number).uncensored
 
 
 def is_suren(number: str) -> bool:
-    if re.search(r"\d{3,}[A-Z]+-\d{2}", number.upper()) or "SIRO" in number.upper():
-        return True
-    return any(number.upper().startswith(key) for key in ManualConfig.SUREN_DIC)
+    return get_number_info(number).suren
 
 
 def get_number_letters(number: str) -> str:
-    number_upper = number.upper()
-    if r := re.search(r"([A-Za-z0-9-.]{3,})[-_. ]\d{2}\.\d{2}\.\d{2}", number):
-        return r[1]
-    if number_upper.startswith("FC2"):
-        return "FC2"
-    if number_upper.startswith("MYWIFE"):
-        return "MYWIFE"
-    if number_upper.startswith("KIN8"):
-        return "KIN8"
-    if number_upper.startswith("S2M"):
-        return "S2M"
-    if number_upper.startswith("T28"):
-        return "T28"
-    if number_upper.startswith("TH101"):
-        return "TH101"
-    if number_upper.startswith("XXX-AV"):
-        return "XXX-AV"
-    if r := re.search(r"(MKY-[A-Z]+)-\d{3,}", number_upper):
-        return r[1]
-    if re.search(r"(CW3D2D?BD)", number_upper):
-        return "CW3D2D"
-    if re.search(r"MCB3D[BD]*-\d{2,}", number_upper):
-        return "MCB3D"
-    if re.findall(r"(H4610|C0930|H0930)-[A-Z]+\d{4,}", number_upper):
-        return re.findall(r"(H4610|C0930|H0930)-[A-Z]+\d{4,}", number_upper)[0]
-    result = re.search(r"(\d*[A-Za-z]+)\d*", number)
-    return result[1] if result else "未知车牌"
+    return get_number_info(number).letters
 
 
 def get_number_first_letter(number: str) -> str:
@@ -103,7 +167,48 @@ def long_name(short_name: str) -> str:
     return long_name.lower().replace("-", "").replace(".", "") if long_name else short_name.lower()
 
 
+# get_file_number 使用的正则, 模块加载时编译一次
+_RE_CD_PART = re.compile(r"[-_ .]CD\d{1,2}")
+_RE_TAIL_PART = re.compile(r"[-_ .][A-Z0-9]\.$")
+_RE_DATE_LONG = re.compile(r"\d{4}[-_.]\d{1,2}[-_.]\d{1,2}")
+_RE_DATE_SHORT = re.compile(r"[-\[]\d{2}[-_.]\d{2}[-_.]\d{2}]?")
+_RE_MYWIFE = re.compile(r"NO\.(\d*)")
+_RE_CW3D2DBD = re.compile(r"CW3D2D?BD-?\d{2,}")
+_RE_MMR = re.compile(r"MMR-?[A-Z]{2,}-?\d+[A-Z]*")
+_RE_MD = re.compile(r"([^A-Z]|^)(MD[A-Z-]*\d{4,}(-\d)?)")
+_RE_OUMEI_CHECK = re.compile(r"([A-Z0-9_]{2,})[-.]2?0?(\d{2}[-.]\d{2}[-.]\d{2})")
+_RE_OUMEI = re.compile(r"([A-Z0-9-]{2,})[-_.]2?0?(\d{2}[-.]\d{2}[-.]\d{2})")
+_RE_XXX_AV = re.compile(r"XXX-AV-\d{4,}")
+_RE_MKY = re.compile(r"MKY-[A-Z]+-\d{3,}")
+_RE_FC2 = re.compile(r"FC2-\d{5,}")
+_RE_FC2_NO_DASH = re.compile(r"FC2\d{5,}")
+_RE_HEYZO = re.compile(r"HEYZO-\d{3,}")
+_RE_HEYZO_NO_DASH = re.compile(r"HEYZO\d{3,}")
+_RE_H4610 = re.compile(r"(H4610|C0930|H0930)-[A-Z]+\d{4,}")
+_RE_KIN8 = re.compile(r"KIN8(TENGOKU)?-?\d{3,}")
+_RE_S2M = re.compile(r"S2M[BD]*-\d{3,}")
+_RE_MCB3D = re.compile(r"MCB3D[BD]*-\d{2,}")
+_RE_T28 = re.compile(r"T28-?\d{3,}")
+_RE_TH101 = re.compile(r"TH101-\d{3,}-\d{5,}")
+_RE_ZERO_PADDED = re.compile(r"([A-Z]{2,})00(\d{3})")
+_RE_SUREN = re.compile(r"\d{2,}[A-Z]{2,}-\d{2,}[A-Z]?")
+_RE_COMMON = re.compile(r"[A-Z]{2,}-\d{2,}[Z]?")
+_RE_LETTER_DASH_LETTER = re.compile(r"[A-Z]+-[A-Z]\d+")
+_RE_DIGITS_DIGITS = re.compile(r"\d{2,}[-_]\d{2,}")
+_RE_DIGITS_LETTERS = re.compile(r"\d{3,}-[A-Z]{3,}")
+_RE_N_NUMBER = re.compile(r"([^A-Z]|^)(N\d{4})(\D|$)")
+_RE_H_UNDERSCORE = re.compile(r"H_\d{3,}([A-Z]{2,})(\d{2,})")
+_RE_LOOSE_3_2 = re.compile(r"([A-Z]{3,}).*?(\d{2,})")
+_RE_LOOSE_2_3 = re.compile(r"([A-Z]{2,}).*?(\d{3,})")
+_RE_BRACKETS = re.compile(r"[【(（\[].+?[]）)】]")
+
+
 def get_file_number(filepath: str, escape_string_list: list[str]) -> str:
+    """
+    从文件路径中提取番号.
+
+    各规则按顺序匹配, 命中即返回. 正则均已预编译, 并在匹配前检查规则必需的关键字, 不含关键字时跳过该规则的正则匹配.
+    """
     real_name = os.path.splitext(os.path.split(filepath)[1])[0].strip() + "."
 
     # 去除多余字符
@@ -119,96 +224,93 @@ def get_file_number(filepath: str, escape_string_list: list[str]) -> str:
     )
 
     # 去除分集
-    filename = re.sub(r"[-_ .]CD\d{1,2}", "", filename)  # xxx-CD1.mp4
-    filename = re.sub(r"[-_ .][A-Z0-9]\.$", "", filename)  # xxx_1.mp4, xxx.1.mp4, xxx.A.mp4, xxx A.mp4
+    if "CD" in filename:
+        filename = _RE_CD_PART.sub("", filename)  # xxx-CD1.mp4
+    filename = _RE_TAIL_PART.sub("", filename)  # xxx_1.mp4, xxx.1.mp4, xxx.A.mp4, xxx A.mp4
     filename = filename.replace(" ", "-").strip("-_. ")
     oumei_filename = filename
 
     # 去除时间
-    filename = re.sub(r"\d{4}[-_.]\d{1,2}[-_.]\d{1,2}", "", filename)  # 去除文件名中时间
-    filename = re.sub(r"[-\[]\d{2}[-_.]\d{2}[-_.]\d{2}]?", "", filename)  # 去除文件名中时间
+    filename = _RE_DATE_LONG.sub("", filename)  # 去除文件名中时间
+    filename = _RE_DATE_SHORT.sub("", filename)  # 去除文件名中时间
 
     # 转换番号
     filename = (
         filename.replace("FC2-PPV", "FC2-").replace("FC2PPV", "FC2-").replace("--", "-").replace("GACHIPPV", "GACHI")
     )
+    has_dash = "-" in filename
 
     # 提取番号
-    if "MYWIFE" in filename and re.search(r"NO\.\d*", filename):  # 提取 mywife No.1111
-        temp_num = re.findall(r"NO\.(\d*)", filename)[0]
-        return f"Mywife No.{temp_num}"
+    if "MYWIFE" in filename and (r := _RE_MYWIFE.search(filename)):  # 提取 mywife No.1111
+        return f"Mywife No.{r[1]}"
 
-    elif r := re.search(r"CW3D2D?BD-?\d{2,}", filename):  # 提取番号 CW3D2DBD-11
+    elif "CW3D2" in filename and (r := _RE_CW3D2DBD.search(filename)):  # 提取番号 CW3D2DBD-11
         file_number = r.group()
         return file_number
 
-    elif r := re.search(r"MMR-?[A-Z]{2,}-?\d+[A-Z]*", filename):  # 提取番号 mmr-ak089sp
+    elif "MMR" in filename and (r := _RE_MMR.search(filename)):  # 提取番号 mmr-ak089sp
         file_number = r.group()
         return file_number.replace("MMR-", "MMR")
 
-    elif (
-        r := re.search(r"([^A-Z]|^)(MD[A-Z-]*\d{4,}(-\d)?)", file_name)
-    ) and "MDVR" not in file_name:  # 提取番号 md-0165-1
+    elif "MD" in file_name and (r := _RE_MD.search(file_name)) and "MDVR" not in file_name:  # 提取番号 md-0165-1
         file_number = r.group(2)
         return file_number
 
-    elif re.findall(
-        r"([A-Z0-9_]{2,})[-.]2?0?(\d{2}[-.]\d{2}[-.]\d{2})", oumei_filename
-    ):  # 提取欧美番号 sexart.11.11.11
-        result = re.findall(r"([A-Z0-9-]{2,})[-_.]2?0?(\d{2}[-.]\d{2}[-.]\d{2})", oumei_filename)
+    elif _RE_OUMEI_CHECK.search(oumei_filename):  # 提取欧美番号 sexart.11.11.11
+        result = _RE_OUMEI.findall(oumei_filename)
         return (long_name(result[0][0].strip("-")) + "." + result[0][1].replace("-", ".")).capitalize()
 
     elif (
-        (r := re.search(r"XXX-AV-\d{4,}", filename))  # MKY-A-11111
-        or (r := re.search(r"MKY-[A-Z]+-\d{3,}", filename))  # 提取xxx-av-11111
+        ("XXX-AV-" in filename and (r := _RE_XXX_AV.search(filename)))  # 提取xxx-av-11111
+        or ("MKY-" in filename and (r := _RE_MKY.search(filename)))  # MKY-A-11111
     ):
         file_number = r.group()
 
     elif "FC2" in filename:
         filename = filename.replace("PPV", "").replace("_", "-").replace("--", "-")
-        if r := re.search(r"FC2-\d{5,}", filename):  # 提取类似fc2-111111番号
+        if r := _RE_FC2.search(filename):  # 提取类似fc2-111111番号
             file_number = r.group()
-        elif r := re.search(r"FC2\d{5,}", filename):
+        elif r := _RE_FC2_NO_DASH.search(filename):
             file_number = r.group().replace("FC2", "FC2-")
         else:
             file_number = filename
 
     elif "HEYZO" in filename:
         filename = filename.replace("_", "-").replace("--", "-")
-        if r := re.search(r"HEYZO-\d{3,}", filename):  # HEYZO-1111番号
+        if r := _RE_HEYZO.search(filename):  # HEYZO-1111番号
             file_number = r.group()
-        elif r := re.search(r"HEYZO\d{3,}", filename):
+        elif r := _RE_HEYZO_NO_DASH.search(filename):
             file_number = r.group().replace("HEYZO", "HEYZO-")
         else:
             file_number = filename
 
-    elif r := re.search(
-        r"(H4610|C0930|H0930)-[A-Z]+\d{4,}", filename
+    elif ("0930" in filename or "H4610" in filename) and (
+        r := _RE_H4610.search(filename)
     ):  # 提取H4610-ki111111 c0930-ki221218 h0930-ori1665
         file_number = r.group()
 
-    elif r := re.search(r"KIN8(TENGOKU)?-?\d{3,}", filename):  # 提取S2MBD-002 或S2MBD-006
+    elif "KIN8" in filename and (r := _RE_KIN8.search(filename)):  # 提取kin8-1111 kin8tengoku-1111
         file_number = r.group().replace("TENGOKU", "-").replace("--", "-")
 
     elif (
-        (r := re.search(r"S2M[BD]*-\d{3,}", filename))  # MCB3DBD-33
-        or (r := re.search(r"MCB3D[BD]*-\d{2,}", filename))  # S2MBD-002
+        ("S2M" in filename and (r := _RE_S2M.search(filename)))  # S2MBD-002
+        or ("MCB3D" in filename and (r := _RE_MCB3D.search(filename)))  # MCB3DBD-33
     ):
         file_number = r.group()
 
-    elif r := re.search(r"T28-?\d{3,}", filename):  # 提取T28-223
+    elif "T28" in filename and (r := _RE_T28.search(filename)):  # 提取T28-223
         file_number = r.group().replace("T2800", "T28-")
 
-    elif r := re.search(r"TH101-\d{3,}-\d{5,}", filename):  # 提取th101-140-112594
+    elif "TH101-" in filename and (r := _RE_TH101.search(filename)):  # 提取th101-140-112594
         file_number = r.group().lower()
 
-    elif r := re.search(r"([A-Z]{2,})00(\d{3})", filename):  # 提取ssni00644为ssni-644
+    elif "00" in filename and (r := _RE_ZERO_PADDED.search(filename)):  # 提取ssni00644为ssni-644
         file_number = r[1] + "-" + r[2]
 
-    elif r := re.search(r"\d{2,}[A-Z]{2,}-\d{2,}[A-Z]?", filename):  # 提取类似259luxu-1456番号
+    elif has_dash and (r := _RE_SUREN.search(filename)):  # 提取类似259luxu-1456番号
         file_number = r.group()
 
-    elif r := re.search(r"[A-Z]{2,}-\d{2,}[Z]?", filename):  # 提取类似mkbd-120番号
+    elif has_dash and (r := _RE_COMMON.search(filename)):  # 提取类似mkbd-120番号
         file_number = r.group()
         for key, value in ManualConfig.SUREN_DIC.items():
             if key in file_number:
@@ -216,28 +318,27 @@ def get_file_number(filepath: str, escape_string_list: list[str]) -> str:
                 break
 
     elif (
-        (r := re.search(r"[A-Z]+-[A-Z]\d+", filename))  # mkbd-s120
-        or (r := re.search(r"\d{2,}[-_]\d{2,}", filename))  # 111111-000 111111_000
-        or (r := re.search(r"\d{3,}-[A-Z]{3,}", filename))  # 111111-MMMM
+        (has_dash and (r := _RE_LETTER_DASH_LETTER.search(filename)))  # mkbd-s120
+        or ((has_dash or "_" in filename) and (r := _RE_DIGITS_DIGITS.search(filename)))  # 111111-000 111111_000
+        or (has_dash and (r := _RE_DIGITS_LETTERS.search(filename)))  # 111111-MMMM
     ):
         file_number = r.group()
 
-    elif r := re.search(r"([^A-Z]|^)(N\d{4})(\D|$)", filename):  # 提取n1111
+    elif "N" in filename and (r := _RE_N_NUMBER.search(filename)):  # 提取n1111
         file_number = r.group(2).lower()
 
-    elif r := re.search(r"H_\d{3,}([A-Z]{2,})(\d{2,})", filename):  # 提取类似h_173mega05番号
+    elif "H_" in filename and (r := _RE_H_UNDERSCORE.search(filename)):  # 提取类似h_173mega05番号
         a, b = r.groups()
         file_number = a + "-" + b
 
     elif (
-        (r := re.findall(r"([A-Z]{3,}).*?(\d{2,})", filename))  # 3个及以上字母，2个及以上数字
-        or (r := re.findall(r"([A-Z]{2,}).*?(\d{3,})", filename))  # 2个及以上字母，3个及以上数字
+        (r := _RE_LOOSE_3_2.search(filename))  # 3个及以上字母，2个及以上数字
+        or (r := _RE_LOOSE_2_3.search(filename))  # 2个及以上字母，3个及以上数字
     ):
-        temp = r[0]
-        file_number = temp[0] + "-" + temp[1]
+        file_number = r[1] + "-" + r[2]
 
     else:
-        temp_name = re.sub(r"[【(（\[].+?[]）)】]", "", file_name).strip("@. ")  # 去除[]
+        temp_name = _RE_BRACKETS.sub("", file_name).strip("@. ")  # 去除[]
         temp_name = unicodedata.normalize("NFC", temp_name)  # Mac 把会拆成两个字符，即 NFD，而网页请求使用的是 NFC
         with contextlib.suppress(Exception):
             temp_name = temp_name.encode("cp932").decode("shift_jis")  # 转换为常见日文，比如～ 转换成 〜
@@ -248,13 +349,10 @@ def get_file_number(filepath: str, escape_string_list: list[str]) -> str:
     return file_number.strip("-_. ")
 
 
-# pure version of models.base.remove_escape_string
-def remove_escape_string1(filename: str, escape_string_list: list[str], replace_char: str = "") -> str:
-    filename = filename.upper()
-    for string in escape_string_list:
-        if string:
-            filename = filename.replace(string.upper(), replace_char)
-    short_strings = [
+# 需要去除的分辨率、编码等短字符串, 仅在前后均为分隔符时去除
+_SHORT_STRING_PATTERNS = [
+    (each, re.compile(rf"[-_ .\[]{each}[-_ .\]]"))
+    for each in (
         "4K",
         "4KS",
         "8K",
@@ -271,7 +369,21 @@ def remove_escape_string1(filename: str, escape_string_list: list[str], replace_
         "AAC",
         "XXX",
         "PRT",
-    ]
-    for each in short_strings:
-        filename = re.sub(rf"[-_ .\[]{each.upper()}[-_ .\]]", "-", filename)
+    )
+]
+
+
+@functools.lru_cache(maxsize=8)
+def _upper_escape_strings(escape_strings: tuple[str, ...]) -> tuple[str, ...]:
+    return tuple(s.upper() for s in escape_strings if s)
+
+
+# pure version of models.base.remove_escape_string
+def remove_escape_string1(filename: str, escape_string_list: list[str], replace_char: str = "") -> str:
+    filename = filename.upper()
+    for string in _upper_escape_strings(tuple(escape_string_list)):
+        filename = filename.replace(string, replace_char)
+    for each, pattern in _SHORT_STRING_PATTERNS:
+        if each in filename:
+            filename = pattern.sub("-", filename)
     return filename.replace("--", "-").strip("-_ .")
@@ -0,0 +1,140 @@
+"""
+色花标题数据存储. 将 resources/c_number/c_number.json 转换为 SQLite 数据库, 按番号查询时无需将整个 JSON 载入内存.
+
+数据库中记录了源 JSON 的 sha256, 源文件更新后可据此判断数据库是否需要重新生成.
+校验通过后在用户数据目录记录 JSON 和数据库的大小及修改时间, 二者均未变化时不再计算 sha256.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from pathlib import Path
+
+
+def file_hash(path: str | Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(1024 * 1024):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _stat_key(path: str | Path) -> str:
+    st = os.stat(path)
+    return f"{st.st_size}:{st.st_mtime_ns}"
+
+
+def _load_record(record_path: Path) -> dict:
+    try:
+        with open(record_path, encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+
+def _save_record(record_path: Path, json_path: Path, db_path: Path) -> None:
+    try:
+        record_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(record_path, "w", encoding="utf-8") as f:
+            json.dump({"json": _stat_key(json_path), "db": str(db_path), "db_stat": _stat_key(db_path)}, f)
+    except OSError:
+        pass
+
+
+def build_sehua_db(json_path: str | Path, db_path: str | Path) -> int:
+    """
+    根据 JSON 数据生成数据库. 先写入临时文件再替换, 生成过程中不影响正在读取的数据库.
+
+    Returns:
+        写入的条目数
+    """
+    with open(json_path, encoding="utf-8") as f:
+        data: dict[str, str] = json.load(f)
+    db_path = Path(db_path)
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = db_path.with_name(db_path.name + ".tmp")
+    tmp_path.unlink(missing_ok=True)
+    conn = sqlite3.connect(tmp_path)
+    try:
+        with conn:
+            # without rowid 表直接按主键组织为 B 树, 查询为 O(log n) 且不需要额外的索引
+            conn.execute("create table titles (number text primary key, title text not null) without rowid")
+            conn.execute("create table meta (key text primary key, value text not null)")
+            conn.executemany("insert or replace into titles values (?, ?)", sorted(data.items()))
+            conn.execute("insert into meta values ('source_hash', ?)", (file_hash(json_path),))
+        conn.execute("vacuum")
+    finally:
+        conn.close()
+    os.replace(tmp_path, db_path)
+    return len(data)
+
+
+def source_hash(db_path: str | Path) -> str | None:
+    """返回数据库记录的源 JSON sha256, 数据库不存在或无效时返回 None."""
+    if not Path(db_path).is_file():
+        return None
+    try:
+        conn = sqlite3.connect(f"{Path(db_path).as_uri()}?mode=ro", uri=True)
+        try:
+            row = conn.execute("select value from meta where key = 'source_hash'").fetchone()
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return None
+    return row[0] if row else None
+
+
+class SehuaTitleStore:
+    """
+    只读的色花标题数据, 提供与 dict 相同的 get 方法.
+
+    此类线程安全.
+    """
+
+    def __init__(self, db_path: str | Path):
+        self.db_path = Path(db_path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(f"{self.db_path.as_uri()}?mode=ro", uri=True, check_same_thread=False)
+
+    def get(self, number: str, default: str | None = None) -> str | None:
+        with self._lock:
+            row = self._conn.execute("select title from titles where number = ?", (number,)).fetchone()
+        return row[0] if row else default
+
+    def __contains__(self, number: object) -> bool:
+        return isinstance(number, str) and self.get(number) is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("select count(*) from titles").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def open_sehua_store(json_path: Path, prebuilt: Path, fallback: Path) -> SehuaTitleStore:
+    """
+    打开与 json_path 内容一致的数据库.
+
+    优先使用构建时生成的 prebuilt, 若不存在或已过期 (如源码运行时修改了 JSON), 则在 fallback 生成并使用.
+    上次校验后 JSON 和数据库的大小及修改时间均未变化时, 直接使用上次的数据库.
+    """
+    record_path = fallback.with_name(fallback.name + ".verified")
+    record = _load_record(record_path)
+    try:
+        if record.get("json") == _stat_key(json_path) and _stat_key(record["db"]) == record.get("db_stat"):
+            return SehuaTitleStore(record["db"])
+    except (OSError, KeyError, TypeError):
+        pass
+
+    expected = file_hash(json_path)
+    for path in (prebuilt, fallback):
+        if source_hash(path) == expected:
+            _save_record(record_path, json_path, path)
+            return SehuaTitleStore(path)
+    build_sehua_db(json_path, fallback)
+    _save_record(record_path, json_path, fallback)
+    return SehuaTitleStore(fallback)
@@ -1,9 +1,17 @@
+import asyncio
+import base64
+import bisect
+import json
 import os
+import threading
+from collections import OrderedDict
+from collections.abc import AsyncIterator
 from datetime import datetime
 from pathlib import Path
-from typing import Annotated, Literal
+from typing import Annotated, Literal, NamedTuple
 
 from fastapi import APIRouter, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 
 from ...config import SAFE_DIRS
@@ -11,6 +19,11 @@ from .utils import check_path_access
 
 router = APIRouter(prefix="/files", tags=["文件管理"])
 
+# 缓存最近浏览的目录列表, 翻页时无需重新遍历目录
+_LISTING_CACHE_SIZE = 8
+# 流式返回时每批获取元数据的条目数
+_STREAM_BATCH = 1000
+
 
 class FileItem(BaseModel):
     """Represents a file or directory item."""
@@ -28,16 +41,77 @@ class FileListResponse(BaseModel):
     items: list[FileItem] = Field(
         ..., description="指定路径下的文件和目录列表. 先目录后文件, 均按名称排序且不区分大小写."
     )
-    total: int = Field(..., description="路径下的文件和目录总数. 若大于 len(data) 说明 data 因文件过多被截断.")
+    total: int = Field(..., description="路径下的文件和目录总数. 若大于 len(items) 说明还有后续分页.")
+    next_cursor: str | None = Field(default=None, description="获取下一页时传入的 cursor, 没有更多内容时为 null.")
 
 
-@router.get("/list", operation_id="listFiles", summary="列出文件和目录")
-async def list_files(
-    path: Annotated[str, Query(description="服务器路径. 相对路径将基于 SAFE_DIRS 中的首个路径解析.")],
-) -> FileListResponse:
-    """
-    列出指定路径下的文件和目录. 仅允许访问 `SAFE_DIRS` 目录下的内容, `SAFE_DIRS` 可通过服务器环境变量 `MDCX_SAFE_DIRS` 设置. 指向 `SAFE_DIRS` 外目录的软链接本身可见, 但无法访问其内容.
-    """
+class _SortKey(NamedTuple):
+    """排序键, 先目录后文件, 按名称排序且不区分大小写. 遍历时仅需 d_type, 不需要 stat."""
+
+    is_file: bool
+    lower: str
+    name: str
+
+
+_listing_cache: OrderedDict[Path, tuple[int, list[_SortKey]]] = OrderedDict()
+_listing_lock = threading.Lock()
+
+
+def _scan_keys(target: Path) -> list[_SortKey]:
+    """返回目录下所有条目的排序键. 目录未修改时使用缓存."""
+    mtime_ns = os.stat(target).st_mtime_ns
+    with _listing_lock:
+        cached = _listing_cache.get(target)
+        if cached is not None and cached[0] == mtime_ns:
+            _listing_cache.move_to_end(target)
+            return cached[1]
+    with os.scandir(target) as it:
+        keys = [_SortKey(not entry.is_dir(), entry.name.lower(), entry.name) for entry in it]
+    keys.sort()
+    with _listing_lock:
+        _listing_cache[target] = (mtime_ns, keys)
+        if len(_listing_cache) > _LISTING_CACHE_SIZE:
+            _listing_cache.popitem(last=False)
+    return keys
+
+
+def _to_item(target: Path, key: _SortKey) -> FileItem:
+    entry_path = target / key.name
+    item = FileItem(name=key.name, path=entry_path.as_posix(), type="file" if key.is_file else "directory")
+    # Get optional file metadata
+    try:
+        stat_result = entry_path.stat()
+        item.last_modified = datetime.fromtimestamp(stat_result.st_mtime)
+        if key.is_file:
+            item.size = stat_result.st_size
+    except OSError:
+        # Could not retrieve stats, skip these fields
+        pass
+    return item
+
+
+def _encode_cursor(key: _SortKey) -> str:
+    return base64.urlsafe_b64encode(json.dumps(key, ensure_ascii=False).encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> _SortKey:
+    try:
+        is_file, lower, name = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return _SortKey(bool(is_file), str(lower), str(name))
+    except Exception:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="无效的 cursor.")
+
+
+def _list_page(target: Path, after: _SortKey | None, limit: int) -> FileListResponse:
+    keys = _scan_keys(target)
+    # cursor 为上一页最后一项的排序键, 期间目录有增删时也不会重复或遗漏未变化的条目
+    start = bisect.bisect_right(keys, after) if after is not None else 0
+    page = keys[start : start + limit]
+    next_cursor = _encode_cursor(page[-1]) if page and start + limit < len(keys) else None
+    return FileListResponse(items=[_to_item(target, k) for k in page], total=len(keys), next_cursor=next_cursor)
+
+
+def _resolve_dir(path: str) -> Path:
     p = Path(path)
     try:
         if p.is_absolute():
@@ -56,31 +130,55 @@ async def list_files(
 
     if not target_path.exists():
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"指定路径 {path} 不存在.")
+    return target_path
 
+
+@router.get("/list", operation_id="listFiles", summary="列出文件和目录")
+async def list_files(
+    path: Annotated[str, Query(description="服务器路径. 相对路径将基于 SAFE_DIRS 中的首个路径解析.")],
+    limit: Annotated[int, Query(ge=1, le=5000, description="每页最多返回的条目数.")] = 1000,
+    cursor: Annotated[str | None, Query(description="上一页返回的 next_cursor, 为空时返回第一页.")] = None,
+) -> FileListResponse:
+    """
+    分页列出指定路径下的文件和目录. 仅允许访问 `SAFE_DIRS` 目录下的内容, `SAFE_DIRS` 可通过服务器环境变量 `MDCX_SAFE_DIRS` 设置. 指向 `SAFE_DIRS` 外目录的软链接本身可见, 但无法访问其内容.
+    """
+    after = _decode_cursor(cursor) if cursor else None
+    target_path = await asyncio.to_thread(_resolve_dir, path)
     try:
-        items = []
-        for entry in os.scandir(target_path):
-            entry_path = Path(entry.path)
-            item_type = "directory" if entry.is_dir() else "file"
-            item = FileItem(name=entry.name, path=str(entry_path.as_posix()), type=item_type)
-            # Get optional file metadata
-            try:
-                stat_result = entry.stat()
-                mtime = datetime.fromtimestamp(stat_result.st_mtime)
-                item.last_modified = mtime
-                if item_type == "file":
-                    item.size = stat_result.st_size
-            except (OSError, FileNotFoundError):
-                # Could not retrieve stats, skip these fields
-                pass
-            items.append(item)
-
-        # Sort items: directories first, then files, both alphabetically
-        items.sort(key=lambda x: (x.type != "directory", x.name.lower()))
-        total = len(items)
-        return FileListResponse(items=items[:1000], total=total)  # 限制最多返回 1k 项
+        # 目录 I/O 在工作线程中进行, 避免阻塞刮削和 WebSocket
+        return await asyncio.to_thread(_list_page, target_path, after, limit)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"An unexpected error occurred: {str(e)}"
+        )
 
+
+@router.get(
+    "/list/stream",
+    operation_id="streamFiles",
+    summary="流式列出文件和目录",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"application/x-ndjson": {}}, "description": "每行一个 FileItem"}},
+)
+async def stream_files(
+    path: Annotated[str, Query(description="服务器路径. 相对路径将基于 SAFE_DIRS 中的首个路径解析.")],
+) -> StreamingResponse:
+    """
+    以 NDJSON 格式返回指定路径下的全部文件和目录, 每行一个 FileItem, 排序与 `listFiles` 相同. 适用于条目过多的目录.
+    """
+    target_path = await asyncio.to_thread(_resolve_dir, path)
+    try:
+        keys = await asyncio.to_thread(_scan_keys, target_path)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"An unexpected error occurred: {str(e)}"
         )
+
+    def _batch(batch: list[_SortKey]) -> str:
+        return "".join(_to_item(target_path, k).model_dump_json() + "\n" for k in batch)
+
+    async def _lines() -> AsyncIterator[str]:
+        for i in range(0, len(keys), _STREAM_BATCH):
+            yield await asyncio.to_thread(_batch, keys[i : i + _STREAM_BATCH])
+
+    return StreamingResponse(_lines(), media_type="application/x-ndjson")
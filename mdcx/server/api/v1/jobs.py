@@ -0,0 +1,112 @@
+from datetime import datetime
+from pathlib import Path
+
+from fastapi import APIRouter, HTTPException, status
+from pydantic import BaseModel, Field
+
+from mdcx.config.extend import deal_url
+from mdcx.config.manager import manager
+from mdcx.core.jobs import Job, JobKind, JobStatus, get_job_queue
+
+from ...config import SAFE_DIRS
+from .utils import check_path_access
+
+router = APIRouter(prefix="/jobs", tags=["刮削任务"])
+
+
+class JobCreateBody(BaseModel):
+    kind: JobKind = Field(description="scrape: 批量刮削, 未指定 paths 时刮削设置中的媒体目录; scrape_file: 单文件刮削.")
+    paths: list[str] = Field(default_factory=list, description="待刮削的文件路径. scrape_file 任务至少需要一个.")
+    url: str = Field(default="", description="指定刮削网址, 仅用于 scrape_file 任务.")
+
+
+class JobProgress(BaseModel):
+    total: int
+    done: int
+    succeeded: int
+    failed: int
+    current: str = Field(description="最近开始刮削的文件名")
+
+
+class JobInfo(BaseModel):
+    id: str
+    kind: JobKind
+    status: JobStatus
+    paths: list[str]
+    url: str
+    progress: JobProgress
+    eta: float | None = Field(description="预计剩余秒数, 无法估算时为 null")
+    error: str = Field(
+        description="任务失败 (status 为 failed) 时为错误信息, 否则为刮削失败文件的原因, 每个失败文件一行"
+    )
+    created_at: datetime
+    started_at: datetime | None
+    finished_at: datetime | None
+
+    @classmethod
+    def from_job(cls, job: Job) -> "JobInfo":
+        p = job.progress
+        return cls(
+            id=job.id,
+            kind=job.kind,
+            status=job.status,
+            paths=[path.as_posix() for path in job.paths],
+            url=job.appoint_url,
+            progress=JobProgress(total=p.total, done=p.done, succeeded=p.succeeded, failed=p.failed, current=p.current),
+            eta=job.eta(),
+            error=job.error,
+            created_at=datetime.fromtimestamp(job.created_at),
+            started_at=datetime.fromtimestamp(job.started_at) if job.started_at else None,
+            finished_at=datetime.fromtimestamp(job.finished_at) if job.finished_at else None,
+        )
+
+
+def _get_job(job_id: str) -> Job:
+    job = get_job_queue().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"任务 {job_id} 不存在.")
+    return job
+
+
+@router.post("", operation_id="createJob", summary="提交刮削任务", status_code=status.HTTP_202_ACCEPTED)
+async def create_job(body: JobCreateBody) -> JobInfo:
+    """
+    提交刮削任务并立即返回. 同一时间只运行一个批量刮削任务, 单文件任务可与其同时运行.
+    """
+    paths = [Path(p) for p in body.paths]
+    for p in paths:
+        check_path_access(p, *SAFE_DIRS)
+    website = ""
+    if body.kind == JobKind.SCRAPE:
+        if body.url:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="批量刮削不支持指定网址.")
+        errors = manager.load()
+        if errors:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"配置错误: {', '.join(errors)}")
+    else:
+        if not paths:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="单文件任务需要指定文件路径.")
+        if body.url:
+            website, _ = deal_url(body.url)
+            if not website:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="不支持的网址.")
+    return JobInfo.from_job(get_job_queue().submit(body.kind, paths, body.url, website))
+
+
+@router.get("", operation_id="listJobs", summary="列出刮削任务")
+async def list_jobs() -> list[JobInfo]:
+    """按提交顺序列出未结束及最近结束的任务"""
+    return [JobInfo.from_job(job) for job in get_job_queue().list()]
+
+
+@router.get("/{job_id}", operation_id="getJob", summary="获取刮削任务状态")
+async def get_job(job_id: str) -> JobInfo:
+    return JobInfo.from_job(_get_job(job_id))
+
+
+@router.post("/{job_id}/cancel", operation_id="cancelJob", summary="取消刮削任务")
+async def cancel_job(job_id: str) -> JobInfo:
+    """取消排队中或运行中的任务, 已结束的任务不受影响"""
+    job = _get_job(job_id)
+    get_job_queue().cancel(job_id)
+    return JobInfo.from_job(job)
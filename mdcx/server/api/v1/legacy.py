@@ -8,12 +8,8 @@ from mdcx.base.file import newtdisk_creat_symlink
 from mdcx.config.extend import deal_url
 from mdcx.config.manager import manager
 from mdcx.config.models import SiteConfig, Website
-from mdcx.core.scraper import start_new_scrape
-from mdcx.models.enums import FileMode
-from mdcx.models.flags import Flags
+from mdcx.core.jobs import JobKind, get_job_queue
 from mdcx.server.config import SAFE_DIRS
-from mdcx.tools.emby_actor_image import update_emby_actor_photo
-from mdcx.tools.emby_actor_info import show_emby_actor_list, update_emby_actor_info
 from mdcx.tools.subtitle import add_sub_for_all_video
 
 from .config import check_path_access
@@ -23,13 +19,13 @@ router = APIRouter(prefix="/legacy", tags=["Legacy"])
 
 @router.post("/scrape", summary="开始刮削", operation_id="startScrape")
 async def start_scrape():
-    """使用当前配置运行刮削流程, 无需额外参数"""
+    """使用当前配置运行刮削流程, 无需额外参数. 等同于提交 scrape 任务."""
+    errors = manager.load()
+    if errors:
+        raise HTTPException(status_code=500, detail=f"Configuration errors: {', '.join(errors)}")
     try:
-        errors = manager.load()
-        if errors:
-            raise HTTPException(status_code=500, detail=f"Configuration errors: {', '.join(errors)}")
-        start_new_scrape(FileMode.Default)
-        return {"message": "Scraping started."}
+        job = get_job_queue().submit(JobKind.SCRAPE, [])
+        return {"message": "Scraping started.", "job_id": job.id}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -41,17 +37,15 @@ class ScrapeFileBody(BaseModel):
 
 @router.post("/scrape/single", summary="单文件刮削", operation_id="scrapeSingleFile")
 async def scrape_single(body: ScrapeFileBody):
+    """等同于提交 scrape_file 任务"""
     p = Path(body.path)
     check_path_access(p, *SAFE_DIRS)
-    Flags.single_file_path = p
     website, url = deal_url(body.url)
     if not website:
         raise HTTPException(status_code=400, detail="Unsupported URL")
-    Flags.appoint_url = body.url
-    Flags.website_name = website
     try:
-        start_new_scrape(FileMode.Single)
-        return {"message": "Single file scraping started."}
+        job = get_job_queue().submit(JobKind.SCRAPE_FILE, [p], body.url, website)
+        return {"message": "Single file scraping started.", "job_id": job.id}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -86,6 +80,9 @@ async def add_subtitles():
 @router.get("/actors", summary="查看媒体服务器演员名单", operation_id="getActors")
 async def get_actors():
     """查看 emby/jellyfin 中符合条件的演员名单"""
+    # 演员工具依赖 bs4/parsel, 使用时再导入
+    from mdcx.tools.emby_actor_info import show_emby_actor_list
+
     try:
         await show_emby_actor_list(0)
         return {"message": "Task to show actors completed. Check logs for results."}
@@ -96,6 +93,9 @@ async def get_actors():
 @router.post("/actors/complete", summary="补全演员信息", operation_id="completeActors")
 async def complete_actors():
     """补全 emby/jellyfin 演员信息/头像"""
+    from mdcx.tools.emby_actor_image import update_emby_actor_photo
+    from mdcx.tools.emby_actor_info import update_emby_actor_info
+
     try:
         create_task(update_emby_actor_info())
         create_task(update_emby_actor_photo())
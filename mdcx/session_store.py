@@ -0,0 +1,185 @@
+"""
+会话存储. 持久化浏览器通过验证 (如 Cloudflare) 后获得的 cookies 及对应的 User-Agent, 供 HTTP 客户端和浏览器共享.
+
+cf_clearance 等 cookie 与 User-Agent 绑定, 因此 HTTP 请求携带这些 cookie 时须同时使用浏览器的 User-Agent.
+"""
+
+import sqlite3
+import threading
+import time
+from collections.abc import Callable, Iterable, Mapping
+from pathlib import Path
+from typing import Any
+
+# 会话 cookie (无过期时间) 的保存时长
+SESSION_COOKIE_TTL = 12 * 3600
+# 识别验证页面的响应内容特征
+_CHALLENGE_MARKERS = ("challenge-platform", "cf-chl-", "Just a moment...", "cf_chl_opt")
+
+
+def is_challenge(status_code: int, headers: Mapping[str, str], text: str) -> bool:
+    """判断响应是否为 Cloudflare 等人机验证页面."""
+    if headers.get("cf-mitigated") == "challenge":
+        return True
+    if status_code not in (403, 429, 503):
+        return False
+    return any(m in text for m in _CHALLENGE_MARKERS)
+
+
+def _domain_candidates(host: str) -> list[str]:
+    """返回可作用于 host 的 cookie 域名, 如 www.javdb.com -> [www.javdb.com, javdb.com]."""
+    parts = host.lower().split(".")
+    return [".".join(parts[i:]) for i in range(len(parts) - 1)] or [host.lower()]
+
+
+class SessionStore:
+    """
+    按域名保存 cookies 和 User-Agent. 数据同时缓存在内存中, 读取不访问数据库, 可在事件循环中直接调用.
+
+    此类线程安全.
+    """
+
+    def __init__(self, db_path: str | Path | Callable[[], Path]):
+        """
+        Args:
+            db_path: 数据库路径, 或返回路径的函数. 数据库在首次使用时打开
+        """
+        self._db_path = db_path
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+        self._cookies: dict[str, dict[tuple[str, str], tuple[str, bool, bool, float]]] = {}
+        self._agents: dict[str, str] = {}
+
+    def _open(self) -> sqlite3.Connection:
+        """打开数据库并加载数据, 调用方需持有锁."""
+        if self._conn is not None:
+            return self._conn
+        db_path = self._db_path() if callable(self._db_path) else Path(self._db_path)
+        conn = sqlite3.connect(db_path, check_same_thread=False)
+        with conn:
+            conn.execute(
+                "create table if not exists cookies ("
+                "domain text not null, name text not null, path text not null, value text not null, "
+                "secure integer not null, http_only integer not null, expires real not null, "
+                "primary key (domain, name, path))"
+            )
+            conn.execute("create table if not exists agents (domain text primary key, user_agent text not null)")
+            conn.execute("delete from cookies where expires <= ?", (time.time(),))
+        for domain, name, path, value, secure, http_only, expires in conn.execute(
+            "select domain, name, path, value, secure, http_only, expires from cookies"
+        ):
+            self._cookies.setdefault(domain, {})[(name, path)] = (value, bool(secure), bool(http_only), expires)
+        self._agents = dict(conn.execute("select domain, user_agent from agents").fetchall())
+        self._conn = conn
+        return conn
+
+    def cookies(self, host: str) -> dict[str, str]:
+        """获取可用于 host 的未过期 cookies, 子域名的 cookie 优先."""
+        now = time.time()
+        result: dict[str, str] = {}
+        with self._lock:
+            self._open()
+            for domain in reversed(_domain_candidates(host)):
+                for (name, _), (value, _, _, expires) in self._cookies.get(domain, {}).items():
+                    if expires > now:
+                        result[name] = value
+        return result
+
+    def user_agent(self, host: str) -> str | None:
+        with self._lock:
+            self._open()
+            return next((self._agents[d] for d in _domain_candidates(host) if d in self._agents), None)
+
+    def browser_cookies(self, host: str) -> list[dict[str, Any]]:
+        """获取可用于 host 的 cookies, 格式与 BrowserContext.add_cookies 参数一致."""
+        now = time.time()
+        result = []
+        with self._lock:
+            self._open()
+            for domain in _domain_candidates(host):
+                for (name, path), (value, secure, http_only, expires) in self._cookies.get(domain, {}).items():
+                    if expires > now:
+                        result.append(
+                            {
+                                "name": name,
+                                "value": value,
+                                "domain": "." + domain,
+                                "path": path,
+                                "expires": expires,
+                                "secure": secure,
+                                "httpOnly": http_only,
+                            }
+                        )
+        return result
+
+    def save_browser_cookies(self, cookies: Iterable[Mapping[str, Any]], user_agent: str | None = None) -> None:
+        """
+        保存浏览器上下文的 cookies.
+
+        Args:
+            cookies: BrowserContext.cookies() 的返回值
+            user_agent: 浏览器的 User-Agent, 将关联到 cookies 所属的域名
+        """
+        now = time.time()
+        rows = []
+        for c in cookies:
+            expires = c.get("expires", -1)
+            if expires is None or expires < 0:
+                expires = now + SESSION_COOKIE_TTL
+            if expires <= now:
+                continue
+            domain = c["domain"].lstrip(".").lower()
+            rows.append(
+                (
+                    domain,
+                    c["name"],
+                    c.get("path") or "/",
+                    c["value"],
+                    c.get("secure", False),
+                    c.get("httpOnly", False),
+                    expires,
+                )
+            )
+        if not rows:
+            return
+        domains = {r[0] for r in rows}
+        with self._lock, self._open() as conn:
+            conn.executemany("insert or replace into cookies values (?, ?, ?, ?, ?, ?, ?)", rows)
+            for domain, name, path, value, secure, http_only, expires in rows:
+                self._cookies.setdefault(domain, {})[(name, path)] = (value, bool(secure), bool(http_only), expires)
+            if user_agent:
+                conn.executemany("insert or replace into agents values (?, ?)", [(d, user_agent) for d in domains])
+                self._agents.update(dict.fromkeys(domains, user_agent))
+
+    def clear(self, host: str) -> None:
+        """删除 host 的会话, 如保存的 cookie 已失效时."""
+        domains = _domain_candidates(host)
+        with self._lock, self._open() as conn:
+            for d in domains:
+                self._cookies.pop(d, None)
+                self._agents.pop(d, None)
+                conn.execute("delete from cookies where domain = ?", (d,))
+                conn.execute("delete from agents where domain = ?", (d,))
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+_session_store: SessionStore | None = None
+
+
+def get_session_store() -> SessionStore:
+    """获取会话存储, 首次调用时打开用户数据目录下的数据库."""
+    global _session_store
+    if _session_store is None:
+        _session_store = SessionStore(_default_db_path)
+    return _session_store
+
+
+def _default_db_path() -> Path:
+    from .config.resources import resources  # 延迟导入, 配置加载时 resources 尚未初始化
+
+    return resources.u("sessions.db")
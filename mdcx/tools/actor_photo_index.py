@@ -0,0 +1,144 @@
+"""
+演员头像索引. 保存 Gfriends 头像库和本地头像文件夹中演员名与图片地址的对应关系.
+
+演员名在建立索引时统一规范化 (去除扩展名, 转为 NFC), 查询时无需再处理 .jpg/.png 两种文件名.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections.abc import Iterable
+from pathlib import Path
+
+from ..config.resources import resources
+
+PHOTO_SUFFIXES = (".jpg", ".png")
+
+
+def normalize_name(name: str) -> str:
+    """去除扩展名并转为 NFC. macOS 的文件名为 NFD, 直接比较会查询不到."""
+    stem, suffix = os.path.splitext(name)
+    if suffix.lower() in PHOTO_SUFFIXES:
+        name = stem
+    return unicodedata.normalize("NFC", name)
+
+
+def _merge(entries: Iterable[tuple[str, str]]) -> dict[str, str]:
+    """
+    将 (文件名, 地址) 转换为 演员名 -> 地址. 同名图片先出现的优先, 且 .jpg 优先于 .png.
+    """
+    jpg: dict[str, str] = {}
+    png: dict[str, str] = {}
+    for file_name, location in entries:
+        suffix = os.path.splitext(file_name)[1].lower()
+        if suffix not in PHOTO_SUFFIXES:
+            continue
+        (jpg if suffix == ".jpg" else png).setdefault(normalize_name(file_name), location)
+    return png | jpg
+
+
+def index_filetree(filetree: dict, raw_url: str) -> dict[str, str]:
+    """
+    解析 Gfriends 的 Filetree.json.
+
+    Args:
+        filetree: Filetree.json 内容, 格式为 {"Content": {文件夹: {文件名: 实际文件名}}}
+        raw_url: 仓库的 raw 地址, 如 https://raw.githubusercontent.com/gfriends/gfriends
+    """
+    content: dict[str, dict[str, str]] = filetree.get("Content", {})
+    return _merge(
+        # https://raw.githubusercontent.com/gfriends/gfriends/master/Content/z-Derekhsu/%E5%A4%A2%E4%B9%83%E3%81%82%E3%81%84%E3%81%8B.jpg
+        (key, f"{raw_url}/master/Content/{folder}/{value}")
+        for folder in sorted(content)
+        for key, value in content[folder].items()
+    )
+
+
+def folder_version(folder: str | Path) -> str:
+    """根据各子文件夹的修改时间生成版本号. 增删文件会改变所在文件夹的修改时间."""
+    h = hashlib.sha1()
+    for root, _, _ in os.walk(folder):
+        h.update(f"{root}\0{os.stat(root).st_mtime_ns}\0".encode())
+    return h.hexdigest()
+
+
+def index_folder(folder: str | Path) -> dict[str, str]:
+    """索引本地头像文件夹"""
+    return _merge((file, os.path.join(root, file)) for root, _, files in os.walk(folder) for file in sorted(files))
+
+
+class ActorPhotos:
+    """某个头像来源的索引, 按演员名 O(1) 查询"""
+
+    def __init__(self, photos: dict[str, str]):
+        self._photos = photos
+
+    def get(self, name: str) -> str | None:
+        """
+        查询演员头像地址.
+
+        Args:
+            name: 演员名, 可带 .jpg/.png 扩展名
+        """
+        return self._photos.get(normalize_name(name))
+
+    def __len__(self) -> int:
+        return len(self._photos)
+
+
+class ActorPhotoIndex:
+    """
+    按来源保存头像索引及其版本 (Gfriends 为 Filetree.json 的 ETag, 本地文件夹为 folder_version).
+
+    此类线程安全.
+    """
+
+    def __init__(self, db_path: str | Path):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "create table if not exists photos ("
+                "source text not null, name text not null, location text not null, "
+                "primary key (source, name)) without rowid"
+            )
+            self._conn.execute(
+                "create table if not exists sources (source text primary key, version text not null, updated real not null)"
+            )
+
+    def version(self, source: str) -> tuple[str, float] | None:
+        """返回来源的版本及更新时间, 未建立索引时返回 None."""
+        with self._lock:
+            row = self._conn.execute("select version, updated from sources where source = ?", (source,)).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def replace(self, source: str, version: str, photos: dict[str, str]) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("delete from photos where source = ?", (source,))
+            self._conn.executemany(
+                "insert into photos values (?, ?, ?)", ((source, name, loc) for name, loc in photos.items())
+            )
+            self._conn.execute("insert or replace into sources values (?, ?, ?)", (source, version, time.time()))
+
+    def load(self, source: str) -> ActorPhotos:
+        with self._lock:
+            rows = self._conn.execute("select name, location from photos where source = ?", (source,)).fetchall()
+        return ActorPhotos(dict(rows))
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_photo_index: ActorPhotoIndex | None = None
+
+
+def get_actor_photo_index() -> ActorPhotoIndex:
+    """获取演员头像索引, 首次调用时打开用户数据目录下的数据库."""
+    global _photo_index
+    if _photo_index is None:
+        _photo_index = ActorPhotoIndex(resources.u("actor_photos.db"))
+    return _photo_index
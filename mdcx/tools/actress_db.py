@@ -1,49 +1,218 @@
 import datetime
+import hashlib
+import os
 import re
 import sqlite3
+import threading
 import traceback
 from pathlib import Path
+from typing import NamedTuple
 
 from ..config.manager import manager
+from ..config.resources import resources
 from ..models.emby import EMbyActressInfo
 from ..signals import signal
 
+# Info 表中使用的列
+_INFO_COLUMNS = "Href, Cup, Height, Bust, Waist, Hip, Birthday, Birthplace, Account, CareerPeriod"
+# sqlite 单条语句的参数数量有限, 分批查询
+_BATCH = 500
+
+
+class ActressRecord(NamedTuple):
+    name: str
+    alias: str
+    href: str
+    cup: str
+    height: str
+    bust: str
+    waist: str
+    hip: str
+    birthday: str
+    birthplace: str
+    account: str
+    career_period: str
+
+
+def _read_only_uri(path: Path) -> str:
+    return f"{path.resolve().as_uri()}?mode=ro&immutable=1"
+
+
+def _source_signature(path: Path) -> str:
+    st = path.stat()
+    return f"{path.resolve()}:{st.st_size}:{st.st_mtime_ns}"
+
+
+def build_cache_db(source: Path, dest: Path) -> None:
+    """
+    根据女优数据库生成带索引的缓存数据库. 原数据库以只读方式打开, 不做任何修改.
+
+    保留原表的 rowid (seq 列), 多条记录匹配时与直接查询原数据库一样返回第一条.
+    """
+    tmp = dest.with_name(dest.name + ".tmp")
+    tmp.unlink(missing_ok=True)
+    conn = sqlite3.connect(tmp.resolve().as_uri(), uri=True)
+    try:
+        conn.execute("attach database ? as src", (_read_only_uri(source),))
+        with conn:
+            conn.execute("create table Names as select rowid as seq, Name, Alias from src.Names")
+            conn.execute(f"create table Info as select rowid as seq, Name, {_INFO_COLUMNS} from src.Info")
+            # 按别名查询时无需回表
+            conn.execute("create index names_alias on Names (Alias, seq, Name)")
+            conn.execute("create index info_name on Info (Name, seq)")
+            conn.execute("create table meta (key text primary key, value text not null)")
+            conn.execute("insert into meta values ('source', ?)", (_source_signature(source),))
+        conn.execute("detach database src")
+    finally:
+        conn.close()
+    os.replace(tmp, dest)
+
+
+def cache_db_path(source: Path) -> Path:
+    """
+    原数据库对应的缓存数据库路径. 文件名包含原数据库签名, 原数据库变化时生成新文件,
+    不会替换其他线程仍在使用的缓存 (Windows 下无法替换已打开的文件).
+    """
+    digest = hashlib.sha1(_source_signature(source).encode()).hexdigest()[:12]
+    return resources.u(f"actress_db_cache-{digest}.db")
+
+
+def cache_db_signature(path: Path) -> str | None:
+    """返回缓存数据库对应的原数据库签名, 不存在或无效时返回 None."""
+    if not path.is_file():
+        return None
+    try:
+        conn = sqlite3.connect(_read_only_uri(path), uri=True)
+        try:
+            row = conn.execute("select value from meta where key = 'source'").fetchone()
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return None
+    return row[0] if row else None
+
 
 class ActressDB:
-    DB = None
+    """
+    女优数据库. 查询使用带索引的缓存数据库, 每个线程使用各自的只读连接.
+    """
+
+    DB: Path | None = None
+    _generation = 0
+    _local = threading.local()
+    _init_lock = threading.Lock()
 
     @classmethod
     def init_db(cls):
-        try:
-            #  https://ricardoanderegg.com/posts/python-sqlite-thread-safety/
-            cls.DB = sqlite3.connect(Path(manager.config.info_database_path), check_same_thread=False)
-            info_count = cls.DB.execute("select count(*) from Info").fetchone()  # 必须实际执行查询才能判断是否连接成功
-            signal.show_log_text(f" ✅ 数据库连接成功, 共有 {info_count[0]} 条女优信息")
-        except Exception:
-            signal.show_traceback_log(traceback.format_exc())
-            signal.show_log_text(" ❌ 数据库连接失败, 请检查数据库设置")
-            cls.DB = None
+        """初始化数据库, 必要时建立索引. 建立索引耗时较长, 界面中应通过 init_db_in_background 调用"""
+        with cls._init_lock:
+            try:
+                source = Path(manager.config.info_database_path)
+                cache = cache_db_path(source)
+                if cache_db_signature(cache) != _source_signature(source):
+                    signal.show_log_text(" ⏳ 正在为女优数据库建立索引...")
+                    build_cache_db(source, cache)
+                conn = sqlite3.connect(_read_only_uri(cache), uri=True)
+                try:
+                    info_count = conn.execute("select count(*) from Info").fetchone()
+                finally:
+                    conn.close()
+                cls.DB = cache
+                signal.show_log_text(f" ✅ 数据库连接成功, 共有 {info_count[0]} 条女优信息")
+            except Exception:
+                signal.show_traceback_log(traceback.format_exc())
+                signal.show_log_text(" ❌ 数据库连接失败, 请检查数据库设置")
+                cls.DB = None
+            cls._generation += 1
+            cls._remove_stale_caches()
+
+    @classmethod
+    def init_db_in_background(cls) -> threading.Thread:
+        t = threading.Thread(target=cls.init_db, daemon=True)
+        t.start()
+        return t
+
+    @classmethod
+    def _remove_stale_caches(cls):
+        """删除旧的缓存数据库, 仍被其他线程打开的文件删除失败时留到下次初始化"""
+        for p in resources.u("").glob("actress_db_cache*.db"):
+            if p != cls.DB:
+                try:
+                    p.unlink()
+                except OSError:
+                    pass
+
+    @classmethod
+    def _conn(cls) -> sqlite3.Connection:
+        """获取当前线程的只读连接, 数据库重新初始化后重新连接"""
+        assert cls.DB is not None
+        local = cls._local
+        if getattr(local, "generation", None) != cls._generation:
+            if getattr(local, "conn", None) is not None:
+                local.conn.close()
+            local.conn = sqlite3.connect(_read_only_uri(cls.DB), uri=True)
+            local.generation = cls._generation
+        return local.conn
+
+    @classmethod
+    def lookup(cls, keywords: list[str]) -> dict[str, ActressRecord]:
+        """
+        批量查询女优信息. 优先精确匹配别名, 其次匹配以关键词开头的别名.
+
+        Returns:
+            关键词 -> 女优信息, 未找到的关键词不在结果中
+        """
+        if cls.DB is None:
+            return {}
+        conn = cls._conn()
+        keywords = list(dict.fromkeys(k for k in keywords if k))
+        names: dict[str, tuple[str, str]] = {}
+        # 精确匹配
+        for i in range(0, len(keywords), _BATCH):
+            batch = keywords[i : i + _BATCH]
+            rows = conn.execute(
+                f"select Alias, Name from Names where Alias in ({','.join('?' * len(batch))}) order by seq desc", batch
+            ).fetchall()
+            # 按 seq 倒序写入, 同一别名保留 seq 最小的记录
+            names.update((alias, (name, alias)) for alias, name in rows)
+        # 前缀匹配, 通过别名索引进行范围查询
+        rest = [k for k in keywords if k not in names]
+        if rest:
+            conn.execute("create temp table if not exists query (keyword text primary key)")
+            with conn:
+                conn.execute("delete from query")
+                conn.executemany("insert into query values (?)", ((k,) for k in rest))
+            rows = conn.execute(
+                "select q.keyword, n.Name, n.Alias from query q join Names n "
+                "on n.Alias >= q.keyword and n.Alias < q.keyword || char(1114111) order by n.seq desc"
+            ).fetchall()
+            names.update((keyword, (name, alias)) for keyword, name, alias in rows)
+        # 女优信息
+        info: dict[str, tuple] = {}
+        unique = list({name for name, _ in names.values()})
+        for i in range(0, len(unique), _BATCH):
+            batch = unique[i : i + _BATCH]
+            rows = conn.execute(
+                f"select Name, {_INFO_COLUMNS} from Info where Name in ({','.join('?' * len(batch))}) order by seq desc",
+                batch,
+            ).fetchall()
+            info.update((row[0], row[1:]) for row in rows)
+        return {k: ActressRecord(name, alias, *info[name]) for k, (name, alias) in names.items() if name in info}
 
     @classmethod
     def update_actor_info_from_db(cls, actor_info: EMbyActressInfo) -> tuple[int, str]:
         if cls.DB is None:
             return 0, "❌ 数据库连接失败, 请检查数据库设置"
+        return cls.apply_record(actor_info, cls.lookup([actor_info.name]).get(actor_info.name))
 
-        keyword = actor_info.name
-        cur = cls.DB.cursor()
-        if s := cur.execute(f"select Name, Alias from Names where Alias='{keyword}'").fetchone():
-            name, alias = s
-        else:
-            s = cur.execute(f"select Name, Alias from Names where Alias like '{keyword}%'").fetchone()
-            if not s:
-                return 0, f"🔴 数据库中未找到姓名: {keyword}"
-            name, alias = s
-
-        res = cur.execute(
-            f"select Href,Cup,Height,Bust,Waist,Hip,Birthday,Birthplace,Account,CareerPeriod from Info where Name = '{name}'"
-        )
-        href, cup, height, bust, waist, hip, birthday, birthplace, account, career_period = res.fetchone()
-        cur.close()
+    @classmethod
+    def apply_record(cls, actor_info: EMbyActressInfo, record: ActressRecord | None) -> tuple[int, str]:
+        """将查询结果写入 actor_info, 用于批量查询后逐个处理"""
+        if cls.DB is None:
+            return 0, "❌ 数据库连接失败, 请检查数据库设置"
+        if record is None:
+            return 0, f"🔴 数据库中未找到姓名: {actor_info.name}"
+        name, alias, href, cup, height, bust, waist, hip, birthday, birthplace, account, career_period = record
 
         # 收集处理结果信息
         messages = []
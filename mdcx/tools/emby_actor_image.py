@@ -1,12 +1,14 @@
 import asyncio
 import base64
-import json
+import hashlib
 import os
 import re
 import time
 import traceback
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Literal, cast
+from typing import Literal
 
 import aiofiles
 import aiofiles.os
@@ -16,9 +18,11 @@ from ..base.web import download_file_with_filepath
 from ..config.enums import EmbyAction
 from ..config.manager import manager
 from ..config.resources import resources
-from ..image import cut_pic, fix_pic_async
+from ..image import prepare_actor_photo
 from ..signals import signal
 from ..utils import get_used_time
+from .actor_photo_index import ActorPhotos, folder_version, get_actor_photo_index, index_filetree, index_folder
+from .emby_sync import get_emby_sync_state, image_tag_hash, settings_key
 
 
 async def update_emby_actor_photo() -> None:
@@ -35,7 +39,17 @@ async def update_emby_actor_photo() -> None:
     signal.reset_buttons_status.emit()
 
 
-async def _get_emby_actor_list() -> list[dict]:
+# 分页获取演员列表时每页的数量
+PERSONS_PAGE_SIZE = 500
+
+
+async def _get_emby_actor_list(fields: str = "") -> list[dict]:
+    """
+    分页获取 Emby/Jellyfin 的演员列表.
+
+    Args:
+        fields: 额外返回的字段, 如 "Overview", 避免之后逐个请求演员详情
+    """
     url = str(manager.config.emby_url).rstrip("/")
     # 获取 emby 的演员列表
     if "emby" == manager.config.server_type:
@@ -49,6 +63,8 @@ async def _get_emby_actor_list() -> list[dict]:
 
     if manager.config.user_id:
         url += f"&userid={manager.config.user_id}"
+    if fields:
+        url += f"&Fields={fields}"
 
     signal.show_log_text(f"⏳ 连接 {server_name} 服务器...")
 
@@ -56,13 +72,23 @@ async def _get_emby_actor_list() -> list[dict]:
         signal.show_log_text(f"🔴 {server_name} API 密钥未填写！")
         signal.show_log_text("================================================================================")
 
-    response, error = await manager.computed.async_client.get_json(url, use_proxy=False)
-    if response is None:
-        signal.show_log_text(f"🔴 {server_name} 连接失败！请检查 {server_name} 地址 和 API 密钥是否正确填写！ {error}")
-        signal.show_log_text(traceback.format_exc())
-        return []
+    actor_list = []
+    while True:
+        page_url = f"{url}&StartIndex={len(actor_list)}&Limit={PERSONS_PAGE_SIZE}"
+        response, error = await manager.computed.async_client.get_json(page_url, use_proxy=False)
+        if response is None:
+            signal.show_log_text(
+                f"🔴 {server_name} 连接失败！请检查 {server_name} 地址 和 API 密钥是否正确填写！ {error}"
+            )
+            signal.show_log_text(traceback.format_exc())
+            return []
+        items = response["Items"]
+        actor_list.extend(items)
+        total = response.get("TotalRecordCount", 0)
+        # 服务器不支持分页时一次返回全部演员
+        if len(items) < PERSONS_PAGE_SIZE or len(actor_list) >= total:
+            break
 
-    actor_list = response["Items"]
     signal.show_log_text(f"✅ {server_name} 连接成功！共有 {len(actor_list)} 个演员！")
     if not actor_list:
         signal.show_log_text("================================================================================")
@@ -109,102 +135,77 @@ def _generate_server_url(actor_js: dict) -> tuple[str, str, str, str, str, str]:
     return actor_homepage, actor_person, pic_url, backdrop_url, backdrop_url_0, update_url
 
 
-async def _get_gfriends_actor_data() -> dict[str, str] | Literal[False] | None:
-    emby_on = manager.config.emby_on
+async def _get_gfriends_actor_data() -> ActorPhotos | Literal[False]:
+    """获取头像来源的索引. 开启网络头像库时使用 Gfriends, 否则使用本地头像库文件夹."""
+    if EmbyAction.ACTOR_PHOTO_NET not in manager.config.emby_on:
+        return await asyncio.to_thread(_get_local_actor_photo)
+
     gfriends_github = manager.config.gfriends_github
     raw_url = f"{gfriends_github}".replace("github.com/", "raw.githubusercontent.com/").replace("://www.", "://")
     # 'https://raw.githubusercontent.com/gfriends/gfriends'
+    filetree_url = f"{raw_url.rstrip('/')}/master/Filetree.json"
+    source = f"gfriends:{raw_url}"
+    index = get_actor_photo_index()
+    local = await asyncio.to_thread(index.version, source)
+
+    # 根据 Filetree.json 的 ETag 判断是否需要更新, 无需下载整个文件
+    signal.show_log_text("⏳ 连接 Gfriends 网络头像库...")
+    resp, error = await manager.computed.async_client.request("HEAD", filetree_url)
+    etag = resp.headers.get("etag", "") if resp is not None else ""
+    if resp is None:
+        signal.show_log_text(f"🔴 Gfriends 查询数据版本失败！{error}")
+    if local is not None:
+        local_time = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(local[1]))
+        if resp is None or (etag and etag == local[0]):
+            signal.show_log_text(f"✅ 本地缓存数据无需更新！本地数据更新时间: {local_time}")
+            return await asyncio.to_thread(index.load, source)
+        signal.show_log_text(f"🍉 本地缓存数据需要更新！本地数据更新时间: {local_time}")
+
+    # 更新数据
+    signal.show_log_text("⏳ 开始缓存 Gfriends 最新数据表...")
+    resp, error = await manager.computed.async_client.request("GET", filetree_url)
+    if resp is None:
+        signal.show_log_text(f"🔴 Gfriends 数据表获取失败！补全已停止！{error}")
+        return False
+    try:
+        photos = index_filetree(resp.json(), raw_url.rstrip("/"))
+    except Exception:
+        signal.show_traceback_log(traceback.format_exc())
+        signal.show_log_text("🔴 Gfriends 数据表解析失败！补全已停止！")
+        return False
+    # 未返回 ETag 时使用内容哈希作为版本, 下次仍会重新下载
+    version = resp.headers.get("etag", "") or hashlib.sha1(resp.content).hexdigest()
+    await asyncio.to_thread(index.replace, source, version, photos)
+    signal.show_log_text(f"✅ Gfriends 数据表已缓存！共 {len(photos)} 个演员")
+    return ActorPhotos(photos)
 
-    if EmbyAction.ACTOR_PHOTO_NET in emby_on:
-        update_data = False
-        signal.show_log_text("⏳ 连接 Gfriends 网络头像库...")
-        net_url = f"{gfriends_github}/commits/master/Filetree.json"
-        response, error = await manager.computed.async_client.get_text(net_url)
-        if response is None:
-            signal.show_log_text("🔴 Gfriends 查询最新数据更新时间失败！")
-            net_float = 0
-            update_data = True
-        else:
-            try:
-                date_time = re.findall(r'committedDate":"(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2})', response)
-                lastest_time = time.strptime(date_time[0], "%Y-%m-%dT%H:%M:%S")
-                net_float = time.mktime(lastest_time) - time.timezone
-                net_time = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(net_float))
-            except Exception:
-                signal.show_log_text("🔴 Gfriends 历史页面解析失败！请向开发者报告! ")
-                return False
-            signal.show_log_text(f"✅ Gfriends 连接成功！最新数据更新时间: {net_time}")
-
-        # 更新：本地无文件时；更新时间过期；本地文件读取失败时，重新更新
-        gfriends_json_path = resources.u("gfriends.json")
-        if (
-            not await aiofiles.os.path.exists(gfriends_json_path)
-            or await aiofiles.os.path.getmtime(gfriends_json_path) < 1657285200
-        ):
-            update_data = True
-        else:
-            try:
-                async with aiofiles.open(gfriends_json_path, encoding="utf-8") as f:
-                    content = await f.read()
-                    gfriends_actor_data = json.loads(content)
-            except Exception:
-                signal.show_log_text("🔴 本地缓存数据读取失败！需重新缓存！")
-                update_data = True
-            else:
-                local_float = await aiofiles.os.path.getmtime(gfriends_json_path)
-                local_time = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(local_float))
-                if not net_float or net_float > local_float:
-                    signal.show_log_text(f"🍉 本地缓存数据需要更新！本地数据更新时间: {local_time}")
-                    update_data = True
-                else:
-                    signal.show_log_text(f"✅ 本地缓存数据无需更新！本地数据更新时间: {local_time}")
-                    return gfriends_actor_data
-
-        # 更新数据
-        if update_data:
-            signal.show_log_text("⏳ 开始缓存 Gfriends 最新数据表...")
-            filetree_url = f"{raw_url}/master/Filetree.json"
-            response, error = await manager.computed.async_client.get_content(filetree_url)
-            if response is None:
-                signal.show_log_text("🔴 Gfriends 数据表获取失败！补全已停止！")
-                return False
-            async with aiofiles.open(gfriends_json_path, "wb") as f:
-                await f.write(response)
-            signal.show_log_text("✅ Gfriends 数据表已缓存！")
-            try:
-                async with aiofiles.open(gfriends_json_path, encoding="utf-8") as f:
-                    content = await f.read()
-                    gfriends_actor_data = json.loads(content)
-            except Exception:
-                signal.show_log_text("🔴 本地缓存数据读取失败！补全已停止！")
-                return False
-            else:
-                content = gfriends_actor_data.get("Content")
-                new_gfriends_actor_data = {}
-                content_list = list(content.keys())
-                content_list.sort()
-                for each_key in content_list:
-                    for key, value in content.get(each_key).items():
-                        if key not in new_gfriends_actor_data:
-                            # https://raw.githubusercontent.com/gfriends/gfriends/master/Content/z-Derekhsu/%E5%A4%A2%E4%B9%83%E3%81%82%E3%81%84%E3%81%8B.jpg
-                            actor_url = f"{raw_url}/master/Content/{each_key}/{value}"
-                            new_gfriends_actor_data[key] = actor_url
-                async with aiofiles.open(gfriends_json_path, "w", encoding="utf-8") as f:
-                    json_content = json.dumps(
-                        new_gfriends_actor_data,
-                        ensure_ascii=False,
-                        sort_keys=True,
-                        indent=4,
-                        separators=(",", ": "),
-                    )
-                    await f.write(json_content)
-                return new_gfriends_actor_data
-    else:
-        return await asyncio.to_thread(_get_local_actor_photo)
 
+@dataclass
+class _PhotoSyncLimits:
+    """头像同步的并发限制. Emby API 与头像来源分别限流, 图片处理在进程池中执行."""
+
+    emby: asyncio.Semaphore = field(default_factory=lambda: asyncio.Semaphore(1))
+    photo: asyncio.Semaphore = field(default_factory=lambda: asyncio.Semaphore(1))
+    pool: Executor | None = None
+    _file_locks: dict[Path, asyncio.Lock] = field(default_factory=dict)
+
+    def file_lock(self, path: Path) -> asyncio.Lock:
+        """同一图片可能被多个演员 (如别名) 同时使用, 处理前需加锁"""
+        return self._file_locks.setdefault(path, asyncio.Lock())
+
+    async def prepare(self, pic_path: Path, backdrop_path: Path | None = None, crop: bool = True) -> None:
+        loop = asyncio.get_running_loop()
+        async with self.file_lock(pic_path):
+            error = await loop.run_in_executor(self.pool, prepare_actor_photo, pic_path, backdrop_path, crop)
+        if error:
+            signal.show_log_text(error)
 
-async def _get_graphis_pic(actor_name: str) -> tuple[Path | None, Path | None, str]:
+
+async def _get_graphis_pic(
+    actor_name: str, limits: _PhotoSyncLimits | None = None
+) -> tuple[Path | None, Path | None, str]:
     emby_on = manager.config.emby_on
+    limits = limits or _PhotoSyncLimits()
 
     # 生成图片路径和请求地址
     actor_folder = resources.u("actor/graphis")
@@ -248,7 +249,8 @@ async def _get_graphis_pic(actor_name: str) -> tuple[Path | None, Path | None, s
         return pic_path, backdrop_path, ""
 
     # 请求图片
-    res, error = await manager.computed.async_client.get_text(url)
+    async with limits.photo:
+        res, error = await manager.computed.async_client.get_text(url)
     if res is None:
         logs += f"🔴 graphis.ne.jp 请求失败！\n{error}"
         return None, None, logs
@@ -263,110 +265,163 @@ async def _get_graphis_pic(actor_name: str) -> tuple[Path | None, Path | None, s
 
     # 保存图片
     if not has_pic and pic_path:
-        if await download_file_with_filepath(small_pic, pic_path, actor_folder):
+        async with limits.photo:
+            downloaded = await download_file_with_filepath(small_pic, pic_path, actor_folder)
+        if downloaded:
             logs += "🍊 使用 graphis.ne.jp 头像！ "
             if EmbyAction.GRAPHIS_BACKDROP not in emby_on:
                 if not has_backdrop:
-                    await fix_pic_async(pic_path, backdrop_path)
+                    await limits.prepare(pic_path, backdrop_path, crop=False)
                 return pic_path, backdrop_path, logs
         else:
             logs += "🔴 graphis.ne.jp 头像获取失败！ "
     if not has_backdrop and EmbyAction.GRAPHIS_BACKDROP in emby_on:
-        if await download_file_with_filepath(big_pic, backdrop_path, actor_folder):
+        async with limits.photo:
+            downloaded = await download_file_with_filepath(big_pic, backdrop_path, actor_folder)
+        if downloaded:
             logs += "🍊 使用 graphis.ne.jp 背景！ "
-            await fix_pic_async(backdrop_path, backdrop_path)
+            await limits.prepare(backdrop_path, backdrop_path, crop=False)
         else:
             logs += "🔴 graphis.ne.jp 背景获取失败！ "
     return pic_path, backdrop_path, logs
 
 
-async def _update_emby_actor_photo_execute(actor_list: list[dict], gfriends_actor_data: dict[str, str]) -> None:
+def _photo_sync_task() -> str:
+    """头像同步的任务键, 影响头像来源和处理方式的设置变化后重新同步所有演员"""
+    config = manager.config
+    return "photo-" + settings_key(sorted(config.emby_on), config.gfriends_github, config.actor_photo_folder)
+
+
+async def _update_emby_actor_photo_execute(actor_list: list[dict], gfriends_actor_data: ActorPhotos) -> None:
+    """
+    并发更新演员头像. 每个演员上传完成后记录其图片标签, 中断后重新运行或再次同步时跳过图片未变化的演员.
+    """
     start_time = time.time()
-    emby_on = manager.config.emby_on
-    actor_folder = resources.u("actor")
+    config = manager.config
+    server = str(config.emby_url).rstrip("/")
+    task = _photo_sync_task()
+    state = get_emby_sync_state()
+    synced = await asyncio.to_thread(state.load, server, task)
 
-    i = 0
-    succ = 0
-    fail = 0
-    skip = 0
+    counts = {"succ": 0, "fail": 0, "skip": 0}
     count_all = len(actor_list)
-    for actor_js in actor_list:
-        i += 1
-        deal_percent = f"{i / count_all:.2%}"
-        # Emby 有头像时处理
-        actor_name = actor_js["Name"]
-        actor_imagetages = actor_js["ImageTags"]
-        actor_backdrop_imagetages = actor_js["BackdropImageTags"]
-        if " " in actor_name:
-            skip += 1
-            continue
-        actor_homepage, actor_person, pic_url, backdrop_url, backdrop_url_0, update_url = _generate_server_url(actor_js)
-        if actor_imagetages and EmbyAction.ACTOR_PHOTO_MISS in emby_on:
-            # self.show_log_text(f'\n{deal_percent} ✅ {i}/{count_all} 已有头像！跳过！ 👩🏻 {actor_name} \n{actor_homepage}')
-            skip += 1
-            continue
-
-        # 获取演员日文名字
-        actor_name_data = resources.get_actor_data(actor_name)
-        has_name = actor_name_data["has_name"]
-        jp_name = actor_name
-        if has_name:
-            jp_name = actor_name_data["jp"]
-
-        # graphis 判断
-        pic_path, backdrop_path, logs = None, None, ""
-        if (
-            EmbyAction.ACTOR_PHOTO_NET in emby_on
-            and has_name
-            and (EmbyAction.GRAPHIS_BACKDROP in emby_on or EmbyAction.GRAPHIS_FACE in emby_on)
-        ):
-            pic_path, backdrop_path, logs = await _get_graphis_pic(jp_name)
-
-        # 要上传的头像图片未找到时
-        if not pic_path:
-            pic_path = gfriends_actor_data.get(f"{jp_name}.jpg")
-            if not pic_path:
-                pic_path = gfriends_actor_data.get(f"{jp_name}.png")
-            if not pic_path:
-                if actor_imagetages:
-                    signal.show_log_text(
-                        f"\n{deal_percent} ✅ {i}/{count_all} 没有找到头像！继续使用原有头像！ 👩🏻 {actor_name} {logs}\n{actor_homepage}"
-                    )
-                    succ += 1
-                    continue
-                signal.show_log_text(
-                    f"\n{deal_percent} 🔴 {i}/{count_all} 没有找到头像！ 👩🏻 {actor_name}  {logs}\n{actor_homepage}"
+    done = 0
+    actors = iter(actor_list)
+
+    async def worker(limits: _PhotoSyncLimits):
+        nonlocal done
+        for actor_js in actors:
+            try:
+                result, msg, tag = await _update_actor_photo(
+                    actor_js, gfriends_actor_data, limits, synced.get(actor_js["Id"])
                 )
-                fail += 1
-                continue
-        else:
-            pass
-
-        # 头像需要下载时
-        if isinstance(pic_path, str) and "https://" in pic_path:
-            file_name = pic_path.split("/")[-1]
-            file_name = re.search(r"^[^?]+", file_name)
-            file_name = file_name.group(0) if file_name else f"{actor_name}.jpg"
-            file_path = actor_folder / file_name
-            if not await aiofiles.os.path.isfile(file_path):
-                if not await download_file_with_filepath(pic_path, file_path, actor_folder):
-                    signal.show_log_text(
-                        f"\n{deal_percent} 🔴 {i}/{count_all} 头像下载失败！ 👩🏻 {actor_name}  {logs}\n{actor_homepage}"
-                    )
-                    fail += 1
-                    continue
-            pic_path = file_path
-        pic_path = cast(Path, pic_path)
-
-        # 检查背景是否存在
-        if not backdrop_path:
-            backdrop_path = pic_path.with_name(pic_path.stem + "-big.jpg")
-            if not await aiofiles.os.path.isfile(backdrop_path):
-                await fix_pic_async(pic_path, backdrop_path)
-
-        # 检查图片尺寸并裁剪为2:3
-        await asyncio.to_thread(cut_pic, pic_path)
+            except Exception:
+                result, msg, tag = "fail", f"头像更新出错！ 👩🏻 {actor_js.get('Name')}\n{traceback.format_exc()}", ""
+            done += 1
+            counts[result] += 1
+            if tag:
+                await asyncio.to_thread(state.mark, server, task, actor_js["Id"], tag)
+            if msg:
+                icon = "🔴" if result == "fail" else "✅"
+                signal.show_log_text(f"\n{done / count_all:.2%} {icon} {done}/{count_all} {msg}")
+
+    workers = config.actor_photo_workers or min(4, os.cpu_count() or 1)
+    try:
+        pool = ProcessPoolExecutor(max_workers=workers)
+    except Exception:  # 部分环境不支持多进程, 改为在线程中处理
+        signal.show_traceback_log(traceback.format_exc())
+        pool = None
+    limits = _PhotoSyncLimits(
+        emby=asyncio.Semaphore(max(1, config.emby_concurrency)),
+        photo=asyncio.Semaphore(max(1, config.actor_photo_concurrency)),
+        pool=pool,
+    )
+    try:
+        await asyncio.gather(
+            *(worker(limits) for _ in range(max(config.emby_concurrency, config.actor_photo_concurrency, 1)))
+        )
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+    signal.show_log_text(
+        f"\n\n 🎉🎉🎉 演员头像补全完成！用时: {get_used_time(start_time)}秒 "
+        f"成功: {counts['succ']} 失败: {counts['fail']} 跳过: {counts['skip']}\n"
+    )
+
+
+async def _update_actor_photo(
+    actor_js: dict, gfriends_actor_data: ActorPhotos, limits: _PhotoSyncLimits, synced_tag: str | None
+) -> tuple[Literal["succ", "fail", "skip"], str, str]:
+    """
+    更新单个演员的头像.
 
+    Returns:
+        (结果, 日志, 上传后的图片标签哈希). 未上传时标签为空字符串
+    """
+    emby_on = manager.config.emby_on
+    actor_folder = resources.u("actor")
+    # Emby 有头像时处理
+    actor_name = actor_js["Name"]
+    actor_imagetages = actor_js["ImageTags"]
+    actor_backdrop_imagetages = actor_js["BackdropImageTags"]
+    if " " in actor_name:
+        return "skip", "", ""
+    actor_homepage, actor_person, pic_url, backdrop_url, backdrop_url_0, update_url = _generate_server_url(actor_js)
+    if actor_imagetages and EmbyAction.ACTOR_PHOTO_MISS in emby_on:
+        # self.show_log_text(f'\n{deal_percent} ✅ {i}/{count_all} 已有头像！跳过！ 👩🏻 {actor_name} \n{actor_homepage}')
+        return "skip", "", ""
+    # 上次同步后图片未变化
+    if actor_imagetages and synced_tag == image_tag_hash(actor_js):
+        return "skip", "", ""
+
+    # 获取演员日文名字
+    actor_name_data = resources.get_actor_data(actor_name)
+    has_name = actor_name_data["has_name"]
+    jp_name = actor_name
+    if has_name:
+        jp_name = actor_name_data["jp"]
+
+    # graphis 判断
+    pic_path, backdrop_path, logs = None, None, ""
+    if (
+        EmbyAction.ACTOR_PHOTO_NET in emby_on
+        and has_name
+        and (EmbyAction.GRAPHIS_BACKDROP in emby_on or EmbyAction.GRAPHIS_FACE in emby_on)
+    ):
+        pic_path, backdrop_path, logs = await _get_graphis_pic(jp_name, limits)
+
+    # 要上传的头像图片未找到时
+    if not pic_path:
+        pic_path = gfriends_actor_data.get(jp_name)
+        if not pic_path:
+            if actor_imagetages:
+                return "succ", f"没有找到头像！继续使用原有头像！ 👩🏻 {actor_name} {logs}\n{actor_homepage}", ""
+            return "fail", f"没有找到头像！ 👩🏻 {actor_name}  {logs}\n{actor_homepage}", ""
+
+    # 头像需要下载时
+    if isinstance(pic_path, str) and "https://" in pic_path:
+        file_name = pic_path.split("/")[-1]
+        file_name = re.search(r"^[^?]+", file_name)
+        file_name = file_name.group(0) if file_name else f"{actor_name}.jpg"
+        file_path = actor_folder / file_name
+        async with limits.file_lock(file_path):
+            if not await aiofiles.os.path.isfile(file_path):
+                async with limits.photo:
+                    downloaded = await download_file_with_filepath(pic_path, file_path, actor_folder)
+                if not downloaded:
+                    return "fail", f"头像下载失败！ 👩🏻 {actor_name}  {logs}\n{actor_homepage}", ""
+        pic_path = file_path
+    pic_path = Path(pic_path)
+
+    # 检查背景是否存在, 并将头像裁剪为2:3
+    new_backdrop = None
+    if not backdrop_path:
+        backdrop_path = pic_path.with_name(pic_path.stem + "-big.jpg")
+        if not await aiofiles.os.path.isfile(backdrop_path):
+            new_backdrop = backdrop_path
+    await limits.prepare(pic_path, new_backdrop)
+
+    async with limits.emby:
         # 清理旧图片（backdrop可以多张，不清理会一直累积）
         if actor_backdrop_imagetages:
             for _ in range(len(actor_backdrop_imagetages)):
@@ -376,47 +431,46 @@ async def _update_emby_actor_photo_execute(actor_list: list[dict], gfriends_acto
         r, err = await _upload_actor_photo(pic_url, pic_path)
         if not r:
             r, err = await _upload_actor_photo(backdrop_url, backdrop_path)
-        if r:
-            if not logs or logs == "🍊 graphis.ne.jp 无结果！":
-                if EmbyAction.ACTOR_PHOTO_NET in manager.config.emby_on:
-                    logs += " ✅ 使用 Gfriends 头像和背景！"
-                else:
-                    logs += " ✅ 使用本地头像库头像和背景！"
-            signal.show_log_text(
-                f"\n{deal_percent} ✅ {i}/{count_all} 头像更新成功！ 👩🏻 {actor_name}  {logs}\n{actor_homepage}"
-            )
-            succ += 1
+    if not r:
+        return "fail", f"头像上传失败！ 👩🏻 {actor_name}  {logs}\n{actor_homepage} {err}", ""
+
+    if not logs or logs == "🍊 graphis.ne.jp 无结果！":
+        if EmbyAction.ACTOR_PHOTO_NET in manager.config.emby_on:
+            logs += " ✅ 使用 Gfriends 头像和背景！"
         else:
-            signal.show_log_text(
-                f"\n{deal_percent} 🔴 {i}/{count_all} 头像上传失败！ 👩🏻 {actor_name}  {logs}\n{actor_homepage} {err}"
-            )
-            fail += 1
-    signal.show_log_text(
-        f"\n\n 🎉🎉🎉 演员头像补全完成！用时: {get_used_time(start_time)}秒 成功: {succ} 失败: {fail} 跳过: {skip}\n"
-    )
+            logs += " ✅ 使用本地头像库头像和背景！"
+    # 获取上传后的图片标签, 用于下次同步时判断图片是否变化
+    async with limits.emby:
+        person, _ = await manager.computed.async_client.get_json(actor_person, use_proxy=False)
+    tag = image_tag_hash(person) if isinstance(person, dict) else ""
+    return "succ", f"头像更新成功！ 👩🏻 {actor_name}  {logs}\n{actor_homepage}", tag
 
 
-def _get_local_actor_photo() -> dict[str, str] | Literal[False]:
+def _get_local_actor_photo() -> ActorPhotos | Literal[False]:
     """This function is intended to be sync."""
     actor_photo_folder = manager.config.actor_photo_folder
     if actor_photo_folder == "" or not os.path.isdir(actor_photo_folder):
         signal.show_log_text("🔴 本地头像库文件夹不存在！补全已停止！")
         signal.show_log_text("================================================================================")
         return False
+
+    # 文件夹未变化时直接使用索引
+    index = get_actor_photo_index()
+    source = f"local:{os.path.abspath(actor_photo_folder)}"
+    version = folder_version(actor_photo_folder)
+    local = index.version(source)
+    if local is not None and local[0] == version:
+        photos = index.load(source)
     else:
-        local_actor_photo_dic = {}
-        all_files = os.walk(actor_photo_folder)
-        for root, dirs, files in all_files:
-            for file in files:
-                if (file.endswith("jpg") or file.endswith("png")) and file not in local_actor_photo_dic:
-                    pic_path = os.path.join(root, file)
-                    local_actor_photo_dic[file] = pic_path
-
-        if not local_actor_photo_dic:
-            signal.show_log_text("🔴 本地头像库文件夹未发现头像图片！请把图片放到文件夹中！")
-            signal.show_log_text("================================================================================")
-            return False
-        return local_actor_photo_dic
+        photos = index_folder(actor_photo_folder)
+        index.replace(source, version, photos)
+        photos = ActorPhotos(photos)
+
+    if not len(photos):
+        signal.show_log_text("🔴 本地头像库文件夹未发现头像图片！请把图片放到文件夹中！")
+        signal.show_log_text("================================================================================")
+        return False
+    return photos
 
 
 if __name__ == "__main__":
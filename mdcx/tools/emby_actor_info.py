@@ -8,9 +8,11 @@ import re
 import shutil
 import time
 import traceback
+from dataclasses import fields
 
 import aiofiles
 import aiofiles.os
+from aiolimiter import AsyncLimiter
 from lxml import etree
 
 from ..base.web import download_file_with_filepath
@@ -22,14 +24,16 @@ from ..models.emby import EMbyActressInfo
 from ..signals import signal
 from ..utils import get_used_time
 from ..utils.file import copy_file_async
-from .actress_db import ActressDB
+from .actress_db import ActressDB, ActressRecord
 from .emby_actor_image import (
     _generate_server_url,
     _get_emby_actor_list,
     _get_gfriends_actor_data,
     update_emby_actor_photo,
 )
-from .wiki import get_detail, search_wiki
+from .emby_sync import settings_key
+from .wiki import WikidataResolver, WikiRequestError, get_detail, search_wiki
+from .wiki_cache import WIKI_CACHE_TTL, WIKI_MISS_TTL, get_wiki_cache
 
 
 async def creat_kodi_actors(add: bool) -> None:
@@ -56,27 +60,36 @@ async def update_emby_actor_info() -> None:
     server_name = "Emby" if "emby" == manager.config.server_type else "Jellyfin"
     signal.show_log_text(f"👩🏻 开始补全 {server_name} 演员信息...")
 
-    actor_list = await _get_emby_actor_list()
-    tasks = []
-
+    # 演员简介随列表分页获取, 无需逐个请求演员详情
+    actor_list = await _get_emby_actor_list(fields="Overview")
+    actors = []
     for actor in actor_list:
         actor_name = actor.get("Name")
         # 名字含有空格时跳过
         if re.search(r"[ .·・-]", actor_name):
             signal.show_log_text(f"🔍 {actor_name}: 名字含有空格等分隔符，识别为非女优，跳过！")
             continue
-        task = asyncio.create_task(_process_actor_async(actor, emby_on))
-        tasks.append(task)
+        actors.append(actor)
 
+    job = _ActorInfoJob(emby_on)
+    if manager.config.use_database:
+        # 一次查询所有演员的数据库信息
+        job.db_records = await asyncio.to_thread(ActressDB.lookup, [a["Name"] for a in actors])
     db = 0
     wiki = 0
     updated = 0
-    for task in asyncio.as_completed(tasks):
-        flag, msg = await task
-        updated += flag != 0
-        wiki += flag & 1
-        db += flag >> 1
-        signal.show_log_text(msg)
+    pending = iter(actors)
+
+    async def worker():
+        nonlocal db, wiki, updated
+        for actor in pending:
+            flag, msg = await job.process(actor)
+            updated += flag != 0
+            wiki += flag & 1
+            db += flag >> 1
+            signal.show_log_text(msg)
+
+    await asyncio.gather(*(worker() for _ in range(max(1, manager.config.emby_concurrency))))
 
     signal.show_log_text(
         f"\n🎉🎉🎉 补全完成！！！ 用时 {get_used_time(start_time)} 秒 共更新: {updated} Wiki 获取: {wiki} 数据库: {db}"
@@ -93,59 +106,103 @@ async def update_emby_actor_info() -> None:
         signal.reset_buttons_status.emit()
 
 
-async def _process_actor_async(actor: dict, emby_on: list[EmbyAction]) -> tuple[int, str]:
-    """异步处理单个演员信息"""
-    actor_name = actor.get("Name", "Unknown Actor")
-    try:
-        server_id = actor.get("ServerId", "")
-        actor_id = actor.get("Id", "")
-        # 已有资料时跳过
-        actor_homepage, actor_person, _, _, _, update_url = _generate_server_url(actor)
-        res, error = await manager.computed.async_client.get_json(actor_person, use_proxy=False)
-        if res is None:
-            return 0, f"🔴 {actor_name}: Emby/Jellyfin 获取演员信息错误！\n    错误信息: {error}"
-
-        overview = res.get("Overview", "")
-        if overview and "无维基百科信息" not in overview and EmbyAction.ACTOR_INFO_MISS in emby_on:
-            return 0, f"✅ {actor_name}: Emby/Jellyfin 已有演员信息！跳过！"
-
-        actor_info = EMbyActressInfo(name=actor_name, server_id=server_id, id=actor_id)
-        db_exist = 0
-        wiki_found = 0
-        # wiki
-        logs = []
-        res, msg = await search_wiki(actor_info)
-        logs.append(msg)
-        if res is not None:
-            result, error = await get_detail(res, msg, actor_info)
-            if result:  # 成功
-                wiki_found = 1
-        # db
-        if manager.config.use_database:
-            if "数据库补全" in overview and EmbyAction.ACTOR_INFO_MISS in emby_on:  # 已有数据库信息
-                db_exist = 0
-                logs.append(f"{actor_name}: 已有数据库信息")
-            else:
-                db_exist, msg = ActressDB.update_actor_info_from_db(actor_info)
-                logs.append(msg)
-        # summary
-        summary = "\n    " + "\n".join(logs) if logs else ""
-        if db_exist or wiki_found:
-            res, error = await manager.computed.async_client.post_text(
-                update_url, json_data=actor_info.dump(), use_proxy=False
+# 缓存的演员信息字段
+_WIKI_FIELDS = [f.name for f in fields(EMbyActressInfo) if f.name not in ("name", "server_id", "id")]
+
+
+class _ActorInfoJob:
+    """
+    补全演员信息任务. 维基百科查询结果按名字缓存, 同名演员并发处理时只查询一次; 更新请求按设置的速率发送.
+    """
+
+    def __init__(self, emby_on: list[EmbyAction]):
+        self.emby_on = emby_on
+        self.cache = get_wiki_cache()
+        # 语言和翻译设置影响查询结果, 设置变化后不使用此前的缓存
+        self.namespace = "actor-" + settings_key(
+            sorted(emby_on),
+            manager.config.translate_config.translate_by if EmbyAction.ACTOR_INFO_TRANSLATE in emby_on else [],
+        )
+        rate = manager.config.emby_update_rate
+        self.limiter = AsyncLimiter(rate, 1) if rate > 0 else None
+        # 并发处理的演员共用, 合并 Wikidata 实体请求
+        self.resolver = WikidataResolver(self.cache)
+        self._locks: dict[str, asyncio.Lock] = {}
+        self.db_records: dict[str, ActressRecord] = {}
+
+    async def search(self, actor_info: EMbyActressInfo) -> tuple[bool, str]:
+        """查询维基百科并填充 actor_info, 返回是否获取到详情及日志"""
+        name = actor_info.name
+        async with self._locks.setdefault(name, asyncio.Lock()):
+            cached = await asyncio.to_thread(self.cache.get, self.namespace, name)
+            if cached is not None:
+                for k in _WIKI_FIELDS:
+                    setattr(actor_info, k, cached["info"][k])
+                return cached["found"], cached["msg"] + " (缓存)"
+
+            found = False
+            try:
+                res, msg = await search_wiki(actor_info, self.resolver)
+                if res is not None:
+                    found, _ = await get_detail(res, msg, actor_info)
+            except WikiRequestError as e:
+                # 请求失败的结果不缓存
+                return False, str(e)
+            value = {"found": found, "msg": msg, "info": {k: getattr(actor_info, k) for k in _WIKI_FIELDS}}
+            await asyncio.to_thread(
+                self.cache.set, self.namespace, name, value, WIKI_CACHE_TTL if found else WIKI_MISS_TTL
             )
-            if res is not None:
-                return (
-                    wiki_found + (db_exist << 1),
-                    f"✅ {actor_name} 更新成功.{summary}\n主页: {actor_homepage}",
-                )
+            return found, msg
+
+    async def update(self, url: str, actor_info: EMbyActressInfo) -> tuple[str | None, str]:
+        if self.limiter is None:
+            return await manager.computed.async_client.post_text(url, json_data=actor_info.dump(), use_proxy=False)
+        async with self.limiter:
+            return await manager.computed.async_client.post_text(url, json_data=actor_info.dump(), use_proxy=False)
+
+    async def process(self, actor: dict) -> tuple[int, str]:
+        """处理单个演员信息"""
+        emby_on = self.emby_on
+        actor_name = actor.get("Name", "Unknown Actor")
+        try:
+            server_id = actor.get("ServerId", "")
+            actor_id = actor.get("Id", "")
+            # 已有资料时跳过
+            actor_homepage, _, _, _, _, update_url = _generate_server_url(actor)
+            overview = actor.get("Overview", "")
+            if overview and "无维基百科信息" not in overview and EmbyAction.ACTOR_INFO_MISS in emby_on:
+                return 0, f"✅ {actor_name}: Emby/Jellyfin 已有演员信息！跳过！"
+
+            actor_info = EMbyActressInfo(name=actor_name, server_id=server_id, id=actor_id)
+            db_exist = 0
+            # wiki
+            logs = []
+            wiki_found, msg = await self.search(actor_info)
+            logs.append(msg)
+            # db
+            if manager.config.use_database:
+                if "数据库补全" in overview and EmbyAction.ACTOR_INFO_MISS in emby_on:  # 已有数据库信息
+                    db_exist = 0
+                    logs.append(f"{actor_name}: 已有数据库信息")
+                else:
+                    db_exist, msg = ActressDB.apply_record(actor_info, self.db_records.get(actor_name))
+                    logs.append(msg)
+            # summary
+            summary = "\n    " + "\n".join(logs) if logs else ""
+            if db_exist or wiki_found:
+                res, error = await self.update(update_url, actor_info)
+                if res is not None:
+                    return (
+                        int(wiki_found) + (db_exist << 1),
+                        f"✅ {actor_name} 更新成功.{summary}\n主页: {actor_homepage}",
+                    )
+                else:
+                    return 0, f"🔴 {actor_name} 更新失败: {error}{summary}"
             else:
-                return 0, f"🔴 {actor_name} 更新失败: {error}{summary}"
-        else:
-            return 0, f"🔴 {actor_name}: 未检索到演员信息！跳过！"
+                return 0, f"🔴 {actor_name}: 未检索到演员信息！跳过！"
 
-    except Exception:
-        return 0, f"🔴 {actor_name} 未知异常:\n    {traceback.format_exc()}"
+        except Exception:
+            return 0, f"🔴 {actor_name} 未知异常:\n    {traceback.format_exc()}"
 
 
 async def show_emby_actor_list(mode: int) -> None:
@@ -172,7 +229,8 @@ async def show_emby_actor_list(mode: int) -> None:
     elif mode == 9:
         signal.show_log_text("🚀 开始查询 没头像 的演员列表...")
 
-    actor_list = await _get_emby_actor_list()
+    # 演员简介随列表分页获取, 无需逐个请求演员详情
+    actor_list = await _get_emby_actor_list(fields="Overview" if mode <= 7 else "")
     if actor_list:
         count = 1
         succ_pic = 0
@@ -189,9 +247,7 @@ async def show_emby_actor_list(mode: int) -> None:
         for actor_js in actor_list:
             actor_name = actor_js["Name"]
             actor_imagetages = actor_js["ImageTags"]
-            actor_homepage, actor_person, pic_url, backdrop_url, backdrop_url_0, update_url = _generate_server_url(
-                actor_js
-            )
+            actor_homepage, _, _, _, _, _ = _generate_server_url(actor_js)
             # http://192.168.5.191:8096/web/index.html#!/item?id=2146&serverId=57cdfb2560294a359d7778e7587cdc98
 
             if actor_imagetages:
@@ -213,14 +269,7 @@ async def show_emby_actor_list(mode: int) -> None:
                     logs = ""
                 count += 1
             else:
-                # http://192.168.5.191:8096/emby/Persons/梦乃爱华?api_key=ee9a2f2419704257b1dd60b975f2d64e
-                res, error = await manager.computed.async_client.get_json(actor_person, use_proxy=False)
-                if res is None:
-                    signal.show_log_text(
-                        f"\n🔴 {count}/{total} Emby 获取演员信息错误！👩🏻 {actor_name} \n    错误信息: {error}"
-                    )
-                    continue
-                overview = res.get("Overview")
+                overview = actor_js.get("Overview")
 
                 if overview:
                     succ_info += 1
@@ -341,7 +390,7 @@ async def _deal_kodi_actors(gfriends_actor_data, add):
                             actor_name_list = resources.get_actor_data(each)["keyword"]
                             for actor_name in actor_name_list:
                                 if actor_name:
-                                    net_pic_path = gfriends_actor_data.get(f"{actor_name}.jpg")
+                                    net_pic_path = gfriends_actor_data.get(actor_name)
                                     if net_pic_path:
                                         vedio_actor_path = os.path.join(vedio_actor_folder, each + ".jpg")
                                         if await aiofiles.os.path.isfile(vedio_actor_path):
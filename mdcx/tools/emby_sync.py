@@ -0,0 +1,78 @@
+"""
+Emby/Jellyfin 演员同步进度. 记录每个演员同步完成时的图片标签, 中断后重新运行时跳过已完成且未变化的演员.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+from ..config.resources import resources
+
+
+def image_tag_hash(actor_js: dict[str, Any]) -> str:
+    """计算演员当前图片标签的哈希, 服务器上的头像或背景变化时哈希随之变化."""
+    tags = {"p": actor_js.get("ImageTags") or {}, "b": actor_js.get("BackdropImageTags") or []}
+    return hashlib.sha1(json.dumps(tags, sort_keys=True).encode()).hexdigest()
+
+
+def settings_key(*values: Any) -> str:
+    """根据影响同步结果的设置生成任务键, 设置变化后此前的记录不再生效."""
+    return hashlib.sha1(json.dumps(values, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+class EmbySyncState:
+    """
+    按 (服务器, 任务, 演员 Id) 保存同步完成时的标签.
+
+    此类线程安全.
+    """
+
+    def __init__(self, db_path: str | Path):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "create table if not exists synced ("
+                "server text not null, task text not null, actor_id text not null, tag text not null, "
+                "updated real not null, primary key (server, task, actor_id))"
+            )
+
+    def load(self, server: str, task: str) -> dict[str, str]:
+        """返回任务已完成的演员 Id 及对应标签."""
+        with self._lock:
+            rows = self._conn.execute(
+                "select actor_id, tag from synced where server = ? and task = ?", (server, task)
+            ).fetchall()
+        return dict(rows)
+
+    def mark(self, server: str, task: str, actor_id: str, tag: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "insert or replace into synced values (?, ?, ?, ?, ?)", (server, task, actor_id, tag, time.time())
+            )
+
+    def clear(self, server: str, task: str | None = None) -> None:
+        with self._lock, self._conn:
+            if task is None:
+                self._conn.execute("delete from synced where server = ?", (server,))
+            else:
+                self._conn.execute("delete from synced where server = ? and task = ?", (server, task))
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_sync_state: EmbySyncState | None = None
+
+
+def get_emby_sync_state() -> EmbySyncState:
+    """获取同步进度存储, 首次调用时打开用户数据目录下的数据库."""
+    global _sync_state
+    if _sync_state is None:
+        _sync_state = EmbySyncState(resources.u("emby_sync.db"))
+    return _sync_state
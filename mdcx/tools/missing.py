@@ -2,21 +2,23 @@
 查找指定演员缺少作品
 """
 
-import json
+import asyncio
 import re
+import sqlite3
+import threading
 import time
 from pathlib import Path
-from typing import cast
+from typing import NamedTuple
 
 import aiofiles
 import aiofiles.os
 from lxml import etree
 
 from ..base.file import movie_lists
+from ..base.library import get_library_index
 from ..config.manager import manager
 from ..config.resources import resources
 from ..core.file import get_file_info_v2
-from ..models.flags import Flags
 from ..signals import signal
 from ..utils import get_used_time
 
@@ -35,87 +37,190 @@ async def _scraper_web(url):
     return html
 
 
-async def _get_actor_numbers(actor_url, actor_single_url):
+# JAVDB 仅能返回前 60 页
+MAX_PAGES = 60
+# 同时请求的页数上限, 请求速率另受 JAVDB 域名的限速约束
+PAGE_CONCURRENCY = 4
+# 同时解析 NFO 的文件数
+LOCAL_NUMBER_CONCURRENCY = 16
+# 增量更新不会刷新旧作品的磁力和字幕状态, 超过此时间后完整获取一次
+FULL_REFRESH_INTERVAL = 7 * 24 * 3600
+
+
+class ActorWork(NamedTuple):
+    number: str
+    date: str  # YYYY/MM/DD
+    url: str
+    download_info: str
+    title: str
+
+
+class ActorCatalogue:
     """
-    获取演员的番号列表
+    演员作品目录缓存. 保存每个演员在 JAVDB 的作品及单体作品, 再次查询时只需获取新作品所在的分页.
+
+    此类线程安全.
     """
-    # 获取单体番号
-    next_page = True
-    number_single_list = set()
-    i = 1
-    while next_page:
-        page_url = f"{actor_url}?page={i}&t=s"
-        html, error = await manager.computed.async_client.get_text(page_url)
-        if html is None:
-            html, error = await manager.computed.async_client.get_text(page_url)
-        if html is None:
-            return
-        if "pagination-next" not in html or i >= 60:
-            next_page = False
-            if i == 60:
-                signal.show_log_text("   已达 60 页上限！！！（JAVDB 仅能返回该演员的前 60 页数据！）")
-        html = etree.fromstring(html, etree.HTMLParser())
-        actor_info = html.xpath('//a[@class="box"]')
-        for each in actor_info:
-            video_number = each.xpath('div[@class="video-title"]/strong/text()')[0]
-            number_single_list.add(video_number)
-        i += 1
-    Flags.actor_numbers_dic[actor_single_url] = number_single_list
-
-    # 获取全部番号
-    next_page = True
-    i = 1
-    while next_page:
-        page_url = f"{actor_url}?page={i}"
-        html = await _scraper_web(page_url)
-        if len(html) < 1:
-            return
-        if "pagination-next" not in html or i >= 60:
-            next_page = False
-            if i == 60:
-                signal.show_log_text("   已达 60 页上限！！！（JAVDB 仅能返回该演员的前 60 页数据！）")
-        html = etree.fromstring(html, etree.HTMLParser(encoding="utf-8"))
-        actor_info = html.xpath('//a[@class="box"]')
-        for each in actor_info:
-            video_number = each.xpath('div[@class="video-title"]/strong/text()')[0]
-            video_title = each.xpath('div[@class="video-title"]/text()')[0]
-            video_date = each.xpath('div[@class="meta"]/text()')[0].strip()
-            video_url = "https://javdb.com" + each.get("href")
-            video_download_link = each.xpath('div[@class="tags has-addons"]/span[@class="tag is-success"]/text()')
-            video_sub_link = each.xpath('div[@class="tags has-addons"]/span[@class="tag is-warning"]/text()')
-            download_info = "   "
-            if video_sub_link:
-                download_info = "🧲  🀄️"
-            elif video_download_link:
-                download_info = "🧲    "
-            single_info = "单体" if video_number in number_single_list else "\u3000\u3000"
-            time_list = re.split(r"[./-]", video_date)
-            if len(time_list[0]) == 2:
-                video_date = f"{time_list[2]}/{time_list[0]}/{time_list[1]}"
-            else:
-                video_date = f"{time_list[0]}/{time_list[1]}/{time_list[2]}"
-            Flags.actor_numbers_dic[actor_url].update(
-                {video_number: [video_number, video_date, video_url, download_info, video_title, single_info]}
+
+    def __init__(self, db_path: str | Path):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "create table if not exists works ("
+                "actor_url text not null, number text not null, date text not null, url text not null, "
+                "download_info text not null, title text not null, primary key (actor_url, number))"
             )
-        i += 1
+            self._conn.execute(
+                "create table if not exists singles ("
+                "actor_url text not null, number text not null, date text not null, primary key (actor_url, number))"
+            )
+            self._conn.execute(
+                "create table if not exists actors (actor_url text primary key, full_updated real not null)"
+            )
+
+    def load(self, actor_url: str) -> tuple[dict[str, ActorWork], dict[str, str], float]:
+        """返回 (作品, 单体番号 -> 日期, 上次完整获取的时间). 未缓存时时间为 0"""
+        with self._lock:
+            works = self._conn.execute(
+                "select number, date, url, download_info, title from works where actor_url = ?", (actor_url,)
+            ).fetchall()
+            singles = self._conn.execute(
+                "select number, date from singles where actor_url = ?", (actor_url,)
+            ).fetchall()
+            row = self._conn.execute("select full_updated from actors where actor_url = ?", (actor_url,)).fetchone()
+        return {w[0]: ActorWork(*w) for w in works}, dict(singles), row[0] if row else 0
 
+    def save(self, actor_url: str, works: list[ActorWork], singles: list[ActorWork], full: bool) -> None:
+        """
+        保存新获取的作品. 完整获取时替换该演员的全部数据.
+        """
+        with self._lock, self._conn:
+            if full:
+                self._conn.execute("delete from works where actor_url = ?", (actor_url,))
+                self._conn.execute("delete from singles where actor_url = ?", (actor_url,))
+                self._conn.execute("insert or replace into actors values (?, ?)", (actor_url, time.time()))
+            self._conn.executemany(
+                "insert or replace into works values (?, ?, ?, ?, ?, ?)", ((actor_url, *w) for w in works)
+            )
+            self._conn.executemany(
+                "insert or replace into singles values (?, ?, ?)", ((actor_url, w.number, w.date) for w in singles)
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_catalogue: ActorCatalogue | None = None
+
+
+def get_actor_catalogue() -> ActorCatalogue:
+    """获取演员作品目录缓存, 首次调用时打开用户数据目录下的数据库."""
+    global _catalogue
+    if _catalogue is None:
+        _catalogue = ActorCatalogue(resources.u("actor_catalogue.db"))
+    return _catalogue
+
+
+def _parse_page(html: str) -> tuple[list[ActorWork], bool]:
+    """解析演员作品列表页, 返回作品及是否有下一页"""
+    tree = etree.fromstring(html, etree.HTMLParser(encoding="utf-8"))
+    works = []
+    for each in tree.xpath('//a[@class="box"]'):
+        video_number = each.xpath('div[@class="video-title"]/strong/text()')[0]
+        video_title = each.xpath('div[@class="video-title"]/text()')
+        video_date = each.xpath('div[@class="meta"]/text()')[0].strip()
+        video_url = "https://javdb.com" + each.get("href")
+        video_download_link = each.xpath('div[@class="tags has-addons"]/span[@class="tag is-success"]/text()')
+        video_sub_link = each.xpath('div[@class="tags has-addons"]/span[@class="tag is-warning"]/text()')
+        download_info = "   "
+        if video_sub_link:
+            download_info = "🧲  🀄️"
+        elif video_download_link:
+            download_info = "🧲    "
+        time_list = re.split(r"[./-]", video_date)
+        if len(time_list[0]) == 2:
+            video_date = f"{time_list[2]}/{time_list[0]}/{time_list[1]}"
+        else:
+            video_date = f"{time_list[0]}/{time_list[1]}/{time_list[2]}"
+        works.append(
+            ActorWork(video_number, video_date, video_url, download_info, video_title[0] if video_title else "")
+        )
+    return works, "pagination-next" in html
 
-async def _get_actor_missing_numbers(actor_name, actor_url, actor_flag):
+
+async def _fetch_pages(page_url: str, stop_date: str) -> list[ActorWork] | None:
+    """
+    按顺序获取演员作品分页. 每批同时请求多页, 首批只请求 1 页, 之后逐批加倍.
+
+    到达最后一页或遇到早于 stop_date 的作品 (之后的分页已缓存) 时停止. 请求失败时返回 None.
+    """
+    works: list[ActorWork] = []
+    page = 1
+    size = 1
+    while page <= MAX_PAGES:
+        pages = range(page, min(page + size, MAX_PAGES + 1))
+        htmls = await asyncio.gather(*(_scraper_web(page_url.format(page=i)) for i in pages))
+        for i, html in zip(pages, htmls, strict=True):
+            if not html:
+                return None
+            items, has_next = _parse_page(html)
+            works.extend(items)
+            if not has_next or (stop_date and any(w.date < stop_date for w in items)):
+                return works
+            if i == MAX_PAGES:
+                signal.show_log_text("   已达 60 页上限！！！（JAVDB 仅能返回该演员的前 60 页数据！）")
+        page += size
+        size = min(size * 2, PAGE_CONCURRENCY)
+    return works
+
+
+async def _get_actor_numbers(actor_url: str) -> tuple[dict[str, ActorWork], set[str]] | None:
+    """
+    获取演员的番号列表及单体番号. 已缓存时只获取比缓存中最新作品更新的分页.
+    """
+    catalogue = get_actor_catalogue()
+    works, singles, full_updated = await asyncio.to_thread(catalogue.load, actor_url)
+    full = time.time() - full_updated > FULL_REFRESH_INTERVAL
+    newest = "" if full else max((w.date for w in works.values()), default="")
+    single_newest = "" if full else max(singles.values(), default="")
+
+    # 获取单体番号和全部番号
+    new_singles, new_works = await asyncio.gather(
+        _fetch_pages(f"{actor_url}?page={{page}}&t=s", single_newest),
+        _fetch_pages(f"{actor_url}?page={{page}}", newest),
+    )
+    if new_singles is None or new_works is None:
+        if not works:
+            return None
+        signal.show_log_text("   🔴 获取最新作品失败，使用本地缓存的番号列表！")
+        return works, set(singles)
+    await asyncio.to_thread(catalogue.save, actor_url, new_works, new_singles, full)
+    if full:
+        works, singles = {}, {}
+    works.update((w.number, w) for w in new_works)
+    singles.update((w.number, w.date) for w in new_singles)
+    return works, set(singles)
+
+
+async def _get_actor_missing_numbers(
+    actor_name: str, actor_url: str, actor_flag: bool, local_numbers: set[str], local_cnword_numbers: set[str]
+):
     """
     获取演员缺少的番号列表
     """
     start_time = time.time()
-    actor_single_url = actor_url + "?t=s"
 
-    # 获取演员的所有番号，如果字典有，就从字典读取，否则去网络请求
-    if not Flags.actor_numbers_dic.get(actor_url):
-        Flags.actor_numbers_dic[actor_url] = {}
-        Flags.actor_numbers_dic[actor_single_url] = {}  # 单体作品
-        await _get_actor_numbers(actor_url, actor_single_url)  # 如果字典里没有该演员主页的番号，则从网络获取演员番号
+    # 获取演员的所有番号, 本地已缓存时只获取新作品
+    result = await _get_actor_numbers(actor_url)
+    if result is None:
+        signal.show_log_text(f"🔴 获取 [ {actor_name} ] 的番号列表失败！")
+        return
+    actor_info, single_set = result
 
     # 演员信息排版和显示
-    actor_info = Flags.actor_numbers_dic.get(actor_url)
-    len_single = len(Flags.actor_numbers_dic.get(actor_single_url))
+    len_single = len(single_set)
     signal.show_log_text(
         f"🎉 获取完毕！共找到 [ {actor_name} ] 番号数量（{len(actor_info)}）单体数量（{len_single}）({get_used_time(start_time)}s)"
     )
@@ -126,7 +231,8 @@ async def _get_actor_missing_numbers(actor_name, actor_url, actor_flag):
         not_download_magnet_list = set()
         not_download_cnword_list = set()
         for actor_number in actor_numbers:
-            video_number, video_date, video_url, download_info, video_title, single_info = actor_info.get(actor_number)
+            video_number, video_date, video_url, download_info, video_title = actor_info[actor_number]
+            single_info = "单体" if video_number in single_set else "\u3000\u3000"
             if actor_flag:
                 video_url = video_title[:30]
             space_char = "　"  # 全角空格
@@ -134,14 +240,14 @@ async def _get_actor_missing_numbers(actor_name, actor_url, actor_flag):
                 f"{video_date:>13}  {video_number:<10} {single_info}  {download_info:{space_char}>5}   {video_url}"
             )
             all_list.add(number_str)
-            if actor_number not in Flags.local_number_set:
+            if actor_number not in local_numbers:
                 not_download_list.add(number_str)
                 if "🧲" in download_info:
                     not_download_magnet_list.add(number_str)
 
                 if "🀄️" in download_info:
                     not_download_cnword_list.add(number_str)
-            elif actor_number not in Flags.local_number_cnword_set and "🀄️" in download_info:
+            elif actor_number not in local_cnword_numbers and "🀄️" in download_info:
                 not_download_cnword_list.add(number_str)
 
         all_list = sorted(all_list, reverse=True)
@@ -182,13 +288,44 @@ async def _get_actor_missing_numbers(actor_name, actor_url, actor_flag):
             signal.show_log_text("🎉 没有缺少的番号...\n")
 
 
+def _stat_files(movies: list[Path]) -> dict[str, tuple[int, int]]:
+    """返回 路径 -> (大小, 修改时间 ns), 忽略无法访问的文件"""
+    files = {}
+    for movie in movies:
+        try:
+            st = movie.stat()
+        except OSError:
+            continue
+        files[movie.as_posix()] = (st.st_size, st.st_mtime_ns)
+    return files
+
+
+async def _get_local_number(movie: Path) -> tuple[str, bool]:
+    """从 NFO 读取番号和是否有字幕, 没有 NFO 时根据文件名获取"""
+    nfo_path = movie.with_suffix(".nfo")
+    number = ""
+    has_sub = False
+    if await aiofiles.os.path.exists(nfo_path):
+        async with aiofiles.open(nfo_path, encoding="utf-8") as f:
+            nfo_content = await f.read()
+        number_result = re.findall(r"<num>(.+)</num>", nfo_content)
+        if number_result:
+            number = number_result[0]
+            has_sub = "<genre>中文字幕</genre>" in nfo_content or "<tag>中文字幕</tag>" in nfo_content
+    if not number:
+        file_info = await get_file_info_v2(movie, copy_sub=False)
+        has_sub = file_info.has_sub
+        number = file_info.number
+    temp_number = re.findall(r"\d{3,}([a-zA-Z]+-\d+)", number)  # 去除前缀，因为 javdb 不带前缀
+    return temp_number[0] if temp_number else number, has_sub
+
+
 async def check_missing_number(actor_flag):
     """
     检查缺失番号
     """
     signal.change_buttons_status.emit()
     start_time = time.time()
-    local_movies: dict[str, tuple[str, bool]] = {}
 
     # 获取资源库配置
     movie_type = manager.config.media_type
@@ -209,58 +346,26 @@ async def check_missing_number(actor_flag):
     # 获取本地番号
     start_time_local = time.time()
     signal.show_log_text("\n>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>\n⏳ 开始获取本地视频的番号信息...")
-    local_number_list = resources.u("number_list.json")
-    if not await aiofiles.os.path.exists(local_number_list):
+    index = get_library_index()
+    files = await asyncio.to_thread(_stat_files, all_movies)
+    pending = await asyncio.to_thread(index.sync_local_numbers, files)
+    if pending:
         signal.show_log_text(
-            "   提示：正在生成本地视频的番号信息数据...（第一次较慢，请耐心等待，以后只需要查找新视频，速度很快）"
+            f"   提示：正在获取 {len(pending)} 个新视频的番号信息...（以后只需要查找新视频，速度很快）"
         )
-        async with aiofiles.open(local_number_list, "w", encoding="utf-8") as f:
-            await f.write("{}")
-    async with aiofiles.open(local_number_list, encoding="utf-8") as data:
-        json_data = json.loads(await data.read())
-        json_data = cast("dict[str, tuple[str, bool]]", json_data)
-    for movie in all_movies:
-        nfo_path = movie.with_suffix(".nfo")
-        number = ""
-        has_sub = False
-        if r := json_data.get(movie.as_posix()):
-            number, has_sub = r
-        else:
-            if await aiofiles.os.path.exists(nfo_path):
-                async with aiofiles.open(nfo_path, encoding="utf-8") as f:
-                    nfo_content = await f.read()
-                number_result = re.findall(r"<num>(.+)</num>", nfo_content)
-                if number_result:
-                    number = number_result[0]
-
-                    if "<genre>中文字幕</genre>" in nfo_content or "<tag>中文字幕</tag>" in nfo_content:
-                        has_sub = True
-                    else:
-                        has_sub = False
-            if not number:
-                file_info = await get_file_info_v2(movie, copy_sub=False)
-                has_sub = file_info.has_sub
-                number = file_info.number
+        semaphore = asyncio.Semaphore(LOCAL_NUMBER_CONCURRENCY)
+
+        async def _parse(path: str) -> tuple[str, int, int, str, bool]:
+            async with semaphore:
+                number, has_sub = await _get_local_number(Path(path))
             cn_word_icon = "🀄️" if has_sub else ""
             signal.show_log_text(f"   发现新番号：{number:<10} {cn_word_icon}")
-        temp_number = re.findall(r"\d{3,}([a-zA-Z]+-\d+)", number)  # 去除前缀，因为 javdb 不带前缀
-        number = temp_number[0] if temp_number else number
-        local_movies[movie.as_posix()] = (number, has_sub)  # 用新表，更新完重新写入到本地文件中
-        Flags.local_number_set.add(number)  # 添加到本地番号集合
-        if has_sub:
-            Flags.local_number_cnword_set.add(number)  # 添加到本地有字幕的番号集合
-
-    async with aiofiles.open(local_number_list, "w", encoding="utf-8") as f:
-        await f.write(
-            json.dumps(
-                local_movies,
-                ensure_ascii=False,
-                sort_keys=True,
-                indent=4,
-                separators=(",", ": "),
-            )
-        )
-    signal.show_log_text(f"🎉 获取完毕！共获取番号数量（{len(local_movies)}）({get_used_time(start_time_local)}s)")
+            return (path, *files[path], number, has_sub)
+
+        rows = await asyncio.gather(*(_parse(p) for p in pending))
+        await asyncio.to_thread(index.set_local_numbers, rows)
+    local_numbers, local_cnword_numbers = await asyncio.to_thread(index.local_number_sets)
+    signal.show_log_text(f"🎉 获取完毕！共获取番号数量（{len(files)}）({get_used_time(start_time_local)}s)")
 
     # 查询演员番号
     if manager.config.actors_name:
@@ -276,7 +381,7 @@ async def check_missing_number(actor_flag):
                 signal.show_log_text(
                     f"\n>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>\n⏳ 从 JAVDB 获取 [ {actor_name} ] 的所有番号列表..."
                 )
-                await _get_actor_missing_numbers(actor_name, actor_url, actor_flag)
+                await _get_actor_missing_numbers(actor_name, actor_url, actor_flag, local_numbers, local_cnword_numbers)
             else:
                 signal.show_log_text(
                     f"\n🔴 未找到 [ {actor_name} ] 的主页地址，你可以填写演员的 JAVDB 主页地址替换演员名称..."
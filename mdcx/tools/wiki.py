@@ -1,3 +1,4 @@
+import asyncio
 import contextlib
 import random
 import re
@@ -15,17 +16,114 @@ from ..config.resources import resources
 from ..manual import ManualConfig
 from ..models.emby import EMbyActressInfo
 from ..utils.language import is_english
+from .wiki_cache import WikiCache, get_wiki_cache
 
 
-async def search_wiki(actor_info: EMbyActressInfo) -> tuple[str | None, str]:
+class WikiRequestError(Exception):
+    """请求失败或处理过程中出现异常. 此类失败是暂时的, 结果不应缓存."""
+
+
+class WikidataResolver:
+    """
+    批量获取 Wikidata 实体. 短时间内多个演员请求的实体合并为一次 wbgetentities 请求 (每次最多 50 个), 结果缓存在本地.
+    """
+
+    BATCH_SIZE = 50
+    # 等待合并请求的时间 (秒)
+    BATCH_DELAY = 0.05
+    CACHE_NAMESPACE = "entity"
+
+    def __init__(self, cache: WikiCache | None = None):
+        self.cache = cache or get_wiki_cache()
+        self._pending: dict[str, asyncio.Future[dict | WikiRequestError | None]] = {}
+        self._queue: list[str] = []
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+    async def get_entities(self, ids: list[str]) -> dict[str, dict]:
+        """
+        获取实体数据, 返回 id -> 实体. 不存在的实体不在结果中.
+
+        Raises:
+            WikiRequestError: 部分实体请求失败
+        """
+        ids = list(dict.fromkeys(ids))
+        result = await asyncio.to_thread(self.cache.get_many, self.CACHE_NAMESPACE, ids)
+        loop = asyncio.get_running_loop()
+        waiting = []
+        for wiki_id in ids:
+            if wiki_id in result:
+                continue
+            future = self._pending.get(wiki_id)
+            if future is None:
+                future = self._pending[wiki_id] = loop.create_future()
+                self._queue.append(wiki_id)
+            waiting.append((wiki_id, future))
+        if len(self._queue) >= self.BATCH_SIZE:
+            self._flush()
+        elif self._queue and self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.BATCH_DELAY, self._flush)
+        failed = None
+        for wiki_id, future in waiting:
+            entity = await future
+            if isinstance(entity, WikiRequestError):
+                failed = entity
+            elif entity is not None:
+                result[wiki_id] = entity
+        if failed is not None:
+            raise failed
+        return result
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        while self._queue:
+            batch, self._queue = self._queue[: self.BATCH_SIZE], self._queue[self.BATCH_SIZE :]
+            task = asyncio.create_task(self._fetch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _fetch(self, ids: list[str]) -> None:
+        entities: dict[str, dict] = {}
+        failed = None
+        try:
+            # 仅请求 handle_search_res 用到的属性, 描述和站点链接只保留中日文
+            url = (
+                "https://www.wikidata.org/w/api.php?action=wbgetentities&format=json"
+                f"&ids={'|'.join(ids)}&props=descriptions|sitelinks/urls|claims&languages=zh|ja&sitefilter=zhwiki|jawiki"
+            )
+            res, error = await manager.computed.async_client.get_json(url, headers=manager.computed.random_headers)
+            if isinstance(res, dict):
+                for key, entity in res.get("entities", {}).items():
+                    if "missing" not in entity:
+                        entities[key] = entity
+                if entities:
+                    await asyncio.to_thread(self.cache.set_many, self.CACHE_NAMESPACE, entities)
+            else:
+                failed = WikiRequestError(f"维基百科实体数据请求失败: {error}")
+        except Exception as e:
+            failed = WikiRequestError(f"维基百科实体数据请求失败: {e}")
+        finally:
+            for wiki_id in ids:
+                future = self._pending.pop(wiki_id, None)
+                if future is not None and not future.done():
+                    future.set_result(entities.get(wiki_id, failed))
+
+
+async def search_wiki(actor_info: EMbyActressInfo, resolver: WikidataResolver | None = None) -> tuple[str | None, str]:
     """
     搜索维基百科演员信息
 
     Args:
         actor_info: 演员信息, 将填充 wiki 解析结果
+        resolver: 批量获取实体数据, 多个演员共用时可合并请求
 
     Returns:
         tuple: wiki 详情页 URL, 日志
+
+    Raises:
+        WikiRequestError: 请求失败或搜索过程发生异常
     """
     try:
         actor_name = actor_info.name
@@ -44,7 +142,7 @@ async def search_wiki(actor_info: EMbyActressInfo) -> tuple[str | None, str]:
         url = f"https://www.wikidata.org/w/api.php?action=wbsearchentities&search={actor_name}&language=zh&format=json"
         res, error = await manager.computed.async_client.get_json(url, headers=manager.computed.random_headers)
         if res is None:
-            return None, f"维基百科搜索结果请求失败: {error}"
+            raise WikiRequestError(f"维基百科搜索结果请求失败: {error}")
 
         search_results = res.get("search")
 
@@ -55,53 +153,58 @@ async def search_wiki(actor_info: EMbyActressInfo) -> tuple[str | None, str]:
             url = f"https://www.wikidata.org/w/api.php?action=wbsearchentities&search={actor_name_tw}&language=zh&format=json"
             res, error = await manager.computed.async_client.get_json(url)
             if res is None:
-                return None, f"维基百科搜索结果请求失败: {error}"
+                raise WikiRequestError(f"维基百科搜索结果请求失败: {error}")
             search_results = res.get("search")
             # 搜索无结果
             if not search_results:
                 return None, "维基百科暂未收录"
 
+        # 根据描述信息判断是否为女优, 无描述的结果也需进一步确认
+        candidates = []
         for each_result in search_results:
             description = each_result.get("description")
-
-            # 根据描述信息判断是否为女优
             if description:
-                description_en = description
                 description_t = description.lower()
-                for each_des in ManualConfig.ACTRESS_WIKI_KEYWORDS:
-                    if each_des.lower() in description_t:
-                        break
-                else:
+                if not any(each_des.lower() in description_t for each_des in ManualConfig.ACTRESS_WIKI_KEYWORDS):
                     continue
-                actor_info.taglines = [f"{description}"]
-            else:
-                description_en = ""
-
-            # 通过id请求数据，获取 wiki url
-            wiki_id = each_result.get("id")
-            url = f"https://m.wikidata.org/wiki/Special:EntityData/{wiki_id}.json"
-            res, error = await manager.computed.async_client.get_json(url, headers=manager.computed.random_headers)
-            if res is None:
+            candidates.append((each_result.get("id"), description or ""))
+        if not candidates:
+            return None, "未找到匹配的演员信息"
+
+        # 一次获取所有候选的实体数据, 获取 wiki url
+        entities = await (resolver or WikidataResolver()).get_entities([wiki_id for wiki_id, _ in candidates])
+        for wiki_id, description_en in candidates:
+            entity = entities.get(wiki_id)
+            if entity is None:
                 continue
+            if description_en:
+                actor_info.taglines = [f"{description_en}"]
             # 获取详细信息并返回URL
-            url, msg = handle_search_res(res, wiki_id, actor_info, description_en)
+            url, msg = handle_search_res({"entities": {wiki_id: entity}}, wiki_id, actor_info, description_en)
             if url is None:
                 # todo log
                 continue
             return url, msg
         return None, "未找到匹配的演员信息"
+    except WikiRequestError:
+        raise
     except Exception as e:
-        return None, f"搜索过程发生异常: {str(e)}"
+        raise WikiRequestError(f"搜索过程发生异常: {str(e)}") from e
 
 
 async def get_detail(url: str, url_log: str, actor_info: EMbyActressInfo) -> tuple[bool, str]:
-    """异步版本的_get_wiki_detail函数"""
+    """
+    获取维基百科详情页并填充 actor_info
+
+    Raises:
+        WikiRequestError: 请求失败、翻译失败或获取过程发生异常
+    """
     try:
         ja = "ja." in url
         emby_on = manager.config.emby_on
         res, error = await manager.computed.async_client.get_text(url, headers=manager.computed.random_headers)
         if res is None:
-            return False, f"维基百科演员页请求失败: {error}"
+            raise WikiRequestError(f"维基百科演员页请求失败: {error}")
         if "noarticletext mw-content-ltr" in res:
             return False, "维基百科演员页没有该词条"
 
@@ -134,8 +237,10 @@ async def get_detail(url: str, url_log: str, actor_info: EMbyActressInfo) -> tup
         # 处理维基百科内容
         result, error = await parse_detail(res, url, url_log, actor_info, ja, emby_on)
         return result, error
+    except WikiRequestError:
+        raise
     except Exception as e:
-        return False, f"获取维基百科详情时发生异常: {str(e)}"
+        raise WikiRequestError(f"获取维基百科详情时发生异常: {str(e)}") from e
 
 
 def handle_search_res(
@@ -338,7 +443,7 @@ async def parse_detail(
         try:
             overview = await _process_translation(actor_info, overview, ja, emby_on)
         except Exception as e:
-            return False, f"翻译处理过程中发生异常: {str(e)}"
+            raise WikiRequestError(f"翻译处理过程中发生异常: {str(e)}") from e
 
         # 外部链接和最终处理
         overview = _finalize_overview(overview, url_log, res, actor_info, emby_on)
@@ -346,6 +451,8 @@ async def parse_detail(
 
         return True, ""
 
+    except WikiRequestError:
+        raise
     except Exception as e:
         return False, f"处理维基百科页面内容时发生异常: {str(e)}"
 
@@ -0,0 +1,86 @@
+"""
+维基百科查询缓存. 按命名空间和键保存 JSON 数据, 过期后视为未命中.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+from ..config.resources import resources
+
+# 查询到演员信息时的缓存时长
+WIKI_CACHE_TTL = 30 * 24 * 3600
+# 未查询到演员信息时的缓存时长, 维基百科可能在此期间收录
+WIKI_MISS_TTL = 3 * 24 * 3600
+
+
+class WikiCache:
+    """此类线程安全."""
+
+    def __init__(self, db_path: str | Path):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "create table if not exists cache ("
+                "namespace text not null, key text not null, value text not null, expires real not null, "
+                "primary key (namespace, key))"
+            )
+            self._conn.execute("delete from cache where expires <= ?", (time.time(),))
+
+    def get(self, namespace: str, key: str) -> Any | None:
+        with self._lock:
+            row = self._conn.execute(
+                "select value from cache where namespace = ? and key = ? and expires > ?",
+                (namespace, key, time.time()),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def get_many(self, namespace: str, keys: list[str]) -> dict[str, Any]:
+        """批量查询, 返回命中的键及对应数据."""
+        result = {}
+        now = time.time()
+        with self._lock:
+            # sqlite 单条语句的参数数量有限, 分批查询
+            for i in range(0, len(keys), 500):
+                batch = keys[i : i + 500]
+                rows = self._conn.execute(
+                    f"select key, value from cache where namespace = ? and expires > ? "
+                    f"and key in ({','.join('?' * len(batch))})",
+                    (namespace, now, *batch),
+                ).fetchall()
+                result.update((k, json.loads(v)) for k, v in rows)
+        return result
+
+    def set_many(self, namespace: str, items: dict[str, Any], ttl: float = WIKI_CACHE_TTL) -> None:
+        expires = time.time() + ttl
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "insert or replace into cache values (?, ?, ?, ?)",
+                ((namespace, k, json.dumps(v, ensure_ascii=False), expires) for k, v in items.items()),
+            )
+
+    def set(self, namespace: str, key: str, value: Any, ttl: float = WIKI_CACHE_TTL) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "insert or replace into cache values (?, ?, ?, ?)",
+                (namespace, key, json.dumps(value, ensure_ascii=False), time.time() + ttl),
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_wiki_cache: WikiCache | None = None
+
+
+def get_wiki_cache() -> WikiCache:
+    """获取维基百科查询缓存, 首次调用时打开用户数据目录下的数据库."""
+    global _wiki_cache
+    if _wiki_cache is None:
+        _wiki_cache = WikiCache(resources.u("wiki_cache.db"))
+    return _wiki_cache
@@ -2,6 +2,7 @@ import asyncio
 import os
 import shutil
 import subprocess
+import sys
 import traceback
 from pathlib import Path
 
@@ -59,6 +60,55 @@ def copy_file_sync(old: Path | str, new: Path | str):
     return False, error_info
 
 
+# Linux FICLONE ioctl, 在 btrfs/xfs 等文件系统上创建共享数据块的写时复制副本
+_FICLONE = 0x40049409
+
+
+def _reflink(old: Path, new: Path) -> bool:
+    if sys.platform != "linux":
+        return False
+    import fcntl
+
+    try:
+        with open(old, "rb") as src, open(new, "wb") as dst:
+            fcntl.ioctl(dst.fileno(), _FICLONE, src.fileno())
+        return True
+    except OSError:
+        new.unlink(missing_ok=True)
+        return False
+
+
+def link_or_copy_sync(old: Path | str, new: Path | str, link: bool = True) -> str:
+    """
+    将 old 物化到 new, 依次尝试写时复制 (reflink)、硬链接和复制, new 已存在时被替换.
+
+    硬链接与原文件共享数据, 调用方不应原地修改 new. 需要修改时先写入临时文件再移动覆盖.
+
+    Args:
+        link: 为 False 时直接复制
+
+    Returns:
+        使用的方式: reflink, hardlink 或 copy
+    """
+    old = Path(old)
+    new = Path(new)
+    tmp = new.with_name(new.name + ".[LINK]")
+    tmp.unlink(missing_ok=True)
+    method = "copy"
+    if link and _reflink(old, tmp):
+        method = "reflink"
+    elif link:
+        try:
+            os.link(old, tmp)
+            method = "hardlink"
+        except OSError:
+            pass
+    if method == "copy":
+        shutil.copy(old, tmp)
+    os.replace(tmp, new)
+    return method
+
+
 def read_link_sync(p: str):
     # 获取符号链接的真实路径
     while os.path.islink(p):
@@ -158,6 +208,23 @@ async def copy_file_async(old: str | Path, new: str | Path):
     return False, error_info
 
 
+async def link_or_copy_async(old: str | Path, new: str | Path, link: bool = True):
+    """异步物化文件, 参见 link_or_copy_sync"""
+    old = Path(old)
+    new = Path(new)
+    try:
+        if not await aiofiles.os.path.exists(old):
+            return False, f"不存在: {old}"
+        if str(old).lower() != str(new).lower():
+            await asyncio.to_thread(link_or_copy_sync, old, new, link)
+        return True, ""
+    except Exception as e:
+        error_info = f" 复制文件: {old}\n 目标: {new} \n 错误: {e}\n{traceback.format_exc()}"
+        signal.add_log(error_info)
+        print(error_info)
+    return False, error_info
+
+
 def _check_pic_blocking(p: str | Path):
     """阻塞版本的图片检查，用于在线程中执行"""
     with Image.open(p) as img:  # 如果文件不是图片，报错
@@ -1,34 +1,86 @@
+import importlib.util
 import json
 import os
 import shutil
+import sqlite3
 import subprocess
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import asdict, dataclass, field
 from pathlib import Path
 
-try:
-    import av
-except ImportError:
-    av = None
+import oshash
 
+# pyav 导入耗时较长, 启动时仅检查是否安装, 首次探测时导入
+HAS_PYAV = importlib.util.find_spec("av") is not None
 
-def get_video_metadata_pyav(p: Path) -> tuple[int, str]:
-    if av is None:
+
+@dataclass
+class AudioStream:
+    codec: str = ""
+    channels: int = 0
+    language: str = ""
+
+
+@dataclass
+class VideoMetadata:
+    height: int = 0
+    codec: str = ""
+    duration: float = 0.0  # 秒
+    bitrate: int = 0  # bit/s
+    audio: list[AudioStream] = field(default_factory=list)
+    source: str = ""  # pyav, ffprobe 或 path (根据文件名推断)
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self), ensure_ascii=False)
+
+    @classmethod
+    def from_json(cls, s: str) -> "VideoMetadata":
+        d = json.loads(s)
+        d["audio"] = [AudioStream(**a) for a in d.get("audio", [])]
+        return cls(**d)
+
+
+# 最小读取模式: 仅解析容器头部, 不解码任何帧. 避免网络存储/机械硬盘上读取大量数据
+PYAV_MINIMAL_OPTIONS = {
+    "probesize": str(1 << 20),  # 1MB, 默认 5MB
+    "analyzeduration": "1000000",  # 1s, 默认 5s
+    "fpsprobesize": "0",
+}
+
+
+def probe_video_pyav(p: Path, timeout: float | None = None) -> VideoMetadata:
+    if not HAS_PYAV:
         raise ImportError("Should not be called if pyav is not available")
-    height = 0
-    codec_fourcc = ""
-    with av.open(p) as container:
+    import av
+
+    meta = VideoMetadata(source="pyav")
+    with av.open(str(p), options=PYAV_MINIMAL_OPTIONS, timeout=timeout) as container:
         # 查找第一个视频流
         video_stream = next((s for s in container.streams.video), None)
         if video_stream:
-            height = video_stream.height
-            codec_fourcc = video_stream.codec_context.name.upper()
-    return height, codec_fourcc
+            meta.height = video_stream.height
+            meta.codec = video_stream.codec_context.name.upper()
+        if container.duration:
+            meta.duration = container.duration / av.time_base
+        meta.bitrate = container.bit_rate or 0
+        for s in container.streams.audio:
+            meta.audio.append(
+                AudioStream(
+                    codec=s.codec_context.name.upper(),
+                    channels=getattr(s.codec_context, "channels", 0) or 0,
+                    language=s.metadata.get("language", ""),
+                )
+            )
+    return meta
 
 
-def get_video_metadata_ffmpeg(p: Path) -> tuple[int, str]:
+def probe_video_ffmpeg(p: Path, timeout: float | None = None) -> VideoMetadata:
     if shutil.which("ffprobe") is None:
         raise RuntimeError("当前版本无 opencv/pyav. 若想获取视频分辨率请安装 ffprobe 或改用带 opencv/pyav 版本.")
     # Use ffprobe to get video information
-    cmd = ["ffprobe", "-v", "quiet", "-print_format", "json", "-show_streams", str(p)]
+    cmd = ["ffprobe", "-v", "quiet", "-print_format", "json", "-show_streams", "-show_format", str(p)]
 
     # macOS and Linux use default flags
     creationflags = 0
@@ -36,25 +88,155 @@ def get_video_metadata_ffmpeg(p: Path) -> tuple[int, str]:
     if os.name == "nt":
         creationflags = subprocess.CREATE_NO_WINDOW
 
-    result = subprocess.run(cmd, capture_output=True, text=True, creationflags=creationflags)
+    # 超时后子进程会被终止
+    result = subprocess.run(cmd, capture_output=True, text=True, creationflags=creationflags, timeout=timeout)
 
     data = json.loads(result.stdout)
+    streams = data.get("streams", [])
+    fmt = data.get("format", {})
 
+    meta = VideoMetadata(source="ffprobe")
     # Find video stream
-    video_stream = next((stream for stream in data["streams"] if stream["codec_type"] == "video"), None)
-
+    video_stream = next((stream for stream in streams if stream["codec_type"] == "video"), None)
     if video_stream:
-        height = int(video_stream["height"])
-        codec_fourcc = video_stream["codec_name"].upper()
-    else:
-        height = 0
-        codec_fourcc = ""
-    return height, codec_fourcc
+        meta.height = int(video_stream["height"])
+        meta.codec = video_stream["codec_name"].upper()
+    meta.duration = float(fmt.get("duration") or 0)
+    meta.bitrate = int(fmt.get("bit_rate") or 0)
+    for stream in streams:
+        if stream["codec_type"] != "audio":
+            continue
+        meta.audio.append(
+            AudioStream(
+                codec=stream.get("codec_name", "").upper(),
+                channels=int(stream.get("channels") or 0),
+                language=stream.get("tags", {}).get("language", ""),
+            )
+        )
+    return meta
 
 
-if av is not None:
+def guess_height_from_path(p: Path) -> int:
+    """根据路径中的分辨率关键词推断视频高度, 无法推断时返回 0."""
+    path_upper = p.as_posix().upper()
+    if "8K" in path_upper:
+        return 4000
+    if "4K" in path_upper or "UHD" in path_upper:
+        return 2000
+    if "1440P" in path_upper or "QHD" in path_upper:
+        return 1440
+    if "1080P" in path_upper or "FHD" in path_upper:
+        return 1080
+    if "960P" in path_upper:
+        return 960
+    if "720P" in path_upper or "HD" in path_upper:
+        return 720
+    return 0
+
+
+def get_video_metadata_pyav(p: Path) -> tuple[int, str]:
+    meta = probe_video_pyav(p)
+    return meta.height, meta.codec
+
+
+def get_video_metadata_ffmpeg(p: Path) -> tuple[int, str]:
+    meta = probe_video_ffmpeg(p)
+    return meta.height, meta.codec
+
+
+if HAS_PYAV:
     VIDEO_BACKEND = "pyav"
+    probe_video = probe_video_pyav
     get_video_metadata = get_video_metadata_pyav
 else:
     VIDEO_BACKEND = "ffmpeg"
+    probe_video = probe_video_ffmpeg
     get_video_metadata = get_video_metadata_ffmpeg
+
+# 按顺序尝试的探测后端, 均失败时由调用方根据文件名推断
+PROBE_BACKENDS: list[tuple[str, Callable[[Path, float | None], VideoMetadata]]] = []
+if HAS_PYAV:
+    PROBE_BACKENDS.append(("pyav", probe_video_pyav))
+if shutil.which("ffprobe") is not None:
+    PROBE_BACKENDS.append(("ffprobe", probe_video_ffmpeg))
+
+
+def file_identity(p: Path) -> str:
+    """
+    生成文件身份标识, 文件内容不变时 (包括在同一文件系统内移动/重命名) 标识不变.
+
+    优先使用 (device, inode, size, mtime). 部分网络文件系统不提供 inode, 此时改用 oshash, 只需读取文件首尾各 64KB.
+    """
+    st = os.stat(p)
+    if st.st_ino:
+        return f"{st.st_dev}:{st.st_ino}:{st.st_size}:{st.st_mtime_ns}"
+    return f"oshash:{oshash.oshash(str(p))}:{st.st_size}"
+
+
+class VideoProbeCache:
+    """
+    视频元数据的持久化缓存, 以 SQLite 存储, 按文件身份索引.
+
+    此类线程安全, 所有方法均为阻塞调用, 在异步代码中应通过 asyncio.to_thread 调用.
+    """
+
+    def __init__(self, db_path: str | Path):
+        self.db_path = Path(db_path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "create table if not exists probe ("
+                "key text primary key, path text not null, data text not null, updated real not null)"
+            )
+            self._conn.execute("create index if not exists probe_path on probe(path)")
+
+    def get(self, p: Path) -> VideoMetadata | None:
+        """获取文件的缓存元数据, 文件不存在或已变更时返回 None."""
+        try:
+            key = file_identity(p)
+        except OSError:
+            return None
+        with self._lock:
+            row = self._conn.execute("select data, path from probe where key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            data, cached_path = row
+            if cached_path != str(p):  # 文件已被移动或重命名, 更新路径
+                with self._conn:
+                    self._conn.execute("update probe set path = ? where key = ?", (str(p), key))
+        return VideoMetadata.from_json(data)
+
+    def put(self, p: Path, meta: VideoMetadata) -> None:
+        key = file_identity(p)
+        with self._lock, self._conn:
+            # 同一路径只保留最新记录, 避免文件被替换后旧记录残留
+            self._conn.execute("delete from probe where path = ? and key != ?", (str(p), key))
+            self._conn.execute(
+                "insert or replace into probe (key, path, data, updated) values (?, ?, ?, ?)",
+                (key, str(p), meta.to_json(), time.time()),
+            )
+
+    def get_or_probe(self, p: Path, probe: Callable[[Path], VideoMetadata] = probe_video) -> VideoMetadata:
+        """优先从缓存读取, 未命中时调用 probe 获取并写入缓存."""
+        if (meta := self.get(p)) is not None:
+            return meta
+        meta = probe(p)
+        self.put(p, meta)
+        return meta
+
+    def lookup_path(self, p: str | Path) -> VideoMetadata | None:
+        """
+        按路径查询最近一次的探测结果, 不检查文件是否变更, 也不访问文件系统.
+
+        供批量工具使用, 结果可能已过期.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "select data from probe where path = ? order by updated desc limit 1", (str(p),)
+            ).fetchone()
+        return VideoMetadata.from_json(row[0]) if row else None
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
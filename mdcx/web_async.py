@@ -1,11 +1,22 @@
 import asyncio
+import base64
+import bisect
+import contextlib
+import hashlib
+import itertools
+import json
 import random
-from collections.abc import Callable
+import time
+from collections import OrderedDict, deque
+from collections.abc import AsyncIterator, Callable
+from dataclasses import dataclass, field
+from enum import IntEnum
 from io import BytesIO
 from pathlib import Path
 from typing import Any
 
 import aiofiles
+import aiofiles.os
 import httpx
 from aiolimiter import AsyncLimiter
 from curl_cffi import AsyncSession, Response
@@ -14,6 +25,11 @@ from curl_cffi.requests.session import HttpMethod
 from curl_cffi.requests.utils import not_set
 from PIL import Image
 
+from .session_store import SessionStore, is_challenge
+
+# 请求遇到人机验证时, 错误信息中包含此字符串. 调用方可据此改用浏览器请求
+CHALLENGE_ERROR = "遇到人机验证"
+
 
 class AsyncWebLimiters:
     def __init__(self):
@@ -31,6 +47,277 @@ class AsyncWebLimiters:
             del self.limiters[key]
 
 
+class DownloadPriority(IntEnum):
+    """下载优先级, 值越小越优先"""
+
+    METADATA = 0  # 刮削请求, 不占用下载连接
+    IMAGE = 1  # poster, thumb, fanart, 演员头像
+    EXTRAFANART = 2
+    TRAILER = 3
+
+
+class _TokenBucket:
+    """令牌桶限速. 允许欠额, 欠额由后续调用者按比例等待"""
+
+    def __init__(self, rate: float):
+        self.rate = rate  # bytes/s
+        self.tokens = rate
+        self.updated = time.monotonic()
+
+    async def consume(self, n: int):
+        now = time.monotonic()
+        self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate) - n
+        self.updated = now
+        if self.tokens < 0:
+            await asyncio.sleep(-self.tokens / self.rate)
+
+
+class DownloadScheduler:
+    """
+    全局下载调度器. 按优先级分配下载连接, 并限制全局和单个域名的并发数及带宽.
+
+    刮削请求不占用下载连接也不限速. 剧照和预告片延后下载时, 有刮削请求进行中时它们同时最多占用 1 个连接,
+    保证带宽有限时的刮削速度; 未延后时刮削流程会等待其下载完成, 不做此限制.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = 16,
+        per_host: int = 6,
+        bandwidth: float = 0,
+        per_host_bandwidth: float = 0,
+        yield_bulk: bool = False,
+    ):
+        """
+        Args:
+            max_concurrent: 全局最大下载连接数
+            per_host: 单个域名最大下载连接数
+            bandwidth: 全局带宽限制 (bytes/s), 0 表示不限制
+            per_host_bandwidth: 单个域名带宽限制 (bytes/s), 0 表示不限制
+            yield_bulk: 有刮削请求进行中时, 剧照和预告片是否让出连接 (最多占用 1 个)
+        """
+        self.max_concurrent = max(max_concurrent, 1)
+        self.per_host = max(per_host, 1)
+        self.per_host_bandwidth = per_host_bandwidth
+        self.yield_bulk = yield_bulk
+        self._bucket = _TokenBucket(bandwidth) if bandwidth > 0 else None
+        self._host_buckets: dict[str, _TokenBucket] = {}
+        # 按 (优先级, 序号) 排序的等待队列
+        self._waiters: list[tuple[int, int, str, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._active = 0
+        self._host_active: dict[str, int] = {}
+        self._bulk_active = 0
+        self._metadata_active = 0
+
+    @property
+    def active(self) -> int:
+        return self._active
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    def _can_start(self, host: str, priority: int) -> bool:
+        if self._active >= self.max_concurrent or self._host_active.get(host, 0) >= self.per_host:
+            return False
+        return not (
+            self.yield_bulk and priority >= DownloadPriority.EXTRAFANART and self._metadata_active and self._bulk_active
+        )
+
+    def _start(self, host: str, priority: int):
+        self._active += 1
+        self._host_active[host] = self._host_active.get(host, 0) + 1
+        if priority >= DownloadPriority.EXTRAFANART:
+            self._bulk_active += 1
+
+    def _release(self, host: str, priority: int):
+        self._active -= 1
+        self._host_active[host] -= 1
+        if not self._host_active[host]:
+            del self._host_active[host]
+        if priority >= DownloadPriority.EXTRAFANART:
+            self._bulk_active -= 1
+        self._dispatch()
+
+    def _dispatch(self):
+        """按优先级唤醒等待者. 受单域名限制的等待者不阻塞其他域名的低优先级等待者"""
+        i = 0
+        while i < len(self._waiters) and self._active < self.max_concurrent:
+            priority, _, host, fut = self._waiters[i]
+            if fut.done():
+                del self._waiters[i]
+            elif self._can_start(host, priority):
+                del self._waiters[i]
+                self._start(host, priority)
+                fut.set_result(None)
+            else:
+                i += 1
+
+    @contextlib.asynccontextmanager
+    async def slot(self, host: str, priority: DownloadPriority) -> AsyncIterator[None]:
+        """占用一个下载连接"""
+        fut = asyncio.get_running_loop().create_future()
+        bisect.insort(self._waiters, (int(priority), next(self._seq), host, fut), key=lambda w: w[:2])
+        self._dispatch()
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():  # 已分配连接
+                self._release(host, priority)
+            raise
+        try:
+            yield
+        finally:
+            self._release(host, priority)
+
+    @contextlib.asynccontextmanager
+    async def metadata(self) -> AsyncIterator[None]:
+        """标记一个进行中的刮削请求"""
+        self._metadata_active += 1
+        try:
+            yield
+        finally:
+            self._metadata_active -= 1
+            if not self._metadata_active:
+                self._dispatch()
+
+    async def throttle(self, host: str, n: int):
+        """按带宽限制等待, 每写入 n 字节调用一次"""
+        if self._bucket is not None:
+            await self._bucket.consume(n)
+        if self.per_host_bandwidth > 0:
+            bucket = self._host_buckets.setdefault(host, _TokenBucket(self.per_host_bandwidth))
+            await bucket.consume(n)
+
+
+MB = 1024**2
+# 大于此大小且服务器支持 Range 时并发分段下载
+PARALLEL_THRESHOLD = 2 * MB
+SEGMENT_SIZE = 4 * MB
+MAX_PARALLEL_RANGES = 8
+# 探测结果缓存
+PROBE_CACHE_SIZE = 512
+PROBE_TTL = 600
+
+
+@dataclass
+class ProbeResult:
+    """HEAD 请求结果. 同一 URL 的检测链接、获取大小和下载共用一次探测"""
+
+    url: str  # 重定向后的 URL
+    size: int | None
+    accept_ranges: bool
+    etag: str = ""
+    last_modified: str = ""
+    content_encoding: str = ""
+    content_md5: str = ""
+    created: float = field(default_factory=time.monotonic)
+
+    @property
+    def validator(self) -> str:
+        """断点续传时用于 If-Range 的校验值. 弱 ETag 不能用于 If-Range"""
+        if self.etag and not self.etag.startswith("W/"):
+            return self.etag
+        return self.last_modified
+
+    @property
+    def verifiable_size(self) -> int | None:
+        """可用于校验下载结果的大小. 压缩传输时 Content-Length 与解压后大小不同, 不校验"""
+        if self.content_encoding and self.content_encoding.lower() != "identity":
+            return None
+        return self.size
+
+
+class _RangeNotSupported(Exception):
+    """服务器未按 Range 返回 206, 或 If-Range 校验失败 (文件已变更)"""
+
+
+class _AdaptiveParallelism:
+    """
+    根据吞吐量调整并发分段数.
+
+    每完成一轮分段计算一次吞吐量, 比上一轮提升 10% 以上时增加一个并发; 不再提升时停止增加; 明显下降时减少一个并发.
+    """
+
+    def __init__(self, initial: int = 2, maximum: int = MAX_PARALLEL_RANGES):
+        self.target = initial
+        self.maximum = maximum
+        self.best = 0.0
+        self.growing = True
+        self._reset()
+
+    def _reset(self):
+        self.window_start = time.monotonic()
+        self.window_bytes = 0
+        self.window_segments = 0
+
+    def add_bytes(self, n: int):
+        self.window_bytes += n
+
+    def segment_done(self) -> int:
+        """返回并发数的变化: 1 增加, -1 减少, 0 不变"""
+        self.window_segments += 1
+        elapsed = time.monotonic() - self.window_start
+        if self.window_segments < self.target or elapsed < 0.5:
+            return 0
+        rate = self.window_bytes / elapsed
+        delta = 0
+        if rate > self.best * 1.1:
+            self.best = rate
+            if self.growing and self.target < self.maximum:
+                self.target += 1
+                delta = 1
+        elif rate < self.best * 0.7 and self.target > 1:
+            self.target -= 1
+            self.growing = False
+            delta = -1
+        else:
+            self.growing = False
+        self._reset()
+        return delta
+
+
+def _partial_paths(file_path: Path) -> tuple[Path, Path]:
+    """下载中的临时文件及其断点信息文件"""
+    partial = file_path.with_name(file_path.name + ".[DOWNLOAD]")
+    return partial, file_path.with_name(file_path.name + ".[DOWNLOAD].json")
+
+
+async def _load_meta(meta_path: Path) -> dict:
+    try:
+        async with aiofiles.open(meta_path, encoding="utf-8") as f:
+            return json.loads(await f.read())
+    except Exception:
+        return {}
+
+
+async def _save_meta(meta_path: Path, meta: dict):
+    async with aiofiles.open(meta_path, "w", encoding="utf-8") as f:
+        await f.write(json.dumps(meta))
+
+
+def _remove_files(*paths: Path):
+    for p in paths:
+        try:
+            p.unlink(missing_ok=True)
+        except OSError:
+            pass
+
+
+def discard_partial(file_path: Path):
+    """删除 file_path 下载中断后保留的临时文件及断点信息, 供放弃下载的调用方使用"""
+    _remove_files(*_partial_paths(file_path))
+
+
+def _file_digest(p: Path, algorithm: str) -> bytes:
+    h = hashlib.new(algorithm)
+    with open(p, "rb") as f:
+        while chunk := f.read(MB):
+            h.update(chunk)
+    return h.digest()
+
+
 class AsyncWebClient:
     def __init__(
         self,
@@ -40,6 +327,8 @@ class AsyncWebClient:
         timeout: float,
         log_fn: Callable[[str], None] | None = None,
         limiters: AsyncWebLimiters | None = None,
+        scheduler: DownloadScheduler | None = None,
+        session_store: SessionStore | None = None,
         loop=None,
     ):
         self.retry = retry
@@ -55,6 +344,12 @@ class AsyncWebClient:
 
         self.log_fn = log_fn if log_fn is not None else lambda _: None
         self.limiters = limiters if limiters is not None else AsyncWebLimiters()
+        self.scheduler = scheduler if scheduler is not None else DownloadScheduler()
+        self.session_store = session_store
+        self._probes: OrderedDict[str, ProbeResult] = OrderedDict()
+
+    async def close(self) -> None:
+        await self.curl_session.close()
 
     def _prepare_headers(self, url: str | None = None, headers: dict[str, str] | None = None) -> dict[str, str]:
         """预处理请求头"""
@@ -108,6 +403,13 @@ class AsyncWebClient:
         try:
             u = httpx.URL(url)
             headers = self._prepare_headers(url, headers)
+            # 使用浏览器通过验证后保存的 cookies, 验证 cookie 与 User-Agent 绑定, 需一并使用
+            session_cookies = self.session_store.cookies(u.host) if self.session_store is not None else None
+            if session_cookies:
+                cookies = session_cookies | (cookies or {})
+                ua = self.session_store.user_agent(u.host)  # type: ignore[union-attr]
+                if ua and not any(k.lower() == "user-agent" for k in headers):
+                    headers["User-Agent"] = ua
             await self.limiters.get(u.host).acquire()
             retry_count = self.retry
             error_msg = ""
@@ -115,21 +417,28 @@ class AsyncWebClient:
                 # 采用保守的重试策略, 除特定状态码外不进行重试
                 retry = False
                 try:
-                    resp: Response = await self.curl_session.request(
-                        method,
-                        url,
-                        proxy=self.proxy if use_proxy else None,
-                        headers=headers,
-                        cookies=cookies,
-                        data=data,
-                        json=json_data,
-                        timeout=timeout or not_set,
-                        stream=stream,
-                        allow_redirects=allow_redirects,
-                    )
+                    # 非流式请求视为刮削请求, 进行中时调度器会限制剧照和预告片的下载连接
+                    async with self.scheduler.metadata() if not stream else contextlib.nullcontext():
+                        resp: Response = await self.curl_session.request(
+                            method,
+                            url,
+                            proxy=self.proxy if use_proxy else None,
+                            headers=headers,
+                            cookies=cookies,
+                            data=data,
+                            json=json_data,
+                            timeout=timeout or not_set,
+                            stream=stream,
+                            allow_redirects=allow_redirects,
+                        )
                     # 检查响应状态
                     if resp.status_code >= 300 and not (resp.status_code == 302 and resp.headers.get("Location")):
                         error_msg = f"HTTP {resp.status_code}"
+                        if not stream and is_challenge(resp.status_code, resp.headers, resp.text):
+                            error_msg = f"{CHALLENGE_ERROR} (HTTP {resp.status_code})"
+                            if session_cookies:  # 已保存的验证 cookie 失效
+                                self.session_store.clear(u.host)  # type: ignore[union-attr]
+                            break
                         retry = resp.status_code in (
                             408,  # Request Timeout
                             429,  # Too Many Requests
@@ -273,57 +582,122 @@ class AsyncWebClient:
 
         return response.content, ""
 
-    async def get_filesize(self, url: str, *, use_proxy: bool = True) -> int | None:
-        """获取文件大小"""
+    async def probe(self, url: str, *, use_proxy: bool = True) -> tuple[ProbeResult | None, str]:
+        """
+        发送 HEAD 请求获取 URL 的大小、是否支持 Range 及校验值. 结果缓存 PROBE_TTL 秒, 供后续下载复用
+
+        Returns:
+            tuple[Optional[ProbeResult], str]: (探测结果, 错误信息)
+        """
+        if (cached := self._probes.get(url)) and time.monotonic() - cached.created < PROBE_TTL:
+            self._probes.move_to_end(url)
+            return cached, ""
         response, error = await self.request("HEAD", url, use_proxy=use_proxy)
         if response is None:
+            return None, error
+        headers = response.headers
+        try:
+            size = int(headers.get("Content-Length"))
+        except (ValueError, TypeError):
+            size = None
+        result = ProbeResult(
+            url=str(response.url),
+            size=size,
+            accept_ranges=(headers.get("Accept-Ranges") or "").lower() == "bytes",
+            etag=headers.get("ETag") or "",
+            last_modified=headers.get("Last-Modified") or "",
+            content_encoding=headers.get("Content-Encoding") or "",
+            content_md5=headers.get("Content-MD5") or "",
+        )
+        self._probes[url] = result
+        while len(self._probes) > PROBE_CACHE_SIZE:
+            self._probes.popitem(last=False)
+        return result, ""
+
+    async def get_filesize(self, url: str, *, use_proxy: bool = True) -> int | None:
+        """获取文件大小"""
+        probe, error = await self.probe(url, use_proxy=use_proxy)
+        if probe is None:
             self.log_fn(f"🔴 获取文件大小失败: {url} {error}")
             return None
-        if response.status_code < 400:
-            try:
-                return int(response.headers.get("Content-Length"))
-            except (ValueError, TypeError):
-                self.log_fn(f"🔴 获取文件大小失败: {url} Content-Length 解析错误")
-                return None
-        self.log_fn(f"🔴 获取文件大小失败: {url} HTTP {response.status_code}")
-        return None
+        if probe.size is None:
+            self.log_fn(f"🔴 获取文件大小失败: {url} Content-Length 解析错误")
+        return probe.size
 
-    async def download(self, url: str, file_path: Path, *, use_proxy: bool = True) -> bool:
+    async def download(
+        self,
+        url: str,
+        file_path: Path,
+        *,
+        use_proxy: bool = True,
+        checksum: str | None = None,
+        priority: DownloadPriority = DownloadPriority.IMAGE,
+    ) -> bool:
         """
-        下载文件. 当文件较大时分块下载
+        下载文件. 数据直接写入同目录下的 .[DOWNLOAD] 临时文件, 校验通过后替换目标文件.
+
+        中断后再次下载同一文件时, 若服务器返回了 ETag/Last-Modified, 通过 Range/If-Range 从断点继续.
+        下载失败时保留临时文件, 调用方不再重试时应调用 discard_partial 删除.
+        文件较大且服务器支持 Range 时并发下载多个分段, 并发数根据吞吐量调整.
 
         Args:
             url: 下载链接
             file_path: 保存路径
             use_proxy: 是否使用代理
+            checksum: 期望的校验和, 格式为 "算法:十六进制摘要", 如 "sha256:abcd...". 未指定时若服务器返回 Content-MD5 则校验 MD5
+            priority: 下载优先级, 由 scheduler 按优先级分配连接
 
         Returns:
             bool: 下载是否成功
         """
-        # 获取文件大小
-        file_size = await self.get_filesize(url, use_proxy=use_proxy)
-        # 判断是不是webp文件
-        webp = False
-        if file_path.suffix == "jpg" and ".webp" in url:
-            webp = True
-
-        MB = 1024**2
-        # 2 MB 以上使用分块下载, 不清楚为什么 webp 不分块, 可能是因为要转换成 jpg
-        if file_size and file_size > 2 * MB and not webp:
-            return await self._download_chunks(url, file_path, file_size, use_proxy)
+        probe, error = await self.probe(url, use_proxy=use_proxy)
+        if probe is None:
+            self.log_fn(f"🟠 探测失败, 直接下载: {url} {error}")
+
+        # 判断是不是webp文件, webp 需要转换为 jpg, 文件很小, 直接读取到内存
+        if file_path.suffix == ".jpg" and ".webp" in url:
+            async with self.scheduler.slot(httpx.URL(url).host, priority):
+                return await self._download_webp(url, file_path, use_proxy)
+
+        partial, meta_path = _partial_paths(file_path)
+        size = probe.verifiable_size if probe else None
+        try:
+            ok = None
+            if size and size > PARALLEL_THRESHOLD and probe:
+                ok = await self._download_ranges(url, partial, meta_path, size, probe, use_proxy, priority)
+            if ok is None:  # 不支持 Range 时单连接下载
+                ok = await self._download_stream(url, partial, meta_path, size, probe, use_proxy, priority)
+            if not ok:
+                return False
+
+            # 校验大小和校验和
+            actual = await aiofiles.os.path.getsize(partial)
+            if size is not None and actual != size:
+                self.log_fn(f"🔴 文件大小不一致: {url} {actual}/{size}")
+                await asyncio.to_thread(_remove_files, partial, meta_path)
+                return False
+            if not checksum and probe and probe.content_md5:
+                checksum = f"md5:{base64.b64decode(probe.content_md5).hex()}"
+            if checksum:
+                algorithm, _, expected = checksum.partition(":")
+                digest = await asyncio.to_thread(_file_digest, partial, algorithm)
+                if digest.hex() != expected.lower():
+                    self.log_fn(f"🔴 校验和不一致: {url} {algorithm}")
+                    await asyncio.to_thread(_remove_files, partial, meta_path)
+                    return False
+
+            await aiofiles.os.replace(partial, file_path)
+            await asyncio.to_thread(_remove_files, meta_path)
+            return True
+        except Exception as e:
+            self.log_fn(f"🔴 下载失败: {url} {file_path} {str(e)}")
+            return False
 
+    async def _download_webp(self, url: str, file_path: Path, use_proxy: bool) -> bool:
         content, error = await self.get_content(url, use_proxy=use_proxy)
         if not content:
             self.log_fn(f"🔴 下载失败: {url} {error}")
             return False
-        if not webp:
-            try:
-                async with aiofiles.open(file_path, "wb") as f:
-                    await f.write(content)
-                return True
-            except Exception as e:
-                self.log_fn(f"🔴 文件写入失败: {url} {file_path} {str(e)}")
-                return False
         try:
             byte_stream = BytesIO(content)
             img: Image.Image = Image.open(byte_stream)
@@ -336,71 +710,175 @@ class AsyncWebClient:
             self.log_fn(f"🔴 WebP转换失败: {url} {file_path} {str(e)}")
             return False
 
-    async def _download_chunks(self, url: str, file_path: Path, file_size: int, use_proxy: bool = True) -> bool:
-        """分块下载大文件"""
-        # 分块，每块 1 MB
-        MB = 1024**2
-        each_size = min(1 * MB, file_size)
-        parts = [(s, min(s + each_size, file_size)) for s in range(0, file_size, each_size)]
-
-        self.log_fn(f"📦 分块下载: {url} {len(parts)} 个分块, 总大小: {file_size} bytes")
+    async def _download_stream(
+        self,
+        url: str,
+        partial: Path,
+        meta_path: Path,
+        size: int | None,
+        probe: ProbeResult | None,
+        use_proxy: bool,
+        priority: DownloadPriority,
+    ) -> bool:
+        """单连接流式下载, 支持从临时文件断点续传"""
+        validator = probe.validator if probe else ""
+        offset = 0
+        headers = {}
+        meta = await _load_meta(meta_path)
+        if (
+            validator
+            and meta.get("url") == url
+            and meta.get("validator") == validator
+            and "done" not in meta
+            and await aiofiles.os.path.exists(partial)
+        ):
+            offset = await aiofiles.os.path.getsize(partial)
+            if size is not None and offset == size:
+                return True
+            if offset:
+                headers = {"Range": f"bytes={offset}-", "If-Range": validator}
+                self.log_fn(f"⏩ 断点续传: {url} 从 {offset} bytes 开始")
 
-        # 先创建文件并预分配空间
-        try:
-            async with aiofiles.open(file_path, "wb") as f:
-                await f.truncate(file_size)
-        except Exception as e:
-            self.log_fn(f"🔴 文件创建失败: {url} {str(e)}")
-            return False
+        host = httpx.URL(url).host
+        async with self.scheduler.slot(host, priority):
+            res, error = await self.request("GET", url, headers=headers, use_proxy=use_proxy, stream=True)
+            if res is None:
+                self.log_fn(f"🔴 下载失败: {url} {error}")
+                if offset:  # 续传失败 (如 416), 删除临时文件, 下次重新下载
+                    await asyncio.to_thread(_remove_files, partial, meta_path)
+                return False
+            try:
+                if res.status_code != 206:  # 服务器返回完整内容
+                    offset = 0
+                await _save_meta(meta_path, {"url": url, "size": size, "validator": validator})
+                async with aiofiles.open(partial, "r+b" if offset else "wb") as f:
+                    if offset:
+                        await f.seek(offset)
+                        await f.truncate()
+                    async for chunk in res.aiter_content():
+                        await f.write(chunk)
+                        await self.scheduler.throttle(host, len(chunk))
+            except Exception as e:
+                # 保留临时文件, 下次继续
+                self.log_fn(f"🔴 下载中断: {url} {str(e)}")
+                return False
+            finally:
+                await res.aclose()
+        return True
 
-        # 创建下载任务
-        semaphore = asyncio.Semaphore(10)  # 限制并发数
-        tasks = []
+    async def _download_ranges(
+        self,
+        url: str,
+        partial: Path,
+        meta_path: Path,
+        size: int,
+        probe: ProbeResult,
+        use_proxy: bool,
+        priority: DownloadPriority,
+    ) -> bool | None:
+        """
+        并发分段下载. 各分段的数据经队列交给单个写入任务, 通过同一个文件句柄写入.
 
-        for i, (start, end) in enumerate(parts):
-            task = self._download_chunk(semaphore, url, file_path, start, end, i, use_proxy)
-            tasks.append(task)
+        Returns:
+            下载是否成功. 服务器不支持 Range 时返回 None
+        """
+        validator = probe.validator
+        host = httpx.URL(url).host
+        segments = [(s, min(s + SEGMENT_SIZE, size)) for s in range(0, size, SEGMENT_SIZE)]
+        meta = await _load_meta(meta_path)
+        done: set[int] = set()
+        if (
+            validator
+            and meta.get("url") == url
+            and meta.get("validator") == validator
+            and meta.get("segment_size") == SEGMENT_SIZE
+            and await aiofiles.os.path.exists(partial)
+            and await aiofiles.os.path.getsize(partial) == size
+        ):
+            done = set(meta.get("done", []))
+            self.log_fn(f"⏩ 断点续传: {url} 已完成 {len(done)}/{len(segments)} 个分段")
+        else:
+            async with aiofiles.open(partial, "wb") as f:
+                await f.truncate(size)
+        meta = {"url": url, "size": size, "validator": validator, "segment_size": SEGMENT_SIZE, "done": sorted(done)}
+        await _save_meta(meta_path, meta)
+
+        pending = deque(i for i in range(len(segments)) if i not in done)
+        self.log_fn(f"📦 分块下载: {url} {len(pending)}/{len(segments)} 个分段, 总大小: {size} bytes")
+        queue: asyncio.Queue[tuple[int, bytes | None] | None] = asyncio.Queue(maxsize=64)
+        parallelism = _AdaptiveParallelism()
+        running = 0
+
+        async def writer():
+            last_save = time.monotonic()
+            async with aiofiles.open(partial, "r+b") as f:
+                while (item := await queue.get()) is not None:
+                    pos, data = item
+                    if data is None:  # 分段完成标记, pos 为分段序号
+                        done.add(pos)
+                        if time.monotonic() - last_save > 1:
+                            await f.flush()
+                            meta["done"] = sorted(done)
+                            await _save_meta(meta_path, meta)
+                            last_save = time.monotonic()
+                        continue
+                    await f.seek(pos)
+                    await f.write(data)
+
+        async def worker(group: asyncio.TaskGroup):
+            nonlocal running
+            running += 1
+            try:
+                while pending and running <= parallelism.target:
+                    i = pending.popleft()
+                    start, end = segments[i]
+                    headers = {"Range": f"bytes={start}-{end - 1}"}
+                    if validator:
+                        headers["If-Range"] = validator
+                    async with self.scheduler.slot(host, priority):
+                        res, error = await self.request("GET", url, headers=headers, use_proxy=use_proxy, stream=True)
+                        if res is None:
+                            raise RuntimeError(f"分段 {i} 下载失败: {error}")
+                        try:
+                            if res.status_code != 206:
+                                raise _RangeNotSupported()
+                            pos = start
+                            async for chunk in res.aiter_content():
+                                await queue.put((pos, chunk))
+                                pos += len(chunk)
+                                parallelism.add_bytes(len(chunk))
+                                await self.scheduler.throttle(host, len(chunk))
+                        finally:
+                            await res.aclose()
+                    if pos != end:
+                        raise RuntimeError(f"分段 {i} 不完整: {pos - start}/{end - start}")
+                    await queue.put((i, None))
+                    if parallelism.segment_done() > 0 and pending:
+                        group.create_task(worker(group))
+            finally:
+                running -= 1
+
+        async def run_workers():
+            async with asyncio.TaskGroup() as group:
+                for _ in range(min(parallelism.target, len(pending))):
+                    group.create_task(worker(group))
+            await queue.put(None)
 
-        # 并发执行所有下载任务
         try:
-            errors = await asyncio.gather(*tasks, return_exceptions=True)
-            # 检查所有任务是否成功
-            for i, err in enumerate(errors):
-                if isinstance(err, Exception):
-                    self.log_fn(f"🔴 分块 {i} 下载失败: {url} {str(err)}")
-                    return False
-                elif err:
-                    self.log_fn(f"🔴 分块 {i} 下载失败: {url} {err}")
-                    return False
-            self.log_fn(f"✅ 多分块下载完成: {url} {file_path}")
-            return True
-        except Exception as e:
-            self.log_fn(f"🔴 并发下载异常: {url} {str(e)}")
+            async with asyncio.TaskGroup() as tg:
+                tg.create_task(writer())
+                tg.create_task(run_workers())
+        except ExceptionGroup as eg:
+            if eg.subgroup(_RangeNotSupported):
+                self.log_fn(f"🟠 服务器不支持分段下载或文件已变更, 改为单连接下载: {url}")
+                await asyncio.to_thread(_remove_files, partial, meta_path)
+                return None
+            # 保留已完成的分段, 下次继续
+            meta["done"] = sorted(done)
+            await _save_meta(meta_path, meta)
+            while isinstance(e := eg.exceptions[0], ExceptionGroup):
+                eg = e
+            self.log_fn(f"🔴 分块下载失败: {url} {e}")
             return False
-
-    async def _download_chunk(
-        self,
-        semaphore: asyncio.Semaphore,
-        url: str,
-        file_path: Path,
-        start: int,
-        end: int,
-        chunk_id: int,
-        use_proxy: bool = True,
-    ) -> str | None:
-        """下载单个分块"""
-        async with semaphore:
-            res, error = await self.request(
-                "GET",
-                url,
-                headers={"Range": f"bytes={start}-{end}"},
-                use_proxy=use_proxy,
-                stream=True,
-            )
-            if res is None:
-                return error
-        # 写入文件
-        async with aiofiles.open(file_path, "rb+") as fp:
-            await fp.seek(start)
-            await fp.write(await res.acontent())
-        return ""
+        self.log_fn(f"✅ 多分块下载完成: {url} {partial} (并发 {parallelism.target})")
+        return True
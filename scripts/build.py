@@ -62,6 +62,7 @@ class BuildManager:
                 logger.info("清理现有的 dist 目录...")
                 shutil.rmtree(dist)
 
+            self._generate_resources()
             self._generate_spec()
             if self.is_mac:
                 self._modify_spec()
@@ -111,6 +112,15 @@ class BuildManager:
             if not Path(file_path).exists():
                 raise BuildError(f"文件检查失败: {file_path}")
 
+    def _generate_resources(self):
+        """生成打包的资源文件"""
+        logger.info("生成色花标题数据库...")
+        self._run_command(
+            [sys.executable, "-m", "mdcx.cmd.gen_sehua"],
+            success_msg="色花标题数据库生成完成",
+            error_msg="色花标题数据库生成失败",
+        )
+
     def _generate_spec(self):
         """生成.spec文件"""
         logger.info("生成 .spec 文件...")
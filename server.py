@@ -1,3 +1,5 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
@@ -16,13 +18,24 @@ def init():
     set_signal(signal)
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 监视媒体目录, 是否启用由设置决定, 修改设置后无需重启
+    from mdcx.core.watcher import get_library_watcher
+
+    watcher = get_library_watcher()
+    watcher.start()
+    yield
+    watcher.stop()
+
+
 def create_app() -> FastAPI:
     init()
 
     from mdcx.server.api.v1 import api
     from mdcx.server.ws.auth import WebSocketProtocolBearerMiddleware
 
-    app = FastAPI(title="MDCx API", version="1.0.0")
+    app = FastAPI(title="MDCx API", version="1.0.0", lifespan=lifespan)
     app.add_middleware(
         CORSMiddleware,
         allow_origins=["*"],  # Allows all origins
@@ -215,3 +215,121 @@ def generate_random_list_from_enum(enum_class: type[Enum], min_items: int = 1, m
     all_items = list(enum_class)
     num_items = random.randint(min_items, min(max_items, len(all_items)))
     return random.sample(all_items, num_items)
+
+
+# 番号提取测试语料. 每个生成函数返回 (文件名中的番号写法, 期望提取结果)
+_YOUMA_PREFIXES = ["SSIS", "ABP", "IPX", "MIDV", "STARS", "JUL", "PRED", "CAWD", "SSNI", "MIAA", "EBOD", "WAAA", "ADN"]
+_SUREN_PREFIXES = [("259", "LUXU"), ("200", "GANA"), ("300", "MIUM"), ("390", "JAC"), ("428", "SUKE")]
+_OUMEI_STUDIOS = [
+    ("SexArt", "Sexart"),
+    ("Blacked", "Blacked"),
+    ("Tushy", "Tushy"),
+    ("Vixen", "Vixen"),
+    ("wgp", "Whengirlsplay"),
+    ("21n", "21naturals"),
+]
+_NUMBER_PREFIX_NOISE = ["", "", "", "hhd800.com@", "[456k.me]", "gg5.co@", "Carib-", "1pondo-"]
+_NUMBER_SUFFIX_NOISE = ["", "", "", "-C", "-cd1", "-CD2", "_4K", " 1080p", "-HD", ".part1", "-A", "_B", " x265"]
+_NUMBER_EXTENSIONS = [".mp4", ".mkv", ".avi", ".wmv", ".ts"]
+
+
+def _gen_youma(rng: random.Random) -> tuple[str, str]:
+    prefix, num = rng.choice(_YOUMA_PREFIXES), rng.randint(1, 999)
+    expected = f"{prefix}-{num:03d}"
+    form = rng.randrange(4)
+    if form == 0:
+        return expected.lower(), expected
+    if form == 1:
+        return f"{prefix}{num:03d}", expected
+    if form == 2:
+        return f"{prefix.lower()}00{num:03d}", expected
+    return expected, expected
+
+
+def _gen_suren(rng: random.Random) -> tuple[str, str]:
+    digits, letters = rng.choice(_SUREN_PREFIXES)
+    expected = f"{digits}{letters}-{rng.randint(100, 2999)}"
+    if rng.random() < 0.3 and letters in ("LUXU", "GANA", "MIUM"):  # 省略数字前缀, 根据 SUREN_DIC 补全
+        return expected.removeprefix(digits), expected
+    return expected, expected
+
+
+def _gen_fc2(rng: random.Random) -> tuple[str, str]:
+    num = rng.randint(1000000, 4999999)
+    form = rng.choice(["FC2-PPV-{}", "fc2ppv_{}", "FC2-{}", "fc2-ppv-{}", "FC2PPV-{}"])
+    return form.format(num), f"FC2-{num}"
+
+
+def _gen_heyzo(rng: random.Random) -> tuple[str, str]:
+    num = rng.randint(1000, 3500)
+    form = rng.choice(["HEYZO-{}", "heyzo_hd_{}", "heyzo-{}"])
+    return form.format(num), f"HEYZO-{num}"
+
+
+def _gen_uncensored(rng: random.Random) -> tuple[str, str]:
+    sep = rng.choice("-_")
+    number = f"{rng.randint(10, 12):02d}{rng.randint(1, 28):02d}{rng.randint(10, 24):02d}{sep}{rng.randint(1, 999):03d}"
+    return number, number
+
+
+def _gen_tokyo_hot(rng: random.Random) -> tuple[str, str]:
+    number = f"n{rng.randint(1000, 2999)}"
+    return rng.choice([number, f"Tokyo-Hot {number}", number.upper()]), number
+
+
+def _gen_oumei(rng: random.Random) -> tuple[str, str]:
+    studio, name = rng.choice(_OUMEI_STUDIOS)
+    date = f"{rng.randint(15, 24)}.{rng.randint(1, 12):02d}.{rng.randint(1, 28):02d}"
+    return f"{studio}.{date}", f"{name}.{date}"
+
+
+def _gen_special(rng: random.Random) -> tuple[str, str]:
+    num = rng.randint(100, 999)
+    return rng.choice(
+        [
+            (f"mywife No.{num}", f"Mywife No.{num}"),
+            (f"kin8tengoku-{num}", f"KIN8-{num}"),
+            (f"th101-{num}-1{num}99", f"th101-{num}-1{num}99"),
+            (f"h_173mega{num % 90 + 10}", f"MEGA-{num % 90 + 10}"),
+            (f"mmr-ak{num}sp", f"MMRAK{num}SP"),
+            (f"MD-0{num}", f"MD-0{num}"),
+            (f"t28-{num}", f"T28-{num}"),
+            (f"S2MBD-{num}", f"S2MBD-{num}"),
+            (f"CW3D2DBD-{num}", f"CW3D2DBD-{num}"),
+        ]
+    )
+
+
+NUMBER_FAMILIES = {
+    "youma": _gen_youma,
+    "suren": _gen_suren,
+    "fc2": _gen_fc2,
+    "heyzo": _gen_heyzo,
+    "uncensored": _gen_uncensored,
+    "tokyo_hot": _gen_tokyo_hot,
+    "oumei": _gen_oumei,
+    "special": _gen_special,
+}
+
+
+def generate_number_corpus(count: int = 12000, seed: int = 0) -> list[tuple[str, str, str]]:
+    """
+    生成番号提取测试语料, 包含常见的网站前缀、字幕/分集/分辨率后缀等干扰字符
+
+    Args:
+        count: 语料数量
+        seed: 随机种子, 相同种子生成相同语料
+
+    Returns:
+        (文件路径, 番号类别, 期望提取结果) 列表
+    """
+    rng = random.Random(seed)
+    families = list(NUMBER_FAMILIES.items())
+    corpus = []
+    for i in range(count):
+        family, gen = families[i % len(families)]
+        raw, expected = gen(rng)
+        name = rng.choice(_NUMBER_PREFIX_NOISE) + raw + rng.choice(_NUMBER_SUFFIX_NOISE)
+        folder = rng.choice(["/media/av", "/mnt/nas/待刮削", "/data/JAV/未整理"])
+        corpus.append((f"{folder}/{name}{rng.choice(_NUMBER_EXTENSIONS)}", family, expected))
+    return corpus
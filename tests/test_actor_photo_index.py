@@ -0,0 +1,46 @@
+import os
+import unicodedata
+
+from mdcx.tools.actor_photo_index import ActorPhotoIndex, folder_version, index_filetree, index_folder
+
+RAW = "https://raw.githubusercontent.com/gfriends/gfriends"
+
+
+def test_index_filetree():
+    filetree = {
+        "Content": {
+            "b-Studio": {"夢乃あいか.jpg": "AI-Fix-夢乃あいか.jpg?t=1", "三上悠亜.png": "三上悠亜.png"},
+            "a-Studio": {"夢乃あいか.jpg": "夢乃あいか.jpg?t=2", "三上悠亜.jpg": "三上悠亜.jpg", "readme.txt": "x"},
+        }
+    }
+    photos = index_filetree(filetree, RAW)
+    # 按文件夹排序后先出现的优先, .jpg 优先于 .png
+    assert photos == {
+        "夢乃あいか": f"{RAW}/master/Content/a-Studio/夢乃あいか.jpg?t=2",
+        "三上悠亜": f"{RAW}/master/Content/a-Studio/三上悠亜.jpg",
+    }
+
+
+def test_actor_photo_index(tmp_path):
+    folder = tmp_path / "photos"
+    (folder / "sub").mkdir(parents=True)
+    # macOS 下文件名为 NFD
+    nfd = unicodedata.normalize("NFD", "波多野結衣ぱ")
+    (folder / "sub" / f"{nfd}.png").write_bytes(b"png")
+    (folder / "三上悠亜.jpg").write_bytes(b"jpg")
+    version = folder_version(folder)
+
+    index = ActorPhotoIndex(tmp_path / "actor_photos.db")
+    index.replace("local", version, index_folder(folder))
+    photos = index.load("local")
+    assert photos.get("波多野結衣ぱ") == os.path.join(folder, "sub", f"{nfd}.png")
+    assert photos.get("三上悠亜.jpg") == os.path.join(folder, "三上悠亜.jpg")
+    assert photos.get("夢乃あいか") is None
+    assert len(photos) == 2
+    assert index.version("local")[0] == version  # type: ignore[index]
+    assert index.version("gfriends") is None
+
+    # 增加文件后版本变化
+    (folder / "sub" / "夢乃あいか.jpg").write_bytes(b"jpg")
+    assert folder_version(folder) != version
+    index.close()
@@ -0,0 +1,87 @@
+import os
+import sqlite3
+import threading
+
+from mdcx.config.manager import manager
+from mdcx.config.resources import resources
+from mdcx.models.emby import EMbyActressInfo
+from mdcx.tools.actress_db import ActressDB, build_cache_db, cache_db_signature
+
+
+def _source_db(path):
+    conn = sqlite3.connect(path)
+    conn.execute("create table Names (Name text, Alias text)")
+    conn.execute(
+        "create table Info (Name text, Href text, Cup text, Height text, Bust text, Waist text, Hip text, "
+        "Birthday text, Birthplace text, Account text, CareerPeriod text)"
+    )
+    conn.executemany(
+        "insert into Names values (?, ?)",
+        [
+            ("夢乃あいか", "夢乃あいか"),
+            ("夢乃あいか", "ゆめのあいか"),
+            ("三上悠亜", "三上悠亜 (鬼頭桃菜)"),
+            ("O'Neil", "O'Neil"),
+        ],
+    )
+    conn.executemany(
+        "insert into Info values (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        [
+            ("夢乃あいか", "https://a", "E", "163", "83", "58", "85", "1995-11-29", "福岡県", "", "2015年 - "),
+            ("三上悠亜", "https://b", "F", "159", "83", "57", "88", "1993-08-16", "", "", ""),
+            ("O'Neil", "https://c", "", "", "", "", "", "", "", "", ""),
+        ],
+    )
+    conn.commit()
+    conn.close()
+
+
+def test_actress_db_lookup(tmp_path, monkeypatch):
+    source = tmp_path / "actress.db"
+    _source_db(source)
+    cache = tmp_path / "actress_db_cache.db"
+    build_cache_db(source, cache)
+    assert cache_db_signature(cache)
+    monkeypatch.setattr(ActressDB, "DB", cache)
+    monkeypatch.setattr(ActressDB, "_generation", ActressDB._generation + 1)
+
+    records = ActressDB.lookup(["ゆめのあいか", "三上悠亜", "O'Neil", "不存在"])
+    assert records["ゆめのあいか"].name == "夢乃あいか"
+    assert records["三上悠亜"].alias == "三上悠亜 (鬼頭桃菜)"  # 前缀匹配
+    assert records["O'Neil"].href == "https://c"  # 参数化查询, 引号不影响
+    assert "不存在" not in records
+
+    info = EMbyActressInfo(name="ゆめのあいか", server_id="s", id="1")
+    assert ActressDB.apply_record(info, records["ゆめのあいか"])[0] == 1
+    assert info.locations == ["日本·福岡县"] and info.birthday == "1995-11-29"
+
+    # 每个线程使用各自的连接
+    result = {}
+    t = threading.Thread(target=lambda: result.update(ActressDB.lookup(["夢乃あいか"])))
+    t.start()
+    t.join()
+    assert result["夢乃あいか"].href == "https://a"
+
+
+def test_actress_db_rebuild(tmp_path, monkeypatch):
+    source = tmp_path / "actress.db"
+    _source_db(source)
+    monkeypatch.setattr(resources, "_userdata_base", tmp_path / "userdata")
+    (tmp_path / "userdata").mkdir()
+    monkeypatch.setattr(manager.config, "info_database_path", str(source))
+    monkeypatch.setattr(ActressDB, "DB", None)
+    ActressDB.init_db_in_background().join()
+    old = ActressDB.DB
+    assert old is not None and ActressDB.lookup(["夢乃あいか"])
+
+    # 原数据库变化后生成新的缓存文件, 不替换仍被连接打开的旧文件
+    conn = sqlite3.connect(source)
+    conn.execute("insert into Names values ('新人', '新人')")
+    conn.execute("insert into Info (Name, Href) values ('新人', 'https://d')")
+    conn.commit()
+    conn.close()
+    os.utime(source, ns=(0, source.stat().st_mtime_ns + 1))
+    ActressDB.init_db()
+    assert ActressDB.DB is not None and ActressDB.DB != old
+    assert ActressDB.lookup(["新人"])["新人"].href == "https://d"
+    assert [p.name for p in (tmp_path / "userdata").glob("actress_db_cache*")] == [ActressDB.DB.name]
@@ -0,0 +1,74 @@
+import asyncio
+
+import pytest
+
+from mdcx.browser import PagePool, should_block
+
+
+class FakePage:
+    def __init__(self):
+        self.closed = False
+        self.visited: list[tuple[str, str]] = []
+
+    def is_closed(self):
+        return self.closed
+
+    async def close(self):
+        self.closed = True
+
+    async def goto(self, url, wait_until=None, timeout=None):
+        if url.endswith("/error"):
+            raise TimeoutError(url)
+        await asyncio.sleep(0.01)
+        self.visited.append((url, wait_until))
+
+    async def wait_for_selector(self, selector, timeout=None):
+        self.visited.append(("selector", selector))
+
+    async def evaluate(self, expression):
+        return "Mozilla/5.0 Test"
+
+    async def content(self):
+        return f"<html>{self.visited[-1][0]}</html>"
+
+
+class FakeContext:
+    def __init__(self):
+        self.pages: list[FakePage] = []
+
+    async def new_page(self):
+        page = FakePage()
+        self.pages.append(page)
+        return page
+
+
+@pytest.mark.asyncio
+async def test_page_pool_bounded_and_recycled():
+    context = FakeContext()
+    pool = PagePool(context, size=2, max_uses=3)  # type: ignore[arg-type]
+
+    results = await asyncio.gather(*(pool.fetch(f"https://example.com/{i}") for i in range(6)))
+    assert results == [f"<html>https://example.com/{i}</html>" for i in range(6)]
+    # 最多同时打开 2 个页面, 每个页面使用 3 次后关闭
+    assert len(context.pages) == 2
+    assert all(p.closed and len(p.visited) == 3 for p in context.pages)
+
+    await pool.fetch("https://example.com/a", wait="div.movie-info")
+    assert context.pages[-1].visited == [("https://example.com/a", "domcontentloaded"), ("selector", "div.movie-info")]
+
+    # 出错的页面不再复用
+    with pytest.raises(TimeoutError):
+        await pool.fetch("https://example.com/error")
+    assert context.pages[-1].closed
+
+    await pool.close()
+    assert all(p.closed for p in context.pages)
+
+
+def test_should_block():
+    assert should_block("image", "https://pics.dmm.co.jp/a.jpg")
+    assert should_block("font", "https://example.com/a.woff2")
+    assert should_block("script", "https://www.google-analytics.com/analytics.js")
+    assert should_block("script", "https://googletagmanager.com/gtm.js")
+    assert not should_block("script", "https://javdb.com/app.js")
+    assert not should_block("document", "https://www.dmm.co.jp/digital/videoa/-/detail/=/cid=abc123/")
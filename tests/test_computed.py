@@ -0,0 +1,43 @@
+import threading
+
+from mdcx.config.computed import Computed, close_later
+from mdcx.config.models import Config
+
+
+def test_computed_reuses_unchanged_clients():
+    config = Config()
+    first = Computed(config)
+
+    # 设置未变化时沿用全部客户端
+    same = Computed(config.model_copy(), first)
+    assert same.async_client is first.async_client
+    assert same.async_client.scheduler is first.async_client.scheduler
+    assert same.llm_client is first.llm_client
+    assert same.replaced == []
+
+    # 重试次数直接更新, 下载设置变化时仅替换调度器
+    changed = config.model_copy(update={"retry": config.retry + 1, "download_concurrency": 3})
+    updated = Computed(changed, same)
+    assert updated.async_client is first.async_client
+    assert updated.async_client.retry == config.retry + 1
+    assert updated.async_client.scheduler.max_concurrent == 3
+    assert updated.replaced == []
+
+    # 超时变化时重建客户端并沿用限速器, LLM 设置变化时重建 LLM 客户端
+    translate = config.translate_config.model_copy(update={"llm_key": "sk-test"})
+    changed = changed.model_copy(update={"timeout": config.timeout + 1, "translate_config": translate})
+    rebuilt = Computed(changed, updated)
+    assert rebuilt.async_client is not first.async_client
+    assert rebuilt.async_client.limiters is first.async_client.limiters
+    assert rebuilt.llm_client is not first.llm_client
+    assert rebuilt.replaced == [first.llm_client.close, first.async_client.close]
+
+
+def test_close_later():
+    closed = threading.Event()
+
+    async def close():
+        closed.set()
+
+    close_later([close], delay=0)
+    assert closed.wait(5)
@@ -0,0 +1,42 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image
+
+from mdcx.image import prepare_actor_photo
+from mdcx.tools.emby_sync import EmbySyncState, image_tag_hash, settings_key
+
+
+def test_emby_sync_state(tmp_path):
+    state = EmbySyncState(tmp_path / "emby_sync.db")
+    actor = {"Id": "1", "ImageTags": {"Primary": "a"}, "BackdropImageTags": ["b"]}
+    tag = image_tag_hash(actor)
+    task = "photo-" + settings_key(["actor_photo_net"], "https://github.com/gfriends/gfriends")
+    state.mark("http://emby", task, "1", tag)
+    state.close()
+
+    # 重新打开后仍可读取, 不同服务器和任务互不影响
+    state = EmbySyncState(tmp_path / "emby_sync.db")
+    assert state.load("http://emby", task) == {"1": tag}
+    assert state.load("http://other", task) == {}
+    assert state.load("http://emby", "info") == {}
+    # 服务器上的图片变化后哈希随之变化
+    assert image_tag_hash({**actor, "ImageTags": {"Primary": "c"}}) != tag
+    assert image_tag_hash({"ImageTags": None}) == image_tag_hash({})
+    state.clear("http://emby", task)
+    assert state.load("http://emby", task) == {}
+    state.close()
+
+
+def test_prepare_actor_photo_in_process(tmp_path):
+    pic = tmp_path / "actor.jpg"
+    Image.new("RGB", (400, 400), "red").save(pic)
+    backdrop = tmp_path / "actor-big.jpg"
+    # spawn 下子进程需重新导入模块, 比 fork 更严格
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+        assert pool.submit(prepare_actor_photo, pic, backdrop).result() == ""
+        assert "actor-missing.jpg" in pool.submit(prepare_actor_photo, tmp_path / "actor-missing.jpg").result()
+    with Image.open(pic) as img:
+        assert img.size == (266, 400)  # 裁剪为 2:3
+    with Image.open(backdrop) as img:
+        assert img.size == (462, 400)
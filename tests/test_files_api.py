@@ -0,0 +1,71 @@
+import json
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from mdcx.server.api.v1 import files
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(files, "SAFE_DIRS", [tmp_path])
+    app = FastAPI()
+    app.include_router(files.router)
+    return TestClient(app)
+
+
+def _tree(root):
+    for name in ("b", "A"):
+        (root / name).mkdir()
+    for i in range(25):
+        (root / f"f{i:02}.mp4").write_bytes(b"x" * i)
+
+
+def test_list_files_pages(client, tmp_path):
+    _tree(tmp_path)
+    names = []
+    cursor = None
+    while True:
+        params = {"path": str(tmp_path), "limit": 10}
+        if cursor:
+            params["cursor"] = cursor
+        r = client.get("/files/list", params=params)
+        assert r.status_code == 200
+        data = r.json()
+        assert data["total"] == 27
+        names += [item["name"] for item in data["items"]]
+        cursor = data["next_cursor"]
+        if cursor is None:
+            break
+    # 先目录后文件, 不区分大小写
+    assert names == ["A", "b"] + [f"f{i:02}.mp4" for i in range(25)]
+
+    # 翻页期间新增的条目不会导致重复
+    first = client.get("/files/list", params={"path": str(tmp_path), "limit": 5}).json()
+    (tmp_path / "f02a.mp4").touch()
+    second = client.get(
+        "/files/list", params={"path": str(tmp_path), "limit": 5, "cursor": first["next_cursor"]}
+    ).json()
+    assert second["total"] == 28
+    assert second["items"][0]["name"] == "f02a.mp4"
+    assert not {i["name"] for i in first["items"]} & {i["name"] for i in second["items"]}
+
+    assert client.get("/files/list", params={"path": str(tmp_path), "cursor": "bad"}).status_code == 400
+
+
+def test_stream_files(client, tmp_path):
+    _tree(tmp_path)
+    r = client.get("/files/list/stream", params={"path": str(tmp_path)})
+    assert r.headers["content-type"].startswith("application/x-ndjson")
+    items = [json.loads(line) for line in r.text.splitlines()]
+    assert [i["name"] for i in items[:3]] == ["A", "b", "f00.mp4"]
+    assert len(items) == 27
+    assert items[-1]["size"] == 24
+
+
+def test_list_files_outside_safe_dirs(client, tmp_path):
+    assert client.get("/files/list", params={"path": str(tmp_path.parent)}).status_code == 403
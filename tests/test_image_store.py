@@ -0,0 +1,51 @@
+from mdcx.base.image_store import ImageStore
+from mdcx.utils.file import link_or_copy_sync
+
+
+def test_image_store(tmp_path):
+    store = ImageStore(tmp_path / "store")
+    src = tmp_path / "thumb.jpg"
+    src.write_bytes(b"image" * 100)
+
+    h = store.add(src, "https://example.com/a.jpg")
+    # 相同内容的不同 URL 共用一个文件
+    assert store.add(src, "https://cdn.example.com/a.jpg") == h
+    assert store.total_size() == 500
+
+    dest = tmp_path / "movie" / "thumb.jpg"
+    dest.parent.mkdir()
+    dest.write_bytes(b"old")
+    assert store.fetch("https://cdn.example.com/a.jpg", dest) in ("reflink", "hardlink", "copy")
+    assert dest.read_bytes() == src.read_bytes()
+    assert store.fetch("https://example.com/missing.jpg", dest) == ""
+
+    # 存储中的文件损坏时视为未命中
+    store.blob_path(h, ".jpg").unlink()
+    assert store.lookup("https://example.com/a.jpg") is None
+    assert store.total_size() == 0
+    store.close()
+
+
+def test_image_store_prune(tmp_path):
+    store = ImageStore(tmp_path / "store")
+    for i in range(3):
+        p = tmp_path / f"{i}.jpg"
+        p.write_bytes(bytes([i]) * 100)
+        store.add(p, f"https://example.com/{i}.jpg")
+    store.lookup("https://example.com/0.jpg")  # 最近使用, 应被保留
+    assert store.prune(200) == 1
+    assert store.lookup("https://example.com/1.jpg") is None
+    assert store.lookup("https://example.com/0.jpg") is not None
+    store.close()
+
+
+def test_link_or_copy(tmp_path):
+    src = tmp_path / "a.jpg"
+    src.write_bytes(b"data")
+    dest = tmp_path / "b.jpg"
+    assert link_or_copy_sync(src, dest, link=False) == "copy"
+    assert dest.read_bytes() == b"data"
+    assert dest.stat().st_ino != src.stat().st_ino
+    if link_or_copy_sync(src, dest) == "hardlink":
+        assert dest.stat().st_ino == src.stat().st_ino
+    assert not (tmp_path / "b.jpg.[LINK]").exists()
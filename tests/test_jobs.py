@@ -0,0 +1,169 @@
+import asyncio
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from mdcx.core import jobs
+from mdcx.core.jobs import Job, JobKind, JobQueue, JobStatus
+
+
+class FakeProvider:
+    async def close(self):
+        pass
+
+
+class FakeScraper:
+    """记录开始刮削的文件, 在对应的 release 事件被设置后结束"""
+
+    started: list[str] = []
+    release: dict[str, threading.Event] = {}
+
+    def __init__(self, crawler_provider, progress):
+        self.crawler_provider = crawler_provider
+        self.progress = progress
+
+    async def _wait(self, name: str):
+        FakeScraper.started.append(name)
+        event = FakeScraper.release.setdefault(name, threading.Event())
+        while not event.is_set():
+            await asyncio.sleep(0.01)
+
+    async def run(self, file_mode, movie_list):
+        self.progress.total = 2
+        await self._wait("bulk")
+        self.progress.done = 2
+        self.progress.succeeded = self.progress.failed = 1
+
+    async def scrape_file(self, file_path: Path, appoint) -> str:
+        await self._wait(file_path.name)
+        self.progress.done += 1
+        return "" if appoint[1] else "failed"
+
+
+@pytest.fixture
+def queue(monkeypatch):
+    FakeScraper.started = []
+    FakeScraper.release = {}
+    monkeypatch.setattr(jobs, "Scraper", FakeScraper)
+    monkeypatch.setattr(jobs, "CrawlerProvider", lambda *args: FakeProvider())
+    queue = JobQueue(small_concurrency=2)
+    yield queue
+    for event in FakeScraper.release.values():
+        event.set()
+    for job in queue.list():
+        queue.cancel(job.id)
+
+
+def _wait_for(predicate, timeout=5.0):
+    end = time.time() + timeout
+    while not predicate():
+        assert time.time() < end, "timeout"
+        time.sleep(0.01)
+
+
+def _release(name: str):
+    FakeScraper.release.setdefault(name, threading.Event()).set()
+
+
+def test_small_jobs_run_alongside_bulk(queue):
+    a = queue.submit(JobKind.SCRAPE_FILE, [Path("a.mp4")], "https://javdb.com/v/a", "javdb")
+    b = queue.submit(JobKind.SCRAPE_FILE, [Path("b.mp4")])
+    _wait_for(lambda: sorted(FakeScraper.started) == ["a.mp4", "b.mp4"])
+    assert a.status == b.status == JobStatus.RUNNING
+
+    # 批量刮削等待正在运行的单文件任务结束, 等待期间不开始新的单文件任务
+    bulk = queue.submit(JobKind.SCRAPE, [])
+    c = queue.submit(JobKind.SCRAPE_FILE, [Path("c.mp4")], "https://javdb.com/v/c", "javdb")
+    _release("a.mp4")
+    _wait_for(lambda: a.status == JobStatus.SUCCEEDED)
+    time.sleep(0.1)
+    assert bulk.status == c.status == JobStatus.QUEUED
+    _release("b.mp4")
+    # 文件刮削失败不是任务失败, 原因记录在 error 中
+    _wait_for(lambda: b.status == JobStatus.SUCCEEDED)
+    assert b.error == "failed"
+
+    # 批量刮削开始后, 单文件任务可同时运行
+    _wait_for(lambda: c.status == JobStatus.RUNNING)
+    assert bulk.status == JobStatus.RUNNING
+    assert FakeScraper.started[2:] == ["bulk", "c.mp4"]
+    _release("c.mp4")
+    _release("bulk")
+    _wait_for(lambda: bulk.status.finished and c.status.finished)
+    assert bulk.status == c.status == JobStatus.SUCCEEDED
+    assert bulk.progress.done == 2 and bulk.progress.failed == 1 and bulk.finished_at is not None
+
+
+def test_cancel(queue):
+    running = queue.submit(JobKind.SCRAPE, [])
+    queued = queue.submit(JobKind.SCRAPE, [])
+    _wait_for(lambda: running.status == JobStatus.RUNNING)
+    queue.cancel(queued.id)
+    assert queued.status == JobStatus.CANCELLED
+    queue.cancel(running.id)
+    _wait_for(lambda: running.status == JobStatus.CANCELLED)
+    assert FakeScraper.started == ["bulk"]
+    assert queue.cancel("missing") is None
+
+
+def test_job_error(queue, monkeypatch):
+    async def run(self, file_mode, movie_list):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(FakeScraper, "run", run)
+    job = queue.submit(JobKind.SCRAPE, [])
+    _wait_for(lambda: job.status.finished)
+    assert job.status == JobStatus.FAILED and job.error == "boom"
+
+
+def test_history_pruned(queue):
+    queue.max_history = 1
+    for name in ("a.mp4", "b.mp4"):
+        _release(name)
+        job = queue.submit(JobKind.SCRAPE_FILE, [Path(name)], "https://javdb.com/v/a", "javdb")
+        _wait_for(lambda job=job: job.status.finished)
+    last = queue.submit(JobKind.SCRAPE_FILE, [Path("c.mp4")])
+    assert [j.id for j in queue.list()] == [job.id, last.id]
+
+
+def test_eta():
+    job = Job("id", JobKind.SCRAPE, [])
+    assert job.eta() is None
+    job.status = JobStatus.RUNNING
+    job.started_at = time.time() - 10
+    job.progress.total = 4
+    assert job.eta() is None
+    job.progress.done = 2
+    assert job.eta() == pytest.approx(10, abs=1)
+
+
+def test_jobs_api(queue, tmp_path, monkeypatch):
+    pytest.importorskip("fastapi")
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from mdcx.server.api.v1 import jobs as jobs_api
+
+    monkeypatch.setattr(jobs_api, "SAFE_DIRS", [tmp_path])
+    monkeypatch.setattr(jobs_api, "get_job_queue", lambda: queue)
+    app = FastAPI()
+    app.include_router(jobs_api.router)
+    client = TestClient(app)
+
+    assert client.post("/jobs", json={"kind": "scrape_file"}).status_code == 400
+    assert client.post("/jobs", json={"kind": "scrape_file", "paths": ["/etc/passwd"]}).status_code == 403
+    r = client.post("/jobs", json={"kind": "scrape_file", "paths": [str(tmp_path / "a.mp4")], "url": "example.org"})
+    assert r.status_code == 400
+
+    r = client.post("/jobs", json={"kind": "scrape_file", "paths": [str(tmp_path / "a.mp4")]})
+    assert r.status_code == 202
+    job_id = r.json()["id"]
+    _wait_for(lambda: client.get(f"/jobs/{job_id}").json()["status"] == "running")
+    assert [j["id"] for j in client.get("/jobs").json()] == [job_id]
+
+    r = client.post(f"/jobs/{job_id}/cancel")
+    assert r.status_code == 200
+    _wait_for(lambda: client.get(f"/jobs/{job_id}").json()["status"] == "cancelled")
+    assert client.get("/jobs/missing").status_code == 404
@@ -0,0 +1,112 @@
+import pytest
+
+from mdcx.base import library
+from mdcx.base.library import LibraryIndex, _find_duplicates, _replace_with_hardlink, dedup_movie_list
+from mdcx.config.manager import manager
+
+
+def test_find_duplicates(tmp_path, monkeypatch):
+    index = LibraryIndex(tmp_path / "library.db")
+    monkeypatch.setattr(library, "_library_index", index)
+
+    content = bytes(range(256)) * 1024
+    a = tmp_path / "a" / "ABC-123.mp4"
+    b = tmp_path / "b" / "abc123 1080p.mp4"
+    c = tmp_path / "c" / "other.mp4"
+    for p in (a, b, c):
+        p.parent.mkdir()
+    a.write_bytes(content)
+    b.write_bytes(content)
+    c.write_bytes(content[::-1])
+
+    unique, duplicates = _find_duplicates([a, b, c])
+    assert unique == [a, c]
+    assert duplicates == {b: a}
+
+    # 刮削后移动的文件仍可被识别
+    scraped = tmp_path / "output" / "ABC-123.mp4"
+    scraped.parent.mkdir()
+    a.rename(scraped)
+    index.record_scraped(a, scraped, "ABC-123")
+    unique, duplicates = _find_duplicates([b, c])
+    assert unique == [c]
+    assert duplicates == {b: scraped}
+
+    assert _replace_with_hardlink(b, scraped) == ""
+    assert b.stat().st_ino == scraped.stat().st_ino
+    assert b.read_bytes() == content
+    assert _replace_with_hardlink(c, scraped) == "抽样校验不一致"
+    index.close()
+
+
+def test_local_numbers(tmp_path):
+    index = LibraryIndex(tmp_path / "library.db")
+    files = {"/a/ABC-123.mp4": (100, 1), "/a/ABC-456.mp4": (200, 2), "/a/gone.mp4": (300, 3)}
+    assert sorted(index.sync_local_numbers(files)) == sorted(files)
+    index.set_local_numbers(
+        [
+            ("/a/ABC-123.mp4", 100, 1, "ABC-123", True),
+            ("/a/ABC-456.mp4", 200, 2, "ABC-456", False),
+            ("/a/gone.mp4", 300, 3, "GONE-001", False),
+        ]
+    )
+    assert index.local_number_sets() == ({"ABC-123", "ABC-456", "GONE-001"}, {"ABC-123"})
+
+    # 移动的文件沿用番号, 修改的文件重新解析, 删除的文件从索引中移除
+    files = {"/b/ABC-123.mp4": (100, 1), "/a/ABC-456.mp4": (201, 5)}
+    assert index.sync_local_numbers(files) == ["/a/ABC-456.mp4"]
+    index.set_local_numbers([("/a/ABC-456.mp4", 201, 5, "ABC-456", True)])
+    assert index.local_number_sets() == ({"ABC-123", "ABC-456"}, {"ABC-123", "ABC-456"})
+    assert index.sync_local_numbers(files) == []
+
+    # 重命名的文件 (没有 NFO 时番号来自文件名) 需要重新解析
+    files = {"/b/ABC-124.mp4": (100, 1), "/a/ABC-456.mp4": (201, 5)}
+    assert index.sync_local_numbers(files) == ["/b/ABC-124.mp4"]
+    assert index.local_number_sets() == ({"ABC-456"}, {"ABC-456"})
+    index.close()
+
+
+def test_find_duplicates_small_files(tmp_path, monkeypatch):
+    # oshash 不支持小于 128 KB 的文件
+    index = LibraryIndex(tmp_path / "library.db")
+    monkeypatch.setattr(library, "_library_index", index)
+    a, b, c = tmp_path / "a.mp4", tmp_path / "b.mp4", tmp_path / "c.mp4"
+    a.write_bytes(b"small")
+    b.write_bytes(b"small")
+    c.write_bytes(b"other")
+    unique, duplicates = _find_duplicates([a, b, c])
+    assert unique == [a, c]
+    assert duplicates == {b: a}
+    index.record_scraped(a, a, "ABC-123")
+    assert index.find_scraped(index.get_hash(b), 5) == [(a, "ABC-123")]
+    index.close()
+
+
+@pytest.mark.asyncio
+async def test_dedup_movie_list(tmp_path, monkeypatch):
+    index = LibraryIndex(tmp_path / "library.db")
+    monkeypatch.setattr(library, "_library_index", index)
+    monkeypatch.setattr(manager.config, "dedup_mode", "skip")
+    a, b, c = tmp_path / "a" / "ABC-123.mp4", tmp_path / "b" / "abc123.mp4", tmp_path / "c" / "ABC-123 copy.mp4"
+    for p in (a, b, c):
+        p.parent.mkdir()
+        p.write_bytes(b"same")
+
+    # 本批次中的重复文件等待首个文件刮削完成后再检测
+    assert await dedup_movie_list([a, b, c]) == ([a], [b, c])
+    # 首个文件刮削失败, 重复文件仍需刮削
+    assert await dedup_movie_list([b, c]) == ([b], [c])
+
+    # 刮削成功后, 重复文件复制其 NFO 及图片
+    scraped = tmp_path / "output" / "ABC-123.mp4"
+    scraped.parent.mkdir()
+    b.rename(scraped)
+    (tmp_path / "output" / "ABC-123.nfo").write_text("<num>ABC-123</num>")
+    (tmp_path / "output" / "poster.jpg").write_bytes(b"poster")
+    (tmp_path / "c" / "ABC-123 copy-thumb.jpg").write_bytes(b"own thumb")
+    index.record_scraped(b, scraped, "ABC-123")
+    assert await dedup_movie_list([c]) == ([], [])
+    assert (tmp_path / "c" / "ABC-123 copy.nfo").read_text() == "<num>ABC-123</num>"
+    assert (tmp_path / "c" / "ABC-123 copy-poster.jpg").read_bytes() == b"poster"
+    assert (tmp_path / "c" / "ABC-123 copy-thumb.jpg").read_bytes() == b"own thumb"
+    index.close()
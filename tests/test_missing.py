@@ -0,0 +1,86 @@
+import pytest
+
+from mdcx.tools import missing
+from mdcx.tools.missing import ActorCatalogue, ActorWork
+
+ACTOR = "https://javdb.com/actors/abc"
+
+
+def _page(works: list[tuple[str, str]], has_next: bool) -> str:
+    boxes = "".join(
+        f'<a class="box" href="/v/{number}"><div class="video-title"><strong>{number}</strong> title</div>'
+        f'<div class="meta">{date}</div><div class="tags has-addons"><span class="tag is-success">m</span></div></a>'
+        for number, date in works
+    )
+    return f"<html><body>{boxes}{'<a class=pagination-next></a>' if has_next else ''}</body></html>"
+
+
+class FakeJavdb:
+    """按页返回作品, 每页 2 部, 日期从新到旧"""
+
+    def __init__(self, works: list[tuple[str, str]], singles: list[tuple[str, str]]):
+        self.lists = {"": works, "&t=s": singles}
+        self.requests: list[str] = []
+        self.fail = False
+
+    async def scraper_web(self, url: str) -> str:
+        self.requests.append(url)
+        if self.fail:
+            return ""
+        query = "&t=s" if url.endswith("&t=s") else ""
+        page = int(url.removeprefix(f"{ACTOR}?page=").removesuffix(query))
+        works = self.lists[query]
+        return _page(works[(page - 1) * 2 : page * 2], page * 2 < len(works))
+
+
+def _works(n: int) -> list[tuple[str, str]]:
+    return [(f"ABC-{i:03}", f"2024-01-{i:02}") for i in range(n, 0, -1)]
+
+
+@pytest.fixture
+def javdb(tmp_path, monkeypatch):
+    fake = FakeJavdb(_works(9), [("ABC-002", "2024-01-02")])
+    catalogue = ActorCatalogue(tmp_path / "actor_catalogue.db")
+    monkeypatch.setattr(missing, "_scraper_web", fake.scraper_web)
+    monkeypatch.setattr(missing, "get_actor_catalogue", lambda: catalogue)
+    yield fake
+    catalogue.close()
+
+
+@pytest.mark.asyncio
+async def test_get_actor_numbers_incremental(javdb):
+    works, singles = await missing._get_actor_numbers(ACTOR)
+    assert len(works) == 9 and singles == {"ABC-002"}
+    assert works["ABC-009"] == ActorWork("ABC-009", "2024/01/09", "https://javdb.com/v/ABC-009", "🧲    ", " title")
+    # 共 5 页, 按 1, 2, 4 页分批请求
+    assert len([u for u in javdb.requests if not u.endswith("&t=s")]) == 7
+
+    # 第 2 页即包含早于缓存的作品, 不再请求之后的分页
+    javdb.requests.clear()
+    javdb.lists[""] = [("ABC-010", "2024-01-10"), *_works(9)]
+    works, singles = await missing._get_actor_numbers(ACTOR)
+    assert len(works) == 10 and singles == {"ABC-002"}
+    assert set(javdb.requests) == {f"{ACTOR}?page=1&t=s", f"{ACTOR}?page=1", f"{ACTOR}?page=2", f"{ACTOR}?page=3"}
+
+    # 请求失败时使用缓存
+    javdb.fail = True
+    works, _ = await missing._get_actor_numbers(ACTOR)
+    assert len(works) == 10
+
+
+@pytest.mark.asyncio
+async def test_get_actor_numbers_full_refresh(javdb, monkeypatch):
+    await missing._get_actor_numbers(ACTOR)
+    javdb.requests.clear()
+    javdb.lists[""] = _works(3)
+    monkeypatch.setattr(missing, "FULL_REFRESH_INTERVAL", -1)
+    works, _ = await missing._get_actor_numbers(ACTOR)
+    # 完整获取时替换全部缓存
+    assert sorted(works) == ["ABC-001", "ABC-002", "ABC-003"]
+    assert len([u for u in javdb.requests if not u.endswith("&t=s")]) == 3
+
+
+@pytest.mark.asyncio
+async def test_get_actor_numbers_failed_without_cache(javdb):
+    javdb.fail = True
+    assert await missing._get_actor_numbers(ACTOR) is None
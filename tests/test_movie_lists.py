@@ -0,0 +1,86 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from mdcx.base.file import movie_lists, save_remain_list
+from mdcx.config.enums import Switch
+from mdcx.config.manager import manager
+from mdcx.config.resources import resources
+from mdcx.models.flags import Flags
+
+
+class SyntheticTree:
+    """模拟 Path.walk 的目录树, 用于在不创建文件的情况下测试遍历逻辑"""
+
+    def __init__(self, root: Path, dirs: int, files_per_dir: int, ignore_every: int):
+        self.root = root
+        self.dirs = [f"d{i:05}" for i in range(dirs)]
+        self.files = [f"ABC-{i:03}.mp4" if i % 2 else f"ABC-{i:03}.nfo" for i in range(files_per_dir)]
+        self.ignore_dirs = [root / d for d in self.dirs[::ignore_every]]
+
+    def walk(self, top_down: bool = True):
+        dirs = list(self.dirs)
+        yield self.root, dirs, []
+        for d in dirs:
+            yield self.root / d, [], list(self.files)
+
+
+@pytest.mark.asyncio
+async def test_movie_lists(tmp_path):
+    for d in ("a", "a/nested", "ignored", "skipped", "behind the scenes"):
+        (tmp_path / d).mkdir()
+    for f in ("a/ABC-001.mp4", "a/nested/ABC-002.MKV", "a/.hidden.mp4", "a/ABC-001-trailer.mp4", "a/ABC-001.nfo"):
+        (tmp_path / f).touch()
+    for d in ("ignored", "skipped", "behind the scenes"):
+        (tmp_path / d / "ABC-003.mp4").touch()
+    (tmp_path / "skipped" / ".skip").touch()
+    # 指向同一文件的软链接只跳过不删除, 无论遍历顺序如何都保留真实文件
+    real = tmp_path / "a" / "nested" / "ABC-002.MKV"
+    (tmp_path / "b").mkdir()
+    (tmp_path / "0").mkdir()
+    links = [tmp_path / "0" / "link0.mp4", tmp_path / "a" / "link1.mp4", tmp_path / "b" / "link2.mp4"]
+    os.symlink(real, links[0])
+    os.symlink(real, links[1])
+    os.symlink("../a/nested/ABC-002.MKV", links[2])
+    # 只有软链接指向的文件 (不在遍历范围内) 保留一个软链接
+    outside = tmp_path.parent / f"{tmp_path.name}-outside.mp4"
+    outside.touch()
+    other_links = [tmp_path / "0" / "other1.mp4", tmp_path / "b" / "other2.mp4"]
+    for p in other_links:
+        os.symlink(outside, p)
+
+    found = await movie_lists([tmp_path / "ignored"], [".mp4", ".mkv"], tmp_path)
+    assert len(found) == 3 and tmp_path / "a" / "ABC-001.mp4" in found and real in found
+    assert len(set(found) & set(other_links)) == 1
+    assert all(p.is_symlink() for p in links + other_links)
+
+
+@pytest.mark.asyncio
+async def test_movie_lists_synthetic_tree(tmp_path):
+    tree = SyntheticTree(tmp_path, dirs=100, files_per_dir=10, ignore_every=10)
+    found = await movie_lists(tree.ignore_dirs, [".mp4"], tree)  # type: ignore[arg-type]
+    assert len(found) == 90 * 5
+    assert len(set(found)) == len(found)
+
+
+class _MutatedDict(dict):
+    def __iter__(self):
+        raise RuntimeError("dictionary changed size during iteration")
+
+
+def test_save_remain_list(tmp_path, monkeypatch):
+    monkeypatch.setattr(resources, "_userdata_base", tmp_path)
+    monkeypatch.setattr(manager.config, "switch_on", [Switch.REMAIN_TASK])
+    monkeypatch.setattr(Flags, "remain_list", dict.fromkeys([Path("/b.mp4"), Path("/a.mp4")]))
+    monkeypatch.setattr(Flags, "can_save_remain", True)
+    save_remain_list()
+    assert (tmp_path / "remain.txt").read_text("utf-8").split() == [str(Path("/a.mp4")), str(Path("/b.mp4"))]
+
+    # 复制剩余任务时出错不应清空已保存的记录
+    monkeypatch.setattr(Flags, "remain_list", _MutatedDict())
+    monkeypatch.setattr(Flags, "can_save_remain", True)
+    monkeypatch.setattr("mdcx.base.file.signal.show_log_text", lambda *_: None)
+    save_remain_list()
+    assert (tmp_path / "remain.txt").read_text("utf-8").split() == [str(Path("/a.mp4")), str(Path("/b.mp4"))]
+    assert Flags.can_save_remain
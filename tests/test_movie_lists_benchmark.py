@@ -0,0 +1,86 @@
+"""
+待刮削文件遍历及剩余任务记录的性能测试, 需要 pytest-benchmark. 使用 20 万条目的模拟目录树, 对比列表与集合的开销.
+运行: pytest tests/test_movie_lists_benchmark.py --benchmark-group-by=func
+"""
+
+import asyncio
+import os
+from pathlib import Path
+
+import pytest
+
+from mdcx.base.file import movie_lists
+from tests.test_movie_lists import SyntheticTree
+
+pytest.importorskip("pytest_benchmark")
+
+DIRS = 20000
+FILES_PER_DIR = 10  # 共 20 万个文件
+IGNORE_EVERY = 100  # 200 个排除目录
+
+
+def _legacy_movie_lists(ignore_dirs: list[Path], media_type: list[str], movie_path: SyntheticTree) -> list[Path]:
+    """修改前 movie_lists 的遍历逻辑 (省略清理和日志)"""
+    total = []
+    skip_list = ["skip", ".skip", ".ignore"]
+    for root, dirs, files in movie_path.walk(top_down=True):
+        for d in dirs.copy():
+            if root / d in ignore_dirs or "behind the scenes" in d:
+                dirs.remove(d)
+        for skip_key in skip_list:
+            if skip_key in files:
+                dirs.clear()
+                break
+        else:
+            for f in files:
+                _, file_ext = os.path.splitext(f)
+                path = root / f
+                temp_total = []
+                if file_ext.lower() in media_type:
+                    if os.path.islink(path):
+                        real_path = path.readlink()
+                        if real_path in temp_total:
+                            continue
+                        temp_total.append(real_path)
+                    if path in temp_total:
+                        continue
+                    temp_total.append(path)
+                    total.append(path)
+    total.sort()
+    return total
+
+
+@pytest.fixture(scope="module")
+def tree(tmp_path_factory):
+    return SyntheticTree(tmp_path_factory.mktemp("media"), DIRS, FILES_PER_DIR, IGNORE_EVERY)
+
+
+def _movie_lists(ignore_dirs: list[Path], media_type: list[str], movie_path: SyntheticTree) -> list[Path]:
+    return asyncio.run(movie_lists(ignore_dirs, media_type, movie_path))  # type: ignore[arg-type]
+
+
+@pytest.mark.parametrize("func", [_movie_lists, _legacy_movie_lists], ids=["set", "legacy"])
+def test_benchmark_movie_lists(benchmark, tree, func):
+    benchmark.extra_info["entries"] = DIRS * FILES_PER_DIR
+    found = benchmark(func, tree.ignore_dirs, [".mp4"], tree)
+    assert len(found) == DIRS * FILES_PER_DIR // 2 * (IGNORE_EVERY - 1) // IGNORE_EVERY
+
+
+def _remain_list(paths: list[Path]):
+    remain = list(paths)
+    for p in paths:
+        remain.remove(p)
+
+
+def _remain_dict(paths: list[Path]):
+    remain = dict.fromkeys(paths)
+    for p in paths:
+        remain.pop(p, None)
+
+
+@pytest.mark.parametrize("func", [_remain_dict, _remain_list], ids=["ordered_set", "list"])
+def test_benchmark_remain(benchmark, func):
+    # 按开始顺序完成刮削, 每完成一个从剩余任务中移除
+    paths = [Path(f"/media/d{i // FILES_PER_DIR:05}/ABC-{i:06}.mp4") for i in range(DIRS * FILES_PER_DIR)]
+    benchmark.extra_info["entries"] = len(paths)
+    benchmark(func, paths)
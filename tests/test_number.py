@@ -0,0 +1,88 @@
+from collections import Counter
+
+import pytest
+
+from mdcx.config.models import Config
+from mdcx.manual import ManualConfig
+from mdcx.number import get_file_number, get_number_info
+from tests.number_reference import (
+    get_file_number_reference,
+    get_number_letters_reference,
+    is_suren_reference,
+    is_uncensored_reference,
+)
+from tests.random_generator import NUMBER_FAMILIES, generate_number_corpus
+
+# 与 Computed.escape_string_list 的构造方式一致
+ESCAPE_STRING_LIST = list(dict.fromkeys(k for k in Config().string + ManualConfig.REPL_LIST if k.strip()))
+
+
+@pytest.fixture(scope="module")
+def corpus():
+    return generate_number_corpus(12000)
+
+
+def test_get_file_number_same_as_reference(corpus):
+    for path, _, _ in corpus:
+        assert get_file_number(path, ESCAPE_STRING_LIST) == get_file_number_reference(path, ESCAPE_STRING_LIST), path
+
+
+@pytest.mark.parametrize(
+    "path,expected",
+    [
+        ("/a/hhd800.com@SSIS-123-C.mp4", "SSIS-123"),
+        ("/a/ssni00644.mp4", "SSNI-644"),
+        ("/a/LUXU-1456.mp4", "259LUXU-1456"),
+        ("/a/FC2-PPV-1234567.mp4", "FC2-1234567"),
+        ("/a/heyzo_hd_1234.mp4", "HEYZO-1234"),
+        ("/a/Carib-123456-789 1080p.mkv", "123456-789"),
+        ("/a/Tokyo-Hot n1234.avi", "n1234"),
+        ("/a/SexArt.21.05.12.mp4", "Sexart.21.05.12"),
+        ("/a/mywife No.1234.mp4", "Mywife No.1234"),
+        ("/a/h_173mega05.mp4", "MEGA-05"),
+        ("/a/th101-140-112594.mp4", "th101-140-112594"),
+        ("/a/ABP-123.part1.mp4", "ABP-123"),
+        ("/a/IPX-123-CD2 [HEVC].mp4", "IPX-123"),
+    ],
+)
+def test_get_file_number(path, expected):
+    assert get_file_number(path, ESCAPE_STRING_LIST) == expected
+    assert get_file_number_reference(path, ESCAPE_STRING_LIST) == expected
+
+
+def test_get_file_number_accuracy(corpus):
+    total, correct = Counter(), Counter()
+    for path, family, expected in corpus:
+        total[family] += 1
+        correct[family] += get_file_number(path, ESCAPE_STRING_LIST) == expected
+    accuracy = {family: correct[family] / total[family] for family in NUMBER_FAMILIES}
+    assert all(v == 1 for v in accuracy.values()), accuracy
+
+
+@pytest.mark.parametrize(
+    "number,letters,family,short_number",
+    [
+        ("SSIS-123", "SSIS", "censored", ""),
+        ("259LUXU-1456", "259LUXU", "suren", "LUXU-1456"),
+        ("SIRO-4567", "SIRO", "suren", ""),
+        ("FC2-1234567", "FC2", "fc2", ""),
+        ("HEYZO-1234", "HEYZO", "uncensored", ""),
+        ("n1234", "n", "uncensored", ""),
+        ("Sexart.21.05.12", "Sexart", "oumei", ""),
+        ("MKY-NS-003", "MKY-NS", "censored", ""),
+        ("XXX-AV-12345", "XXX-AV", "uncensored", ""),
+    ],
+)
+def test_get_number_info(number, letters, family, short_number):
+    info = get_number_info(number)
+    assert (info.letters, info.family, info.short_number) == (letters, family, short_number)
+
+
+def test_get_number_info_same_as_reference(corpus):
+    numbers = {get_file_number(path, ESCAPE_STRING_LIST) for path, _, _ in corpus}
+    numbers |= {key + "123" for key in ManualConfig.SUREN_DIC}
+    for number in numbers:
+        info = get_number_info(number)
+        assert info.uncensored == is_uncensored_reference(number), number
+        assert info.suren == is_suren_reference(number), number
+        assert info.letters == get_number_letters_reference(number), number
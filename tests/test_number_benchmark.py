@@ -0,0 +1,37 @@
+"""
+番号提取性能测试, 需要 pytest-benchmark. 运行: pytest tests/test_number_benchmark.py --benchmark-group-by=func
+"""
+
+import pytest
+
+from mdcx.number import get_file_number
+from tests.number_reference import get_file_number_reference
+from tests.random_generator import NUMBER_FAMILIES, generate_number_corpus
+from tests.test_number import ESCAPE_STRING_LIST
+
+pytest.importorskip("pytest_benchmark")
+
+
+@pytest.fixture(scope="module")
+def corpus():
+    return generate_number_corpus(12000)
+
+
+def _extract_all(func, paths: list[str]):
+    for p in paths:
+        func(p, ESCAPE_STRING_LIST)
+
+
+@pytest.mark.parametrize("func", [get_file_number, get_file_number_reference], ids=["optimized", "reference"])
+def test_benchmark_get_file_number(benchmark, corpus, func):
+    paths = [p for p, _, _ in corpus]
+    benchmark.extra_info["files"] = len(paths)
+    benchmark(_extract_all, func, paths)
+
+
+@pytest.mark.parametrize("family", list(NUMBER_FAMILIES))
+def test_benchmark_get_file_number_by_family(benchmark, corpus, family):
+    paths = [p for p, f, _ in corpus if f == family]
+    benchmark.group = "family"
+    benchmark.extra_info["files"] = len(paths)
+    benchmark(_extract_all, get_file_number, paths)
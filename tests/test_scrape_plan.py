@@ -0,0 +1,68 @@
+import dataclasses
+
+import pytest
+
+from mdcx.config.enums import Language, Website
+from mdcx.config.models import Config
+from mdcx.config.plan import MULTI_LANGUAGE_WEBSITES, ScrapePlan, SiteCategory
+from mdcx.gen.field_enums import CrawlerResultFields
+from mdcx.manual import ManualConfig
+
+
+def _config() -> Config:
+    config = Config()
+    config.set_field_language(CrawlerResultFields.TITLE, Language.ZH_CN)
+    config.set_field_sites(CrawlerResultFields.TITLE, [Website.AIRAV, Website.JAVBUS, Website.DMM])
+    config.set_field_language(CrawlerResultFields.OUTLINE, Language.UNDEFINED)
+    config.set_field_sites(CrawlerResultFields.OUTLINE, [Website.JAVLIBRARY, Website.DMM])
+    return config
+
+
+def legacy_sources(config: Config, type_sites: set[Website], field: CrawlerResultFields):
+    """与 ScrapePlan 引入前 FileScraper._call_crawlers 相同的计算"""
+    f_config = config.get_field_config(field)
+    f_lang = f_config.language
+    result = []
+    for site in [s for s in f_config.site_prority if s in type_sites]:
+        key = (site, f_lang) if site in MULTI_LANGUAGE_WEBSITES else (site, Language.UNDEFINED)
+        language = Language.JP if site in MULTI_LANGUAGE_WEBSITES and key[1] == Language.UNDEFINED else f_lang
+        result.append((site, key, language))
+    return result
+
+
+def test_scrape_plan_matches_config():
+    config = _config()
+    plan = ScrapePlan.from_config(config)
+    categories = {
+        SiteCategory.YOUMA: config.website_youma,
+        SiteCategory.WUMA: config.website_wuma,
+        SiteCategory.SUREN: config.website_suren,
+        SiteCategory.FC2: config.website_fc2,
+        SiteCategory.OUMEI: config.website_oumei,
+        SiteCategory.GUOCHAN: config.website_guochan,
+        SiteCategory.DMM: {Website.DMM},
+    }
+    for category, sites in categories.items():
+        for field in ManualConfig.REDUCED_FIELDS:
+            expected = legacy_sources(config, sites, field)
+            assert [(s.site, s.key, s.language) for s in plan.sources(category, field)] == expected
+
+    title = plan.sources(SiteCategory.DMM, CrawlerResultFields.TITLE)
+    assert [s.site for s in title] == [Website.DMM]
+    assert plan.field_languages[CrawlerResultFields.TITLE] == Language.ZH_CN
+    assert plan.switches == frozenset(config.switch_on)
+    assert plan.download_files == frozenset(config.download_files)
+
+
+def test_scrape_plan_is_immutable():
+    config = _config()
+    plan = ScrapePlan.from_config(config)
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        plan.switches = frozenset()  # type: ignore[misc]
+    with pytest.raises(TypeError):
+        plan.field_languages[CrawlerResultFields.TITLE] = Language.JP  # type: ignore[index]
+
+    # 刮削开始后修改设置不影响已生成的计划
+    before = plan.sources(SiteCategory.YOUMA, CrawlerResultFields.TITLE)
+    config.set_field_sites(CrawlerResultFields.TITLE, [Website.JAVBUS])
+    assert plan.sources(SiteCategory.YOUMA, CrawlerResultFields.TITLE) == before
@@ -0,0 +1,34 @@
+"""
+刮削计划性能测试, 需要 pytest-benchmark. 对比每个文件查询各字段来源网站的开销.
+运行: pytest tests/test_scrape_plan_benchmark.py --benchmark-group-by=func
+"""
+
+import pytest
+
+from mdcx.config.models import Config
+from mdcx.config.plan import ScrapePlan, SiteCategory
+from mdcx.manual import ManualConfig
+from tests.test_scrape_plan import legacy_sources
+
+pytest.importorskip("pytest_benchmark")
+
+FILES = 1000
+
+
+def _per_file_legacy(config: Config):
+    for _ in range(FILES):
+        for field in ManualConfig.REDUCED_FIELDS:
+            legacy_sources(config, config.website_youma, field)
+
+
+def _per_file_plan(config: Config):
+    plan = ScrapePlan.from_config(config)  # 每次刮削生成一次
+    for _ in range(FILES):
+        for field in ManualConfig.REDUCED_FIELDS:
+            plan.sources(SiteCategory.YOUMA, field)
+
+
+@pytest.mark.parametrize("func", [_per_file_plan, _per_file_legacy], ids=["plan", "legacy"])
+def test_benchmark_field_sources(benchmark, func):
+    benchmark.extra_info["files"] = FILES
+    benchmark(func, Config())
@@ -0,0 +1,67 @@
+import pytest
+
+from mdcx.core.file import deal_old_files
+from mdcx.core.scraper import Scraper
+from mdcx.models.flags import FileDoneDict, Flags, ScrapeState
+from mdcx.models.types import OtherInfo
+
+
+class FakeProvider:
+    async def close(self):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_scrape_file_twice(tmp_path, monkeypatch):
+    movie = tmp_path / "ABC-001.mp4"
+    movie.touch()
+    catched = []
+
+    async def process_one_file(self, file_info, file_mode, reuse=True, state=Flags):
+        # 只执行图片处理权的抢占, 图片不带文件名时同一目录只有一个文件可以下载
+        state.file_done_dic["ABC-001"] = FileDoneDict(
+            poster=None,
+            thumb=None,
+            fanart=None,
+            trailer=None,
+            local_poster=None,
+            local_thumb=None,
+            local_fanart=None,
+            local_trailer=None,
+        )
+        catched.append(
+            await deal_old_files(
+                "ABC-001",
+                OtherInfo.empty(),
+                tmp_path,
+                tmp_path,
+                movie,
+                tmp_path / "ABC-001-thumb.jpg",
+                tmp_path / "ABC-001-poster.jpg",
+                tmp_path / "ABC-001-fanart.jpg",
+                tmp_path / "ABC-001.nfo",
+                tmp_path / "poster.jpg",
+                tmp_path / "thumb.jpg",
+                tmp_path / "fanart.jpg",
+                state,
+            )
+        )
+        return object(), object()
+
+    monkeypatch.setattr(Scraper, "_process_one_file", process_one_file)
+    monkeypatch.setattr(Flags, "pic_catch_set", set())
+    monkeypatch.setattr(Flags, "extrafanart_deal_set", set())
+    scraper = Scraper(FakeProvider())  # type: ignore[arg-type]
+
+    # 同一文件的两次单文件任务都应取得图片和剧照的处理权, 且不修改批量刮削的全局状态
+    assert await scraper.scrape_file(movie) == ""
+    assert await scraper.scrape_file(movie) == ""
+    assert catched == [(True, True), (True, True)]
+    assert not Flags.pic_catch_set and not Flags.extrafanart_deal_set
+    assert scraper.progress.succeeded == 2
+
+    # 批量刮削共享状态, 同一目录的图片只处理一次
+    state = ScrapeState()
+    await process_one_file(scraper, None, None, state=state)
+    await process_one_file(scraper, None, None, state=state)
+    assert catched[2:] == [(True, True), (False, False)]
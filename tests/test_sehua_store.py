@@ -0,0 +1,47 @@
+import json
+
+from mdcx import sehua_store
+from mdcx.sehua_store import SehuaTitleStore, build_sehua_db, open_sehua_store, source_hash
+
+
+def test_sehua_store(tmp_path):
+    json_path = tmp_path / "c_number.json"
+    json_path.write_text(json.dumps({"ABC-123": "标题一", "010113_504": "标题二"}, ensure_ascii=False), "utf-8")
+    db_path = tmp_path / "c_number.db"
+    assert build_sehua_db(json_path, db_path) == 2
+
+    store = SehuaTitleStore(db_path)
+    assert store.get("ABC-123") == "标题一"
+    assert store.get("010113_504") == "标题二"
+    assert store.get("XYZ-001") is None
+    assert "ABC-123" in store and len(store) == 2
+    store.close()
+
+
+def test_open_sehua_store(tmp_path, monkeypatch):
+    json_path = tmp_path / "c_number.json"
+    json_path.write_text(json.dumps({"ABC-123": "旧标题"}, ensure_ascii=False), "utf-8")
+    prebuilt = tmp_path / "resources" / "c_number.db"
+    fallback = tmp_path / "userdata" / "c_number.db"
+    build_sehua_db(json_path, prebuilt)
+
+    store = open_sehua_store(json_path, prebuilt, fallback)
+    assert store.db_path == prebuilt and not fallback.exists()
+    store.close()
+
+    # JSON 更新后内置数据库过期, 在用户数据目录下重新生成
+    json_path.write_text(json.dumps({"ABC-123": "新标题"}, ensure_ascii=False), "utf-8")
+    store = open_sehua_store(json_path, prebuilt, fallback)
+    assert store.db_path == fallback and store.get("ABC-123") == "新标题"
+    assert source_hash(prebuilt) != source_hash(fallback)
+    store.close()
+
+    # 大小和修改时间未变化时不计算 sha256
+    hashed = []
+    monkeypatch.setattr(sehua_store, "file_hash", lambda p: hashed.append(p) or "")
+    store = open_sehua_store(json_path, prebuilt, fallback)
+    assert store.db_path == fallback and hashed == []
+    store.close()
+    json_path.write_text(json.dumps({"ABC-123": "新标题2"}, ensure_ascii=False), "utf-8")
+    open_sehua_store(json_path, prebuilt, fallback).close()
+    assert hashed
@@ -0,0 +1,92 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from mdcx.session_store import SessionStore, is_challenge
+from mdcx.web_async import CHALLENGE_ERROR, AsyncWebClient
+
+BROWSER_UA = "Mozilla/5.0 (Browser)"
+
+
+class _ChallengeHandler(BaseHTTPRequestHandler):
+    """未携带验证 cookie 及对应 User-Agent 时返回 Cloudflare 验证页面"""
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        passed = "cf_clearance=ok" in self.headers.get("Cookie", "") and self.headers.get("User-Agent") == BROWSER_UA
+        body = b"<html>detail</html>" if passed else b"<html><title>Just a moment...</title></html>"
+        self.send_response(200 if passed else 403)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture(scope="module")
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _ChallengeHandler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+
+
+def _cookie(name, value, domain, expires=-1):
+    return {"name": name, "value": value, "domain": domain, "path": "/", "expires": expires, "httpOnly": True}
+
+
+def test_session_store(tmp_path):
+    store = SessionStore(tmp_path / "sessions.db")
+    store.save_browser_cookies(
+        [
+            _cookie("cf_clearance", "root", ".javdb.com", time.time() + 3600),
+            _cookie("cf_clearance", "www", "www.javdb.com", time.time() + 3600),
+            _cookie("_session", "s", "javdb.com"),
+            _cookie("expired", "x", "javdb.com", time.time() - 1),
+        ],
+        BROWSER_UA,
+    )
+    # 子域名的 cookie 优先
+    assert store.cookies("www.javdb.com") == {"cf_clearance": "www", "_session": "s"}
+    assert store.cookies("javdb.com") == {"cf_clearance": "root", "_session": "s"}
+    assert store.cookies("javbus.com") == {}
+    assert store.user_agent("www.javdb.com") == BROWSER_UA
+    assert {c["domain"] for c in store.browser_cookies("www.javdb.com")} == {".www.javdb.com", ".javdb.com"}
+    store.close()
+
+    # 重新打开后仍可读取
+    store = SessionStore(lambda: tmp_path / "sessions.db")
+    assert store.cookies("javdb.com") == {"cf_clearance": "root", "_session": "s"}
+    store.clear("javdb.com")
+    assert store.cookies("javdb.com") == {}
+    store.close()
+
+
+def test_is_challenge():
+    assert is_challenge(403, {}, "<title>Just a moment...</title>")
+    assert is_challenge(200, {"cf-mitigated": "challenge"}, "")
+    assert not is_challenge(403, {}, "Forbidden")
+    assert not is_challenge(200, {}, "Just a moment...")
+
+
+@pytest.mark.asyncio
+async def test_client_uses_saved_session(server, tmp_path):
+    store = SessionStore(tmp_path / "sessions.db")
+    client = AsyncWebClient(timeout=10, retry=1, session_store=store)
+
+    html, error = await client.get_text(f"{server}/detail")
+    assert html is None and CHALLENGE_ERROR in error
+
+    # 模拟浏览器通过验证后保存的会话
+    store.save_browser_cookies([_cookie("cf_clearance", "ok", "127.0.0.1", time.time() + 3600)], BROWSER_UA)
+    html, error = await client.get_text(f"{server}/detail")
+    assert html == "<html>detail</html>"
+
+    # 验证 cookie 失效时清除会话
+    store.save_browser_cookies([_cookie("cf_clearance", "stale", "127.0.0.1", time.time() + 3600)], BROWSER_UA)
+    html, error = await client.get_text(f"{server}/detail")
+    assert html is None and CHALLENGE_ERROR in error
+    assert store.cookies("127.0.0.1") == {}
+    store.close()
@@ -0,0 +1,81 @@
+"""
+启动耗时测试. 检查启动时不会导入爬虫等按需加载的模块, 超时时使用 `python -X importtime` 列出耗时最长的模块.
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).parent.parent
+# 启动导入耗时上限 (秒). 按需加载前约 1.8s, 现约 0.9s
+STARTUP_BUDGET = 1.0
+# 启动时不应导入的模块, 均在首次使用时导入
+LAZY_MODULES = (
+    "mdcx.crawlers.javbus",
+    "mdcx.crawlers.dmm_new",
+    "mdcx.tools.emby_actor_info",
+    "bs4",
+    "parsel",
+    "patchright",
+    "openai",
+    "av",
+)
+
+
+def import_time(code: str, env: dict[str, str] | None = None, importtime: bool = False) -> tuple[float, dict[str, int]]:
+    """
+    在子进程中执行 code, 返回耗时 (秒) 和各模块的累计导入耗时 (微秒).
+
+    -X importtime 本身会增加约三成耗时, 因此仅在 importtime 为 True 时启用, 否则模块耗时为空.
+    """
+    timed = f"import time as _t; _s = _t.perf_counter()\n{code}\nprint(_t.perf_counter() - _s)"
+    result = subprocess.run(
+        [sys.executable, *(["-X", "importtime"] if importtime else []), "-c", timed],
+        cwd=ROOT,
+        env={**os.environ, **(env or {})},
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or line.count("|") != 2:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():  # 跳过表头
+            modules[name.strip()] = int(cumulative)
+    return float(result.stdout.splitlines()[-1]), modules
+
+
+def _check(code: str, env: dict[str, str] | None = None, runs: int = 3):
+    _, modules = import_time(code, env, importtime=True)
+    loaded = [m for m in LAZY_MODULES if m in modules]
+    assert not loaded, f"启动时导入了按需加载的模块: {loaded}"
+    # 耗时受机器负载影响, 取多次运行的最小值
+    elapsed = import_time(code, env)[0]
+    for _ in range(runs - 1):
+        if elapsed < STARTUP_BUDGET:
+            break
+        elapsed = min(elapsed, import_time(code, env)[0])
+    slowest = sorted(((t, m) for m, t in modules.items() if m.startswith("mdcx")), reverse=True)[:8]
+    assert elapsed < STARTUP_BUDGET, f"启动耗时 {elapsed:.2f}s, 耗时最长的模块: {slowest}"
+
+
+def test_gui_startup():
+    pytest.importorskip("PyQt5.QtWidgets")
+    _check("import mdcx.controllers.main_window.main_window")
+
+
+def test_server_startup():
+    pytest.importorskip("fastapi")
+    # 与 server.init 相同, server.py 导入时会创建应用并挂载前端目录, 因此不直接导入
+    _check(
+        "from mdcx.server import var; var.is_server = True; "
+        "from mdcx.server.signals import signal; from mdcx.signals import set_signal; set_signal(signal); "
+        "from mdcx.server.api.v1 import api",
+        {"MDCX_DEV": "1"},
+    )
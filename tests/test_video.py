@@ -1,9 +1,21 @@
+import asyncio
 import os
 import subprocess
+import threading
+from pathlib import Path
 
 import pytest
 
-from mdcx.utils.video import get_video_metadata_ffmpeg, get_video_metadata_pyav
+from mdcx.core import utils as core_utils
+from mdcx.core.utils import VideoProber, probe_video_cached
+from mdcx.utils.video import (
+    AudioStream,
+    VideoMetadata,
+    VideoProbeCache,
+    get_video_metadata_ffmpeg,
+    get_video_metadata_pyav,
+    guess_height_from_path,
+)
 
 
 def create_dummy_video(path, size="320x240", vcodec="libx264", fmt="mp4", pix_fmt=None):
@@ -37,3 +49,150 @@ def test_get_video_metadata_all(tmpdir, fname, size, vcodec, fmt, pix_fmt, expec
         assert c == expect_codec, f"{func.__name__} codec mismatch for {video_path}"
     except ImportError:
         pytest.skip(f"{func.__name__} not available (ImportError)")
+
+
+def test_video_probe_cache(tmp_path):
+    video_path = tmp_path / "movie.mp4"
+    video_path.write_bytes(b"\0" * 1024)
+    calls = []
+
+    def fake_probe(p):
+        calls.append(p)
+        return VideoMetadata(height=1080, codec="H264", duration=12.5, audio=[AudioStream("AAC", 2, "jpn")])
+
+    cache = VideoProbeCache(tmp_path / "probe.db")
+    meta = cache.get_or_probe(video_path, fake_probe)
+    assert meta.height == 1080 and meta.audio[0].language == "jpn"
+    assert cache.get_or_probe(video_path, fake_probe) == meta
+    assert len(calls) == 1
+
+    # 移动文件后仍命中缓存
+    moved_path = tmp_path / "moved.mp4"
+    video_path.rename(moved_path)
+    assert cache.get_or_probe(moved_path, fake_probe) == meta
+    assert len(calls) == 1
+    assert cache.lookup_path(moved_path) == meta
+
+    # 文件内容变更后重新探测
+    moved_path.write_bytes(b"\0" * 2048)
+    cache.get_or_probe(moved_path, fake_probe)
+    assert len(calls) == 2
+    cache.close()
+
+
+@pytest.mark.parametrize(
+    "path,expected",
+    [
+        ("/media/ABC-123 8K.mp4", 4000),
+        ("/media/4k/ABC-123.mp4", 2000),
+        ("/media/ABC-123-uhd.mkv", 2000),
+        ("/media/ABC-123 [1440p].mp4", 1440),
+        ("/media/ABC-123-FHD.mp4", 1080),
+        ("/media/ABC-123.1080p.mp4", 1080),
+        ("/media/ABC-123 960P.mp4", 960),
+        ("/media/ABC-123-720p.mp4", 720),
+        ("/media/hd/ABC-123.mp4", 720),
+        ("/media/ABC-123.mp4", 0),
+    ],
+)
+def test_guess_height_from_path(path, expected):
+    assert guess_height_from_path(Path(path)) == expected
+
+
+def _backend(name, calls, result=None, release=None):
+    def probe(p, timeout):
+        calls.append(name)
+        if release is not None:
+            release.wait(5)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    return probe
+
+
+@pytest.mark.asyncio
+async def test_video_prober_fallback(monkeypatch):
+    calls = []
+    monkeypatch.setattr(
+        core_utils,
+        "PROBE_BACKENDS",
+        [
+            ("a", _backend("a", calls, RuntimeError("broken"))),
+            ("b", _backend("b", calls, VideoMetadata(source="b"))),
+            ("c", _backend("c", calls, VideoMetadata(height=720, source="c"))),
+        ],
+    )
+    prober = VideoProber(1, 1)
+    # 失败或没有视频流时按顺序尝试下一个后端
+    assert await prober.probe(Path("ABC-123-1080p.mp4")) == VideoMetadata(height=720, source="c")
+    assert calls == ["a", "b", "c"]
+
+    # 全部失败时根据文件名推断
+    monkeypatch.setattr(core_utils, "PROBE_BACKENDS", [("a", _backend("a", calls, RuntimeError("broken")))])
+    assert await prober.probe(Path("ABC-123-1080p.mp4")) == VideoMetadata(height=1080, source="path")
+    prober.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_video_prober_timeout(monkeypatch):
+    calls = []
+    release = threading.Event()
+    monkeypatch.setattr(
+        core_utils,
+        "PROBE_BACKENDS",
+        [
+            ("slow", _backend("slow", calls, VideoMetadata(height=1080, source="slow"), release)),
+            ("fast", _backend("fast", calls, VideoMetadata(height=720, source="fast"))),
+        ],
+    )
+    prober = VideoProber(2, 0.05)
+    prober.TIMEOUT_GRACE = 0
+    try:
+        # 卡住的后端超时后使用下一个后端
+        assert (await prober.probe(Path("ABC-123.mp4"))).source == "fast"
+        assert calls == ["slow", "fast"]
+    finally:
+        release.set()
+        prober.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_video_prober_shutdown_keeps_pending(monkeypatch):
+    calls = []
+    release = threading.Event()
+    monkeypatch.setattr(
+        core_utils, "PROBE_BACKENDS", [("a", _backend("a", calls, VideoMetadata(height=720, source="a"), release))]
+    )
+    prober = VideoProber(1, 5)
+    tasks = [asyncio.create_task(prober.probe(Path(f"{i}.mp4"))) for i in range(2)]
+    await asyncio.sleep(0.05)
+    # 设置变更时重建执行器, 已排队的探测不会被取消
+    prober.shutdown()
+    release.set()
+    assert [m.source for m in await asyncio.gather(*tasks)] == ["a", "a"]
+
+
+@pytest.mark.asyncio
+async def test_probe_video_cached_skips_path_guess(tmp_path, monkeypatch):
+    video_path = tmp_path / "ABC-123-1080p.mp4"
+    video_path.write_bytes(b"\0" * 1024)
+    calls = []
+    cache = VideoProbeCache(tmp_path / "probe.db")
+    monkeypatch.setattr(core_utils, "get_probe_cache", lambda: cache)
+    monkeypatch.setattr(core_utils, "PROBE_BACKENDS", [("a", _backend("a", calls, RuntimeError("broken")))])
+    monkeypatch.setattr(core_utils, "_prober", VideoProber(1, 1))
+    monkeypatch.setattr(core_utils.manager.config, "probe_concurrency", 1)
+    monkeypatch.setattr(core_utils.manager.config, "probe_timeout", 1)
+
+    # 根据文件名推断的结果不缓存, 下次重新探测
+    assert (await probe_video_cached(video_path)).source == "path"
+    assert cache.get(video_path) is None
+    monkeypatch.setattr(
+        core_utils, "PROBE_BACKENDS", [("a", _backend("a", calls, VideoMetadata(height=1080, source="a")))]
+    )
+    assert (await probe_video_cached(video_path)).source == "a"
+    assert (await probe_video_cached(video_path)).source == "a"
+    assert calls == ["a", "a"]
+    assert cache.get(video_path) == VideoMetadata(height=1080, source="a")
+    cache.close()
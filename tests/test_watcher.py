@@ -0,0 +1,100 @@
+import asyncio
+import sys
+from datetime import time as dtime
+
+import pytest
+
+from mdcx.config.manager import manager
+from mdcx.core.watcher import InotifyBackend, LibraryWatcher, PollingBackend, WatchFilter, in_quiet_hours
+
+
+def test_in_quiet_hours():
+    assert in_quiet_hours("01:00-07:00", dtime(3))
+    assert not in_quiet_hours("01:00-07:00", dtime(7))
+    # 跨越午夜
+    assert in_quiet_hours("23:00-02:00", dtime(0, 30))
+    assert not in_quiet_hours("23:00-02:00", dtime(12))
+    assert in_quiet_hours("bad, 12:00-13:00", dtime(12, 30))
+    assert not in_quiet_hours("", dtime(12))
+
+
+@pytest.fixture
+def flt(tmp_path):
+    (tmp_path / "JAV_output").mkdir()
+    return WatchFilter(tmp_path, frozenset({tmp_path / "JAV_output"}), frozenset({".mp4"}))
+
+
+def test_filter(flt, tmp_path):
+    assert flt.accept(tmp_path / "a" / "ABC-001.mp4")
+    assert not flt.accept(tmp_path / "ABC-001.nfo")
+    assert not flt.accept(tmp_path / "ABC-001-trailer.mp4")
+    assert not flt.accept(tmp_path / "JAV_output" / "ABC" / "ABC-001.mp4")
+    (tmp_path / "skipped").mkdir()
+    (tmp_path / "skipped" / ".ignore").touch()
+    assert not flt.accept(tmp_path / "skipped" / "ABC-001.mp4")
+
+
+@pytest.mark.asyncio
+async def test_debounce_and_batch(flt, tmp_path, monkeypatch):
+    monkeypatch.setattr(manager.config, "watch_stable_seconds", 5)
+    monkeypatch.setattr(manager.config, "watch_batch_window", 10)
+    monkeypatch.setattr(manager.config, "watch_quiet_hours", "01:00-07:00")
+    submitted = []
+    watcher = LibraryWatcher(submit=submitted.append)
+    watcher._filter = flt
+    noon = dtime(12)
+
+    a = tmp_path / "ABC-001.mp4"
+    a.write_bytes(b"x")
+    watcher.add(a)
+    watcher.add(tmp_path / "missing.mp4")
+    await watcher.tick(0, noon)
+    # 文件仍在写入, 重新计算稳定时间
+    a.write_bytes(b"xx")
+    await watcher.tick(3, noon)
+    await watcher.tick(7, noon)
+    assert watcher._pending and not watcher._batch
+    await watcher.tick(8, noon)
+    assert list(watcher._batch) == [a] and not watcher._pending
+
+    # 批量窗口内收集, 静默时段内不提交
+    await watcher.tick(17, noon)
+    await watcher.tick(18, dtime(3))
+    assert submitted == []
+    await watcher.tick(19, noon)
+    assert submitted == [[a]]
+    assert not watcher._batch
+
+
+@pytest.mark.asyncio
+async def test_polling_backend(flt, tmp_path):
+    (tmp_path / "old.mp4").touch()
+    added = []
+    backend = PollingBackend(flt, added.append, 60)
+    await backend.start()
+    (tmp_path / "a").mkdir()
+    (tmp_path / "a" / "new.mp4").touch()
+    (tmp_path / "JAV_output" / "done.mp4").touch()
+    await backend.poll()
+    assert added == [tmp_path / "a" / "new.mp4"]
+    await backend.close()
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify")
+@pytest.mark.asyncio
+async def test_inotify_backend(flt, tmp_path):
+    added = []
+    backend = InotifyBackend(flt, added.append)
+    await backend.start()
+    try:
+        (tmp_path / "JAV_output" / "done.mp4").write_bytes(b"x")
+        (tmp_path / "ABC-001.mp4").write_bytes(b"x")
+        (tmp_path / "new").mkdir()
+        (tmp_path / "new" / "ABC-002.mp4").write_bytes(b"x")
+        for _ in range(100):
+            if {tmp_path / "ABC-001.mp4", tmp_path / "new" / "ABC-002.mp4"} <= set(added):
+                break
+            await asyncio.sleep(0.02)
+        assert set(added) == {tmp_path / "ABC-001.mp4", tmp_path / "new" / "ABC-002.mp4"}
+    finally:
+        await backend.close()
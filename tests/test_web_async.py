@@ -0,0 +1,197 @@
+import asyncio
+import contextlib
+import hashlib
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from mdcx import web_async
+from mdcx.web_async import AsyncWebClient, DownloadPriority, DownloadScheduler, _partial_paths
+
+SMALL = bytes(range(256)) * 400
+LARGE = bytes(range(251)) * (10 * 1024**2 // 251)
+ETAG = '"v1"'
+
+
+class _Handler(BaseHTTPRequestHandler):
+    files = {"/small.bin": SMALL, "/large.bin": LARGE}
+    requests: list[tuple[str, str, str | None]] = []
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, body: bool):
+        data = self.files.get(self.path)
+        if data is None:
+            self.send_error(404)
+            return
+        self.requests.append((self.command, self.path, self.headers.get("Range")))
+        start, end = 0, len(data)
+        range_header = self.headers.get("Range")
+        if range_header and self.headers.get("If-Range", ETAG) == ETAG:
+            s, _, e = range_header.removeprefix("bytes=").partition("-")
+            start, end = int(s), int(e) + 1 if e else len(data)
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end - 1}/{len(data)}")
+        else:
+            self.send_response(200)
+        self.send_header("Content-Length", str(end - start))
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("ETag", ETAG)
+        self.end_headers()
+        if body:
+            self.wfile.write(data[start:end])
+
+    def do_HEAD(self):
+        self._send(False)
+
+    def do_GET(self):
+        self._send(True)
+
+
+@pytest.fixture(scope="module")
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+
+
+@pytest.fixture
+def client():
+    _Handler.requests.clear()
+    return AsyncWebClient(timeout=10, retry=1)
+
+
+@pytest.mark.asyncio
+async def test_download_small_single_probe(server, client, tmp_path):
+    url = f"{server}/small.bin"
+    target = tmp_path / "small.bin"
+    assert await client.get_filesize(url) == len(SMALL)
+    assert await client.download(url, target)
+    assert target.read_bytes() == SMALL
+    assert [r[0] for r in _Handler.requests] == ["HEAD", "GET"]
+    assert not _partial_paths(target)[0].exists()
+
+
+@pytest.mark.asyncio
+async def test_download_parallel_ranges(server, client, tmp_path):
+    target = tmp_path / "large.bin"
+    assert await client.download(f"{server}/large.bin", target)
+    assert target.read_bytes() == LARGE
+    ranges = [r[2] for r in _Handler.requests if r[0] == "GET"]
+    assert len(ranges) == -(-len(LARGE) // web_async.SEGMENT_SIZE)
+    assert all(ranges)
+
+
+@pytest.mark.asyncio
+async def test_download_resume(server, client, tmp_path):
+    url = f"{server}/small.bin"
+    target = tmp_path / "small.bin"
+    partial, meta_path = _partial_paths(target)
+    partial.write_bytes(SMALL[:1000])
+    meta_path.write_text(json.dumps({"url": url, "size": len(SMALL), "validator": ETAG}))
+    assert await client.download(url, target)
+    assert target.read_bytes() == SMALL
+    assert ("GET", "/small.bin", "bytes=1000-") in _Handler.requests
+    assert not meta_path.exists()
+
+
+@pytest.mark.asyncio
+async def test_download_failed_discards_partial(server, client, tmp_path, monkeypatch):
+    from mdcx.base.web import download_file_with_filepath
+    from mdcx.config.manager import manager
+
+    monkeypatch.setattr(manager.computed, "async_client", client)
+    target = tmp_path / "missing.bin"
+    partial, meta_path = _partial_paths(target)
+    partial.write_bytes(SMALL[:1000])
+    meta_path.write_text(json.dumps({"url": f"{server}/missing.bin", "size": len(SMALL), "validator": ETAG}))
+    # 下载失败时保留临时文件, 调用方放弃下载后删除
+    assert not await client.download(f"{server}/missing.bin", target)
+    assert partial.exists()
+    assert not await download_file_with_filepath(f"{server}/missing.bin", target, tmp_path)
+    assert not partial.exists() and not meta_path.exists() and not target.exists()
+
+
+@pytest.mark.asyncio
+async def test_download_checksum(server, client, tmp_path):
+    url = f"{server}/small.bin"
+    target = tmp_path / "small.bin"
+    assert not await client.download(url, target, checksum="sha256:" + "0" * 64)
+    assert not target.exists()
+    assert await client.download(url, target, checksum="sha256:" + hashlib.sha256(SMALL).hexdigest())
+    assert target.read_bytes() == SMALL
+
+
+@pytest.mark.asyncio
+async def test_download_scheduler_priority():
+    scheduler = DownloadScheduler(max_concurrent=1, per_host=1)
+    order = []
+    release = asyncio.Event()
+
+    async def job(name: str, priority: DownloadPriority):
+        async with scheduler.slot("a.com", priority):
+            order.append(name)
+            await release.wait()
+
+    first = asyncio.create_task(job("first", DownloadPriority.IMAGE))
+    await asyncio.sleep(0)
+    waiters = [
+        asyncio.create_task(job("trailer", DownloadPriority.TRAILER)),
+        asyncio.create_task(job("extrafanart", DownloadPriority.EXTRAFANART)),
+        asyncio.create_task(job("poster", DownloadPriority.IMAGE)),
+    ]
+    await asyncio.sleep(0)
+    assert scheduler.waiting == 3
+    release.set()
+    await asyncio.gather(first, *waiters)
+    assert order == ["first", "poster", "extrafanart", "trailer"]
+
+
+async def _hold(scheduler: DownloadScheduler, host: str, priority: DownloadPriority, entered: asyncio.Event):
+    """占用连接直到被取消"""
+    async with scheduler.slot(host, priority):
+        entered.set()
+        await asyncio.Event().wait()
+
+
+async def _stop(task: asyncio.Task):
+    task.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await task
+
+
+@pytest.mark.asyncio
+async def test_download_scheduler_limits():
+    scheduler = DownloadScheduler(max_concurrent=3, per_host=2)
+    async with scheduler.slot("a.com", DownloadPriority.IMAGE), scheduler.slot("a.com", DownloadPriority.IMAGE):
+        # a.com 已达上限, 不阻塞其他域名
+        entered = asyncio.Event()
+        blocked = asyncio.create_task(_hold(scheduler, "a.com", DownloadPriority.IMAGE, entered))
+        await asyncio.sleep(0)
+        assert not entered.is_set()
+        async with scheduler.slot("b.com", DownloadPriority.TRAILER):
+            assert scheduler.active == 3
+        await _stop(blocked)
+    assert scheduler.active == 0 and scheduler.waiting == 0
+
+    # 未延后下载时, 有刮削请求也不限制剧照和预告片
+    async with scheduler.metadata(), scheduler.slot("a.com", DownloadPriority.TRAILER):
+        async with scheduler.slot("b.com", DownloadPriority.EXTRAFANART):
+            assert scheduler.active == 2
+
+    # 延后下载时, 有刮削请求时剧照和预告片最多占用 1 个连接
+    scheduler = DownloadScheduler(max_concurrent=3, per_host=2, yield_bulk=True)
+    entered = asyncio.Event()
+    async with scheduler.metadata(), scheduler.slot("a.com", DownloadPriority.TRAILER):
+        bulk = asyncio.create_task(_hold(scheduler, "b.com", DownloadPriority.EXTRAFANART, entered))
+        await asyncio.sleep(0)
+        assert not entered.is_set()
+        async with scheduler.slot("b.com", DownloadPriority.IMAGE):
+            pass
+    await asyncio.wait_for(entered.wait(), 1)
+    await _stop(bulk)
+    assert scheduler.active == 0
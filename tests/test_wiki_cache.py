@@ -0,0 +1,122 @@
+import asyncio
+
+import pytest
+
+from mdcx.config.enums import EmbyAction
+from mdcx.models.emby import EMbyActressInfo
+from mdcx.tools import emby_actor_info
+from mdcx.tools.wiki import WikidataResolver, WikiRequestError
+from mdcx.tools.wiki_cache import WikiCache
+
+
+def test_wiki_cache(tmp_path):
+    cache = WikiCache(tmp_path / "wiki_cache.db")
+    cache.set("actor", "夢乃あいか", {"found": True})
+    cache.set("actor", "expired", {"found": False}, ttl=-1)
+    assert cache.get("actor", "夢乃あいか") == {"found": True}
+    assert cache.get("entity", "夢乃あいか") is None
+    assert cache.get("actor", "expired") is None
+    cache.close()
+
+
+@pytest.mark.asyncio
+async def test_actor_info_job_caches_by_name(tmp_path, monkeypatch):
+    calls = []
+
+    async def search_wiki(actor_info, resolver=None):
+        calls.append(actor_info.name)
+        await asyncio.sleep(0.01)
+        if actor_info.name == "offline":
+            raise WikiRequestError("维基百科搜索结果请求失败: timeout")
+        actor_info.taglines = ["日本AV女优"]
+        return "https://ja.m.wikipedia.org/wiki/a", "Wikipedia: a"
+
+    async def get_detail(url, url_log, actor_info):
+        if actor_info.name == "untranslated":
+            raise WikiRequestError("翻译处理过程中发生异常: timeout")
+        actor_info.overview = "简介"
+        return True, ""
+
+    monkeypatch.setattr(emby_actor_info, "search_wiki", search_wiki)
+    monkeypatch.setattr(emby_actor_info, "get_detail", get_detail)
+    monkeypatch.setattr(emby_actor_info, "get_wiki_cache", lambda: WikiCache(tmp_path / "wiki_cache.db"))
+
+    job = emby_actor_info._ActorInfoJob([EmbyAction.ACTOR_INFO_ZH_CN])
+    infos = [EMbyActressInfo(name="夢乃あいか", server_id="s", id=str(i)) for i in range(3)]
+    results = await asyncio.gather(*(job.search(info) for info in infos))
+    # 同名演员只查询一次, 其余使用缓存
+    assert calls == ["夢乃あいか"]
+    assert [found for found, _ in results] == [True] * 3
+    assert all(info.overview == "简介" and info.taglines == ["日本AV女优"] for info in infos)
+
+    # 请求失败的结果不缓存
+    for _ in range(2):
+        assert await job.search(EMbyActressInfo(name="offline", server_id="s", id="x")) == (
+            False,
+            "维基百科搜索结果请求失败: timeout",
+        )
+    assert calls.count("offline") == 2
+    for _ in range(2):
+        assert await job.search(EMbyActressInfo(name="untranslated", server_id="s", id="x")) == (
+            False,
+            "翻译处理过程中发生异常: timeout",
+        )
+    assert calls.count("untranslated") == 2
+
+    # 设置变化后不使用此前的缓存
+    job = emby_actor_info._ActorInfoJob([EmbyAction.ACTOR_INFO_JA])
+    await job.search(EMbyActressInfo(name="夢乃あいか", server_id="s", id="0"))
+    assert calls.count("夢乃あいか") == 2
+
+
+class FakeWikidata:
+    def __init__(self):
+        self.urls = []
+
+    async def get_json(self, url, headers=None):
+        self.urls.append(url)
+        await asyncio.sleep(0.01)
+        ids = url.split("&ids=")[1].split("&")[0].split("|")
+        return {"entities": {i: {"id": i} if i != "Q0" else {"id": i, "missing": ""} for i in ids}}, ""
+
+
+@pytest.mark.asyncio
+async def test_wikidata_resolver_batches(tmp_path, monkeypatch):
+    from mdcx.config.manager import manager
+
+    fake = FakeWikidata()
+    monkeypatch.setattr(manager.computed, "async_client", fake)
+    cache = WikiCache(tmp_path / "wiki_cache.db")
+    resolver = WikidataResolver(cache)
+
+    # 多个演员并发请求的实体合并请求, 每次最多 50 个
+    groups = [[f"Q{i}", f"Q{i + 1}"] for i in range(0, 120, 2)] + [["Q0", "Q1"]]
+    results = await asyncio.gather(*(resolver.get_entities(ids) for ids in groups))
+    assert len(fake.urls) == 3
+    assert all("props=descriptions|sitelinks/urls|claims" in url for url in fake.urls)
+    # 不存在的实体不在结果中
+    assert results[0] == results[-1] == {"Q1": {"id": "Q1"}}
+
+    # 再次请求时使用缓存
+    assert await resolver.get_entities(["Q5", "Q6"]) == {"Q5": {"id": "Q5"}, "Q6": {"id": "Q6"}}
+    assert len(fake.urls) == 3
+    cache.close()
+
+
+class OfflineWikidata:
+    async def get_json(self, url, headers=None):
+        return None, "timeout"
+
+
+@pytest.mark.asyncio
+async def test_wikidata_resolver_failure_not_cached(tmp_path, monkeypatch):
+    from mdcx.config.manager import manager
+
+    monkeypatch.setattr(manager.computed, "async_client", OfflineWikidata())
+    cache = WikiCache(tmp_path / "wiki_cache.db")
+    resolver = WikidataResolver(cache)
+    # 批量请求失败时, 所有等待的演员都收到请求失败, 而不是未找到
+    results = await asyncio.gather(resolver.get_entities(["Q1"]), resolver.get_entities(["Q2"]), return_exceptions=True)
+    assert all(isinstance(r, WikiRequestError) for r in results)
+    assert cache.get_many(WikidataResolver.CACHE_NAMESPACE, ["Q1", "Q2"]) == {}
+    cache.close()